@@ -0,0 +1,19 @@
+-- Migration: Allow cross-deck study sessions
+-- Version: 008
+-- Date: 2026-10-19
+-- Description: Makes study_sessions.deck_id nullable so a single session can cover a
+--              merged due queue across all of a user's decks (POST /study/start)
+
+-- ============================================================
+-- STUDY_SESSIONS TABLE
+-- ============================================================
+-- A NULL deck_id means the session was started across multiple decks
+ALTER TABLE study_sessions ALTER COLUMN deck_id DROP NOT NULL;
+
+-- ============================================================
+-- ROLLBACK INSTRUCTIONS
+-- ============================================================
+-- To rollback this migration, run:
+--
+-- DELETE FROM study_sessions WHERE deck_id IS NULL;
+-- ALTER TABLE study_sessions ALTER COLUMN deck_id SET NOT NULL;
@@ -0,0 +1,80 @@
+-- Migration: Create llm_calls table
+-- Version: 009
+-- Date: 2026-10-19
+-- Description: Records token usage, latency and outcome of every Claude call
+--              (mnemonics, flashcards, concept extraction) for cost and latency tracking,
+--              plus an aggregate function used by GET /admin/llm-usage
+
+-- ============================================================
+-- LLM_CALLS TABLE
+-- ============================================================
+CREATE TABLE IF NOT EXISTS llm_calls (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  user_id UUID REFERENCES auth.users(id) ON DELETE SET NULL,
+  task VARCHAR(50) NOT NULL,
+  model VARCHAR(100) NOT NULL,
+  outcome VARCHAR(20) NOT NULL CHECK (outcome IN ('success', 'error', 'cancelled')),
+  error TEXT,
+  input_tokens INTEGER NOT NULL DEFAULT 0,
+  output_tokens INTEGER NOT NULL DEFAULT 0,
+  cache_creation_input_tokens INTEGER NOT NULL DEFAULT 0,
+  cache_read_input_tokens INTEGER NOT NULL DEFAULT 0,
+  latency_ms INTEGER NOT NULL,
+  time_to_first_token_ms INTEGER,
+  retries INTEGER NOT NULL DEFAULT 0,
+  created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_calls_created_at ON llm_calls(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_llm_calls_task_created_at ON llm_calls(task, created_at DESC);
+
+-- Only the backend (service role) reads and writes this table
+ALTER TABLE llm_calls ENABLE ROW LEVEL SECURITY;
+
+-- ============================================================
+-- AGGREGATE FUNCTION
+-- ============================================================
+-- Per task/model usage since a point in time, aggregated in the database
+CREATE OR REPLACE FUNCTION llm_usage_summary(since TIMESTAMPTZ)
+RETURNS TABLE (
+  task VARCHAR,
+  model VARCHAR,
+  calls BIGINT,
+  errors BIGINT,
+  retries BIGINT,
+  input_tokens BIGINT,
+  output_tokens BIGINT,
+  cache_creation_input_tokens BIGINT,
+  cache_read_input_tokens BIGINT,
+  avg_latency_ms DOUBLE PRECISION,
+  p95_latency_ms DOUBLE PRECISION,
+  avg_time_to_first_token_ms DOUBLE PRECISION
+)
+LANGUAGE sql STABLE
+AS $$
+  SELECT
+    task,
+    model,
+    COUNT(*),
+    COUNT(*) FILTER (WHERE outcome = 'error'),
+    COALESCE(SUM(retries), 0),
+    COALESCE(SUM(input_tokens), 0),
+    COALESCE(SUM(output_tokens), 0),
+    COALESCE(SUM(cache_creation_input_tokens), 0),
+    COALESCE(SUM(cache_read_input_tokens), 0),
+    AVG(latency_ms)::DOUBLE PRECISION,
+    PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY latency_ms),
+    AVG(time_to_first_token_ms)::DOUBLE PRECISION
+  FROM llm_calls
+  WHERE created_at >= since
+  GROUP BY task, model
+  ORDER BY task, model;
+$$;
+
+-- ============================================================
+-- ROLLBACK INSTRUCTIONS
+-- ============================================================
+-- To rollback this migration, run:
+--
+-- DROP FUNCTION IF EXISTS llm_usage_summary(TIMESTAMPTZ);
+-- DROP TABLE IF EXISTS llm_calls;
@@ -0,0 +1,108 @@
+-- Migration: Rate limit buckets and atomic generation count
+-- Version: 010
+-- Date: 2026-10-19
+-- Description: Shared token buckets for the per-user generation rate limiter
+--              (RATE_LIMIT_BACKEND=supabase) and a single-statement increment of
+--              profiles.generation_count_monthly to replace the racy read-modify-write
+
+-- ============================================================
+-- RATE_LIMIT_BUCKETS TABLE
+-- ============================================================
+-- One row per bucket key ("<scope>:<tier>:<user_id>")
+CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+  key TEXT PRIMARY KEY,
+  tokens DOUBLE PRECISION NOT NULL,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Used to prune idle buckets
+CREATE INDEX IF NOT EXISTS idx_rate_limit_buckets_updated_at ON rate_limit_buckets(updated_at);
+
+-- Only the backend (service role) reads and writes this table
+ALTER TABLE rate_limit_buckets ENABLE ROW LEVEL SECURITY;
+
+-- ============================================================
+-- TOKEN BUCKET FUNCTION
+-- ============================================================
+-- Refills the bucket for the time elapsed and takes p_cost tokens if available.
+-- The row is locked (or created) by the upsert, so concurrent requests from any
+-- worker are serialized per key.
+-- About one call in a hundred also deletes buckets idle for over a day; they
+-- have refilled by then, so recreating them on the next request is equivalent.
+CREATE OR REPLACE FUNCTION take_rate_limit_token(
+  p_key TEXT,
+  p_capacity INTEGER,
+  p_refill_per_second DOUBLE PRECISION,
+  p_cost INTEGER DEFAULT 1
+)
+RETURNS TABLE (
+  allowed BOOLEAN,
+  remaining INTEGER,
+  retry_after_seconds INTEGER
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  current_tokens DOUBLE PRECISION;
+  last_update TIMESTAMPTZ;
+BEGIN
+  INSERT INTO rate_limit_buckets (key, tokens, updated_at)
+  VALUES (p_key, p_capacity, NOW())
+  ON CONFLICT (key) DO UPDATE SET key = EXCLUDED.key
+  RETURNING rate_limit_buckets.tokens, rate_limit_buckets.updated_at
+  INTO current_tokens, last_update;
+
+  current_tokens := LEAST(
+    p_capacity::DOUBLE PRECISION,
+    current_tokens + EXTRACT(EPOCH FROM (NOW() - last_update)) * p_refill_per_second
+  );
+
+  IF current_tokens >= p_cost THEN
+    current_tokens := current_tokens - p_cost;
+    allowed := TRUE;
+    retry_after_seconds := 0;
+  ELSE
+    allowed := FALSE;
+    retry_after_seconds := CASE
+      WHEN p_refill_per_second > 0 THEN CEIL((p_cost - current_tokens) / p_refill_per_second)::INTEGER
+      ELSE 3600
+    END;
+  END IF;
+
+  UPDATE rate_limit_buckets
+  SET tokens = current_tokens, updated_at = NOW()
+  WHERE key = p_key;
+
+  IF random() < 0.01 THEN
+    DELETE FROM rate_limit_buckets
+    WHERE updated_at < NOW() - INTERVAL '1 day'
+      AND key <> p_key;
+  END IF;
+
+  remaining := FLOOR(current_tokens)::INTEGER;
+  RETURN NEXT;
+END;
+$$;
+
+-- ============================================================
+-- ATOMIC GENERATION COUNT
+-- ============================================================
+-- Returns the new count, or no row if the profile doesn't exist
+CREATE OR REPLACE FUNCTION increment_generation_count(p_user_id UUID)
+RETURNS TABLE (generation_count_monthly INTEGER)
+LANGUAGE sql
+AS $$
+  UPDATE profiles
+  SET generation_count_monthly = COALESCE(profiles.generation_count_monthly, 0) + 1
+  WHERE id = p_user_id
+  RETURNING profiles.generation_count_monthly;
+$$;
+
+-- ============================================================
+-- ROLLBACK INSTRUCTIONS
+-- ============================================================
+-- To rollback this migration, run:
+--
+-- DROP FUNCTION IF EXISTS increment_generation_count(UUID);
+-- DROP FUNCTION IF EXISTS take_rate_limit_token(TEXT, INTEGER, DOUBLE PRECISION, INTEGER);
+-- DROP TABLE IF EXISTS rate_limit_buckets;
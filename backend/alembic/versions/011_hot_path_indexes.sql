@@ -0,0 +1,70 @@
+-- Migration: Hot-path indexes
+-- Version: 011
+-- Date: 2026-10-19
+-- Description: Composite and covering indexes matching the queries the services
+--              actually run. Verify plans with scripts/explain_hot_queries.py.
+--
+-- Lookups by (id, user_id) on mnemonic_generations and study_sessions are
+-- served by the primary key (one row, then a filter) and need no index.
+--
+-- On a large production table, run each CREATE INDEX separately with
+-- CONCURRENTLY (outside a transaction) to avoid blocking writes.
+
+-- ============================================================
+-- FLASHCARDS
+-- ============================================================
+-- FlashcardService.get_flashcards_by_deck: deck_id = ? ORDER BY created_at.
+-- Returns whole rows (select *), so no INCLUDE columns.
+CREATE INDEX IF NOT EXISTS idx_flashcards_deck_created_at ON flashcards(deck_id, created_at);
+
+-- deck_id alone is a prefix of both composite indexes; drop it to save a
+-- write per insert
+DROP INDEX IF EXISTS idx_flashcards_deck_id;
+
+-- ============================================================
+-- DECKS
+-- ============================================================
+-- DirectQueries.get_decks_by_user: user_id = ?
+-- ORDER BY last_studied_at DESC NULLS LAST, created_at DESC (no sort step)
+CREATE INDEX IF NOT EXISTS idx_decks_user_last_studied_created
+  ON decks(user_id, last_studied_at DESC NULLS LAST, created_at DESC);
+
+DROP INDEX IF EXISTS idx_decks_last_studied;
+
+-- ============================================================
+-- CARD_REVIEWS
+-- ============================================================
+-- DirectQueries.get_stats_overview: counts per user, retained (quality) and
+-- since a date, plus distinct review days for the streak. INCLUDE (quality)
+-- makes these index-only scans.
+CREATE INDEX IF NOT EXISTS idx_card_reviews_user_reviewed_at
+  ON card_reviews(user_id, reviewed_at DESC) INCLUDE (quality);
+
+-- ============================================================
+-- STUDY_SESSIONS
+-- ============================================================
+-- DirectQueries.get_stats_overview: total and this-month study time per user
+CREATE INDEX IF NOT EXISTS idx_study_sessions_user_started_at
+  ON study_sessions(user_id, started_at) INCLUDE (duration_seconds);
+
+-- user_id alone is a prefix of the index above
+DROP INDEX IF EXISTS idx_study_sessions_user_id;
+
+-- Refresh planner statistics for the tables whose indexes changed
+ANALYZE flashcards;
+ANALYZE decks;
+ANALYZE card_reviews;
+ANALYZE study_sessions;
+
+-- ============================================================
+-- ROLLBACK INSTRUCTIONS
+-- ============================================================
+-- To rollback this migration, run:
+--
+-- DROP INDEX IF EXISTS idx_study_sessions_user_started_at;
+-- CREATE INDEX IF NOT EXISTS idx_study_sessions_user_id ON study_sessions(user_id);
+-- DROP INDEX IF EXISTS idx_card_reviews_user_reviewed_at;
+-- DROP INDEX IF EXISTS idx_decks_user_last_studied_created;
+-- CREATE INDEX IF NOT EXISTS idx_decks_last_studied ON decks(user_id, last_studied_at DESC NULLS LAST);
+-- DROP INDEX IF EXISTS idx_flashcards_deck_created_at;
+-- CREATE INDEX IF NOT EXISTS idx_flashcards_deck_id ON flashcards(deck_id);
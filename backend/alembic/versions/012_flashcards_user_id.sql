@@ -0,0 +1,92 @@
+-- Migration: Denormalize user_id onto flashcards
+-- Version: 012
+-- Date: 2026-10-19
+-- Description: Stores the owning user on every flashcard so ownership checks and
+--              due-card queries are single-table predicates (no join or extra
+--              query against decks). Triggers keep the column equal to the
+--              deck owner.
+
+-- ============================================================
+-- COLUMN AND BACKFILL
+-- ============================================================
+ALTER TABLE flashcards ADD COLUMN IF NOT EXISTS user_id UUID;
+
+UPDATE flashcards
+SET user_id = decks.user_id
+FROM decks
+WHERE decks.id = flashcards.deck_id
+  AND flashcards.user_id IS DISTINCT FROM decks.user_id;
+
+ALTER TABLE flashcards ALTER COLUMN user_id SET NOT NULL;
+
+-- ============================================================
+-- TRIGGERS
+-- ============================================================
+-- On insert (or a move to another deck) the owner always comes from the deck.
+-- If the writer supplies a user_id it must match the deck owner, so the
+-- backend can insert with user_id set and skip a separate ownership query.
+CREATE OR REPLACE FUNCTION set_flashcard_user_id()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_owner UUID;
+BEGIN
+  SELECT user_id INTO v_owner FROM decks WHERE id = NEW.deck_id;
+
+  IF v_owner IS NULL THEN
+    RAISE EXCEPTION 'Deck not found or access denied' USING ERRCODE = 'P0002';
+  END IF;
+
+  IF TG_OP = 'INSERT' AND NEW.user_id IS NOT NULL AND NEW.user_id <> v_owner THEN
+    RAISE EXCEPTION 'Deck not found or access denied' USING ERRCODE = 'P0002';
+  END IF;
+
+  NEW.user_id := v_owner;
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS flashcards_set_user_id ON flashcards;
+CREATE TRIGGER flashcards_set_user_id
+  BEFORE INSERT OR UPDATE OF deck_id, user_id ON flashcards
+  FOR EACH ROW
+  EXECUTE FUNCTION set_flashcard_user_id();
+
+-- A deck changing owner carries its cards along
+CREATE OR REPLACE FUNCTION propagate_deck_user_id()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  UPDATE flashcards SET user_id = NEW.user_id WHERE deck_id = NEW.id;
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS decks_propagate_user_id ON decks;
+CREATE TRIGGER decks_propagate_user_id
+  AFTER UPDATE OF user_id ON decks
+  FOR EACH ROW
+  WHEN (OLD.user_id IS DISTINCT FROM NEW.user_id)
+  EXECUTE FUNCTION propagate_deck_user_id();
+
+-- ============================================================
+-- INDEXES
+-- ============================================================
+-- Merged due queue and due histogram: user_id = ? AND next_review_date <=/>= ?
+CREATE INDEX IF NOT EXISTS idx_flashcards_user_next_review ON flashcards(user_id, next_review_date);
+
+ANALYZE flashcards;
+
+-- ============================================================
+-- ROLLBACK INSTRUCTIONS
+-- ============================================================
+-- To rollback this migration, run:
+--
+-- DROP INDEX IF EXISTS idx_flashcards_user_next_review;
+-- DROP TRIGGER IF EXISTS decks_propagate_user_id ON decks;
+-- DROP FUNCTION IF EXISTS propagate_deck_user_id();
+-- DROP TRIGGER IF EXISTS flashcards_set_user_id ON flashcards;
+-- DROP FUNCTION IF EXISTS set_flashcard_user_id();
+-- ALTER TABLE flashcards DROP COLUMN IF EXISTS user_id;
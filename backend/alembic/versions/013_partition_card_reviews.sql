@@ -0,0 +1,306 @@
+-- Migration: Partition card_reviews by month with summary compaction
+-- Version: 013
+-- Date: 2026-10-19
+-- Description: Rebuilds card_reviews as a table range-partitioned by month on
+--              reviewed_at, so recent-window queries only touch recent
+--              partitions and vacuum/index maintenance works on one month at a
+--              time. Partitions older than the raw retention window are
+--              compacted into per-card monthly rows in card_review_summaries
+--              and dropped. Run maintain_card_reviews() daily (scheduled below
+--              when pg_cron is available, otherwise via
+--              scripts/maintain_card_reviews.py).
+
+-- ============================================================
+-- MOVE THE EXISTING TABLE ASIDE
+-- ============================================================
+ALTER TABLE card_reviews RENAME TO card_reviews_unpartitioned;
+ALTER TABLE card_reviews_unpartitioned RENAME CONSTRAINT card_reviews_pkey TO card_reviews_unpartitioned_pkey;
+DROP INDEX IF EXISTS idx_card_reviews_flashcard_id;
+DROP INDEX IF EXISTS idx_card_reviews_session_id;
+DROP INDEX IF EXISTS idx_card_reviews_reviewed_at;
+DROP INDEX IF EXISTS idx_card_reviews_user_reviewed_at;
+
+-- ============================================================
+-- PARTITIONED CARD_REVIEWS TABLE
+-- ============================================================
+-- The partition key must be part of the primary key
+CREATE TABLE card_reviews (
+  id UUID NOT NULL DEFAULT gen_random_uuid(),
+  session_id UUID REFERENCES study_sessions(id) ON DELETE CASCADE,
+  flashcard_id UUID NOT NULL REFERENCES flashcards(id) ON DELETE CASCADE,
+  user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+  quality INTEGER NOT NULL CHECK (quality IN (1, 3, 5)),
+  response_time_ms INTEGER,
+  previous_interval INTEGER,
+  new_interval INTEGER,
+  previous_ease_factor FLOAT,
+  new_ease_factor FLOAT,
+  reviewed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+
+  PRIMARY KEY (id, reviewed_at),
+  CONSTRAINT response_time_non_negative CHECK (response_time_ms IS NULL OR response_time_ms >= 0)
+) PARTITION BY RANGE (reviewed_at);
+
+-- Created on every partition
+CREATE INDEX idx_card_reviews_user_reviewed_at ON card_reviews(user_id, reviewed_at DESC) INCLUDE (quality);
+CREATE INDEX idx_card_reviews_session_id ON card_reviews(session_id);
+CREATE INDEX idx_card_reviews_flashcard_id ON card_reviews(flashcard_id);
+
+-- Catches reviews outside every monthly partition (e.g. a skewed client
+-- clock) instead of failing the insert; create_card_review_partitions moves
+-- them into their month's partition when it is created
+CREATE TABLE card_reviews_default PARTITION OF card_reviews DEFAULT;
+
+ALTER TABLE card_reviews ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own card reviews" ON card_reviews
+  FOR SELECT
+  USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can insert own card reviews" ON card_reviews
+  FOR INSERT
+  WITH CHECK (auth.uid() = user_id);
+
+-- ============================================================
+-- CARD_REVIEW_SUMMARIES TABLE
+-- ============================================================
+-- One row per card, user and month for compacted partitions. Keeps totals and
+-- retention statistics after the raw reviews are dropped.
+CREATE TABLE IF NOT EXISTS card_review_summaries (
+  flashcard_id UUID NOT NULL REFERENCES flashcards(id) ON DELETE CASCADE,
+  user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+  month DATE NOT NULL,
+  review_count INTEGER NOT NULL,
+  retained_count INTEGER NOT NULL,  -- reviews with quality >= 3
+  quality_sum INTEGER NOT NULL,
+  response_time_ms_sum BIGINT NOT NULL DEFAULT 0,
+  response_time_count INTEGER NOT NULL DEFAULT 0,
+  last_reviewed_at TIMESTAMPTZ NOT NULL,
+
+  PRIMARY KEY (flashcard_id, user_id, month)
+);
+
+CREATE INDEX IF NOT EXISTS idx_card_review_summaries_user_month ON card_review_summaries(user_id, month);
+
+ALTER TABLE card_review_summaries ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own card review summaries" ON card_review_summaries
+  FOR SELECT
+  USING (auth.uid() = user_id);
+
+-- ============================================================
+-- PARTITION CREATION
+-- ============================================================
+-- Creates monthly partitions (card_reviews_YYYY_MM) from p_from's month up to
+-- p_months_ahead months after the current one. Returns how many were created.
+-- A month's rows already in card_reviews_default are moved into its new
+-- partition, which could not be attached while the default still held them.
+CREATE OR REPLACE FUNCTION create_card_review_partitions(
+  p_from DATE DEFAULT CURRENT_DATE,
+  p_months_ahead INTEGER DEFAULT 3
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+DECLARE
+  v_month DATE := date_trunc('month', p_from)::DATE;
+  v_last DATE := (date_trunc('month', CURRENT_DATE) + make_interval(months => p_months_ahead))::DATE;
+  v_name TEXT;
+  v_start TIMESTAMPTZ;
+  v_end TIMESTAMPTZ;
+  v_created INTEGER := 0;
+BEGIN
+  WHILE v_month <= v_last LOOP
+    v_name := 'card_reviews_' || to_char(v_month, 'YYYY_MM');
+    v_start := v_month::TIMESTAMP AT TIME ZONE 'UTC';
+    v_end := (v_month + INTERVAL '1 month')::TIMESTAMP AT TIME ZONE 'UTC';
+
+    IF to_regclass(v_name) IS NULL THEN
+      EXECUTE format('CREATE TABLE %I (LIKE card_reviews INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', v_name);
+      EXECUTE format(
+        'INSERT INTO %I SELECT * FROM card_reviews_default WHERE reviewed_at >= %L AND reviewed_at < %L',
+        v_name, v_start, v_end
+      );
+      DELETE FROM card_reviews_default WHERE reviewed_at >= v_start AND reviewed_at < v_end;
+      EXECUTE format(
+        'ALTER TABLE card_reviews ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        v_name, v_start, v_end
+      );
+      v_created := v_created + 1;
+    END IF;
+
+    v_month := (v_month + INTERVAL '1 month')::DATE;
+  END LOOP;
+
+  RETURN v_created;
+END;
+$$;
+
+-- ============================================================
+-- COMPACTION AND RETENTION
+-- ============================================================
+-- Folds every partition older than p_keep_months (counting the current month)
+-- into card_review_summaries, then detaches and drops it. Summary rows older
+-- than p_summary_keep_months are deleted (0 keeps them forever).
+-- p_keep_months must be at least 14: the streak lookback reads raw reviews.
+CREATE OR REPLACE FUNCTION compact_card_review_partitions(
+  p_keep_months INTEGER DEFAULT 14,
+  p_summary_keep_months INTEGER DEFAULT 0
+)
+RETURNS TABLE (
+  compacted_partitions INTEGER,
+  summary_rows_deleted INTEGER
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+DECLARE
+  v_cutoff DATE := (date_trunc('month', CURRENT_DATE) - make_interval(months => p_keep_months - 1))::DATE;
+  v_partition TEXT;
+  v_month DATE;
+BEGIN
+  IF p_keep_months IS NULL OR p_keep_months < 14 THEN
+    RAISE EXCEPTION 'p_keep_months must be at least 14 (the streak lookback reads raw reviews), got %', p_keep_months;
+  END IF;
+
+  compacted_partitions := 0;
+  summary_rows_deleted := 0;
+
+  FOR v_partition IN
+    SELECT child.relname
+    FROM pg_inherits
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE pg_inherits.inhparent = 'card_reviews'::REGCLASS
+      AND child.relname ~ '^card_reviews_[0-9]{4}_[0-9]{2}$'
+    ORDER BY child.relname
+  LOOP
+    v_month := to_date(right(v_partition, 7), 'YYYY_MM');
+    EXIT WHEN v_month >= v_cutoff;
+
+    EXECUTE format(
+      $sql$
+      INSERT INTO card_review_summaries (
+        flashcard_id, user_id, month, review_count, retained_count, quality_sum,
+        response_time_ms_sum, response_time_count, last_reviewed_at
+      )
+      SELECT
+        flashcard_id, user_id, %L::DATE, COUNT(*), COUNT(*) FILTER (WHERE quality >= 3), SUM(quality),
+        COALESCE(SUM(response_time_ms), 0), COUNT(response_time_ms), MAX(reviewed_at)
+      FROM %I
+      GROUP BY flashcard_id, user_id
+      ON CONFLICT (flashcard_id, user_id, month) DO UPDATE SET
+        review_count = card_review_summaries.review_count + EXCLUDED.review_count,
+        retained_count = card_review_summaries.retained_count + EXCLUDED.retained_count,
+        quality_sum = card_review_summaries.quality_sum + EXCLUDED.quality_sum,
+        response_time_ms_sum = card_review_summaries.response_time_ms_sum + EXCLUDED.response_time_ms_sum,
+        response_time_count = card_review_summaries.response_time_count + EXCLUDED.response_time_count,
+        last_reviewed_at = GREATEST(card_review_summaries.last_reviewed_at, EXCLUDED.last_reviewed_at)
+      $sql$,
+      v_month,
+      v_partition
+    );
+
+    EXECUTE format('ALTER TABLE card_reviews DETACH PARTITION %I', v_partition);
+    EXECUTE format('DROP TABLE %I', v_partition);
+    compacted_partitions := compacted_partitions + 1;
+  END LOOP;
+
+  IF p_summary_keep_months > 0 THEN
+    DELETE FROM card_review_summaries
+    WHERE month < (date_trunc('month', CURRENT_DATE) - make_interval(months => p_summary_keep_months - 1))::DATE;
+    GET DIAGNOSTICS summary_rows_deleted = ROW_COUNT;
+  END IF;
+
+  RETURN NEXT;
+END;
+$$;
+
+-- Daily maintenance: create upcoming partitions, then compact and apply retention
+CREATE OR REPLACE FUNCTION maintain_card_reviews(
+  p_months_ahead INTEGER DEFAULT 3,
+  p_keep_months INTEGER DEFAULT 14,
+  p_summary_keep_months INTEGER DEFAULT 0
+)
+RETURNS TABLE (
+  created_partitions INTEGER,
+  compacted_partitions INTEGER,
+  summary_rows_deleted INTEGER
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+BEGIN
+  created_partitions := create_card_review_partitions(CURRENT_DATE, p_months_ahead);
+
+  SELECT compacted.compacted_partitions, compacted.summary_rows_deleted
+  INTO compacted_partitions, summary_rows_deleted
+  FROM compact_card_review_partitions(p_keep_months, p_summary_keep_months) AS compacted;
+
+  RETURN NEXT;
+END;
+$$;
+
+-- The functions run as the table owner (only the owner may create, detach
+-- and drop partitions). Supabase grants EXECUTE on new functions to anon and
+-- authenticated, so limit them to service_role (the maintenance script).
+REVOKE EXECUTE ON FUNCTION create_card_review_partitions(DATE, INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION compact_card_review_partitions(INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION maintain_card_reviews(INTEGER, INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION create_card_review_partitions(DATE, INTEGER) TO service_role;
+GRANT EXECUTE ON FUNCTION compact_card_review_partitions(INTEGER, INTEGER) TO service_role;
+GRANT EXECUTE ON FUNCTION maintain_card_reviews(INTEGER, INTEGER, INTEGER) TO service_role;
+
+-- ============================================================
+-- COPY EXISTING REVIEWS
+-- ============================================================
+SELECT create_card_review_partitions(
+  COALESCE((SELECT MIN(reviewed_at) FROM card_reviews_unpartitioned)::DATE, CURRENT_DATE),
+  3
+);
+
+INSERT INTO card_reviews (
+  id, session_id, flashcard_id, user_id, quality, response_time_ms,
+  previous_interval, new_interval, previous_ease_factor, new_ease_factor, reviewed_at
+)
+SELECT
+  id, session_id, flashcard_id, user_id, quality, response_time_ms,
+  previous_interval, new_interval, previous_ease_factor, new_ease_factor, COALESCE(reviewed_at, NOW())
+FROM card_reviews_unpartitioned;
+
+DROP TABLE card_reviews_unpartitioned;
+
+ANALYZE card_reviews;
+
+-- ============================================================
+-- SCHEDULING
+-- ============================================================
+-- Uses the default policy; reschedule with arguments matching the
+-- CARD_REVIEWS_* settings if they are changed.
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+    PERFORM cron.schedule('maintain-card-reviews', '15 3 * * *', 'SELECT * FROM maintain_card_reviews()');
+  END IF;
+END;
+$$;
+
+-- ============================================================
+-- ROLLBACK INSTRUCTIONS
+-- ============================================================
+-- To rollback this migration, run (compacted reviews cannot be restored):
+--
+-- SELECT cron.unschedule('maintain-card-reviews');  -- if pg_cron is installed
+-- DROP FUNCTION IF EXISTS maintain_card_reviews(INTEGER, INTEGER, INTEGER);
+-- DROP FUNCTION IF EXISTS compact_card_review_partitions(INTEGER, INTEGER);
+-- DROP FUNCTION IF EXISTS create_card_review_partitions(DATE, INTEGER);
+-- CREATE TABLE card_reviews_unpartitioned (LIKE card_reviews INCLUDING DEFAULTS INCLUDING CONSTRAINTS);
+-- INSERT INTO card_reviews_unpartitioned SELECT * FROM card_reviews;
+-- DROP TABLE card_reviews;
+-- ALTER TABLE card_reviews_unpartitioned RENAME TO card_reviews;
+-- ALTER TABLE card_reviews ADD PRIMARY KEY (id);
+-- (then recreate the indexes, foreign keys and policies from migrations 007 and 011)
+-- DROP TABLE IF EXISTS card_review_summaries;
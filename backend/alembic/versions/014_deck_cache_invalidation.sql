@@ -0,0 +1,34 @@
+-- Migration: Deck cache invalidation notifications
+-- Version: 014
+-- Date: 2026-10-19
+-- Description: Notifies the deck_cache_invalidate channel with the deck ID on
+--              every update or delete of a deck, so API workers running with
+--              DECK_CACHE_BACKEND=postgres drop their cached copy, whichever
+--              process made the change. Notifications are delivered on commit.
+
+-- ============================================================
+-- NOTIFY TRIGGER
+-- ============================================================
+CREATE OR REPLACE FUNCTION notify_deck_changed()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  PERFORM pg_notify('deck_cache_invalidate', OLD.id::TEXT);
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS decks_notify_changed ON decks;
+CREATE TRIGGER decks_notify_changed
+  AFTER UPDATE OR DELETE ON decks
+  FOR EACH ROW
+  EXECUTE FUNCTION notify_deck_changed();
+
+-- ============================================================
+-- ROLLBACK INSTRUCTIONS
+-- ============================================================
+-- To rollback this migration, run:
+--
+-- DROP TRIGGER IF EXISTS decks_notify_changed ON decks;
+-- DROP FUNCTION IF EXISTS notify_deck_changed();
@@ -0,0 +1,28 @@
+"""
+Rate Limiting for API Routes
+
+Shared guard for every endpoint that calls Claude.
+"""
+
+from fastapi import HTTPException, status
+
+from app.services.rate_limit_service import rate_limit_service
+
+
+async def enforce_generation_rate_limit(user_id: str) -> None:
+    """
+    Take a token from the user's generation bucket.
+
+    Args:
+        user_id: The authenticated user's UUID
+
+    Raises:
+        HTTPException: 429 with a Retry-After header if the bucket is empty
+    """
+    result = await rate_limit_service.check(user_id, scope="generation")
+    if not result.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Too many generation requests. Please try again in {result.retry_after_seconds} seconds.",
+            headers={"Retry-After": str(result.retry_after_seconds)},
+        )
@@ -1,3 +1,3 @@
-from app.api.routes import auth, decks, flashcards, health, mnemonics, pdf, stats, study
+from app.api.routes import admin, auth, decks, flashcards, health, mnemonics, pdf, stats, study
 
-__all__ = ["health", "auth", "decks", "mnemonics", "flashcards", "pdf", "stats", "study"]
+__all__ = ["health", "admin", "auth", "decks", "mnemonics", "flashcards", "pdf", "stats", "study"]
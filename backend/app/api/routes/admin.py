@@ -0,0 +1,110 @@
+"""
+Admin API Routes
+
+Operational endpoints restricted to the user IDs in settings.ADMIN_USER_IDS.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+from app.schemas.admin import LLMUsageResponse
+from app.services.auth_service import auth_service
+from app.services.deck_cache import deck_cache
+from app.services.llm_usage_service import llm_usage_service
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+async def get_admin_user_id(authorization: Optional[str] = Header(None)) -> str:
+    """
+    Extract the user ID from the Authorization header and require admin access.
+
+    Args:
+        authorization: Bearer token from header
+
+    Returns:
+        User ID string
+
+    Raises:
+        HTTPException: 401 if auth fails, 403 if the user is not an admin
+    """
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing or invalid authorization header",
+        )
+
+    access_token = authorization.replace("Bearer ", "")
+
+    try:
+        result = await auth_service.get_current_user(access_token=access_token)
+    except Exception:
+        result = None
+
+    if not result or not result.get("user"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired access token",
+        )
+
+    user_id = result["user"]["id"]
+    if user_id not in settings.ADMIN_USER_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required",
+        )
+
+    return user_id
+
+
+@router.get(
+    "/llm-usage",
+    response_model=LLMUsageResponse,
+    summary="Aggregate Claude usage",
+    description="""
+    Token, latency and error totals for Claude calls, per task and model.
+
+    **Requirements:**
+    - Must be authenticated as an admin
+
+    **Query Parameters:**
+    - hours: Size of the window counting back from now (default 24, max 720)
+
+    **Error Codes:**
+    - 401: Not authenticated
+    - 403: Not an admin
+    - 500: Server error
+    """,
+)
+async def get_llm_usage(
+    hours: int = Query(24, ge=1, le=720),
+    authorization: Optional[str] = Header(None),
+):
+    """Aggregate stored llm_calls rows."""
+    await get_admin_user_id(authorization)
+
+    try:
+        return await llm_usage_service.get_usage_summary(hours=hours)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e),
+        )
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="Prometheus metrics",
+    description="In-process Claude call and deck cache metrics of this worker, in Prometheus text format.",
+)
+async def get_metrics(authorization: Optional[str] = Header(None)):
+    """Render in-process metrics."""
+    await get_admin_user_id(authorization)
+    return PlainTextResponse(
+        llm_usage_service.render_metrics() + deck_cache.render_metrics(),
+        media_type="text/plain; version=0.0.4",
+    )
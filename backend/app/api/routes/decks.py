@@ -6,8 +6,9 @@ Handles all deck CRUD endpoints.
 
 from typing import Optional
 
-from fastapi import APIRouter, Header, HTTPException, status
+from fastapi import APIRouter, Header, HTTPException, Response, status
 
+from app.core.etag import collection_etag, etag_matches, not_modified, set_etag
 from app.schemas.deck import (
     CreateDeckRequest,
     DeckListResponse,
@@ -18,6 +19,7 @@ from app.schemas.deck import (
 )
 from app.services.auth_service import auth_service
 from app.services.deck_service import deck_service
+from app.services.direct_queries import direct_queries
 
 router = APIRouter(prefix="/decks", tags=["Decks"])
 
@@ -116,13 +118,20 @@ async def create_deck(
     **Response:**
     - Returns list of decks sorted by last_studied_at (most recent first)
     - Includes deck count for pagination info
+    - Carries a weak ETag; send it back in If-None-Match to get a 304
+      while the decks are unchanged
 
     **Error Codes:**
+    - 304: Not modified
     - 401: Not authenticated
     - 500: Server error
     """,
 )
-async def get_decks(authorization: Optional[str] = Header(None)):
+async def get_decks(
+    response: Response,
+    authorization: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+):
     """
     Get all decks for the current user.
 
@@ -131,7 +140,14 @@ async def get_decks(authorization: Optional[str] = Header(None)):
     user_id = await get_current_user_id(authorization)
 
     try:
+        count, last_updated = await direct_queries.get_decks_version(user_id)
+        etag = collection_etag("decks", count, last_updated)
+
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
         decks = await deck_service.get_decks_by_user(user_id=user_id)
+        set_etag(response, etag)
         return {
             "decks": decks,
             "total": len(decks),
@@ -4,11 +4,19 @@ Flashcard API Routes
 Handles all flashcard operations including AI generation and CRUD.
 """
 
-from typing import Optional
+import json
+from typing import Any, AsyncIterator, Dict, Optional
 
-from fastapi import APIRouter, Header, HTTPException, status
+from fastapi import APIRouter, Header, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
 
+from app.api.rate_limit import enforce_generation_rate_limit
+from app.core.etag import collection_etag, etag_matches, not_modified, set_etag
 from app.schemas.flashcard import (
+    BulkDeleteFlashcardsRequest,
+    BulkDeleteFlashcardsResponse,
+    BulkUpdateFlashcardsRequest,
+    BulkUpdateFlashcardsResponse,
     CreateFlashcardRequest,
     FlashcardListResponse,
     FlashcardResponse,
@@ -18,6 +26,7 @@ from app.schemas.flashcard import (
     UpdateFlashcardRequest,
 )
 from app.services.auth_service import auth_service
+from app.services.direct_queries import direct_queries
 from app.services.flashcard_service import flashcard_service
 
 router = APIRouter(prefix="/flashcards", tags=["Flashcards"])
@@ -74,7 +83,8 @@ async def get_current_user_id(authorization: Optional[str] = Header(None)) -> st
 
     **Process:**
     - Fetches deck mnemonic information
-    - Calls Claude API to generate 15-20 flashcards
+    - Calls Claude API to generate 15-20 flashcards (long lists are split
+      into groups generated in parallel, with more cards per list)
     - Saves flashcards to database
     - Updates deck card_count
 
@@ -101,6 +111,7 @@ async def generate_flashcards(
     Implements F-006 Scenario 1: Successful flashcard generation (happy path)
     """
     user_id = await get_current_user_id(authorization)
+    await enforce_generation_rate_limit(user_id)
 
     try:
         flashcards = await flashcard_service.generate_flashcards(
@@ -158,6 +169,102 @@ async def generate_flashcards(
             )
 
 
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format a Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.post(
+    "/generate/stream",
+    summary="Generate flashcards using AI (streamed)",
+    description="""
+    Generate flashcards for a deck and stream them back as they are created.
+
+    **Requirements:**
+    - Must be authenticated
+    - Deck must have a list and selected mnemonic
+    - Claude API key must be configured
+
+    **Process:**
+    - Streams the Claude response and parses each flashcard as soon as it is complete
+    - Saves flashcards in small batches while generation continues
+    - Updates deck card_count when the stream ends
+
+    **Response (text/event-stream):**
+    - `flashcards`: {"flashcards": [...], "total": N} for each saved batch
+    - `done`: {"deck_id": ..., "total": N, "message": ...} when generation finishes
+    - `error`: {"detail": ...} if generation fails mid-stream
+
+    **Error Codes (before the stream starts):**
+    - 400: Missing mnemonic or list
+    - 401: Not authenticated
+    - 404: Deck not found
+    - 429: Too many generation requests (see Retry-After header)
+    - 500: AI service not configured
+    """,
+)
+async def generate_flashcards_stream(
+    request: GenerateFlashcardsRequest,
+    authorization: Optional[str] = Header(None),
+):
+    """
+    Generate flashcards for a deck, pushing each saved batch over SSE.
+
+    Lets the user start reviewing the first cards while the rest are generated.
+    """
+    user_id = await get_current_user_id(authorization)
+    await enforce_generation_rate_limit(user_id)
+
+    if not flashcard_service.async_claude_client:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="AI service not configured. Please contact support.",
+        )
+
+    try:
+        deck = await flashcard_service.get_deck_for_generation(
+            deck_id=request.deck_id,
+            user_id=user_id,
+        )
+    except Exception as e:
+        error_msg = str(e).lower()
+        if "not found" in error_msg or "0 rows" in error_msg:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Deck not found",
+            )
+        if "must have a list and selected mnemonic" in error_msg:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Deck must have a list and selected mnemonic before generating flashcards",
+            )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Flashcard generation failed: {str(e)}",
+        )
+
+    async def event_stream() -> AsyncIterator[str]:
+        total = 0
+        try:
+            async for batch in flashcard_service.stream_generate_flashcards(deck):
+                total += len(batch)
+                yield _sse_event("flashcards", {"flashcards": batch, "total": total})
+
+            yield _sse_event("done", {
+                "deck_id": request.deck_id,
+                "total": total,
+                "message": "Flashcards generated successfully",
+            })
+        except Exception as e:
+            yield _sse_event("error", {"detail": str(e), "total": total})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get(
     "/deck/{deck_id}",
     response_model=FlashcardListResponse,
@@ -168,8 +275,11 @@ async def generate_flashcards(
     **Response:**
     - Returns list of flashcards ordered by creation date
     - Includes total count
+    - Carries a weak ETag; send it back in If-None-Match to get a 304
+      while the deck's cards are unchanged
 
     **Error Codes:**
+    - 304: Not modified
     - 401: Not authenticated
     - 403: Not owner of deck
     - 404: Deck not found
@@ -178,7 +288,9 @@ async def generate_flashcards(
 )
 async def get_deck_flashcards(
     deck_id: str,
+    response: Response,
     authorization: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
 ):
     """
     Get all flashcards for a deck.
@@ -188,10 +300,18 @@ async def get_deck_flashcards(
     user_id = await get_current_user_id(authorization)
 
     try:
+        count, last_updated = await direct_queries.get_deck_flashcards_version(deck_id, user_id)
+        etag = collection_etag(f"deck-{deck_id}-flashcards", count, last_updated)
+
+        # With no cards the ownership check below still has to run
+        if count and etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
         flashcards = await flashcard_service.get_flashcards_by_deck(
             deck_id=deck_id,
             user_id=user_id,
         )
+        set_etag(response, etag)
 
         return {
             "flashcards": flashcards,
@@ -212,6 +332,97 @@ async def get_deck_flashcards(
         )
 
 
+@router.patch(
+    "/bulk",
+    response_model=BulkUpdateFlashcardsResponse,
+    summary="Update many flashcards",
+    description="""
+    Update up to 500 flashcards in one request.
+
+    **Requirements:**
+    - Must be authenticated
+    - Each update needs an id plus at least one of front, back, difficulty
+
+    **Notes:**
+    - All changes are written in a single statement, filtered on the owner
+    - Cards that don't exist or aren't owned are returned in not_found_ids
+
+    **Error Codes:**
+    - 400: Invalid input
+    - 401: Not authenticated
+    - 500: Server error
+    """,
+)
+async def bulk_update_flashcards(
+    request: BulkUpdateFlashcardsRequest,
+    authorization: Optional[str] = Header(None),
+):
+    """Update many flashcards at once."""
+    user_id = await get_current_user_id(authorization)
+
+    try:
+        result = await flashcard_service.bulk_update_flashcards(
+            user_id=user_id,
+            updates=[update.model_dump() for update in request.updates],
+        )
+
+        return {
+            "flashcards": result["flashcards"],
+            "updated": len(result["flashcards"]),
+            "not_found_ids": result["not_found_ids"],
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to update flashcards: {str(e)}",
+        )
+
+
+@router.delete(
+    "/bulk",
+    response_model=BulkDeleteFlashcardsResponse,
+    summary="Delete many flashcards",
+    description="""
+    Delete up to 500 flashcards permanently in one request.
+
+    **Requirements:**
+    - Must be authenticated
+
+    **Effects:**
+    - Owned flashcards are deleted in a single statement
+    - Deck card_count is recomputed once per affected deck, in the same transaction
+    - Cards that don't exist or aren't owned are returned in not_found_ids
+
+    **Error Codes:**
+    - 401: Not authenticated
+    - 500: Server error
+    """,
+)
+async def bulk_delete_flashcards(
+    request: BulkDeleteFlashcardsRequest,
+    authorization: Optional[str] = Header(None),
+):
+    """Delete many flashcards at once."""
+    user_id = await get_current_user_id(authorization)
+
+    try:
+        return await flashcard_service.bulk_delete_flashcards(
+            user_id=user_id,
+            flashcard_ids=request.flashcard_ids,
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to delete flashcards: {str(e)}",
+        )
+
+
 @router.get(
     "/{flashcard_id}",
     response_model=FlashcardResponse,
@@ -8,6 +8,7 @@ from typing import Optional
 
 from fastapi import APIRouter, Header, HTTPException, status
 
+from app.api.rate_limit import enforce_generation_rate_limit
 from app.schemas.mnemonic import (
     GenerateMnemonicsRequest,
     GenerateMnemonicsResponse,
@@ -78,6 +79,7 @@ async def get_current_user_id(authorization: Optional[str] = Header(None)) -> st
     - 400: Invalid list (too few/many items, empty items)
     - 401: Not authenticated
     - 403: Generation limit reached (free tier)
+    - 429: Too many generation requests (see Retry-After header)
     - 500: Claude API error or server error
     - 504: Generation timeout (>30 seconds)
     """,
@@ -94,6 +96,7 @@ async def generate_mnemonics(
     Implements Scenario 4: Handle Claude API error
     """
     user_id = await get_current_user_id(authorization)
+    await enforce_generation_rate_limit(user_id)
 
     try:
         result = await mnemonic_service.generate_mnemonics(
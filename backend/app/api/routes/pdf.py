@@ -8,6 +8,7 @@ from typing import Optional
 
 from fastapi import APIRouter, File, Form, Header, HTTPException, UploadFile, status
 
+from app.api.rate_limit import enforce_generation_rate_limit
 from app.schemas.pdf import PDFUploadResponse
 from app.services.auth_service import auth_service
 from app.services.mnemonic_service import mnemonic_service
@@ -82,6 +83,7 @@ async def get_current_user_id(authorization: Optional[str] = Header(None)) -> st
     - 401: Not authenticated
     - 413: File too large (>10MB)
     - 415: Unsupported file type (not PDF)
+    - 429: Too many generation requests (see Retry-After header)
     - 500: Processing error
     - 504: Timeout during processing
     """,
@@ -118,18 +120,21 @@ async def upload_and_generate(
             detail="Only PDF files are supported",
         )
 
-    try:
-        # Read file content
-        file_content = await file.read()
+    # Read file content
+    file_content = await file.read()
 
-        # Check file size (10MB limit)
-        file_size_mb = len(file_content) / (1024 * 1024)
-        if file_size_mb > 10:
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=f"File is too large ({file_size_mb:.1f}MB). Maximum size is 10MB",
-            )
+    # Check file size (10MB limit)
+    file_size_mb = len(file_content) / (1024 * 1024)
+    if file_size_mb > 10:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File is too large ({file_size_mb:.1f}MB). Maximum size is 10MB",
+        )
+
+    # Only a valid upload costs a generation token
+    await enforce_generation_rate_limit(user_id)
 
+    try:
         # Process PDF
         result = await pdf_service.process_pdf_for_learning(
             file_content=file_content,
@@ -206,6 +211,7 @@ async def upload_and_generate(
     - 400: Invalid request
     - 401: Not authenticated
     - 404: Generation not found
+    - 429: Too many generation requests (see Retry-After header)
     - 500: Generation error
     """,
 )
@@ -221,6 +227,7 @@ async def select_and_generate_flashcards(
     This reuses the existing select_mnemonic and generate_flashcards flow.
     """
     user_id = await get_current_user_id(authorization)
+    await enforce_generation_rate_limit(user_id)
 
     # Validate selected_type
     if selected_type not in ["acrostic", "story", "visual"]:
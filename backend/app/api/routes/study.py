@@ -15,6 +15,8 @@ from app.schemas.study import (
     ReviewCardRequest,
     ReviewCardResponse,
     SessionSummary,
+    StartMergedSessionRequest,
+    StartMergedSessionResponse,
     StartSessionResponse,
 )
 from app.services.auth_service import auth_service
@@ -59,6 +61,40 @@ async def get_current_user_id(authorization: Optional[str] = Header(None)) -> st
         )
 
 
+@router.post("/start", response_model=StartMergedSessionResponse)
+async def start_merged_study_session(
+    request: Optional[StartMergedSessionRequest] = None,
+    authorization: Optional[str] = Header(None),
+):
+    """
+    Start a single study session across all of the user's decks.
+
+    Builds one merged due queue (optionally filtered by deck_ids) in a single
+    query instead of starting one session per deck.
+    """
+    user_id = await get_current_user_id(authorization)
+    deck_ids = request.deck_ids if request else None
+
+    try:
+        result = await srs_service.start_merged_study_session(
+            user_id=user_id,
+            deck_ids=deck_ids
+        )
+
+        return StartMergedSessionResponse(
+            session_id=result["session"]["id"] if result["session"] else None,
+            deck_ids=deck_ids,
+            cards_due_count=result["cards_due_count"],
+            due_cards=result["due_cards"]
+        )
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
 @router.post("/{deck_id}/start", response_model=StartSessionResponse)
 async def start_study_session(
     deck_id: str,
@@ -223,7 +259,7 @@ async def complete_study_session(
 
         summary = SessionSummary(
             session_id=session_data["id"],
-            deck_id=session_data["deck_id"],
+            deck_id=session_data.get("deck_id"),
             cards_reviewed=session_data["cards_reviewed"],
             duration_seconds=session_data.get("duration_seconds"),
             cards_remaining=result["cards_remaining"],
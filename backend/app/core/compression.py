@@ -0,0 +1,151 @@
+"""
+Response Compression
+
+Pure ASGI middleware that compresses response bodies with brotli or gzip,
+whichever the client's Accept-Encoding prefers. Deck, flashcard and due-card
+lists and PDF concept/mnemonic responses are large, repetitive JSON that
+shrinks by roughly 85-90%.
+
+Only bodies sent in a single message are compressed. Streamed responses,
+such as the server-sent events of flashcard generation, pass through
+untouched so no chunk is held back waiting for the compressor. Small
+bodies, non-text content types and already-encoded responses are also left
+alone. Bodies large enough to take milliseconds are compressed in a worker
+thread so the event loop keeps serving other requests.
+"""
+
+import gzip
+from typing import Optional
+
+import anyio
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Encodings we can produce, preferred first on equal q-values
+SUPPORTED_ENCODINGS = ("br", "gzip")
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml")
+
+# Bodies at least this large are compressed off the event loop
+THREAD_OFFLOAD_BYTES = 64 * 1024
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the content encoding to use for a request.
+
+    Args:
+        accept_encoding: Accept-Encoding header value
+
+    Returns:
+        "br", "gzip", or None to send the body uncompressed
+    """
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding] = q
+
+    best, best_q = None, 0.0
+    for coding in SUPPORTED_ENCODINGS:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Compresses single-message response bodies with brotli or gzip.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 4,
+        brotli_quality: int = 2,
+    ):
+        """Initialize around an ASGI app"""
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message
+
+            if message["type"] == "http.response.start":
+                # Hold the headers until the first body chunk shows whether it's streamed
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+
+            if message.get("more_body", False) or not self._should_compress(headers, body):
+                await send(start)
+                await send(message)
+                return
+
+            if len(body) >= THREAD_OFFLOAD_BYTES:
+                compressed = await anyio.to_thread.run_sync(self.compress, body, encoding)
+            else:
+                compressed = self.compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+
+            await send(start)
+            await send({**message, "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
+
+    def _should_compress(self, headers: MutableHeaders, body: bytes) -> bool:
+        """Only large text bodies that aren't already encoded are worth compressing."""
+        if len(body) < self.minimum_size or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES) and not content_type.startswith("text/event-stream")
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        """
+        Compress a body.
+
+        Args:
+            body: Uncompressed bytes
+            encoding: "br" or "gzip"
+
+        Returns:
+            Compressed bytes
+        """
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
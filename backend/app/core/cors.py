@@ -0,0 +1,84 @@
+"""
+CORS Middleware
+
+Pure ASGI CORS handling. Unlike a BaseHTTPMiddleware, it doesn't spawn a task
+or re-stream the body per request: it answers preflights itself and, for
+other requests, appends precomputed header tuples to the response start
+message. Body messages, including streamed and server-sent event chunks,
+are forwarded untouched.
+
+Origins are matched exactly against a frozenset. Requests without an Origin
+header are treated as allowed, and any OPTIONS request is answered as a
+preflight.
+"""
+
+from typing import Iterable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PREFLIGHT_HEADERS = [
+    (b"access-control-allow-methods", b"GET, POST, PUT, DELETE, PATCH, OPTIONS"),
+    (b"access-control-allow-headers", b"Authorization, Content-Type"),
+    (b"access-control-allow-credentials", b"true"),
+    (b"access-control-max-age", b"600"),
+    (b"content-length", b"0"),
+]
+
+RESPONSE_HEADERS = [
+    (b"access-control-allow-credentials", b"true"),
+    (b"access-control-expose-headers", b"*"),
+]
+
+
+class CORSCustomMiddleware:
+    """
+    Answers preflights and adds CORS headers for allowed origins.
+    """
+
+    def __init__(self, app: ASGIApp, allow_origins: Iterable[str]):
+        """Initialize around an ASGI app"""
+        self.app = app
+        self.allow_origins = frozenset(origin.encode("latin-1") for origin in allow_origins)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = b""
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+                break
+
+        is_allowed = not origin or origin in self.allow_origins
+
+        if scope["method"] == "OPTIONS":
+            await self._preflight(send, origin, is_allowed)
+            return
+
+        if not is_allowed:
+            await self.app(scope, receive, send)
+            return
+
+        cors_headers = [(b"access-control-allow-origin", origin), *RESPONSE_HEADERS]
+
+        async def send_with_cors(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), *cors_headers]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+    @staticmethod
+    async def _preflight(send: Send, origin: bytes, is_allowed: bool) -> None:
+        """Answer an OPTIONS request without reaching the app."""
+        if is_allowed:
+            status = 200
+            headers = [(b"access-control-allow-origin", origin), *PREFLIGHT_HEADERS]
+        else:
+            status = 403
+            headers = [(b"content-length", b"0")]
+
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": b""})
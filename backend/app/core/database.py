@@ -1,21 +1,86 @@
+from typing import Any, Dict
+from uuid import uuid4
+
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
 from app.core.config import settings
 
+CONNECTION_MODES = ("transaction_pooler", "session_pooler", "direct")
+
 # Convert postgresql:// to postgresql+asyncpg://
 DATABASE_URL = settings.DATABASE_URL.replace(
     "postgresql://", "postgresql+asyncpg://"
 )
 
-# Disable prepared statements for Supabase Transaction Pooler (pgbouncer)
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=settings.DEBUG,
-    connect_args={
+
+def _unique_statement_name() -> str:
+    """Name prepared statements uniquely so pooled backends never see a duplicate."""
+    return f"__asyncpg_{uuid4().hex}__"
+
+
+def build_connect_args(
+    mode: str,
+    statement_cache_size: int,
+    pooler_prepared_statements: bool = False,
+) -> Dict[str, Any]:
+    """
+    Build asyncpg connect arguments for a connection mode.
+
+    Session pooler and direct connections keep one backend per connection,
+    so asyncpg's prepared statement cache is safe and every repeated query
+    skips parse and plan. A transaction pooler may hand each transaction to
+    a different backend: statements are either not prepared at all, or (when
+    the pooler tracks prepared statements) prepared under unique names.
+
+    Args:
+        mode: One of CONNECTION_MODES
+        statement_cache_size: Prepared statements cached per connection
+        pooler_prepared_statements: Whether the transaction pooler supports
+            protocol-level prepared statements
+
+    Returns:
+        Dictionary of connect_args for create_async_engine
+
+    Raises:
+        ValueError: If the mode is unknown
+    """
+    if mode not in CONNECTION_MODES:
+        raise ValueError(f"DATABASE_CONNECTION_MODE must be one of {', '.join(CONNECTION_MODES)}, got '{mode}'")
+
+    if mode != "transaction_pooler":
+        return {
+            "statement_cache_size": statement_cache_size,
+            "prepared_statement_cache_size": statement_cache_size,
+        }
+
+    if pooler_prepared_statements:
+        return {
+            "statement_cache_size": statement_cache_size,
+            "prepared_statement_cache_size": statement_cache_size,
+            "prepared_statement_name_func": _unique_statement_name,
+        }
+
+    # Disable prepared statements for Supabase Transaction Pooler (pgbouncer)
+    return {
         "statement_cache_size": 0,
         "prepared_statement_cache_size": 0,
     }
+
+
+engine = create_async_engine(
+    DATABASE_URL,
+    echo=settings.DATABASE_ECHO,
+    pool_size=settings.DATABASE_POOL_SIZE,
+    max_overflow=settings.DATABASE_MAX_OVERFLOW,
+    pool_timeout=settings.DATABASE_POOL_TIMEOUT_SECONDS,
+    pool_recycle=settings.DATABASE_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=True,
+    connect_args=build_connect_args(
+        settings.DATABASE_CONNECTION_MODE,
+        settings.DATABASE_STATEMENT_CACHE_SIZE,
+        settings.DATABASE_POOLER_PREPARED_STATEMENTS,
+    ),
 )
 
 async_session_maker = sessionmaker(
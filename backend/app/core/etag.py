@@ -0,0 +1,83 @@
+"""
+Collection ETags
+
+Weak ETags for list endpoints, derived from a collection's row count and
+newest updated_at (both kept current by the updated_at triggers) instead
+of from the serialized body. A client sending a matching If-None-Match gets
+a 304 after one small aggregate query, without the rows being fetched or
+serialized.
+
+Count catches deletes; updated_at catches inserts and updates.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from fastapi import Response, status
+
+# Clients must revalidate every time; the ETag makes that cheap
+CACHE_CONTROL = "private, no-cache"
+
+
+def collection_etag(scope: str, count: int, last_updated: Optional[datetime]) -> str:
+    """
+    Build a weak ETag for a collection.
+
+    Args:
+        scope: Collection name, so different lists never share a tag
+        count: Number of rows in the collection
+        last_updated: Newest updated_at in the collection (None if empty)
+
+    Returns:
+        Weak ETag, e.g. W/"decks-12-1760870400123456"
+    """
+    version = int(last_updated.timestamp() * 1_000_000) if last_updated else 0
+    return f'W/"{scope}-{count}-{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag (weak comparison).
+
+    Args:
+        if_none_match: Header value; may list several tags or be "*"
+        etag: Current ETag
+
+    Returns:
+        True if the client's copy is current
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    """
+    Build an empty 304 response for a current ETag.
+
+    Args:
+        etag: Current ETag
+
+    Returns:
+        304 response carrying the ETag and cache headers
+    """
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+def set_etag(response: Response, etag: str) -> None:
+    """
+    Attach an ETag and cache headers to a full response.
+
+    Args:
+        response: Response to decorate
+        etag: Current ETag
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
@@ -0,0 +1,186 @@
+"""
+Language Detection
+
+Fast stopword-based language detector shared by all services that pick a
+prompt language. All lookup tables are built once at import:
+- One dict mapping each stopword to the languages it belongs to, so a
+  token costs a single hash lookup regardless of how many languages exist
+- Characters that are distinctive for a language (ñ, ¿, ß, ã, ...), counted
+  with str.count in C
+
+Long texts are not scanned in full: a few fixed-size windows from the
+start, middle and end are enough to identify the language, which keeps
+detection well under a millisecond even for 100KB inputs.
+"""
+
+from typing import Dict, FrozenSet, NamedTuple, Tuple
+
+SUPPORTED_LANGUAGES = ("en", "es", "pt", "fr", "de", "it")
+
+LANGUAGE_NAMES = {
+    "en": "English",
+    "es": "Spanish",
+    "pt": "Portuguese",
+    "fr": "French",
+    "de": "German",
+    "it": "Italian",
+}
+
+STOPWORDS: Dict[str, FrozenSet[str]] = {
+    "en": frozenset(
+        "the be to of and a in that have i it for not on with he as you do at this but his by "
+        "from they we say her she or an will my one all would there their is are was were been "
+        "which what when who how can if than then these those into its our your".split()
+    ),
+    "es": frozenset(
+        "el la los las un una unos unas de del y o que en es por para con su al lo como más "
+        "pero sus le ya todo esta fue hasta muy ser tiene están qué también durante se no son "
+        "entre cuando sobre este ese esa sin porque donde hay".split()
+    ),
+    "pt": frozenset(
+        "o a os as um uma uns umas de do da dos das e ou que em no na nos nas é por para com "
+        "seu sua mais mas não como são foi pelo pela também quando muito isso esta este entre "
+        "sem onde há".split()
+    ),
+    "fr": frozenset(
+        "le la les un une des de du et ou que en est pour par avec son sa ses au aux ce cette "
+        "ces qui dans pas plus mais comme sont été être il elle ils nous vous sur ne se leur "
+        "aussi quand où".split()
+    ),
+    "de": frozenset(
+        "der die das ein eine einer eines und oder zu von mit ist nicht sich den dem des auf "
+        "für im in es sie er wir ihr auch als an bei aus nach wie wird werden sind war hat "
+        "haben noch nur über".split()
+    ),
+    "it": frozenset(
+        "il lo la i gli le un una uno di del della dei delle e o che in è per con su al non "
+        "come più ma sono stato essere anche questo questa quando dove nel nella tra fra gli "
+        "ha hanno".split()
+    ),
+}
+
+# Characters that (within the supported set) strongly suggest one language
+DISTINCTIVE_CHARS: Dict[str, Tuple[str, ...]] = {
+    "es": ("ñ", "¿", "¡"),
+    "pt": ("ã", "õ"),
+    "fr": ("è", "ê", "œ", "ë"),
+    "de": ("ß", "ä", "ö", "ü"),
+    "it": ("ò", "ì"),
+}
+CHAR_WEIGHT = 5
+
+# Characters shared by several languages; a weak hint for each
+SHARED_CHARS: Dict[str, Tuple[str, ...]] = {
+    "es": ("á", "é", "í", "ó", "ú"),
+    "pt": ("á", "é", "í", "ó", "ú", "ç", "â", "ê", "ô", "à"),
+    "fr": ("é", "à", "ç", "â", "î", "ô", "û", "ù"),
+    "it": ("à", "é", "ù"),
+}
+SHARED_CHAR_WEIGHT = 1
+
+# Size of each sampled window and number of windows for long texts
+WINDOW_CHARS = 1500
+WINDOW_COUNT = 3
+
+
+def _build_word_index() -> Dict[str, Tuple[int, ...]]:
+    """Map every stopword to the indices of the languages it belongs to."""
+    index: Dict[str, Tuple[int, ...]] = {}
+    for position, language in enumerate(SUPPORTED_LANGUAGES):
+        for word in STOPWORDS[language]:
+            index[word] = index.get(word, ()) + (position,)
+    return index
+
+
+WORD_INDEX = _build_word_index()
+
+CHAR_INDEX: Tuple[Tuple[int, str, int], ...] = tuple(
+    (SUPPORTED_LANGUAGES.index(language), char, weight)
+    for table, weight in ((DISTINCTIVE_CHARS, CHAR_WEIGHT), (SHARED_CHARS, SHARED_CHAR_WEIGHT))
+    for language, chars in table.items()
+    for char in chars
+)
+
+
+class LanguageGuess(NamedTuple):
+    """Detected language and how confident the detector is (0.0 - 1.0)."""
+    language: str
+    confidence: float
+
+
+def _sample(text: str) -> str:
+    """Return the text itself, or a few windows from across a long text."""
+    if len(text) <= WINDOW_CHARS * WINDOW_COUNT:
+        return text
+
+    step = (len(text) - WINDOW_CHARS) // (WINDOW_COUNT - 1)
+    return " ".join(text[i * step:i * step + WINDOW_CHARS] for i in range(WINDOW_COUNT))
+
+
+def detect(text: str, default: str = "en") -> LanguageGuess:
+    """
+    Detect the language of a text.
+
+    Args:
+        text: Text to classify
+        default: Language returned when there is no signal at all
+
+    Returns:
+        LanguageGuess with the language code and a confidence score: the
+        share of all language evidence that points to the winner
+    """
+    sample = _sample(text).lower()
+    scores = [0] * len(SUPPORTED_LANGUAGES)
+
+    get = WORD_INDEX.get
+    for word in sample.split():
+        languages = get(word)
+        if languages:
+            for position in languages:
+                scores[position] += 1
+
+    for position, char, weight in CHAR_INDEX:
+        count = sample.count(char)
+        if count:
+            scores[position] += weight * min(count, 3)
+
+    total = sum(scores)
+    if not total:
+        return LanguageGuess(default, 0.0)
+
+    best = max(range(len(scores)), key=scores.__getitem__)
+    return LanguageGuess(SUPPORTED_LANGUAGES[best], round(scores[best] / total, 3))
+
+
+def detect_language(text: str, default: str = "en") -> str:
+    """
+    Detect the language code of a text.
+
+    Args:
+        text: Text to classify
+        default: Language returned when there is no signal at all
+
+    Returns:
+        Language code (one of SUPPORTED_LANGUAGES)
+    """
+    return detect(text, default=default).language
+
+
+def language_instruction(language: str) -> str:
+    """
+    Extra prompt line for languages without a dedicated prompt template.
+
+    Prompts only exist in Spanish and English; for any other detected
+    language the English template is used and this line asks for output in
+    the user's language. It belongs in the user message so the cached
+    system prompt stays identical across languages.
+
+    Args:
+        language: Detected language code
+
+    Returns:
+        Instruction line (with leading blank line), or "" for 'es' and 'en'
+    """
+    if language in ("es", "en") or language not in LANGUAGE_NAMES:
+        return ""
+    return f"\n\nWrite ALL output text in {LANGUAGE_NAMES[language]}."
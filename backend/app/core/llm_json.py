@@ -0,0 +1,352 @@
+"""
+LLM JSON Parsing
+
+Tolerant JSON extraction shared by every Claude response parser.
+
+Model output is usually valid JSON, but not always: it can be wrapped in
+markdown code fences, preceded by prose, contain trailing commas, or be cut
+off when max_tokens is reached. A single stray character used to fail the
+whole (paid) generation. This module parses such responses in one pass and
+recovers as much as possible, and also supports incremental parsing of
+streamed responses.
+"""
+
+import json
+import re
+from json.decoder import scanstring
+from typing import Any, List, Optional, Tuple
+
+NUMBER_RE = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?")
+NUMBER_CHARS = "+-0123456789.eE"
+# A markdown fence on its own line (the language tag, if any, is skipped with the line)
+FENCE_RE = re.compile(r"^[ \t]*```", re.MULTILINE)
+WHITESPACE = " \t\n\r"
+LITERALS = (("true", True), ("false", False), ("null", None))
+
+
+class ResponseFormatError(ValueError):
+    """Raised when a parsed model response doesn't have the expected structure."""
+
+
+class _TruncatedError(Exception):
+    """Raised internally when the input ends in the middle of a value."""
+
+
+class _TolerantParser:
+    """
+    Single-pass recursive descent JSON parser.
+
+    Differences from json.loads:
+    - Trailing commas in objects and arrays are accepted
+    - Raw control characters inside strings are accepted
+    - With allow_partial, input that ends mid-value returns everything
+      completed so far (incomplete trailing members are dropped)
+    """
+
+    def __init__(self, text: str, allow_partial: bool):
+        self.text = text
+        self.allow_partial = allow_partial
+        # Container that was being filled when the input ran out
+        self.partial: Any = None
+
+    def _skip_whitespace(self, pos: int) -> int:
+        while pos < len(self.text) and self.text[pos] in WHITESPACE:
+            pos += 1
+        return pos
+
+    def _error(self, message: str, pos: int) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self.text, min(pos, len(self.text)))
+
+    def parse_value(self, pos: int) -> Tuple[Any, int]:
+        pos = self._skip_whitespace(pos)
+        if pos >= len(self.text):
+            raise _TruncatedError()
+
+        char = self.text[pos]
+        if char == "{":
+            return self._parse_object(pos + 1)
+        if char == "[":
+            return self._parse_array(pos + 1)
+        if char == '"':
+            return self._parse_string(pos + 1)
+
+        for literal, value in LITERALS:
+            if self.text.startswith(literal, pos):
+                return value, pos + len(literal)
+            if literal.startswith(self.text[pos:]):
+                raise _TruncatedError()
+
+        end = pos
+        while end < len(self.text) and self.text[end] in NUMBER_CHARS:
+            end += 1
+        if end == len(self.text) and end > pos:
+            # A number at the very end may still be growing (e.g. "1.5e")
+            raise _TruncatedError()
+
+        match = NUMBER_RE.match(self.text, pos)
+        if match:
+            end = match.end()
+            number = match.group()
+            return (float(number) if any(c in number for c in ".eE") else int(number)), end
+
+        raise self._error("Expecting value", pos)
+
+    def _parse_string(self, pos: int) -> Tuple[str, int]:
+        try:
+            return scanstring(self.text, pos, False)
+        except json.JSONDecodeError as e:
+            if "Unterminated string" in e.msg or e.pos >= len(self.text) - 1:
+                raise _TruncatedError()
+            raise
+
+    def _parse_array(self, pos: int) -> Tuple[List[Any], int]:
+        items: List[Any] = []
+        while True:
+            pos = self._skip_whitespace(pos)
+            if pos >= len(self.text):
+                return self._partial(items, pos)
+            if self.text[pos] == "]":
+                return items, pos + 1
+
+            try:
+                value, pos = self.parse_value(pos)
+            except _TruncatedError:
+                return self._partial(items, len(self.text))
+            items.append(value)
+
+            pos = self._skip_whitespace(pos)
+            if pos >= len(self.text):
+                return self._partial(items, pos)
+            if self.text[pos] == ",":
+                pos += 1
+            elif self.text[pos] != "]":
+                raise self._error("Expecting ',' delimiter", pos)
+
+    def _parse_object(self, pos: int) -> Tuple[dict, int]:
+        result: dict = {}
+        while True:
+            pos = self._skip_whitespace(pos)
+            if pos >= len(self.text):
+                return self._partial(result, pos)
+            if self.text[pos] == "}":
+                return result, pos + 1
+            if self.text[pos] != '"':
+                raise self._error("Expecting property name enclosed in double quotes", pos)
+
+            try:
+                key, pos = self._parse_string(pos + 1)
+                pos = self._skip_whitespace(pos)
+                if pos >= len(self.text):
+                    raise _TruncatedError()
+                if self.text[pos] != ":":
+                    raise self._error("Expecting ':' delimiter", pos)
+                value, pos = self.parse_value(pos + 1)
+            except _TruncatedError:
+                # Keep a partially received container value (e.g. a cut-off list)
+                if self.partial is not None:
+                    result[key] = self.partial
+                return self._partial(result, len(self.text))
+
+            result[key] = value
+
+            pos = self._skip_whitespace(pos)
+            if pos >= len(self.text):
+                return self._partial(result, pos)
+            if self.text[pos] == ",":
+                pos += 1
+            elif self.text[pos] != "}":
+                raise self._error("Expecting ',' delimiter", pos)
+
+    def _partial(self, container: Any, pos: int) -> Tuple[Any, int]:
+        if not self.allow_partial:
+            raise self._error("Unexpected end of JSON input", pos)
+        self.partial = container
+        raise _TruncatedError()
+
+
+def _find_json_start(text: str, start: int = 0) -> int:
+    """Find the next '{' or '[' at or after `start`, or -1."""
+    positions = [p for p in (text.find("{", start), text.find("[", start)) if p != -1]
+    return min(positions) if positions else -1
+
+
+def _strip_code_fence(text: str) -> str:
+    """
+    Return the contents of a markdown code fence around the response, if any.
+
+    Only a fence on its own line before any JSON counts, so ``` inside a
+    JSON string value (e.g. a card about code) is left alone.
+    """
+    opening = FENCE_RE.search(text)
+    if opening is None or -1 < _find_json_start(text) < opening.start():
+        return text
+
+    body_start = text.find("\n", opening.end())
+    if body_start == -1:
+        return text[opening.end():]
+
+    closing = FENCE_RE.search(text, body_start)
+    return text[body_start + 1:closing.start() if closing else len(text)]
+
+
+def extract_json(
+    text: str,
+    expected_type: Optional[type] = dict,
+    allow_partial: bool = True,
+) -> Any:
+    """
+    Extract the first JSON value from an LLM response.
+
+    Tolerates markdown code fences, leading/trailing prose and trailing
+    commas. If the response was cut off and `allow_partial` is set, the
+    completed part is returned (e.g. an array with its last, unfinished
+    element dropped).
+
+    Args:
+        text: Raw model response
+        expected_type: Type of value to look for (dict or list); None for any
+        allow_partial: Whether to recover values from truncated input
+
+    Returns:
+        The parsed JSON value
+
+    Raises:
+        json.JSONDecodeError: If no JSON value of the expected type can be found
+    """
+    body = _strip_code_fence(text)
+    try:
+        return _extract_json_from(body, text, expected_type, allow_partial)
+    except json.JSONDecodeError:
+        if body is text:
+            raise
+        # What looked like a fence may have been part of the value; try the raw text
+        return _extract_json_from(text, text, expected_type, allow_partial)
+
+
+def _extract_json_from(
+    body: str,
+    text: str,
+    expected_type: Optional[type],
+    allow_partial: bool,
+) -> Any:
+    """Parse the first JSON value of the expected type in `body` (see extract_json)."""
+    last_error: Optional[json.JSONDecodeError] = None
+
+    pos = _find_json_start(body)
+    while pos != -1:
+        parser = _TolerantParser(body, allow_partial=allow_partial)
+        try:
+            value, _ = parser.parse_value(pos)
+        except _TruncatedError:
+            value = parser.partial
+        except json.JSONDecodeError as e:
+            last_error = e
+            value = None
+
+        if value is not None and (expected_type is None or isinstance(value, expected_type)):
+            return value
+
+        pos = _find_json_start(body, pos + 1)
+
+    if last_error is not None:
+        raise last_error
+    raise json.JSONDecodeError("No JSON value found in response", text, 0)
+
+
+class JSONArrayStream:
+    """
+    Incremental extractor for the items of one array in a streamed response.
+
+    Feed text chunks as they arrive; each call returns the array items that
+    were completed by that chunk. Works on responses shaped like
+    {"<key>": [item, item, ...]}, with or without code fences or prose.
+    """
+
+    def __init__(self, key: str):
+        """
+        Initialize the stream.
+
+        Args:
+            key: Name of the object key holding the array (e.g. "flashcards")
+        """
+        self.key = key
+        self._buffer = ""
+        self._pos = 0
+        self._in_array = False
+        self._done = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._item_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[Any]:
+        """
+        Consume a chunk of streamed text.
+
+        Args:
+            chunk: Next piece of the model response
+
+        Returns:
+            Array items completed by this chunk
+        """
+        self._buffer += chunk
+        completed: List[Any] = []
+
+        if self._done:
+            return completed
+
+        if not self._in_array:
+            key_index = self._buffer.find(f'"{self.key}"')
+            if key_index == -1:
+                return completed
+            array_index = self._buffer.find("[", key_index)
+            if array_index == -1:
+                return completed
+            self._in_array = True
+            self._pos = array_index + 1
+
+        while self._pos < len(self._buffer):
+            char = self._buffer[self._pos]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif self._depth == 0 and char in ",]":
+                self._emit(self._pos, completed)
+                if char == "]":
+                    self._done = True
+                    self._pos += 1
+                    break
+            else:
+                if self._item_start is None and char not in WHITESPACE:
+                    self._item_start = self._pos
+                if char == '"':
+                    self._in_string = True
+                elif char in "{[":
+                    self._depth += 1
+                elif char in "}]":
+                    self._depth -= 1
+
+            self._pos += 1
+
+        return completed
+
+    def _emit(self, end: int, completed: List[Any]) -> None:
+        """Parse the item ending at `end` and add it to `completed`."""
+        if self._item_start is None:
+            return
+
+        raw = self._buffer[self._item_start:end]
+        self._item_start = None
+        try:
+            completed.append(json.loads(raw, strict=False))
+        except json.JSONDecodeError:
+            try:
+                completed.append(extract_json(raw, expected_type=None, allow_partial=False))
+            except json.JSONDecodeError:
+                # Skip a malformed item rather than failing the whole stream
+                pass
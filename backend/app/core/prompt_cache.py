@@ -0,0 +1,42 @@
+"""
+Prompt Caching
+
+Helpers for reading Anthropic prompt cache usage. Static instructions are
+kept in the system prompt and the user-specific data in the message, so the
+instructions form a stable prefix.
+
+The system prompts are sent without cache_control markers: Anthropic only
+caches a prefix of at least 1024 tokens (2048 on Haiku) and our mnemonic and
+flashcard instructions are roughly 200-500 tokens, so a marker would never
+take effect. Mark the system block again if the instructions grow past the
+minimum; the cache token counts are already recorded in llm_calls.
+"""
+
+from typing import Any, Dict
+
+CACHE_USAGE_FIELDS = (
+    "input_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+)
+
+
+def get_cache_usage(message: Any) -> Dict[str, int]:
+    """
+    Read prompt cache token counts from a Messages API response.
+
+    input_tokens are uncached tokens, cache_creation_input_tokens were written
+    to the cache (a miss) and cache_read_input_tokens were served from it (a hit).
+
+    Args:
+        message: Response from messages.create
+
+    Returns:
+        Dict with the three token counts (0 when not reported)
+    """
+    usage = getattr(message, "usage", None)
+    counts = {}
+    for field in CACHE_USAGE_FIELDS:
+        value = getattr(usage, field, 0)
+        counts[field] = value if isinstance(value, int) else 0
+    return counts
@@ -0,0 +1,93 @@
+"""
+Single-Flight Request Coalescing
+
+Deduplicates identical concurrent calls: while a call for a key is in
+flight, further callers with the same key await the same result instead of
+starting their own. Used to stop a double-clicked "Generate" button or a
+client retry from paying for a second identical Claude call.
+
+Only in-flight calls are shared; once a call finishes (or fails) its key is
+released and the next caller starts a fresh call.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+def make_key(*parts: Any) -> str:
+    """
+    Build a coalescing key from JSON-serializable parts.
+
+    Args:
+        *parts: Values identifying the call (task, user, normalized input, ...)
+
+    Returns:
+        Hex SHA-256 digest of the parts
+    """
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def normalize_text(text: str) -> str:
+    """Case-fold and collapse whitespace so trivially different inputs share a key."""
+    return " ".join(text.split()).casefold()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key.
+
+    The shared call runs as its own task and is shielded from its callers,
+    so one caller disconnecting doesn't cancel it for the others. Every
+    caller gets its own deep copy of the result, so callers can mutate it
+    freely.
+    """
+
+    def __init__(self):
+        """Initialize with no calls in flight"""
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def run(self, key: str, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run a call, or join the identical one already in flight.
+
+        Args:
+            key: Coalescing key (see make_key)
+            call: Coroutine function starting the call
+
+        Returns:
+            A copy of the call's result
+
+        Raises:
+            Exception: Whatever the shared call raised
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(call())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+        else:
+            self.coalesced += 1
+
+        result = await asyncio.shield(task)
+        return copy.deepcopy(result)
+
+    def _release(self, key: str, task: asyncio.Task) -> None:
+        """Forget a finished call (unless the key was already reused)."""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Retrieved by the awaiting callers; avoid "never retrieved" warnings
+            task.exception()
+
+    def in_flight(self) -> int:
+        """Number of calls currently running."""
+        return len(self._in_flight)
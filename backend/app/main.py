@@ -1,57 +1,44 @@
-from fastapi import FastAPI, Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
-from app.api.routes import auth, decks, flashcards, health, mnemonics, pdf, study
+from app.api.routes import admin, auth, decks, flashcards, health, mnemonics, pdf, stats, study
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.cors import CORSCustomMiddleware
+from app.services.deck_cache import deck_cache_invalidation
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url=f"{settings.API_V1_STR}/docs",
     redoc_url=f"{settings.API_V1_STR}/redoc",
+    default_response_class=ORJSONResponse,
 )
 
+# Compression sits inside CORS so preflights never reach it
+if settings.RESPONSE_COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.RESPONSE_COMPRESSION_MIN_BYTES,
+        gzip_level=settings.RESPONSE_GZIP_LEVEL,
+        brotli_quality=settings.RESPONSE_BROTLI_QUALITY,
+    )
 
-# Custom CORS middleware that handles everything
-class CORSCustomMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # Get origin from request
-        origin = request.headers.get("origin", "")
-
-        # Check if origin is allowed
-        is_allowed = origin in settings.CORS_ORIGINS or not origin
-
-        # Handle OPTIONS (preflight) requests
-        if request.method == "OPTIONS":
-            if is_allowed:
-                return Response(
-                    status_code=200,
-                    headers={
-                        "Access-Control-Allow-Origin": origin,
-                        "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, PATCH, OPTIONS",
-                        "Access-Control-Allow-Headers": "Authorization, Content-Type",
-                        "Access-Control-Allow-Credentials": "true",
-                        "Access-Control-Max-Age": "600",
-                    },
-                )
-            else:
-                return Response(status_code=403)
+# Add CORS middleware
+app.add_middleware(CORSCustomMiddleware, allow_origins=settings.CORS_ORIGINS)
 
-        # Handle actual requests
-        response = await call_next(request)
 
-        # Add CORS headers to response
-        if is_allowed:
-            response.headers["Access-Control-Allow-Origin"] = origin
-            response.headers["Access-Control-Allow-Credentials"] = "true"
-            response.headers["Access-Control-Expose-Headers"] = "*"
+@app.on_event("startup")
+async def start_deck_cache_invalidation():
+    if deck_cache_invalidation is not None:
+        await deck_cache_invalidation.start()
 
-        return response
 
+@app.on_event("shutdown")
+async def stop_deck_cache_invalidation():
+    if deck_cache_invalidation is not None:
+        await deck_cache_invalidation.stop()
 
-# Add CORS middleware
-app.add_middleware(CORSCustomMiddleware)
 
 # Routers
 app.include_router(health.router, prefix=settings.API_V1_STR, tags=["health"])
@@ -61,6 +48,8 @@ app.include_router(mnemonics.router, prefix=settings.API_V1_STR, tags=["mnemonic
 app.include_router(flashcards.router, prefix=settings.API_V1_STR, tags=["flashcards"])
 app.include_router(pdf.router, prefix=settings.API_V1_STR, tags=["pdf"])
 app.include_router(study.router, prefix=settings.API_V1_STR, tags=["study"])
+app.include_router(stats.router, prefix=settings.API_V1_STR, tags=["stats"])
+app.include_router(admin.router, prefix=settings.API_V1_STR, tags=["admin"])
 
 
 @app.get("/")
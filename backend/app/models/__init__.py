@@ -7,5 +7,7 @@ Exports all SQLAlchemy models for the BrainKit application.
 from app.models.profile import Profile
 from app.models.deck import Deck
 from app.models.flashcard import Flashcard
+from app.models.study_session import StudySession
+from app.models.card_review import CardReview, CardReviewSummary
 
-__all__ = ["Profile", "Deck", "Flashcard"]
+__all__ = ["Profile", "Deck", "Flashcard", "StudySession", "CardReview", "CardReviewSummary"]
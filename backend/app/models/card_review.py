@@ -0,0 +1,81 @@
+"""
+Card Review Model
+
+This model represents a single flashcard review in the BrainKit application.
+Each row records the rating given and how the SM-2 values changed.
+
+The table is partitioned by month on reviewed_at; old months are compacted
+into CardReviewSummary rows.
+"""
+
+from sqlalchemy import BigInteger, Column, Date, DateTime, Float, Integer, func, text
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.database import Base
+
+
+class CardReview(Base):
+    """
+    Card Review Model
+
+    Attributes:
+        id: UUID (primary key together with reviewed_at, the partition key)
+        session_id: Optional foreign key to study_sessions
+        flashcard_id: Foreign key to flashcards
+        user_id: Foreign key to auth.users
+        quality: Rating (1=Hard, 3=Good, 5=Easy)
+        response_time_ms: Time taken to answer
+        previous_interval / new_interval: Interval in days before and after the review
+        previous_ease_factor / new_ease_factor: Ease factor before and after the review
+        reviewed_at: Timestamp of the review
+    """
+
+    __tablename__ = "card_reviews"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    session_id = Column(UUID(as_uuid=True), nullable=True)
+    flashcard_id = Column(UUID(as_uuid=True), nullable=False)
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    quality = Column(Integer, nullable=False)
+    response_time_ms = Column(Integer, nullable=True)
+    previous_interval = Column(Integer, nullable=True)
+    new_interval = Column(Integer, nullable=True)
+    previous_ease_factor = Column(Float, nullable=True)
+    new_ease_factor = Column(Float, nullable=True)
+    reviewed_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
+
+    def __repr__(self):
+        return f"<CardReview(id={self.id}, flashcard_id={self.flashcard_id}, quality={self.quality})>"
+
+
+class CardReviewSummary(Base):
+    """
+    Card Review Summary Model
+
+    Per-card monthly totals for reviews whose partition has been compacted.
+
+    Attributes:
+        flashcard_id: Foreign key to flashcards
+        user_id: Foreign key to auth.users
+        month: First day of the month summarized
+        review_count: Number of reviews
+        retained_count: Reviews rated Good or Easy (quality >= 3)
+        quality_sum: Sum of ratings
+        response_time_ms_sum / response_time_count: For the mean response time
+        last_reviewed_at: Latest review in the month
+    """
+
+    __tablename__ = "card_review_summaries"
+
+    flashcard_id = Column(UUID(as_uuid=True), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+    month = Column(Date, primary_key=True)
+    review_count = Column(Integer, nullable=False)
+    retained_count = Column(Integer, nullable=False)
+    quality_sum = Column(Integer, nullable=False)
+    response_time_ms_sum = Column(BigInteger, nullable=False, default=0)
+    response_time_count = Column(Integer, nullable=False, default=0)
+    last_reviewed_at = Column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return f"<CardReviewSummary(flashcard_id={self.flashcard_id}, month={self.month}, reviews={self.review_count})>"
@@ -21,6 +21,7 @@ class Flashcard(Base):
     Attributes:
         id: UUID primary key
         deck_id: Foreign key to decks table
+        user_id: Owner of the deck (kept in sync by a trigger)
         front: Question text
         back: Answer text
         difficulty: Card difficulty level ('easy' | 'medium' | 'hard')
@@ -42,6 +43,7 @@ class Flashcard(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True)
     deck_id = Column(UUID(as_uuid=True), nullable=False)
+    user_id = Column(UUID(as_uuid=True), nullable=False)
     front = Column(Text, nullable=False)
     back = Column(Text, nullable=False)
     difficulty = Column(String(10), default="medium", nullable=False)
@@ -66,6 +68,7 @@ class Flashcard(Base):
         return {
             "id": str(self.id),
             "deck_id": str(self.deck_id),
+            "user_id": str(self.user_id) if self.user_id else None,
             "front": self.front,
             "back": self.back,
             "difficulty": self.difficulty,
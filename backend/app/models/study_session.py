@@ -0,0 +1,52 @@
+"""
+Study Session Model
+
+This model represents study sessions in the BrainKit application.
+A session groups the card reviews done in one sitting, for one deck or
+across several decks (deck_id is NULL).
+"""
+
+from sqlalchemy import Column, DateTime, Integer, func, text
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.database import Base
+
+
+class StudySession(Base):
+    """
+    Study Session Model
+
+    Attributes:
+        id: UUID primary key
+        user_id: Foreign key to auth.users
+        deck_id: Foreign key to decks, NULL for cross-deck sessions
+        cards_reviewed: Number of cards reviewed in the session
+        duration_seconds: Session length, set on completion
+        started_at: Timestamp when the session started
+        completed_at: Timestamp when the session was completed
+    """
+
+    __tablename__ = "study_sessions"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    deck_id = Column(UUID(as_uuid=True), nullable=True)
+    cards_reviewed = Column(Integer, default=0, nullable=False)
+    duration_seconds = Column(Integer, nullable=True)
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<StudySession(id={self.id}, user_id={self.user_id}, deck_id={self.deck_id})>"
+
+    def to_dict(self):
+        """Convert study session to dictionary for API responses"""
+        return {
+            "id": str(self.id),
+            "user_id": str(self.user_id),
+            "deck_id": str(self.deck_id) if self.deck_id else None,
+            "cards_reviewed": self.cards_reviewed,
+            "duration_seconds": self.duration_seconds,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+        }
@@ -0,0 +1,43 @@
+"""
+Admin Schemas
+
+Pydantic models for admin-only API responses.
+"""
+
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class LLMTaskUsage(BaseModel):
+    """Aggregated Claude usage for one task and model"""
+    task: str = Field(..., description="Task name (mnemonic, flashcards, concept_extraction, ...)")
+    model: str = Field(..., description="Model used")
+    calls: int = Field(..., description="Number of calls")
+    errors: int = Field(..., description="Number of failed calls")
+    retries: int = Field(..., description="Retried or fallback attempts")
+    input_tokens: int = Field(..., description="Uncached input tokens")
+    output_tokens: int = Field(..., description="Output tokens")
+    cache_creation_input_tokens: int = Field(..., description="Input tokens written to the prompt cache")
+    cache_read_input_tokens: int = Field(..., description="Input tokens read from the prompt cache")
+    avg_latency_ms: Optional[float] = Field(None, description="Average call latency")
+    p95_latency_ms: Optional[float] = Field(None, description="95th percentile call latency")
+    avg_time_to_first_token_ms: Optional[float] = Field(None, description="Average time to first token (streamed calls)")
+
+
+class LLMUsageTotals(BaseModel):
+    """Usage totals across all tasks"""
+    calls: int
+    errors: int
+    retries: int
+    input_tokens: int
+    output_tokens: int
+    cache_creation_input_tokens: int
+    cache_read_input_tokens: int
+
+
+class LLMUsageResponse(BaseModel):
+    """Response for GET /admin/llm-usage"""
+    since: str = Field(..., description="Start of the aggregation window (ISO timestamp)")
+    usage: List[LLMTaskUsage] = Field(..., description="Usage per task and model")
+    totals: LLMUsageTotals = Field(..., description="Totals across all tasks")
@@ -7,7 +7,7 @@ Pydantic models for validating flashcard requests and responses.
 from datetime import date, datetime
 from typing import List, Optional
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 
 class GenerateFlashcardsRequest(BaseModel):
@@ -99,6 +99,65 @@ class UpdateFlashcardRequest(BaseModel):
     }
 
 
+class BulkFlashcardUpdate(UpdateFlashcardRequest):
+    """
+    A single edit inside a bulk update request.
+    """
+    id: str = Field(..., description="UUID of the flashcard to update")
+
+    @model_validator(mode='after')
+    def validate_has_changes(self) -> 'BulkFlashcardUpdate':
+        """Ensure the edit changes at least one field"""
+        if self.front is None and self.back is None and not self.difficulty:
+            raise ValueError('Each update needs at least one of front, back, difficulty')
+        return self
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [{
+                "id": "123e4567-e89b-12d3-a456-426614174000",
+                "difficulty": "hard"
+            }]
+        }
+    }
+
+
+class BulkUpdateFlashcardsRequest(BaseModel):
+    """
+    Request schema for updating many flashcards at once.
+    """
+    updates: List[BulkFlashcardUpdate] = Field(..., min_length=1, max_length=500)
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [{
+                "updates": [
+                    {"id": "123e4567-e89b-12d3-a456-426614174000", "difficulty": "hard"},
+                    {"id": "123e4567-e89b-12d3-a456-426614174001", "back": "Amiodarone 300 mg IV"}
+                ]
+            }]
+        }
+    }
+
+
+class BulkDeleteFlashcardsRequest(BaseModel):
+    """
+    Request schema for deleting many flashcards at once.
+    """
+    flashcard_ids: List[str] = Field(..., min_length=1, max_length=500, description="Flashcard UUIDs to delete")
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [{
+                "flashcard_ids": [
+                    "123e4567-e89b-12d3-a456-426614174000",
+                    "123e4567-e89b-12d3-a456-426614174001"
+                ]
+            }]
+        }
+    }
+
+
 class FlashcardResponse(BaseModel):
     """
     Response schema for a single flashcard.
@@ -151,6 +210,23 @@ class GenerateFlashcardsResponse(BaseModel):
     message: str = "Flashcards generated successfully"
 
 
+class BulkUpdateFlashcardsResponse(BaseModel):
+    """
+    Response schema for bulk flashcard updates.
+    """
+    flashcards: List[FlashcardResponse]
+    updated: int
+    not_found_ids: List[str] = []
+
+
+class BulkDeleteFlashcardsResponse(BaseModel):
+    """
+    Response schema for bulk flashcard deletion.
+    """
+    deleted: int
+    not_found_ids: List[str] = []
+
+
 class MessageResponse(BaseModel):
     """Generic message response."""
     message: str
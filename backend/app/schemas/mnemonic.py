@@ -54,6 +54,9 @@ class MnemonicGenerationMetadata(BaseModel):
     item_count: int = Field(..., description="Number of items in the list")
     model: str = Field(..., description="Claude model version used")
     generation_id: Optional[str] = Field(None, description="Database ID of the generation record")
+    input_tokens: int = Field(0, description="Uncached prompt tokens")
+    cache_creation_input_tokens: int = Field(0, description="Prompt tokens written to the cache (cache miss)")
+    cache_read_input_tokens: int = Field(0, description="Prompt tokens read from the cache (cache hit)")
 
 
 class GenerateMnemonicsResponse(BaseModel):
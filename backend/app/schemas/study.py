@@ -18,6 +18,32 @@ class StartSessionResponse(BaseModel):
     due_cards: List[dict]  # List of flashcard dictionaries
 
 
+class StartMergedSessionRequest(BaseModel):
+    """Request to start a study session across several decks"""
+    deck_ids: Optional[List[str]] = Field(
+        None,
+        description="Optional deck UUIDs to include; all of the user's decks if omitted",
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "deck_ids": [
+                    "123e4567-e89b-12d3-a456-426614174000",
+                    "123e4567-e89b-12d3-a456-426614174002"
+                ]
+            }
+        }
+
+
+class StartMergedSessionResponse(BaseModel):
+    """Response when starting a cross-deck study session"""
+    session_id: Optional[str]
+    deck_ids: Optional[List[str]]
+    cards_due_count: int
+    due_cards: List[dict]  # List of flashcard dictionaries, each with its deck_id
+
+
 class ReviewCardRequest(BaseModel):
     """Request to review a flashcard"""
     flashcard_id: str = Field(..., description="UUID of the flashcard being reviewed")
@@ -61,7 +87,7 @@ class CompleteSessionRequest(BaseModel):
 class SessionSummary(BaseModel):
     """Study session summary statistics"""
     session_id: str
-    deck_id: str
+    deck_id: Optional[str]  # None for cross-deck sessions
     cards_reviewed: int
     duration_seconds: Optional[int]
     cards_remaining: int
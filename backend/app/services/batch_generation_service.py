@@ -0,0 +1,430 @@
+"""
+Batch Generation Service
+
+Runs non-interactive bulk generation jobs (regenerating flashcards for many
+decks, pre-generating mnemonics for imported lists) through the Anthropic
+Message Batches API instead of one synchronous messages.create per item.
+
+Batches are billed at a lower per-token price and don't count against the
+interactive rate limit. Prompts are built by the same builders used by the
+interactive endpoints, so batch output matches what users get in the app.
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+from supabase import Client
+
+from app.core.config import settings
+from app.core.language import detect_language
+from app.core.llm_json import extract_json
+from app.core.supabase import get_supabase_client
+from app.services.claude_service import claude_service
+from app.services.deck_cache import deck_cache
+from app.services.direct_queries import direct_queries
+from app.services.flashcard_service import flashcard_service
+from app.services.model_router import model_router
+
+ANTHROPIC_VERSION = "2023-06-01"
+BATCHES_PATH = "/v1/messages/batches"
+
+# Same limit as the interactive flashcard call in flashcard_service.py
+FLASHCARD_MAX_TOKENS = 4000
+
+# Decks fetched per request (PostgREST caps responses, 1000 rows by default)
+DECK_PAGE_SIZE = 1000
+
+
+class BatchGenerationService:
+    """
+    Batch Generation Service for BrainKit
+
+    Provides methods for:
+    - Building batch requests from mnemonic and flashcard prompts
+    - Submitting batches and polling until they end
+    - Bulk-writing mnemonic_generations and merging regenerated flashcards
+    """
+
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
+        """
+        Initialize the batch service.
+
+        Args:
+            http_client: Optional HTTP client (e.g. one bound to a fake server in tests)
+        """
+        self.admin_client: Client = get_supabase_client()
+        self.http_client = http_client or httpx.AsyncClient(
+            base_url=settings.ANTHROPIC_API_URL,
+            timeout=60,
+        )
+        self.poll_interval = settings.CLAUDE_BATCH_POLL_INTERVAL_SECONDS
+        self.max_wait = settings.CLAUDE_BATCH_MAX_WAIT_SECONDS
+
+    def _headers(self) -> Dict[str, str]:
+        """Build Anthropic API request headers"""
+        return {
+            "x-api-key": settings.CLAUDE_API_KEY,
+            "anthropic-version": ANTHROPIC_VERSION,
+            "content-type": "application/json",
+        }
+
+    def build_mnemonic_request(self, custom_id: str, list_items: List[str]) -> Dict[str, Any]:
+        """
+        Build a batch request for one mnemonic generation.
+
+        Args:
+            custom_id: Unique ID used to match the result to its input
+            list_items: List of items to create mnemonics for
+
+        Returns:
+            Batch request dictionary
+        """
+        language = detect_language(" ".join(list_items))
+        system_prompt = claude_service._build_mnemonic_system_prompt(language=language)
+        prompt = claude_service._build_mnemonic_prompt(list_items, language=language)
+
+        return {
+            "custom_id": custom_id,
+            "params": {
+                "model": model_router.model_for("mnemonic"),
+                "max_tokens": claude_service.max_tokens,
+                "temperature": 1.0,
+                "system": system_prompt,
+                "messages": [{"role": "user", "content": prompt}],
+            },
+        }
+
+    def build_flashcard_request(self, custom_id: str, deck: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build a batch request for one deck's flashcards.
+
+        Args:
+            custom_id: Unique ID used to match the result to its input
+            deck: Deck dictionary with original_list and selected mnemonic
+
+        Returns:
+            Batch request dictionary
+        """
+        system_prompt, prompt = flashcard_service._build_flashcard_prompt(
+            list_items=deck["original_list"],
+            mnemonic_type=deck.get("selected_mnemonic_type", "unknown"),
+            mnemonic_content=deck["selected_mnemonic_content"],
+        )
+
+        return {
+            "custom_id": custom_id,
+            "params": {
+                "model": model_router.model_for(
+                    model_router.flashcard_task(flashcard_service._count_items(deck["original_list"]))
+                ),
+                "max_tokens": FLASHCARD_MAX_TOKENS,
+                "system": system_prompt,
+                "messages": [{"role": "user", "content": prompt}],
+            },
+        }
+
+    async def submit_batch(self, requests: List[Dict[str, Any]]) -> str:
+        """
+        Submit a list of requests as one message batch.
+
+        Args:
+            requests: Batch requests from build_*_request
+
+        Returns:
+            The batch ID
+
+        Raises:
+            Exception: If the API rejects the batch
+        """
+        response = await self.http_client.post(
+            BATCHES_PATH,
+            headers=self._headers(),
+            json={"requests": requests},
+        )
+        if response.status_code >= 400:
+            raise Exception(f"Failed to submit batch: {response.status_code} {response.text}")
+
+        return response.json()["id"]
+
+    async def wait_for_batch(self, batch_id: str) -> Dict[str, Any]:
+        """
+        Poll a batch until processing has ended.
+
+        Args:
+            batch_id: The batch ID
+
+        Returns:
+            The final batch object
+
+        Raises:
+            Exception: If polling fails or the batch doesn't end within max_wait
+        """
+        deadline = time.monotonic() + self.max_wait
+
+        while True:
+            response = await self.http_client.get(
+                f"{BATCHES_PATH}/{batch_id}",
+                headers=self._headers(),
+            )
+            if response.status_code >= 400:
+                raise Exception(f"Failed to get batch status: {response.status_code} {response.text}")
+
+            batch = response.json()
+            if batch.get("processing_status") == "ended":
+                return batch
+
+            if time.monotonic() >= deadline:
+                raise Exception(f"Batch {batch_id} did not finish in time")
+
+            await asyncio.sleep(self.poll_interval)
+
+    async def get_batch_results(self, batch: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Download the results of an ended batch.
+
+        Args:
+            batch: Batch object returned by wait_for_batch
+
+        Returns:
+            Mapping of custom_id -> result object
+            ({"type": "succeeded", "message": {...}} or an error/expired/canceled result)
+
+        Raises:
+            Exception: If the results can't be downloaded
+        """
+        results_url = batch.get("results_url") or f"{BATCHES_PATH}/{batch['id']}/results"
+        response = await self.http_client.get(results_url, headers=self._headers())
+        if response.status_code >= 400:
+            raise Exception(f"Failed to get batch results: {response.status_code} {response.text}")
+
+        results = {}
+        for line in response.text.splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            results[entry["custom_id"]] = entry["result"]
+
+        return results
+
+    async def run_batch(self, requests: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Submit a batch, wait for it to end and parse each successful response.
+
+        Args:
+            requests: Batch requests from build_*_request
+
+        Returns:
+            Dict containing:
+                - batch_id: The batch ID
+                - parsed: Mapping of custom_id -> parsed JSON response
+                - errors: Mapping of custom_id -> error message
+        """
+        batch_id = await self.submit_batch(requests)
+        batch = await self.wait_for_batch(batch_id)
+        results = await self.get_batch_results(batch)
+
+        parsed: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+
+        for request in requests:
+            custom_id = request["custom_id"]
+            result = results.get(custom_id)
+
+            if result is None:
+                errors[custom_id] = "No result returned"
+                continue
+
+            if result.get("type") != "succeeded":
+                error = result.get("error") or {}
+                errors[custom_id] = error.get("message") or result.get("type", "unknown")
+                continue
+
+            try:
+                text = result["message"]["content"][0]["text"]
+                parsed[custom_id] = extract_json(text)
+            except (KeyError, IndexError, json.JSONDecodeError) as e:
+                errors[custom_id] = f"Failed to parse Claude response: {str(e)}"
+
+        return {"batch_id": batch_id, "parsed": parsed, "errors": errors}
+
+    async def generate_mnemonics_batch(
+        self,
+        items: List[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """
+        Pre-generate mnemonics for many lists in one batch.
+
+        Args:
+            items: List of dicts with user_id, list_items and optional deck_id
+
+        Returns:
+            Dict containing:
+                - batch_id: The batch ID
+                - generations: Saved mnemonic_generations rows
+                - errors: Mapping of input index -> error message
+
+        Raises:
+            Exception: If the batch fails or results can't be saved
+        """
+        requests = [
+            self.build_mnemonic_request(f"mnemonic-{index}", item["list_items"])
+            for index, item in enumerate(items)
+        ]
+
+        try:
+            batch = await self.run_batch(requests)
+
+            errors = {int(custom_id.split("-")[1]): message for custom_id, message in batch["errors"].items()}
+            rows = []
+
+            for index, item in enumerate(items):
+                mnemonics = batch["parsed"].get(f"mnemonic-{index}")
+                if mnemonics is None:
+                    continue
+
+                try:
+                    claude_service._validate_mnemonics(mnemonics)
+                except Exception as e:
+                    errors[index] = str(e)
+                    continue
+
+                rows.append({
+                    "user_id": item["user_id"],
+                    "deck_id": item.get("deck_id"),
+                    "input_list": "\n".join(item["list_items"]),
+                    "item_count": len(item["list_items"]),
+                    "acrostic_result": mnemonics["acrostic"],
+                    "story_result": mnemonics["story"],
+                    "visual_result": mnemonics["visual"],
+                    "generation_time_ms": 0,
+                    "claude_model": model_router.model_for("mnemonic"),
+                })
+
+            generations = []
+            if rows:
+                response = self.admin_client.table("mnemonic_generations") \
+                    .insert(rows) \
+                    .execute()
+                generations = response.data or []
+
+            return {"batch_id": batch["batch_id"], "generations": generations, "errors": errors}
+
+        except Exception as e:
+            raise Exception(f"Batch mnemonic generation failed: {str(e)}")
+
+    async def regenerate_flashcards_batch(
+        self,
+        deck_ids: Optional[List[str]] = None,
+        replace_existing: bool = False,
+        all_decks: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Regenerate flashcards for many decks in one batch.
+
+        Only decks with a list and a selected mnemonic are included. New cards
+        are merged into each deck in one transaction: questions the deck
+        already has are skipped, so existing cards keep their review history.
+        With replace_existing, cards missing from the new set are deleted
+        too (and their reviews with them), except ones the user edited.
+
+        Args:
+            deck_ids: Decks to regenerate
+            replace_existing: Whether to delete cards the new set doesn't contain
+            all_decks: Must be True to run on every eligible deck when deck_ids is None
+
+        Returns:
+            Dict containing:
+                - batch_id: The batch ID (None if no deck was eligible)
+                - flashcard_count: Number of flashcards added
+                - removed_count: Number of flashcards deleted
+                - deck_ids: Decks that received new flashcards
+                - errors: Mapping of deck_id -> error message
+
+        Raises:
+            ValueError: If neither deck_ids nor all_decks is given
+            Exception: If the batch fails or results can't be saved
+        """
+        if deck_ids is None and not all_decks:
+            raise ValueError("Pass deck_ids, or all_decks=True to regenerate every deck")
+
+        try:
+            decks = [
+                deck for deck in self._fetch_decks(deck_ids)
+                if deck.get("original_list") and deck.get("selected_mnemonic_content")
+            ]
+
+            if not decks:
+                return {"batch_id": None, "flashcard_count": 0, "removed_count": 0, "deck_ids": [], "errors": {}}
+
+            requests = [self.build_flashcard_request(f"flashcards-{deck['id']}", deck) for deck in decks]
+            batch = await self.run_batch(requests)
+
+            errors = {custom_id[len("flashcards-"):]: message for custom_id, message in batch["errors"].items()}
+            generated = []
+
+            for deck in decks:
+                result = batch["parsed"].get(f"flashcards-{deck['id']}")
+                if result is None:
+                    continue
+
+                cards = flashcard_service._dedupe_flashcards([
+                    card for card in result.get("flashcards", [])
+                    if isinstance(card, dict) and card.get("front") and card.get("back")
+                ])
+                if not cards:
+                    errors[deck["id"]] = "Invalid response format from Claude API"
+                    continue
+
+                generated.append({"deck_id": deck["id"], "user_id": deck["user_id"], "cards": cards})
+
+            summary = {}
+            if generated:
+                summary = await direct_queries.save_generated_flashcards(
+                    generated,
+                    key=flashcard_service._normalize_front,
+                    replace_existing=replace_existing,
+                )
+                for deck_id in summary:
+                    deck_cache.invalidate(deck_id)
+
+            return {
+                "batch_id": batch["batch_id"],
+                "flashcard_count": sum(counts["added"] for counts in summary.values()),
+                "removed_count": sum(counts["removed"] for counts in summary.values()),
+                "deck_ids": [deck["deck_id"] for deck in generated],
+                "errors": errors,
+            }
+
+        except Exception as e:
+            raise Exception(f"Batch flashcard generation failed: {str(e)}")
+
+    def _fetch_decks(self, deck_ids: Optional[List[str]]) -> List[Dict[str, Any]]:
+        """
+        Fetch the decks to regenerate, paging past PostgREST's row limit.
+
+        Args:
+            deck_ids: Decks to fetch (None for every deck)
+
+        Returns:
+            List of deck dictionaries
+        """
+        decks = []
+        while True:
+            query = self.admin_client.table("decks") \
+                .select("id, user_id, original_list, selected_mnemonic_type, selected_mnemonic_content")
+            if deck_ids is not None:
+                query = query.in_("id", deck_ids)
+            page = query.order("id") \
+                .range(len(decks), len(decks) + DECK_PAGE_SIZE - 1) \
+                .execute().data or []
+
+            decks.extend(page)
+            if len(page) < DECK_PAGE_SIZE:
+                return decks
+
+
+# Singleton instance
+batch_generation_service = BatchGenerationService()
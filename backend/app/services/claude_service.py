@@ -4,194 +4,286 @@ Claude AI Service
 Handles integration with Anthropic Claude API for mnemonic generation.
 """
 
+import asyncio
 import json
+import logging
 import time
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 import anthropic
 
 from app.core.config import settings
-
-
-class ClaudeService:
-    """
-    Claude AI Service for BrainKit
-
-    Provides methods for generating mnemonics using Claude AI.
-    """
-
-    def __init__(self):
-        """Initialize the Claude service with API client"""
-        if not settings.CLAUDE_API_KEY:
-            raise ValueError("CLAUDE_API_KEY is not set in environment variables")
-
-        self.client = anthropic.Anthropic(api_key=settings.CLAUDE_API_KEY)
-        self.model = "claude-sonnet-4-20250514"  # Using latest Sonnet model
-        self.max_tokens = 4096
-        self.timeout = 30  # 30 seconds timeout
-
-    def _detect_language(self, text: str) -> str:
-        """
-        Detect the language of the input text.
-
-        Args:
-            text: Text to detect language from
-
-        Returns:
-            Language code ('es' for Spanish, 'en' for English, etc.)
-        """
-        # Simple heuristic-based detection for common Spanish/English words
-        spanish_indicators = ['el', 'la', 'los', 'las', 'un', 'una', 'de', 'del', 'y', 'o', 'que', 'en', 'es', 'por', 'para', 'con', 'su', 'al', 'lo', 'como', 'más', 'pero', 'sus', 'le', 'ya', 'todo', 'esta', 'fue', 'hasta', 'muy', 'ser', 'tiene', 'están', 'qué', 'también', 'durante', 'á', 'é', 'í', 'ó', 'ú', 'ñ']
-        english_indicators = ['the', 'be', 'to', 'of', 'and', 'a', 'in', 'that', 'have', 'i', 'it', 'for', 'not', 'on', 'with', 'he', 'as', 'you', 'do', 'at', 'this', 'but', 'his', 'by', 'from', 'they', 'we', 'say', 'her', 'she', 'or', 'an', 'will', 'my', 'one', 'all', 'would', 'there', 'their']
-
-        text_lower = text.lower()
-        words = text_lower.split()
-
-        spanish_count = sum(1 for word in words if word in spanish_indicators)
-        english_count = sum(1 for word in words if word in english_indicators)
-
-        # Check for Spanish-specific characters
-        if any(char in text for char in ['á', 'é', 'í', 'ó', 'ú', 'ñ', 'Á', 'É', 'Í', 'Ó', 'Ú', 'Ñ', '¿', '¡']):
-            spanish_count += 5
-
-        # Default to Spanish if more Spanish indicators, otherwise English
-        return 'es' if spanish_count > english_count else 'en'
-
-    def _build_mnemonic_prompt(self, list_items: List[str], language: str = 'en') -> str:
-        """
-        Build the prompt for Claude to generate mnemonics.
-
-        Args:
-            list_items: List of items to create mnemonics for
-            language: Language code ('es' for Spanish, 'en' for English)
-
-        Returns:
-            Formatted prompt string
-        """
-        item_count = len(list_items)
-        items_formatted = "\n".join([f"{i+1}. {item}" for i, item in enumerate(list_items)])
-
-        # Language-specific instructions
-        if language == 'es':
-            prompt = f"""Eres un experto en memoria especializado en técnicas mnemotécnicas para profesionales médicos.
-
-Dada la siguiente lista de elementos para memorizar:
-{items_formatted}
-
-Genera TRES técnicas mnemotécnicas diferentes para ayudar a recordar esta lista:
-
-1. **TÉCNICA ACRÓSTICA**
+from app.core.language import detect_language, language_instruction
+from app.core.llm_json import ResponseFormatError, extract_json
+from app.core.prompt_cache import CACHE_USAGE_FIELDS, get_cache_usage
+from app.core.single_flight import SingleFlight, make_key, normalize_text
+from app.services.model_router import model_router
+
+logger = logging.getLogger(__name__)
+
+MNEMONIC_TECHNIQUES = ("acrostic", "story", "visual")
+
+# Transient failures worth retrying a single technique for in parallel mode
+TECHNIQUE_RETRY_ERRORS = (
+    json.JSONDecodeError,
+    ResponseFormatError,
+    anthropic.APITimeoutError,
+    anthropic.APIConnectionError,
+    anthropic.RateLimitError,
+    anthropic.InternalServerError,
+)
+
+MNEMONIC_TECHNIQUE_SECTIONS_ES = {
+    "acrostic": """**TÉCNICA ACRÓSTICA**
 Crea una frase o oración memorable donde la primera letra de cada palabra corresponda a un elemento de la lista (en orden).
 - Formato: Frase/oración única
 - Incluye: La frase acróstica, luego la explicación de qué letra = qué elemento
-- Longitud máxima: 100 palabras
-
-2. **TÉCNICA DE HISTORIA NARRATIVA**
+- Longitud máxima: 100 palabras""",
+    "story": """**TÉCNICA DE HISTORIA NARRATIVA**
 Crea una historia corta vívida y memorable que incorpore TODOS los elementos en secuencia.
 - Usa detalles sensoriales y ganchos emocionales
 - Hazla ligeramente inusual o humorística (profesionalmente apropiada)
 - La historia debe fluir lógicamente para que recordar un elemento lleve al siguiente
-- Longitud máxima: 300 palabras
-
-3. **TÉCNICA DE PATRÓN VISUAL/ESPACIAL**
+- Longitud máxima: 300 palabras""",
+    "visual": """**TÉCNICA DE PATRÓN VISUAL/ESPACIAL**
 Crea un mapa mental, viaje, o técnica de patrón visual.
 - Podría ser: Método de Loci (elementos colocados en ubicaciones familiares), agrupaciones visuales, o basado en patrones
 - Describe qué visualizar para cada elemento
 - Haz las imágenes vívidas e interactivas
-- Longitud máxima: 200 palabras
+- Longitud máxima: 200 palabras""",
+}
+
+MNEMONIC_SYSTEM_PROMPT_ES = """Eres un experto en memoria especializado en técnicas mnemotécnicas para profesionales médicos.
 
-Para cada técnica, incluye:
+El usuario te dará una lista numerada de elementos para memorizar.
+
+Genera TRES técnicas mnemotécnicas diferentes para ayudar a recordar esta lista:
+
+""" + "\n\n".join(
+    f"{number}. {section}" for number, section in enumerate(MNEMONIC_TECHNIQUE_SECTIONS_ES.values(), start=1)
+) + """\n\nPara cada técnica, incluye:
 - Un título corto
 - El contenido mnemotécnico
 - Una breve explicación "Cómo usar esto" (1-2 oraciones)
 
 IMPORTANTE:
-- Incluye TODOS los {item_count} elementos de la lista - no omitas ninguno
+- Incluye TODOS los elementos de la lista - no omitas ninguno
 - Mantén un lenguaje profesional pero memorable
 - Asegúrate de que cada técnica realmente ayude a recordar la lista en orden
 - TODO debe estar en ESPAÑOL
 
 Devuelve la respuesta en formato JSON:
-{{
-  "acrostic": {{
+{
+  "acrostic": {
     "title": "...",
     "content": "...",
     "how_to_use": "..."
-  }},
-  "story": {{
+  },
+  "story": {
     "title": "...",
     "content": "...",
     "how_to_use": "..."
-  }},
-  "visual": {{
+  },
+  "visual": {
     "title": "...",
     "content": "...",
     "how_to_use": "..."
-  }}
-}}"""
-        else:  # English
-            prompt = f"""You are a memory expert specializing in mnemonic techniques for medical professionals.
+  }
+}"""
 
-Given the following list of items to memorize:
-{items_formatted}
-
-Generate THREE different mnemonic techniques to help remember this list:
-
-1. **ACROSTIC TECHNIQUE**
+MNEMONIC_TECHNIQUE_SECTIONS_EN = {
+    "acrostic": """**ACROSTIC TECHNIQUE**
 Create a memorable phrase or sentence where the first letter of each word corresponds to an item in the list (in order).
 - Format: Single phrase/sentence
 - Include: The acrostic phrase, then explanation of which letter = which item
-- Max length: 100 words
-
-2. **NARRATIVE STORY TECHNIQUE**
+- Max length: 100 words""",
+    "story": """**NARRATIVE STORY TECHNIQUE**
 Create a vivid, memorable short story that incorporates ALL items in sequence.
 - Use sensory details and emotional hooks
 - Make it slightly unusual or humorous (professionally appropriate)
 - The story should flow logically so recalling one item leads to the next
-- Max length: 300 words
-
-3. **VISUAL/SPATIAL PATTERN TECHNIQUE**
+- Max length: 300 words""",
+    "visual": """**VISUAL/SPATIAL PATTERN TECHNIQUE**
 Create a mental map, journey, or visual pattern technique.
 - Could be: Method of Loci (items placed in familiar locations), visual groupings, or pattern-based
 - Describe what to visualize for each item
 - Make images vivid and interactive
-- Max length: 200 words
+- Max length: 200 words""",
+}
+
+MNEMONIC_SYSTEM_PROMPT_EN = """You are a memory expert specializing in mnemonic techniques for medical professionals.
 
-For each technique, include:
+The user will give you a numbered list of items to memorize.
+
+Generate THREE different mnemonic techniques to help remember this list:
+
+""" + "\n\n".join(
+    f"{number}. {section}" for number, section in enumerate(MNEMONIC_TECHNIQUE_SECTIONS_EN.values(), start=1)
+) + """\n\nFor each technique, include:
 - A short title
 - The mnemonic content
 - A brief "How to use this" explanation (1-2 sentences)
 
 IMPORTANT:
-- Include ALL {item_count} items from the list - do not omit any
+- Include ALL items from the list - do not omit any
 - Keep language professional but memorable
 - Ensure each technique would actually help recall the list in order
 
 Output in JSON format:
-{{
-  "acrostic": {{
+{
+  "acrostic": {
     "title": "...",
     "content": "...",
     "how_to_use": "..."
-  }},
-  "story": {{
+  },
+  "story": {
     "title": "...",
     "content": "...",
     "how_to_use": "..."
-  }},
-  "visual": {{
+  },
+  "visual": {
     "title": "...",
     "content": "...",
     "how_to_use": "..."
-  }}
+  }
+}"""
+
+
+# Focused single-technique prompts used by parallel generation
+MNEMONIC_TECHNIQUE_PROMPT_ES = """Eres un experto en memoria especializado en técnicas mnemotécnicas para profesionales médicos.
+
+El usuario te dará una lista numerada de elementos para memorizar.
+
+Genera UNA técnica mnemotécnica para ayudar a recordar esta lista:
+
+{section}
+
+Incluye:
+- Un título corto
+- El contenido mnemotécnico
+- Una breve explicación "Cómo usar esto" (1-2 oraciones)
+
+IMPORTANTE:
+- Incluye TODOS los elementos de la lista - no omitas ninguno
+- Mantén un lenguaje profesional pero memorable
+- Asegúrate de que la técnica realmente ayude a recordar la lista en orden
+- TODO debe estar en ESPAÑOL
+
+Devuelve la respuesta en formato JSON:
+{{
+  "title": "...",
+  "content": "...",
+  "how_to_use": "..."
 }}"""
 
-        return prompt
+MNEMONIC_TECHNIQUE_PROMPT_EN = """You are a memory expert specializing in mnemonic techniques for medical professionals.
+
+The user will give you a numbered list of items to memorize.
+
+Generate ONE mnemonic technique to help remember this list:
+
+{section}
+
+Include:
+- A short title
+- The mnemonic content
+- A brief "How to use this" explanation (1-2 sentences)
+
+IMPORTANT:
+- Include ALL items from the list - do not omit any
+- Keep language professional but memorable
+- Ensure the technique would actually help recall the list in order
+
+Output in JSON format:
+{{
+  "title": "...",
+  "content": "...",
+  "how_to_use": "..."
+}}"""
+
+
+class ClaudeService:
+    """
+    Claude AI Service for BrainKit
+
+    Provides methods for generating mnemonics using Claude AI.
+    """
+
+    def __init__(self):
+        """Initialize the Claude service with API client"""
+        if not settings.CLAUDE_API_KEY:
+            raise ValueError("CLAUDE_API_KEY is not set in environment variables")
+
+        self.client = anthropic.Anthropic(api_key=settings.CLAUDE_API_KEY, base_url=settings.ANTHROPIC_API_URL)
+        self.max_tokens = 4096
+        self.timeout = 30  # 30 seconds timeout
+        self.technique_max_tokens = 1536  # One technique per call in parallel mode
+        self.technique_retry_delay = 1.0  # Seconds, multiplied by the attempt number
+        self.in_flight = SingleFlight()
+
+    def _build_mnemonic_system_prompt(self, language: str = 'en') -> str:
+        """
+        Build the static instructions for mnemonic generation.
+
+        The text only depends on the language, so it is sent as the system
+        prompt and the list goes in the user message.
+
+        Args:
+            language: Language code ('es' for Spanish, 'en' for English)
+
+        Returns:
+            System prompt string
+        """
+        # Language-specific instructions
+        if language == 'es':
+            return MNEMONIC_SYSTEM_PROMPT_ES
+        return MNEMONIC_SYSTEM_PROMPT_EN
+
+    def _build_technique_system_prompt(self, technique: str, language: str = 'en') -> str:
+        """
+        Build the static instructions for generating a single technique.
+
+        Args:
+            technique: 'acrostic', 'story' or 'visual'
+            language: Language code ('es' for Spanish, 'en' for English)
+
+        Returns:
+            System prompt string
+        """
+        if language == 'es':
+            return MNEMONIC_TECHNIQUE_PROMPT_ES.format(section=MNEMONIC_TECHNIQUE_SECTIONS_ES[technique])
+        return MNEMONIC_TECHNIQUE_PROMPT_EN.format(section=MNEMONIC_TECHNIQUE_SECTIONS_EN[technique])
+
+    def _build_mnemonic_prompt(self, list_items: List[str], language: str = 'en') -> str:
+        """
+        Build the user message with the list to generate mnemonics for.
+
+        Args:
+            list_items: List of items to create mnemonics for
+            language: Language code ('es' for Spanish, 'en' for English)
+
+        Returns:
+            Formatted prompt string
+        """
+        item_count = len(list_items)
+        items_formatted = "\n".join([f"{i+1}. {item}" for i, item in enumerate(list_items)])
+
+        if language == 'es':
+            return f"""Lista de {item_count} elementos para memorizar:
+{items_formatted}
+
+Incluye los {item_count} elementos en cada técnica."""
+
+        return f"""List of {item_count} items to memorize:
+{items_formatted}
+
+Include all {item_count} items in each technique.""" + language_instruction(language)
 
     async def extract_key_concepts(
         self,
         text: str,
         max_concepts: int = 30,
+        user_id: Optional[str] = None,
     ) -> List[str]:
         """
         Extract key concepts from a long text for memorization.
@@ -199,6 +291,7 @@ Output in JSON format:
         Args:
             text: The text to extract concepts from
             max_concepts: Maximum number of concepts to extract (default 30)
+            user_id: User the call is recorded against in llm_calls
 
         Returns:
             List of key concepts/facts suitable for mnemonic generation
@@ -211,8 +304,19 @@ Output in JSON format:
         if len(text) > max_text_length:
             text = text[:max_text_length]
 
+        # Identical extractions already running (e.g. a re-uploaded PDF) share one call
+        key = make_key("concept_extraction", user_id, normalize_text(text), max_concepts)
+        return await self.in_flight.run(key, lambda: self._extract_key_concepts(text, max_concepts, user_id))
+
+    async def _extract_key_concepts(
+        self,
+        text: str,
+        max_concepts: int,
+        user_id: Optional[str] = None,
+    ) -> List[str]:
+        """Run concept extraction for an already truncated text (see extract_key_concepts)."""
         # Detect language
-        detected_language = self._detect_language(text)
+        detected_language = detect_language(text)
 
         # Build language-specific prompt
         if detected_language == 'es':
@@ -273,11 +377,13 @@ Return your response as a JSON object with this format:
   ]
 }}
 
-IMPORTANT: Only return the JSON object, no additional text."""
+IMPORTANT: Only return the JSON object, no additional text.""" + language_instruction(detected_language)
 
-        try:
-            message = self.client.messages.create(
-                model=self.model,
+        async def attempt(model: str, call) -> List[str]:
+            # Off the event loop, so an identical request can join this one meanwhile
+            message = await asyncio.to_thread(
+                self.client.messages.create,
+                model=model,
                 max_tokens=2048,
                 temperature=0.3,  # Lower temperature for more consistent extraction
                 messages=[
@@ -288,37 +394,29 @@ IMPORTANT: Only return the JSON object, no additional text."""
                 ],
                 timeout=self.timeout,
             )
-
-            response_text = message.content[0].text
+            call.add_usage(message)
 
             # Parse JSON response
-            try:
-                # Handle markdown code blocks
-                if "```json" in response_text:
-                    json_start = response_text.find("```json") + 7
-                    json_end = response_text.find("```", json_start)
-                    response_text = response_text[json_start:json_end].strip()
-                elif "```" in response_text:
-                    json_start = response_text.find("```") + 3
-                    json_end = response_text.find("```", json_start)
-                    response_text = response_text[json_start:json_end].strip()
-
-                result = json.loads(response_text)
-                concepts = result.get("concepts", [])
-
-                if not concepts:
-                    raise Exception("No concepts were extracted from the text")
-
-                # Clean and validate concepts
-                cleaned_concepts = []
-                for concept in concepts:
-                    if isinstance(concept, str) and concept.strip():
-                        cleaned_concepts.append(concept.strip())
-
-                return cleaned_concepts
+            result = extract_json(message.content[0].text)
+            concepts = result.get("concepts", [])
 
-            except json.JSONDecodeError as e:
-                raise Exception(f"Failed to parse Claude response: {str(e)}")
+            if not concepts:
+                raise ResponseFormatError("No concepts were extracted from the text")
+
+            # Clean and validate concepts
+            cleaned_concepts = []
+            for concept in concepts:
+                if isinstance(concept, str) and concept.strip():
+                    cleaned_concepts.append(concept.strip())
+
+            return cleaned_concepts
+
+        try:
+            concepts, _ = await model_router.run("concept_extraction", attempt, user_id=user_id)
+            return concepts
+
+        except json.JSONDecodeError as e:
+            raise Exception(f"Failed to parse Claude response: {str(e)}")
 
         except anthropic.APITimeoutError:
             raise Exception("Processing is taking longer than expected. Please try again.")
@@ -329,6 +427,156 @@ IMPORTANT: Only return the JSON object, no additional text."""
         except anthropic.APIError as e:
             raise Exception(f"Failed to analyze text: {str(e)}")
 
+    def _validate_mnemonics(self, mnemonics: Dict[str, Any]) -> None:
+        """
+        Check that a parsed response contains all three complete techniques.
+
+        Args:
+            mnemonics: Parsed JSON response from Claude
+
+        Raises:
+            ResponseFormatError: If a technique or one of its fields is missing
+        """
+        for key in MNEMONIC_TECHNIQUES:
+            if key not in mnemonics:
+                raise ResponseFormatError(f"Missing '{key}' in Claude response")
+
+            self._validate_technique(key, mnemonics[key])
+
+    def _validate_technique(self, key: str, technique: Any) -> None:
+        """
+        Check that a single technique has a title, content and how_to_use.
+
+        Args:
+            key: Technique name, used in error messages
+            technique: Parsed technique
+
+        Raises:
+            ResponseFormatError: If the technique or one of its fields is missing
+        """
+        if not isinstance(technique, dict):
+            raise ResponseFormatError(f"'{key}' must be a dictionary")
+
+        required_fields = ["title", "content", "how_to_use"]
+        for field in required_fields:
+            if field not in technique:
+                raise ResponseFormatError(f"Missing '{field}' in '{key}' technique")
+
+    async def _generate_technique(
+        self,
+        technique: str,
+        list_items: List[str],
+        language: str,
+        user_id: str,
+    ) -> Tuple[Dict[str, Any], str, Any]:
+        """
+        Generate one technique with a focused prompt, retrying it on its own.
+
+        Transient API errors and unusable responses are retried up to
+        MNEMONIC_TECHNIQUE_MAX_ATTEMPTS times; each attempt still gets the
+        model router's fallback on parse failures.
+
+        Args:
+            technique: 'acrostic', 'story' or 'visual'
+            list_items: List of items to create the mnemonic for
+            language: Detected language code
+            user_id: User ID for usage tracking
+
+        Returns:
+            Tuple of (technique dict, model used, Claude message)
+
+        Raises:
+            Exception: Whatever the last attempt raised
+        """
+        system_prompt = self._build_technique_system_prompt(technique, language=language)
+        prompt = self._build_mnemonic_prompt(list_items, language=language)
+
+        async def attempt(model: str, call) -> Tuple[Dict[str, Any], Any]:
+            # The sync client would block the event loop and serialize the techniques
+            message = await asyncio.to_thread(
+                self.client.messages.create,
+                model=model,
+                max_tokens=self.technique_max_tokens,
+                temperature=1.0,
+                system=system_prompt,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ],
+                timeout=self.timeout,
+            )
+            call.add_usage(message)
+
+            try:
+                result = extract_json(message.content[0].text)
+            except json.JSONDecodeError as e:
+                raise ResponseFormatError(f"Failed to parse Claude response as JSON: {str(e)}")
+
+            self._validate_technique(technique, result)
+            return result, message
+
+        max_attempts = max(1, settings.MNEMONIC_TECHNIQUE_MAX_ATTEMPTS)
+        for attempt_number in range(1, max_attempts + 1):
+            try:
+                (result, message), model = await model_router.run(
+                    "mnemonic", attempt, user_id=user_id, retries=attempt_number - 1,
+                )
+                return result, model, message
+            except TECHNIQUE_RETRY_ERRORS as e:
+                if attempt_number == max_attempts:
+                    raise
+                logger.warning(
+                    "mnemonic technique=%s attempt=%d failed (%s), retrying",
+                    technique, attempt_number, e,
+                )
+                await asyncio.sleep(self.technique_retry_delay * attempt_number)
+
+    async def _generate_mnemonics_parallel(
+        self,
+        list_items: List[str],
+        language: str,
+        user_id: str,
+    ) -> Tuple[Dict[str, Any], str, Dict[str, int]]:
+        """
+        Generate the three techniques concurrently, one focused call each.
+
+        Wall-clock time is bounded by the slowest technique. A failing
+        technique is retried alone; the others are kept.
+
+        Args:
+            list_items: List of items to create mnemonics for
+            language: Detected language code
+            user_id: User ID for usage tracking
+
+        Returns:
+            Tuple of (mnemonics by technique, model(s) used, summed cache usage)
+
+        Raises:
+            Exception: The first error of a technique that failed every attempt
+        """
+        results = await asyncio.gather(
+            *(self._generate_technique(technique, list_items, language, user_id) for technique in MNEMONIC_TECHNIQUES),
+            return_exceptions=True,
+        )
+
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+        mnemonics: Dict[str, Any] = {}
+        models = []
+        usage = {field: 0 for field in CACHE_USAGE_FIELDS}
+        for technique, (content, model, message) in zip(MNEMONIC_TECHNIQUES, results):
+            mnemonics[technique] = content
+            if model not in models:
+                models.append(model)
+            for field, value in get_cache_usage(message).items():
+                usage[field] += value
+
+        return mnemonics, ", ".join(models), usage
+
     async def generate_mnemonics(
         self,
         list_items: List[str],
@@ -338,6 +586,10 @@ IMPORTANT: Only return the JSON object, no additional text."""
         """
         Generate three mnemonic techniques for a list of items.
 
+        With MNEMONIC_PARALLEL_GENERATION enabled the techniques are generated
+        by three concurrent calls instead of one combined response. Concurrent
+        calls for the same user and list share a single generation.
+
         Args:
             list_items: List of items to create mnemonics for
             user_id: User ID for logging
@@ -362,22 +614,36 @@ IMPORTANT: Only return the JSON object, no additional text."""
         if len(list_items) > 50:
             raise ValueError("List cannot contain more than 50 items")
 
+        # A double-click or client retry joins the identical generation already running
+        key = make_key("mnemonic", user_id, [normalize_text(item) for item in list_items])
+        return await self.in_flight.run(key, lambda: self._generate_mnemonics(list_items, user_id, deck_id))
+
+    async def _generate_mnemonics(
+        self,
+        list_items: List[str],
+        user_id: str,
+        deck_id: str = None,
+    ) -> Dict[str, Any]:
+        """Run mnemonic generation for a validated list (see generate_mnemonics)."""
         # Detect language from the list items
         combined_text = " ".join(list_items)
-        detected_language = self._detect_language(combined_text)
+        detected_language = detect_language(combined_text)
 
-        # Build prompt with detected language
+        # Static instructions go in the system prompt, the list in the user message
+        system_prompt = self._build_mnemonic_system_prompt(language=detected_language)
         prompt = self._build_mnemonic_prompt(list_items, language=detected_language)
 
         # Track generation time
         start_time = time.time()
 
-        try:
-            # Call Claude API
-            message = self.client.messages.create(
-                model=self.model,
+        async def attempt(model: str, call) -> Tuple[Dict[str, Any], Any]:
+            # Off the event loop, so an identical request can join this one meanwhile
+            message = await asyncio.to_thread(
+                self.client.messages.create,
+                model=model,
                 max_tokens=self.max_tokens,
                 temperature=1.0,  # Higher temperature for more creative mnemonics
+                system=system_prompt,
                 messages=[
                     {
                         "role": "user",
@@ -386,44 +652,32 @@ IMPORTANT: Only return the JSON object, no additional text."""
                 ],
                 timeout=self.timeout,
             )
-
-            # Calculate generation time
-            generation_time_ms = int((time.time() - start_time) * 1000)
-
-            # Extract response content
-            response_text = message.content[0].text
+            call.add_usage(message)
 
             # Parse JSON response
+            # Claude might wrap it in markdown code blocks or add prose around it
             try:
-                # Try to find JSON in the response
-                # Claude might wrap it in markdown code blocks
-                if "```json" in response_text:
-                    json_start = response_text.find("```json") + 7
-                    json_end = response_text.find("```", json_start)
-                    response_text = response_text[json_start:json_end].strip()
-                elif "```" in response_text:
-                    json_start = response_text.find("```") + 3
-                    json_end = response_text.find("```", json_start)
-                    response_text = response_text[json_start:json_end].strip()
-
-                mnemonics = json.loads(response_text)
+                mnemonics = extract_json(message.content[0].text)
             except json.JSONDecodeError as e:
-                raise Exception(f"Failed to parse Claude response as JSON: {str(e)}")
+                raise ResponseFormatError(f"Failed to parse Claude response as JSON: {str(e)}")
 
             # Validate response structure
-            required_keys = ["acrostic", "story", "visual"]
-            for key in required_keys:
-                if key not in mnemonics:
-                    raise Exception(f"Missing '{key}' in Claude response")
+            self._validate_mnemonics(mnemonics)
+            return mnemonics, message
 
-                technique = mnemonics[key]
-                if not isinstance(technique, dict):
-                    raise Exception(f"'{key}' must be a dictionary")
+        try:
+            if settings.MNEMONIC_PARALLEL_GENERATION:
+                # One focused call per technique, run concurrently
+                mnemonics, model, usage = await self._generate_mnemonics_parallel(
+                    list_items, detected_language, user_id
+                )
+            else:
+                # Call Claude API (falls back to a larger model if the response is unusable)
+                (mnemonics, message), model = await model_router.run("mnemonic", attempt, user_id=user_id)
+                usage = get_cache_usage(message)
 
-                required_fields = ["title", "content", "how_to_use"]
-                for field in required_fields:
-                    if field not in technique:
-                        raise Exception(f"Missing '{field}' in '{key}' technique")
+            # Calculate generation time
+            generation_time_ms = int((time.time() - start_time) * 1000)
 
             # Add metadata
             result = {
@@ -433,9 +687,10 @@ IMPORTANT: Only return the JSON object, no additional text."""
                 "metadata": {
                     "generation_time_ms": generation_time_ms,
                     "item_count": len(list_items),
-                    "model": self.model,
+                    "model": model,
                     "user_id": user_id,
                     "deck_id": deck_id,
+                    **usage,
                 }
             }
 
@@ -0,0 +1,285 @@
+"""
+Deck Cache
+
+Read-through cache of deck rows keyed by deck_id. Nearly every request
+checks deck ownership, and a deck's owner, name, card count and mnemonic
+fields change far less often than they are read.
+
+Entries live in a bounded LRU with a TTL. Every write to decks made by this
+process invalidates the entry. With DECK_CACHE_BACKEND set to "postgres",
+each worker also LISTENs for the notifications sent by the decks trigger
+(migration 014), so writes made by other workers or directly in the
+database invalidate every worker's copy; otherwise other workers' copies
+age out after the TTL. While that LISTEN connection is down the cache is
+bypassed, since its entries would no longer be invalidated.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import asyncpg
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "deck_cache_invalidate"
+
+
+class DeckCache:
+    """
+    Bounded LRU cache of deck rows with a TTL.
+
+    Only found decks are cached; a miss always goes to the database so a
+    newly created deck is visible immediately. Callers get a copy of the
+    cached row.
+
+    A load that was in flight when its deck was invalidated may have read
+    the old row, so its result isn't cached: invalidate() and clear() bump a
+    generation that get_or_load compares before and after loading.
+    Generations are only kept for decks with a load in flight.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: int = 300):
+        """Initialize an empty cache"""
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._loading: Dict[str, int] = {}
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+        # Set while invalidation messages can't be received; lookups go to the database
+        self.bypass = False
+
+    def get(self, deck_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached deck if present and fresh.
+
+        Args:
+            deck_id: The deck's UUID
+
+        Returns:
+            Copy of the deck row, or None on a miss
+        """
+        deck_id = str(deck_id)
+        entry = self._entries.get(deck_id)
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                del self._entries[deck_id]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(deck_id)
+        self.hits += 1
+        return dict(entry[0])
+
+    def set(self, deck_id: str, deck: Dict[str, Any]) -> None:
+        """
+        Cache a deck row, evicting the least recently used entry if full.
+
+        Args:
+            deck_id: The deck's UUID
+            deck: The deck row
+        """
+        deck_id = str(deck_id)
+        self._entries[deck_id] = (dict(deck), time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(deck_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, deck_id: str) -> None:
+        """
+        Drop a deck from the cache (after it was updated or deleted).
+
+        Args:
+            deck_id: The deck's UUID
+        """
+        deck_id = str(deck_id)
+        if deck_id in self._loading:
+            self._generations[deck_id] = self._generations.get(deck_id, 0) + 1
+        if self._entries.pop(deck_id, None) is not None:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        self._entries.clear()
+        self._epoch += 1
+
+    def _generation(self, deck_id: str) -> Tuple[int, int]:
+        """Current (clear, invalidate) generation of a deck with a load in flight."""
+        return self._epoch, self._generations.get(deck_id, 0)
+
+    async def get_or_load(
+        self,
+        deck_id: str,
+        load: Callable[[], Awaitable[Optional[Dict[str, Any]]]],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get a deck from the cache, loading and caching it on a miss.
+
+        Args:
+            deck_id: The deck's UUID
+            load: Coroutine function fetching the deck row (None if missing)
+
+        Returns:
+            Copy of the deck row, or None if the deck doesn't exist
+        """
+        if not settings.DECK_CACHE_ENABLED or self.bypass:
+            return await load()
+
+        deck_id = str(deck_id)
+        deck = self.get(deck_id)
+        if deck is not None:
+            return deck
+
+        self._loading[deck_id] = self._loading.get(deck_id, 0) + 1
+        generation = self._generation(deck_id)
+        try:
+            deck = await load()
+        finally:
+            invalidated = self._generation(deck_id) != generation
+            self._loading[deck_id] -= 1
+            if not self._loading[deck_id]:
+                del self._loading[deck_id]
+                self._generations.pop(deck_id, None)
+
+        # Don't write back a row read before an invalidation
+        if deck and not invalidated:
+            self.set(deck_id, deck)
+        return deck
+
+    def hit_rate(self) -> float:
+        """Share of lookups served from the cache (0.0 before any lookup)."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and current size."""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate(), 4),
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def render_metrics(self) -> str:
+        """
+        Render the cache counters in Prometheus text format.
+
+        Returns:
+            Metrics text
+        """
+        return "\n".join([
+            "# HELP brainkit_deck_cache_lookups_total Deck cache lookups by result",
+            "# TYPE brainkit_deck_cache_lookups_total counter",
+            f'brainkit_deck_cache_lookups_total{{result="hit"}} {self.hits}',
+            f'brainkit_deck_cache_lookups_total{{result="miss"}} {self.misses}',
+            "# HELP brainkit_deck_cache_evictions_total Entries evicted by the LRU bound",
+            "# TYPE brainkit_deck_cache_evictions_total counter",
+            f"brainkit_deck_cache_evictions_total {self.evictions}",
+            "# HELP brainkit_deck_cache_invalidations_total Entries dropped after a deck write",
+            "# TYPE brainkit_deck_cache_invalidations_total counter",
+            f"brainkit_deck_cache_invalidations_total {self.invalidations}",
+            "# HELP brainkit_deck_cache_entries Decks currently cached",
+            "# TYPE brainkit_deck_cache_entries gauge",
+            f"brainkit_deck_cache_entries {len(self._entries)}",
+        ]) + "\n"
+
+
+class PostgresDeckInvalidation:
+    """
+    Invalidates a DeckCache from Postgres notifications.
+
+    Holds one dedicated connection that LISTENs on INVALIDATION_CHANNEL.
+    LISTEN needs a session, so DATABASE_URL must be a direct or
+    session-pooler connection. If the connection drops, the cache is
+    cleared and bypassed (notifications may be missed) while reconnecting
+    with exponential backoff; it is used again once LISTEN is back.
+    """
+
+    RECONNECT_DELAYS = (1, 2, 5, 10, 30, 60)  # Seconds; the last one repeats
+
+    def __init__(self, cache: DeckCache, dsn: str):
+        """Initialize the listener for a cache"""
+        self.cache = cache
+        self.dsn = dsn
+        self._connection = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    async def start(self) -> None:
+        """
+        Connect and start listening.
+
+        Raises:
+            Exception: If the connection fails
+        """
+        self._stopping = False
+        connection = await asyncpg.connect(self.dsn)
+        connection.add_termination_listener(self._on_terminate)
+        await connection.add_listener(INVALIDATION_CHANNEL, self._on_notify)
+        self._connection = connection
+
+    async def stop(self) -> None:
+        """Stop listening (and reconnecting) and close the connection."""
+        self._stopping = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        if self._connection is not None and not self._connection.is_closed():
+            await self._connection.close()
+        self._connection = None
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        """Drop the deck named in the notification."""
+        self.cache.invalidate(payload)
+
+    def _on_terminate(self, connection) -> None:
+        """Notifications may be missed from now on; bypass the cache and reconnect."""
+        self._connection = None
+        if self._stopping:
+            return
+
+        self.cache.clear()
+        self.cache.bypass = True
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        """Retry start() with backoff, then resume caching from an empty cache."""
+        attempt = 0
+        while not self._stopping:
+            await asyncio.sleep(self.RECONNECT_DELAYS[min(attempt, len(self.RECONNECT_DELAYS) - 1)])
+            try:
+                await self.start()
+            except Exception as e:
+                attempt += 1
+                logger.warning("deck cache LISTEN reconnect failed (attempt %d): %s", attempt, e)
+                continue
+
+            # Writes made while disconnected were never announced
+            self.cache.clear()
+            self.cache.bypass = False
+            return
+
+
+# Singleton instances
+deck_cache = DeckCache(
+    max_entries=settings.DECK_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.DECK_CACHE_TTL_SECONDS,
+)
+deck_cache_invalidation = (
+    PostgresDeckInvalidation(deck_cache, settings.DATABASE_URL)
+    if settings.DECK_CACHE_BACKEND == "postgres"
+    else None
+)
@@ -11,6 +11,8 @@ from typing import Any, Dict, List, Optional
 from supabase import Client
 
 from app.core.supabase import get_supabase_client
+from app.services.deck_cache import deck_cache
+from app.services.direct_queries import direct_queries
 
 
 class DeckService:
@@ -24,6 +26,8 @@ class DeckService:
     def __init__(self):
         """Initialize the deck service with Supabase client"""
         self.admin_client: Client = get_supabase_client()
+        self.queries = direct_queries
+        self.cache = deck_cache
 
     async def create_deck(
         self,
@@ -74,14 +78,7 @@ class DeckService:
             Exception: If fetching decks fails
         """
         try:
-            response = self.admin_client.table("decks") \
-                .select("*") \
-                .eq("user_id", user_id) \
-                .order("last_studied_at", desc=True, nullsfirst=False) \
-                .order("created_at", desc=True) \
-                .execute()
-
-            return response.data if response.data else []
+            return await self.queries.get_decks_by_user(user_id)
 
         except Exception as e:
             raise Exception(f"Failed to fetch decks: {str(e)}")
@@ -90,6 +87,8 @@ class DeckService:
         """
         Get a specific deck by ID, ensuring it belongs to the user.
 
+        Served from the deck cache when possible.
+
         Args:
             deck_id: The deck's UUID
             user_id: The user's UUID
@@ -97,6 +96,26 @@ class DeckService:
         Returns:
             Deck dictionary if found and owned by user, None otherwise
 
+        Raises:
+            Exception: If fetching deck fails
+        """
+        deck = await self.cache.get_or_load(deck_id, lambda: self._load_deck(deck_id))
+
+        if not deck or deck.get("user_id") != user_id:
+            return None
+
+        return deck
+
+    async def _load_deck(self, deck_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a deck row by ID, whoever owns it.
+
+        Args:
+            deck_id: The deck's UUID
+
+        Returns:
+            Deck dictionary, or None if it doesn't exist
+
         Raises:
             Exception: If fetching deck fails
         """
@@ -104,7 +123,6 @@ class DeckService:
             response = self.admin_client.table("decks") \
                 .select("*") \
                 .eq("id", deck_id) \
-                .eq("user_id", user_id) \
                 .single() \
                 .execute()
 
@@ -156,6 +174,8 @@ class DeckService:
                 .eq("user_id", user_id) \
                 .execute()
 
+            self.cache.invalidate(deck_id)
+
             if not response.data:
                 return None
 
@@ -185,6 +205,8 @@ class DeckService:
                 .eq("user_id", user_id) \
                 .execute()
 
+            self.cache.invalidate(deck_id)
+
             # Delete returns the deleted rows
             return len(response.data) > 0 if response.data else False
 
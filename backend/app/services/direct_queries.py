@@ -0,0 +1,578 @@
+"""
+Direct Queries
+
+Hot-path queries (due cards, reviews, deck listing, stats) that run
+directly against Postgres through the pooled async SQLAlchemy engine
+instead of PostgREST. This saves an HTTP hop and a JSON round trip per
+query. A review's writes (card update, review row, session counter) go out
+in a single transaction.
+
+Rows are returned as the same dictionaries the PostgREST client produced
+(UUIDs and dates as strings), so callers and API schemas are unchanged.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import (
+    Date,
+    String,
+    Text,
+    any_,
+    bindparam,
+    cast,
+    column,
+    delete,
+    func,
+    insert,
+    select,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import async_session_maker
+from app.models import CardReview, CardReviewSummary, Deck, Flashcard, StudySession
+
+# Reviews with at least this quality count as remembered
+RETAINED_QUALITY = 3
+
+# Days of review history scanned to compute the streak
+STREAK_LOOKBACK_DAYS = 366
+
+
+def _uuid(value: Any) -> Optional[UUID]:
+    """Parse a UUID, returning None for malformed IDs (they can't match a row)."""
+    if isinstance(value, UUID):
+        return value
+    try:
+        return UUID(str(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class DirectQueries:
+    """
+    Direct Postgres queries for BrainKit's hot paths
+
+    Provides methods for:
+    - Fetching due cards for a deck or across a user's decks
+    - Loading a card with its owner and recording a review atomically
+    - Applying bulk card edits and deletes and merging generated cards transactionally
+    - Listing a user's decks
+    - Versioning deck and flashcard lists for ETags
+    - Computing study statistics
+    """
+
+    def __init__(self, session_maker: sessionmaker = async_session_maker):
+        """Initialize with a session factory bound to the pooled engine"""
+        self.session_maker = session_maker
+
+    async def get_due_cards(self, deck_id: str, user_id: str, today: date) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get a deck's due flashcards, oldest due date first.
+
+        Args:
+            deck_id: The deck's UUID
+            user_id: The user's UUID (the deck must belong to them)
+            today: Cards due on or before this date are returned
+
+        Returns:
+            List of flashcard dictionaries, or None if the deck isn't the user's
+        """
+        deck_uuid, user_uuid = _uuid(deck_id), _uuid(user_id)
+        if deck_uuid is None or user_uuid is None:
+            return None
+
+        async with self.session_maker() as session:
+            result = await session.execute(
+                select(Flashcard)
+                .where(
+                    Flashcard.deck_id == deck_uuid,
+                    Flashcard.user_id == user_uuid,
+                    Flashcard.next_review_date <= today,
+                )
+                .order_by(Flashcard.next_review_date)
+            )
+            due_cards = [card.to_dict() for card in result.scalars().all()]
+            if due_cards:
+                return due_cards
+
+            # Nothing due: tell an empty deck apart from one the user doesn't own
+            owned = await session.execute(
+                select(Deck.id).where(Deck.id == deck_uuid, Deck.user_id == user_uuid)
+            )
+            return [] if owned.scalar_one_or_none() is not None else None
+
+    async def get_due_cards_for_user(
+        self,
+        user_id: str,
+        today: date,
+        deck_ids: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Get due flashcards across a user's decks in one index scan.
+
+        Args:
+            user_id: The user's UUID
+            today: Cards due on or before this date are returned
+            deck_ids: Optional list of deck UUIDs to restrict the queue to
+
+        Returns:
+            List of flashcard dictionaries, oldest due date first
+        """
+        user_uuid = _uuid(user_id)
+        if user_uuid is None:
+            return []
+
+        query = (
+            select(Flashcard)
+            .where(Flashcard.user_id == user_uuid, Flashcard.next_review_date <= today)
+            .order_by(Flashcard.next_review_date)
+        )
+        if deck_ids:
+            deck_uuids = [deck_uuid for deck_uuid in map(_uuid, deck_ids) if deck_uuid is not None]
+            query = query.where(Flashcard.deck_id.in_(deck_uuids))
+
+        async with self.session_maker() as session:
+            result = await session.execute(query)
+            return [card.to_dict() for card in result.scalars().all()]
+
+    async def get_due_histogram(self, user_id: str, today: date) -> Dict[date, int]:
+        """
+        Count a user's scheduled reviews per day from today onwards.
+
+        Aggregated in the database, so only one row per day is transferred.
+
+        Args:
+            user_id: The user's UUID
+            today: First date to include
+
+        Returns:
+            Mapping of due date -> number of cards due that day
+        """
+        user_uuid = _uuid(user_id)
+        if user_uuid is None:
+            return {}
+
+        async with self.session_maker() as session:
+            result = await session.execute(
+                select(Flashcard.next_review_date, func.count())
+                .where(Flashcard.user_id == user_uuid, Flashcard.next_review_date >= today)
+                .group_by(Flashcard.next_review_date)
+            )
+            return {due_date: count for due_date, count in result.all()}
+
+    async def get_flashcard_with_owner(self, flashcard_id: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        """
+        Get a flashcard together with the user that owns its deck.
+
+        Args:
+            flashcard_id: The flashcard's UUID
+
+        Returns:
+            Tuple of (flashcard dictionary, owner user ID), or None if not found
+        """
+        flashcard_uuid = _uuid(flashcard_id)
+        if flashcard_uuid is None:
+            return None
+
+        async with self.session_maker() as session:
+            result = await session.execute(select(Flashcard).where(Flashcard.id == flashcard_uuid))
+            card = result.scalars().first()
+            if card is None:
+                return None
+            return card.to_dict(), str(card.user_id)
+
+    async def record_review(
+        self,
+        flashcard_id: str,
+        user_id: str,
+        session_id: Optional[str],
+        srs_update: Dict[str, Any],
+        review: Dict[str, Any],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Apply a review in one transaction.
+
+        Updates the card's SRS fields, inserts the card_reviews row and
+        increments the session's cards_reviewed in place (no read-modify-write).
+
+        Args:
+            flashcard_id: The flashcard's UUID
+            user_id: The reviewing user's UUID
+            session_id: Optional study session UUID
+            srs_update: New ease_factor, interval_days, repetitions, next_review_date
+            review: quality, response_time_ms and previous/new interval and ease factor
+
+        Returns:
+            The updated flashcard dictionary, or None if the user no longer owns the card
+        """
+        flashcard_uuid = _uuid(flashcard_id)
+        session_uuid = _uuid(session_id) if session_id else None
+
+        async with self.session_maker() as session:
+            async with session.begin():
+                result = await session.execute(
+                    update(Flashcard)
+                    .where(Flashcard.id == flashcard_uuid, Flashcard.user_id == _uuid(user_id))
+                    .values(**srs_update, last_reviewed_at=datetime.now(timezone.utc))
+                    .returning(Flashcard)
+                )
+                updated = result.scalars().first()
+                if updated is None:
+                    return None
+
+                await session.execute(
+                    insert(CardReview).values(
+                        session_id=session_uuid,
+                        flashcard_id=flashcard_uuid,
+                        user_id=_uuid(user_id),
+                        **review,
+                    )
+                )
+
+                if session_uuid is not None:
+                    await session.execute(
+                        update(StudySession)
+                        .where(StudySession.id == session_uuid)
+                        .values(cards_reviewed=StudySession.cards_reviewed + 1)
+                    )
+
+                return updated.to_dict()
+
+    async def update_flashcards(
+        self,
+        user_id: str,
+        edits: Dict[str, Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Apply content edits to many of a user's flashcards in one statement.
+
+        The edits are joined in as a VALUES list, with COALESCE keeping the
+        fields an edit doesn't change. Filtering on user_id means cards that
+        are missing or belong to someone else are simply not updated (never
+        recreated). Edited cards are flagged is_edited.
+
+        Args:
+            user_id: The user's UUID
+            edits: Changed fields (front, back, difficulty) keyed by flashcard ID
+
+        Returns:
+            List of updated flashcard dictionaries
+        """
+        user_uuid = _uuid(user_id)
+        rows = [
+            (card_uuid, fields.get("front"), fields.get("back"), fields.get("difficulty"))
+            for card_uuid, fields in ((_uuid(card_id), fields) for card_id, fields in edits.items())
+            if card_uuid is not None and fields
+        ]
+        if user_uuid is None or not rows:
+            return []
+
+        edit_values = values(
+            column("id", Flashcard.id.type),
+            column("front", Text),
+            column("back", Text),
+            column("difficulty", String),
+            name="edits",
+        ).data(rows)
+
+        async with self.session_maker() as session:
+            async with session.begin():
+                result = await session.execute(
+                    update(Flashcard)
+                    .where(Flashcard.id == edit_values.c.id, Flashcard.user_id == user_uuid)
+                    .values(
+                        front=func.coalesce(edit_values.c.front, Flashcard.front),
+                        back=func.coalesce(edit_values.c.back, Flashcard.back),
+                        difficulty=func.coalesce(edit_values.c.difficulty, Flashcard.difficulty),
+                        is_edited=True,
+                    )
+                    .returning(Flashcard)
+                    .execution_options(synchronize_session=False)
+                )
+                return [card.to_dict() for card in result.scalars().all()]
+
+    async def delete_flashcards(self, user_id: str, flashcard_ids: List[str]) -> List[Dict[str, str]]:
+        """
+        Delete many of a user's flashcards and recount their decks in one transaction.
+
+        Cards that are missing or belong to someone else are not matched by
+        the DELETE. Each affected deck's card_count is recomputed once.
+
+        Args:
+            user_id: The user's UUID
+            flashcard_ids: Flashcard UUIDs to delete
+
+        Returns:
+            List of dicts with the id and deck_id of each deleted card
+        """
+        user_uuid = _uuid(user_id)
+        card_uuids = [card_uuid for card_uuid in map(_uuid, flashcard_ids) if card_uuid is not None]
+        if user_uuid is None or not card_uuids:
+            return []
+
+        async with self.session_maker() as session:
+            async with session.begin():
+                result = await session.execute(
+                    delete(Flashcard)
+                    .where(
+                        # One array parameter rather than one bind per ID
+                        Flashcard.id == any_(bindparam("ids", card_uuids, type_=ARRAY(Flashcard.id.type))),
+                        Flashcard.user_id == user_uuid,
+                    )
+                    .returning(Flashcard.id, Flashcard.deck_id)
+                )
+                deleted = [{"id": str(card_id), "deck_id": str(deck_id)} for card_id, deck_id in result.all()]
+
+                deck_ids = {_uuid(card["deck_id"]) for card in deleted}
+                if deck_ids:
+                    await session.execute(
+                        update(Deck)
+                        .where(Deck.id.in_(deck_ids))
+                        .values(
+                            card_count=select(func.count())
+                            .where(Flashcard.deck_id == Deck.id)
+                            .scalar_subquery()
+                        )
+                    )
+
+                return deleted
+
+    async def save_generated_flashcards(
+        self,
+        decks: List[Dict[str, Any]],
+        key: Callable[[str], str],
+        replace_existing: bool = False,
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Merge newly generated cards into decks in one transaction.
+
+        Cards whose key (normalized front) is already in the deck are not
+        inserted again, so existing cards keep their SRS state and review
+        history. With replace_existing, cards the new set no longer contains
+        are also deleted (with their reviews), except ones the user edited.
+        Each deck's card_count is recomputed in the same transaction.
+
+        Args:
+            decks: Dicts with deck_id, user_id and cards (front, back, difficulty)
+            key: Function normalizing a front for duplicate detection
+            replace_existing: Whether to delete cards missing from the new set
+
+        Returns:
+            Mapping of deck_id -> {"added": n, "removed": n}
+        """
+        deck_uuids = [_uuid(deck["deck_id"]) for deck in decks]
+        if not decks or None in deck_uuids:
+            return {}
+
+        async with self.session_maker() as session:
+            async with session.begin():
+                result = await session.execute(
+                    select(Flashcard.id, Flashcard.deck_id, Flashcard.front, Flashcard.is_edited)
+                    .where(Flashcard.deck_id.in_(deck_uuids))
+                    .with_for_update()
+                )
+                existing = {}
+                for card_id, deck_id, front, is_edited in result.all():
+                    existing.setdefault(str(deck_id), []).append((card_id, key(front), is_edited))
+
+                rows, stale_ids, summary = [], [], {}
+                for deck in decks:
+                    current = existing.get(deck["deck_id"], [])
+                    current_keys = {card_key for _, card_key, _ in current}
+                    new_cards = [card for card in deck["cards"] if key(card["front"]) not in current_keys]
+                    rows.extend(
+                        {
+                            "deck_id": _uuid(deck["deck_id"]),
+                            "user_id": _uuid(deck["user_id"]),
+                            "front": card["front"],
+                            "back": card["back"],
+                            "difficulty": card.get("difficulty", "medium"),
+                        }
+                        for card in new_cards
+                    )
+
+                    removed = []
+                    if replace_existing:
+                        new_keys = {key(card["front"]) for card in deck["cards"]}
+                        removed = [
+                            card_id for card_id, card_key, is_edited in current
+                            if card_key not in new_keys and not is_edited
+                        ]
+                        stale_ids.extend(removed)
+
+                    summary[deck["deck_id"]] = {"added": len(new_cards), "removed": len(removed)}
+
+                if stale_ids:
+                    await session.execute(delete(Flashcard).where(Flashcard.id.in_(stale_ids)))
+                if rows:
+                    await session.execute(insert(Flashcard).values(rows))
+
+                await session.execute(
+                    update(Deck)
+                    .where(Deck.id.in_(deck_uuids))
+                    .values(
+                        card_count=select(func.count())
+                        .where(Flashcard.deck_id == Deck.id)
+                        .scalar_subquery()
+                    )
+                )
+
+                return summary
+
+    async def get_decks_by_user(self, user_id: str) -> List[Dict[str, Any]]:
+        """
+        Get a user's decks, most recently studied first.
+
+        Args:
+            user_id: The user's UUID
+
+        Returns:
+            List of deck dictionaries
+        """
+        user_uuid = _uuid(user_id)
+        if user_uuid is None:
+            return []
+
+        async with self.session_maker() as session:
+            result = await session.execute(
+                select(Deck)
+                .where(Deck.user_id == user_uuid)
+                .order_by(Deck.last_studied_at.desc().nulls_last(), Deck.created_at.desc())
+            )
+            return [deck.to_dict() for deck in result.scalars().all()]
+
+    async def get_decks_version(self, user_id: str) -> Tuple[int, Optional[datetime]]:
+        """
+        Get the row count and newest updated_at of a user's decks.
+
+        Args:
+            user_id: The user's UUID
+
+        Returns:
+            Tuple of (count, newest updated_at or None)
+        """
+        user_uuid = _uuid(user_id)
+        if user_uuid is None:
+            return 0, None
+
+        async with self.session_maker() as session:
+            result = await session.execute(
+                select(func.count(), func.max(Deck.updated_at))
+                .where(Deck.user_id == user_uuid)
+            )
+            count, last_updated = result.one()
+            return count, last_updated
+
+    async def get_deck_flashcards_version(self, deck_id: str, user_id: str) -> Tuple[int, Optional[datetime]]:
+        """
+        Get the row count and newest updated_at of a deck's flashcards.
+
+        A count of 0 means either an empty deck or one the user doesn't own.
+
+        Args:
+            deck_id: The deck's UUID
+            user_id: The user's UUID (for ownership verification)
+
+        Returns:
+            Tuple of (count, newest updated_at or None)
+        """
+        deck_uuid, user_uuid = _uuid(deck_id), _uuid(user_id)
+        if deck_uuid is None or user_uuid is None:
+            return 0, None
+
+        async with self.session_maker() as session:
+            result = await session.execute(
+                select(func.count(), func.max(Flashcard.updated_at))
+                .where(Flashcard.deck_id == deck_uuid, Flashcard.user_id == user_uuid)
+            )
+            count, last_updated = result.one()
+            return count, last_updated
+
+    async def get_stats_overview(self, user_id: str, today: date) -> Dict[str, Any]:
+        """
+        Compute a user's study statistics.
+
+        Totals combine raw reviews with the summaries of compacted months.
+        The streak query is bounded by reviewed_at, so it only touches the
+        partitions of the last year.
+
+        Args:
+            user_id: The user's UUID
+            today: Reference date for the streak and the current month
+
+        Returns:
+            Dict with streak, total_cards_studied, retention_rate,
+            total_study_time_seconds, this_month_cards and
+            this_month_study_time_seconds
+        """
+        user_uuid = _uuid(user_id)
+        month_start = datetime(today.year, today.month, 1, tzinfo=timezone.utc)
+        streak_start = datetime.combine(today - timedelta(days=STREAK_LOOKBACK_DAYS), datetime.min.time(), timezone.utc)
+        review_day = cast(CardReview.reviewed_at, Date)
+
+        async with self.session_maker() as session:
+            reviews = (await session.execute(
+                select(
+                    func.count(),
+                    func.count().filter(CardReview.quality >= RETAINED_QUALITY),
+                    func.count().filter(CardReview.reviewed_at >= month_start),
+                ).where(CardReview.user_id == user_uuid)
+            )).one()
+
+            compacted = (await session.execute(
+                select(
+                    func.coalesce(func.sum(CardReviewSummary.review_count), 0),
+                    func.coalesce(func.sum(CardReviewSummary.retained_count), 0),
+                ).where(CardReviewSummary.user_id == user_uuid)
+            )).one()
+
+            study_time = (await session.execute(
+                select(
+                    func.coalesce(func.sum(StudySession.duration_seconds), 0),
+                    func.coalesce(
+                        func.sum(StudySession.duration_seconds).filter(StudySession.started_at >= month_start),
+                        0,
+                    ),
+                ).where(StudySession.user_id == user_uuid)
+            )).one()
+
+            days = await session.execute(
+                select(review_day)
+                .where(
+                    CardReview.user_id == user_uuid,
+                    CardReview.reviewed_at >= streak_start,
+                )
+                .group_by(review_day)
+            )
+            study_days = set(days.scalars().all())
+
+        total_reviews = reviews[0] + int(compacted[0])
+        retained = reviews[1] + int(compacted[1])
+        this_month_cards = reviews[2]
+        return {
+            "streak": self._streak(study_days, today),
+            "total_cards_studied": total_reviews,
+            "retention_rate": round(100 * retained / total_reviews) if total_reviews else 0,
+            "total_study_time_seconds": int(study_time[0]),
+            "this_month_cards": this_month_cards,
+            "this_month_study_time_seconds": int(study_time[1]),
+        }
+
+    @staticmethod
+    def _streak(study_days: set, today: date) -> int:
+        """Count consecutive study days ending today (or yesterday, if not studied yet today)."""
+        day = today if today in study_days else today - timedelta(days=1)
+        streak = 0
+        while day in study_days:
+            streak += 1
+            day -= timedelta(days=1)
+        return streak
+
+
+# Singleton instance
+direct_queries = DirectQueries()
@@ -0,0 +1,157 @@
+"""
+Due Date Load Balancer
+
+Spreads SRS review dates across a small window around the SM-2 target so
+cards learned on the same day don't keep coming due on the same day.
+Uses per-user histograms of already-scheduled reviews (date -> card count)
+kept in memory, so picking a date never queries per card.
+"""
+
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Dict, Optional, Tuple
+
+
+def get_fuzz_range(interval: int) -> Tuple[int, int]:
+    """
+    Get the allowed interval window for a target interval.
+
+    Short intervals are left untouched; longer ones get a window that
+    grows with the interval (roughly ±15% for weeks, ±5% for months).
+
+    Args:
+        interval: Target interval in days from SM-2
+
+    Returns:
+        Tuple of (min_interval, max_interval), both inclusive
+    """
+    if interval < 3:
+        return interval, interval
+
+    if interval < 7:
+        fuzz = 1
+    elif interval < 30:
+        fuzz = max(2, round(interval * 0.15))
+    else:
+        fuzz = max(4, round(interval * 0.05))
+
+    return max(2, interval - fuzz), interval + fuzz
+
+
+def pick_balanced_interval(
+    interval: int,
+    histogram: Dict[date, int],
+    today: date,
+) -> int:
+    """
+    Pick the interval inside the fuzz window with the fewest scheduled reviews.
+
+    Ties are broken by distance to the target interval (closest wins),
+    then by the earlier date, so the result is deterministic.
+
+    Args:
+        interval: Target interval in days from SM-2
+        histogram: Mapping of due date -> number of cards already due that day
+        today: Reference date the interval is counted from
+
+    Returns:
+        The chosen interval in days
+    """
+    min_interval, max_interval = get_fuzz_range(interval)
+
+    return min(
+        range(min_interval, max_interval + 1),
+        key=lambda days: (
+            histogram.get(today + timedelta(days=days), 0),
+            abs(days - interval),
+            days,
+        ),
+    )
+
+
+class DueHistogramIndex:
+    """
+    In-memory index of per-user due date histograms.
+
+    Each histogram is loaded once (one query per user) and then kept in
+    sync incrementally as cards are rescheduled. Entries expire after
+    `ttl_seconds` so changes made outside the review flow (new cards,
+    deleted decks, other workers) are eventually picked up.
+
+    Entries are kept in load order, so expired ones are swept from the
+    front on every set(), and at most `max_entries` users are held.
+    """
+
+    def __init__(self, ttl_seconds: int = 3600, max_entries: int = 10000):
+        """Initialize an empty index"""
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Dict[date, int], float]]" = OrderedDict()
+
+    def get(self, user_id: str) -> Optional[Dict[date, int]]:
+        """
+        Get a user's histogram if it is loaded and still fresh.
+
+        Args:
+            user_id: The user's UUID
+
+        Returns:
+            The histogram, or None if missing or expired
+        """
+        entry = self._entries.get(user_id)
+        if entry is None or time.monotonic() - entry[1] > self.ttl_seconds:
+            return None
+        return entry[0]
+
+    def set(self, user_id: str, histogram: Dict[date, int]) -> None:
+        """
+        Store a freshly loaded histogram for a user.
+
+        Expired entries are dropped, then the oldest ones past max_entries.
+
+        Args:
+            user_id: The user's UUID
+            histogram: Mapping of due date -> card count
+        """
+        now = time.monotonic()
+        self._entries.pop(user_id, None)
+        self._entries[user_id] = (histogram, now)
+
+        while self._entries:
+            oldest_user, (_, loaded_at) = next(iter(self._entries.items()))
+            if now - loaded_at <= self.ttl_seconds and len(self._entries) <= self.max_entries:
+                break
+            del self._entries[oldest_user]
+
+    def move(self, user_id: str, old_date: Optional[date], new_date: date) -> None:
+        """
+        Record that one card moved from `old_date` to `new_date`.
+
+        Does nothing if the user's histogram isn't loaded.
+
+        Args:
+            user_id: The user's UUID
+            old_date: Previous due date of the card (None if unknown)
+            new_date: New due date of the card
+        """
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return
+        histogram = entry[0]
+
+        if old_date is not None and histogram.get(old_date, 0) > 0:
+            histogram[old_date] -= 1
+            if histogram[old_date] == 0:
+                del histogram[old_date]
+
+        histogram[new_date] = histogram.get(new_date, 0) + 1
+
+    def invalidate(self, user_id: str) -> None:
+        """
+        Drop a user's histogram so it is reloaded on next use.
+
+        Args:
+            user_id: The user's UUID
+        """
+        self._entries.pop(user_id, None)
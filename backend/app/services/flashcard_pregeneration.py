@@ -0,0 +1,159 @@
+"""
+Flashcard Pre-generation
+
+Speculatively generates flashcards for all three mnemonic options
+(acrostic, story, visual) in the background while the user is still
+reading them. Results are cached per generation_id; once the user selects
+a mnemonic, generate_flashcards picks up the matching result instead of
+starting a new Claude call. Options that are never selected are evicted
+after a TTL.
+
+The cache lives in process memory, so a selection handled by another
+worker simply falls back to normal generation.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+GenerateFn = Callable[[str, str, str], Awaitable[List[Dict[str, Any]]]]
+
+
+class FlashcardPregenerationCache:
+    """
+    In-memory cache of background flashcard generations.
+
+    Entries are keyed by generation_id and hold one asyncio.Task per
+    mnemonic type. select_mnemonic links a deck to one of the tasks with
+    assign(); generate_flashcards claims it with take().
+    """
+
+    def __init__(self, ttl_seconds: int = 1800):
+        """Initialize an empty cache"""
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._deck_assignments: Dict[str, Tuple[str, str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def start(
+        self,
+        generation_id: str,
+        list_items: str,
+        mnemonics: Dict[str, str],
+        generate: GenerateFn,
+    ) -> None:
+        """
+        Start background flashcard generation for every mnemonic option.
+
+        Args:
+            generation_id: ID of the mnemonic generation record
+            list_items: The original list, one item per line
+            mnemonics: Mapping of mnemonic type -> mnemonic content
+            generate: Coroutine function (list_items, mnemonic_type, mnemonic_content)
+                returning generated flashcard dictionaries
+        """
+        self.evict_expired()
+
+        tasks = {
+            mnemonic_type: asyncio.create_task(generate(list_items, mnemonic_type, content))
+            for mnemonic_type, content in mnemonics.items()
+        }
+        for task in tasks.values():
+            # Failures are handled when the result is claimed; don't log them as unretrieved
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+        self._entries[generation_id] = {
+            "created_at": time.monotonic(),
+            "list_items": list_items,
+            "mnemonics": mnemonics,
+            "tasks": tasks,
+        }
+
+    def assign(self, deck_id: str, generation_id: str, mnemonic_type: str) -> None:
+        """
+        Link a deck to the pre-generated flashcards of its selected mnemonic.
+
+        Does nothing if the generation isn't cached.
+
+        Args:
+            deck_id: Deck the mnemonic was saved to
+            generation_id: ID of the mnemonic generation record
+            mnemonic_type: Selected type ('acrostic', 'story' or 'visual')
+        """
+        if generation_id in self._entries:
+            self._deck_assignments[deck_id] = (generation_id, mnemonic_type)
+
+    def take(
+        self,
+        deck_id: str,
+        list_items: str,
+        mnemonic_type: str,
+        mnemonic_content: str,
+    ) -> Optional[asyncio.Task]:
+        """
+        Claim the pre-generated flashcards for a deck.
+
+        The task is only returned if the deck still has the same list and
+        mnemonic the flashcards were generated from. A claimed task is
+        removed from the cache so it is used at most once.
+
+        Args:
+            deck_id: The deck's UUID
+            list_items: The deck's current list
+            mnemonic_type: The deck's selected mnemonic type
+            mnemonic_content: The deck's selected mnemonic content
+
+        Returns:
+            The generation task (possibly still running), or None on a miss
+        """
+        self.evict_expired()
+
+        assignment = self._deck_assignments.pop(deck_id, None)
+        entry = self._entries.get(assignment[0]) if assignment else None
+
+        if (
+            entry is None
+            or assignment[1] != mnemonic_type
+            or entry["list_items"] != list_items
+            or entry["mnemonics"].get(mnemonic_type) != mnemonic_content
+            or mnemonic_type not in entry["tasks"]
+        ):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry["tasks"].pop(mnemonic_type)
+
+    def evict_expired(self) -> int:
+        """
+        Drop entries older than the TTL, cancelling any still-running tasks.
+
+        Returns:
+            Number of entries evicted
+        """
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired = [
+            generation_id
+            for generation_id, entry in self._entries.items()
+            if entry["created_at"] < cutoff
+        ]
+
+        for generation_id in expired:
+            for task in self._entries.pop(generation_id)["tasks"].values():
+                task.cancel()
+
+        if expired:
+            self._deck_assignments = {
+                deck_id: assignment
+                for deck_id, assignment in self._deck_assignments.items()
+                if assignment[0] in self._entries
+            }
+
+        return len(expired)
+
+
+# Singleton instance
+flashcard_pregeneration = FlashcardPregenerationCache(ttl_seconds=settings.FLASHCARD_PREGENERATION_TTL_SECONDS)
@@ -6,14 +6,103 @@ This service manages CRUD operations and integrates with Anthropic's Claude
 for intelligent flashcard generation based on mnemonics.
 """
 
+import asyncio
 import json
-from typing import Any, Dict, List, Optional
+import logging
+import math
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from uuid import UUID
 
-from anthropic import Anthropic
+from anthropic import Anthropic, AsyncAnthropic
 from supabase import Client
 
 from app.core.config import settings
+from app.core.language import detect_language, language_instruction
+from app.core.llm_json import JSONArrayStream, ResponseFormatError, extract_json
 from app.core.supabase import get_supabase_client
+from app.services.deck_cache import deck_cache
+from app.services.deck_service import deck_service
+from app.services.direct_queries import direct_queries
+from app.services.flashcard_pregeneration import flashcard_pregeneration
+from app.services.llm_usage_service import llm_usage_service
+from app.services.model_router import model_router
+
+logger = logging.getLogger(__name__)
+
+
+FLASHCARD_SYSTEM_PROMPT_ES = """Eres un experto en crear flashcards para memorización profesional.
+
+El usuario te dará la lista que necesita memorizar y la técnica mnemotécnica que eligió para ayudar a recordarla.
+
+Crea flashcards de alta calidad (la cantidad se indica en el mensaje) para ayudarles a:
+1. Memorizar cada elemento individual
+2. Recordar el orden/secuencia correcta
+3. Recordar la técnica mnemotécnica en sí
+4. Hacer asociaciones entre elementos
+
+Tipos de flashcards a incluir:
+- Recordatorio directo: "¿Qué es [elemento X]?" o "¿Qué representa [letra/posición]?"
+- Secuencia: "¿Qué viene después de [elemento]?" o "¿Cuál es el [N-ésimo] elemento?"
+- Recordatorio mnemotécnico: "En el mnemotécnico '[frase]', ¿qué te ayuda a recordar [parte]?"
+- Asociación: "¿Qué elemento está asociado con [elemento visual/de la historia]?"
+- Inverso: "¿Qué letra/número representa [elemento]?"
+
+Requisitos:
+- Las preguntas deben ser claras y sin ambigüedades
+- Las respuestas deben ser concisas pero completas
+- Incluye el contexto mnemotécnico en las respuestas cuando sea útil
+- Varía la dificultad de las preguntas (fácil, medio, difícil)
+- Cubre TODOS los elementos indicados
+- Sin preguntas duplicadas
+- TODO debe estar en ESPAÑOL
+
+Devuelve solo en formato JSON, sin otro texto:
+{
+  "flashcards": [
+    {
+      "front": "Texto de la pregunta",
+      "back": "Texto de la respuesta",
+      "difficulty": "easy|medium|hard"
+    }
+  ]
+}"""
+
+FLASHCARD_SYSTEM_PROMPT_EN = """You are an expert flashcard creator for professional memorization.
+
+The user will give you the list they need to memorize and the mnemonic technique they have chosen to help remember it.
+
+Create high-quality flashcards (the number is given in the message) to help them:
+1. Memorize each individual item
+2. Remember the correct order/sequence
+3. Recall the mnemonic technique itself
+4. Make associations between items
+
+Flashcard types to include:
+- Direct recall: "What is [item X]?" or "What does [letter/position] represent?"
+- Sequence: "What comes after [item]?" or "What is the [Nth] item?"
+- Mnemonic recall: "In the mnemonic '[phrase]', what does [part] help you remember?"
+- Association: "Which item is associated with [visual/story element]?"
+- Reverse: "Which letter/number represents [item]?"
+
+Requirements:
+- Questions should be clear and unambiguous
+- Answers should be concise but complete
+- Include the mnemonic context in answers when helpful
+- Vary question difficulty (easy, medium, challenging)
+- Cover ALL requested items
+- No duplicate questions
+
+Output in JSON format only, no other text:
+{
+  "flashcards": [
+    {
+      "front": "Question text",
+      "back": "Answer text",
+      "difficulty": "easy|medium|hard"
+    }
+  ]
+}"""
 
 
 class FlashcardService:
@@ -26,39 +115,54 @@ class FlashcardService:
     - Updating SRS metadata
     """
 
+    # Lists longer than this are split into groups generated in parallel
+    SINGLE_CALL_MAX_ITEMS = 12
+    GROUP_SIZE = 10
+    MAX_CONCURRENT_CALLS = 4
+
+    # Streamed cards are inserted in micro-batches of this size
+    STREAM_BATCH_SIZE = 5
+
     def __init__(self):
         """Initialize the flashcard service with Supabase and Claude clients"""
         self.admin_client: Client = get_supabase_client()
+        self.queries = direct_queries
         self.claude_client: Optional[Anthropic] = None
+        self.async_claude_client: Optional[AsyncAnthropic] = None
 
-        # Initialize Claude client if API key is available
+        # Initialize Claude clients if API key is available
         if settings.CLAUDE_API_KEY:
-            self.claude_client = Anthropic(api_key=settings.CLAUDE_API_KEY)
+            self.claude_client = Anthropic(api_key=settings.CLAUDE_API_KEY, base_url=settings.ANTHROPIC_API_URL)
+            self.async_claude_client = AsyncAnthropic(api_key=settings.CLAUDE_API_KEY, base_url=settings.ANTHROPIC_API_URL)
 
-    def _detect_language(self, text: str) -> str:
+    async def get_deck_for_generation(
+        self,
+        deck_id: str,
+        user_id: str,
+    ) -> Dict[str, Any]:
         """
-        Detect the language of the input text.
+        Fetch a deck and check it is ready for flashcard generation.
 
         Args:
-            text: Text to detect language from
+            deck_id: The deck's UUID
+            user_id: The user's UUID (for ownership verification)
 
         Returns:
-            Language code ('es' for Spanish, 'en' for English)
-        """
-        spanish_indicators = ['el', 'la', 'los', 'las', 'un', 'una', 'de', 'del', 'y', 'o', 'que', 'en', 'es', 'por', 'para', 'con', 'su', 'al', 'lo', 'como', 'más', 'pero']
-        english_indicators = ['the', 'be', 'to', 'of', 'and', 'a', 'in', 'that', 'have', 'it', 'for', 'not', 'on', 'with', 'he', 'as', 'you', 'do', 'at']
+            Deck dictionary
 
-        text_lower = text.lower()
-        words = text_lower.split()
+        Raises:
+            Exception: If the deck is missing or has no list/selected mnemonic
+        """
+        deck = await deck_service.get_deck_by_id(deck_id, user_id)
 
-        spanish_count = sum(1 for word in words if word in spanish_indicators)
-        english_count = sum(1 for word in words if word in english_indicators)
+        if not deck:
+            raise Exception("Deck not found")
 
-        # Check for Spanish-specific characters
-        if any(char in text for char in ['á', 'é', 'í', 'ó', 'ú', 'ñ', 'Á', 'É', 'Í', 'Ó', 'Ú', 'Ñ', '¿', '¡']):
-            spanish_count += 5
+        # Validate that deck has mnemonic info
+        if not deck.get("original_list") or not deck.get("selected_mnemonic_content"):
+            raise Exception("Deck must have a list and selected mnemonic before generating flashcards")
 
-        return 'es' if spanish_count > english_count else 'en'
+        return deck
 
     async def generate_flashcards(
         self,
@@ -82,200 +186,426 @@ class FlashcardService:
             raise Exception("Claude API key not configured")
 
         try:
-            # Fetch the deck to get mnemonic info
-            deck_response = self.admin_client.table("decks") \
-                .select("*") \
-                .eq("id", deck_id) \
-                .eq("user_id", user_id) \
-                .single() \
-                .execute()
-
-            if not deck_response.data:
-                raise Exception("Deck not found")
-
-            deck = deck_response.data
-
-            # Validate that deck has mnemonic info
-            if not deck.get("original_list") or not deck.get("selected_mnemonic_content"):
-                raise Exception("Deck must have a list and selected mnemonic before generating flashcards")
+            deck = await self.get_deck_for_generation(deck_id, user_id)
 
-            # Generate flashcards using Claude
-            flashcards_data = await self._call_claude_api(
+            # Use flashcards pre-generated while the user was choosing, if any
+            flashcards_data = None
+            pregenerated = flashcard_pregeneration.take(
+                deck_id=deck_id,
                 list_items=deck["original_list"],
                 mnemonic_type=deck.get("selected_mnemonic_type", "unknown"),
                 mnemonic_content=deck["selected_mnemonic_content"],
             )
+            if pregenerated is not None:
+                try:
+                    flashcards_data = await pregenerated
+                except Exception:
+                    # Fall back to a fresh generation below
+                    flashcards_data = None
 
-            # Insert flashcards into database
-            flashcards_to_insert = [
-                {
-                    "deck_id": deck_id,
-                    "front": card["front"],
-                    "back": card["back"],
-                    "difficulty": card.get("difficulty", "medium"),
-                }
-                for card in flashcards_data
-            ]
-
-            response = self.admin_client.table("flashcards") \
-                .insert(flashcards_to_insert) \
-                .execute()
+            # Generate flashcards using Claude
+            if not flashcards_data:
+                flashcards_data = await self._generate_flashcards_data(
+                    list_items=deck["original_list"],
+                    mnemonic_type=deck.get("selected_mnemonic_type", "unknown"),
+                    mnemonic_content=deck["selected_mnemonic_content"],
+                    user_id=user_id,
+                )
 
-            if not response.data:
-                raise Exception("Failed to save generated flashcards")
+            # Insert flashcards into database
+            flashcards = self._insert_flashcards(deck_id, flashcards_data)
 
             # Update deck card_count
             await self._update_deck_card_count(deck_id)
 
-            return response.data
+            return flashcards
 
         except Exception as e:
             raise Exception(f"Flashcard generation failed: {str(e)}")
 
-    async def _call_claude_api(
+    def _partition_list(self, list_items: str) -> List[List[str]]:
+        """
+        Split a list into evenly sized groups for parallel generation.
+
+        Args:
+            list_items: The original list, one item per line
+
+        Returns:
+            List of item groups; a single group for short lists
+        """
+        items = [line.strip() for line in list_items.splitlines() if line.strip()]
+
+        if len(items) <= self.SINGLE_CALL_MAX_ITEMS:
+            return [items]
+
+        group_count = math.ceil(len(items) / self.GROUP_SIZE)
+        group_size = math.ceil(len(items) / group_count)
+        return [items[i:i + group_size] for i in range(0, len(items), group_size)]
+
+    @staticmethod
+    def _normalize_front(text: str) -> str:
+        """
+        Normalize a question for duplicate detection.
+
+        Lowercases, strips punctuation and collapses whitespace.
+        """
+        return " ".join(re.sub(r"[^\w\s]", "", text.lower()).split())
+
+    def _dedupe_flashcards(self, flashcards: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Drop flashcards whose normalized front was already seen.
+
+        Args:
+            flashcards: Flashcards in generation order
+
+        Returns:
+            Flashcards with duplicates removed, first occurrence kept
+        """
+        seen = set()
+        unique = []
+        for card in flashcards:
+            key = self._normalize_front(card.get("front", ""))
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            unique.append(card)
+        return unique
+
+    async def _generate_flashcards_data(
         self,
         list_items: str,
         mnemonic_type: str,
         mnemonic_content: str,
+        user_id: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """
-        Call Claude API to generate flashcards.
+        Generate flashcards with a number of Claude calls that scales with list size.
+
+        Short lists use a single call. Longer lists are partitioned into groups
+        whose cards are generated concurrently (bounded by MAX_CONCURRENT_CALLS),
+        so wall-clock time stays roughly constant as the list grows. A group
+        that fails is retried once; if it fails again its items are logged as
+        uncovered and the other groups' cards are kept. Results are merged in
+        list order and deduplicated by normalized front.
 
         Args:
             list_items: The original list to memorize
             mnemonic_type: Type of mnemonic (acrostic, story, visual)
             mnemonic_content: The selected mnemonic content
+            user_id: User the calls are recorded against in llm_calls
 
         Returns:
             List of flashcard dictionaries with front, back, difficulty
 
         Raises:
-            Exception: If Claude API call fails
+            Exception: If every group fails to generate
+        """
+        groups = self._partition_list(list_items)
+
+        if len(groups) == 1:
+            flashcards = await self._call_claude_api(
+                list_items=list_items,
+                mnemonic_type=mnemonic_type,
+                mnemonic_content=mnemonic_content,
+                user_id=user_id,
+            )
+            return self._dedupe_flashcards(flashcards)
+
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_CALLS)
+
+        async def generate_group(group: List[str]) -> List[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    return await self._call_claude_api(
+                        list_items=list_items,
+                        mnemonic_type=mnemonic_type,
+                        mnemonic_content=mnemonic_content,
+                        focus_items=group,
+                        user_id=user_id,
+                    )
+                except Exception as e:
+                    logger.warning("flashcard group of %d items failed (%s), retrying", len(group), e)
+                    return await self._call_claude_api(
+                        list_items=list_items,
+                        mnemonic_type=mnemonic_type,
+                        mnemonic_content=mnemonic_content,
+                        focus_items=group,
+                        user_id=user_id,
+                        retries=1,
+                    )
+
+        results = await asyncio.gather(
+            *(generate_group(group) for group in groups),
+            return_exceptions=True,
+        )
+
+        # Keep whatever groups succeeded; only fail if nothing came back
+        flashcards = [card for result in results if not isinstance(result, BaseException) for card in result]
+        if not flashcards:
+            raise next(result for result in results if isinstance(result, BaseException))
+
+        uncovered = [
+            item for group, result in zip(groups, results)
+            if isinstance(result, BaseException) for item in group
+        ]
+        if uncovered:
+            logger.warning(
+                "flashcard generation left %d of %d items without cards: %s",
+                len(uncovered), sum(len(group) for group in groups), uncovered,
+            )
+
+        return self._dedupe_flashcards(flashcards)
+
+    @staticmethod
+    def _count_items(list_items: str) -> int:
+        """Count the non-empty lines of a newline-separated list."""
+        return sum(1 for line in list_items.splitlines() if line.strip())
+
+    def _build_flashcard_prompt(
+        self,
+        list_items: str,
+        mnemonic_type: str,
+        mnemonic_content: str,
+        focus_items: Optional[List[str]] = None,
+    ) -> Tuple[str, str]:
+        """
+        Build the language-specific flashcard generation prompt.
+
+        The instructions only depend on the language and are returned as a
+        separate system prompt so they can be cached; the user message holds
+        the deck-specific list and mnemonic.
+
+        Args:
+            list_items: The original list to memorize
+            mnemonic_type: Type of mnemonic (acrostic, story, visual)
+            mnemonic_content: The selected mnemonic content
+            focus_items: Optional subset of the list to generate cards for
+
+        Returns:
+            Tuple of (system_prompt, user_prompt)
         """
         # Detect language from list items and mnemonic content
         combined_text = f"{list_items} {mnemonic_content}"
-        detected_language = self._detect_language(combined_text)
+        detected_language = detect_language(combined_text)
+
+        # Scale the card count with the group size when generating a subset
+        if focus_items:
+            card_range = f"{len(focus_items) * 2}-{len(focus_items) * 3}"
+            focus_formatted = "\n".join(f"- {item}" for item in focus_items)
+            if detected_language == 'es':
+                focus_section = f"\n\nEn este lote, crea flashcards SOLO para estos elementos (usa el resto de la lista como contexto de orden):\n{focus_formatted}"
+                coverage_scope = "de este lote"
+            else:
+                focus_section = f"\n\nIn this batch, create flashcards ONLY for these items (use the rest of the list for ordering context):\n{focus_formatted}"
+                coverage_scope = "in this batch"
+        else:
+            card_range = "15-20"
+            focus_section = ""
+            coverage_scope = "de la lista" if detected_language == 'es' else "from the list"
 
         # Build language-specific prompt
         if detected_language == 'es':
-            prompt = f"""Eres un experto en crear flashcards para memorización profesional.
-
-El usuario necesita memorizar esta lista:
+            return FLASHCARD_SYSTEM_PROMPT_ES, f"""El usuario necesita memorizar esta lista:
 {list_items}
 
 Han elegido esta técnica mnemotécnica para ayudar a recordarla:
 Tipo: {mnemonic_type}
-Contenido: {mnemonic_content}
-
-Crea 15-20 flashcards de alta calidad para ayudarles a:
-1. Memorizar cada elemento individual
-2. Recordar el orden/secuencia correcta
-3. Recordar la técnica mnemotécnica en sí
-4. Hacer asociaciones entre elementos
+Contenido: {mnemonic_content}{focus_section}
 
-Tipos de flashcards a incluir:
-- Recordatorio directo: "¿Qué es [elemento X]?" o "¿Qué representa [letra/posición]?"
-- Secuencia: "¿Qué viene después de [elemento]?" o "¿Cuál es el [N-ésimo] elemento?"
-- Recordatorio mnemotécnico: "En el mnemotécnico '[frase]', ¿qué te ayuda a recordar [parte]?"
-- Asociación: "¿Qué elemento está asociado con [elemento visual/de la historia]?"
-- Inverso: "¿Qué letra/número representa [elemento]?"
-
-Requisitos:
-- Las preguntas deben ser claras y sin ambigüedades
-- Las respuestas deben ser concisas pero completas
-- Incluye el contexto mnemotécnico en las respuestas cuando sea útil
-- Varía la dificultad de las preguntas (fácil, medio, difícil)
-- Cubre TODOS los elementos de la lista
-- Sin preguntas duplicadas
-- TODO debe estar en ESPAÑOL
-
-Devuelve solo en formato JSON, sin otro texto:
-{{
-  "flashcards": [
-    {{
-      "front": "Texto de la pregunta",
-      "back": "Texto de la respuesta",
-      "difficulty": "easy|medium|hard"
-    }}
-  ]
-}}"""
-        else:  # English
-            prompt = f"""You are an expert flashcard creator for professional memorization.
+Crea {card_range} flashcards que cubran TODOS los elementos {coverage_scope}."""
 
-The user needs to memorize this list:
+        return FLASHCARD_SYSTEM_PROMPT_EN, f"""The user needs to memorize this list:
 {list_items}
 
 They have chosen this mnemonic technique to help remember it:
 Type: {mnemonic_type}
-Content: {mnemonic_content}
+Content: {mnemonic_content}{focus_section}
 
-Create 15-20 high-quality flashcards to help them:
-1. Memorize each individual item
-2. Remember the correct order/sequence
-3. Recall the mnemonic technique itself
-4. Make associations between items
+Create {card_range} flashcards covering ALL items {coverage_scope}.""" + language_instruction(detected_language)
 
-Flashcard types to include:
-- Direct recall: "What is [item X]?" or "What does [letter/position] represent?"
-- Sequence: "What comes after [item]?" or "What is the [Nth] item?"
-- Mnemonic recall: "In the mnemonic '[phrase]', what does [part] help you remember?"
-- Association: "Which item is associated with [visual/story element]?"
-- Reverse: "Which letter/number represents [item]?"
+    async def _call_claude_api(
+        self,
+        list_items: str,
+        mnemonic_type: str,
+        mnemonic_content: str,
+        focus_items: Optional[List[str]] = None,
+        user_id: Optional[str] = None,
+        retries: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """
+        Call Claude API to generate flashcards.
 
-Requirements:
-- Questions should be clear and unambiguous
-- Answers should be concise but complete
-- Include the mnemonic context in answers when helpful
-- Vary question difficulty (easy, medium, challenging)
-- Cover ALL items from the list
-- No duplicate questions
+        Args:
+            list_items: The original list to memorize
+            mnemonic_type: Type of mnemonic (acrostic, story, visual)
+            mnemonic_content: The selected mnemonic content
+            focus_items: Optional subset of the list to generate cards for;
+                the full list is still included for ordering context
+            user_id: User the call is recorded against in llm_calls
+            retries: Earlier failed attempts for the same cards (recorded in llm_calls)
 
-Output in JSON format only, no other text:
-{{
-  "flashcards": [
-    {{
-      "front": "Question text",
-      "back": "Answer text",
-      "difficulty": "easy|medium|hard"
-    }}
-  ]
-}}"""
+        Returns:
+            List of flashcard dictionaries with front, back, difficulty
 
-        try:
-            message = self.claude_client.messages.create(
-                model="claude-sonnet-4-20250514",  # Same model used in claude_service.py
+        Raises:
+            Exception: If Claude API call fails
+        """
+        system_prompt, prompt = self._build_flashcard_prompt(
+            list_items=list_items,
+            mnemonic_type=mnemonic_type,
+            mnemonic_content=mnemonic_content,
+            focus_items=focus_items,
+        )
+
+        async def attempt(model: str, call) -> List[Dict[str, Any]]:
+            # Run the blocking client call in a thread so groups can overlap
+            message = await asyncio.to_thread(
+                self.claude_client.messages.create,
+                model=model,
                 max_tokens=4000,
+                system=system_prompt,
                 messages=[
                     {"role": "user", "content": prompt}
-                ]
+                ],
             )
+            call.add_usage(message)
 
-            # Extract JSON from response
-            response_text = message.content[0].text
-
-            # Handle markdown code blocks (Claude might wrap JSON in ``` markers)
-            if "```json" in response_text:
-                json_start = response_text.find("```json") + 7
-                json_end = response_text.find("```", json_start)
-                response_text = response_text[json_start:json_end].strip()
-            elif "```" in response_text:
-                json_start = response_text.find("```") + 3
-                json_end = response_text.find("```", json_start)
-                response_text = response_text[json_start:json_end].strip()
-
-            # Parse JSON response
-            result = json.loads(response_text)
+            # Parse JSON response (tolerates code fences and truncated output)
+            result = extract_json(message.content[0].text)
 
             if "flashcards" not in result:
-                raise Exception("Invalid response format from Claude API")
+                raise ResponseFormatError("Invalid response format from Claude API")
 
             return result["flashcards"]
 
+        # Small sets go to the faster model; unusable responses fall back to a larger one
+        item_count = len(focus_items) if focus_items else self._count_items(list_items)
+        task = model_router.flashcard_task(item_count)
+
+        try:
+            flashcards, _ = await model_router.run(task, attempt, user_id=user_id, retries=retries)
+            return flashcards
+
         except json.JSONDecodeError as e:
             raise Exception(f"Failed to parse Claude API response: {str(e)}")
         except Exception as e:
             raise Exception(f"Claude API call failed: {str(e)}")
 
+    async def stream_generate_flashcards(
+        self,
+        deck: Dict[str, Any],
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Generate flashcards with a streamed Claude response, saving them as they arrive.
+
+        Each flashcard object is parsed as soon as it is complete in the stream,
+        and cards are inserted in micro-batches of STREAM_BATCH_SIZE, so the
+        first cards are available while the rest are still being generated.
+
+        Args:
+            deck: Deck dictionary from get_deck_for_generation
+
+        Yields:
+            Lists of inserted flashcard dictionaries
+
+        Raises:
+            Exception: If streaming or saving fails
+        """
+        if not self.async_claude_client:
+            raise Exception("Claude API key not configured")
+
+        system_prompt, prompt = self._build_flashcard_prompt(
+            list_items=deck["original_list"],
+            mnemonic_type=deck.get("selected_mnemonic_type", "unknown"),
+            mnemonic_content=deck["selected_mnemonic_content"],
+        )
+
+        # Streamed responses can't be retried on another model once cards are saved
+        model = model_router.model_for(model_router.flashcard_task(self._count_items(deck["original_list"])))
+
+        parser = JSONArrayStream("flashcards")
+        seen_fronts = set()
+        pending: List[Dict[str, Any]] = []
+        inserted_any = False
+
+        try:
+            async with llm_usage_service.track("flashcards_stream", model, deck.get("user_id")) as call:
+                async with self.async_claude_client.messages.stream(
+                    model=model,
+                    max_tokens=4000,
+                    system=system_prompt,
+                    messages=[
+                        {"role": "user", "content": prompt}
+                    ],
+                ) as stream:
+                    async for text in stream.text_stream:
+                        call.mark_first_token()
+                        for card in parser.feed(text):
+                            if not isinstance(card, dict):
+                                continue
+                            key = self._normalize_front(card.get("front", ""))
+                            if not key or key in seen_fronts or not card.get("back"):
+                                continue
+                            seen_fronts.add(key)
+                            pending.append(card)
+
+                            if len(pending) >= self.STREAM_BATCH_SIZE:
+                                # Flag before yielding: the client may disconnect at the yield
+                                inserted = self._insert_flashcards(deck["id"], pending)
+                                inserted_any = True
+                                pending = []
+                                yield inserted
+
+                    call.add_usage(stream.current_message_snapshot)
+
+            if pending:
+                inserted = self._insert_flashcards(deck["id"], pending)
+                inserted_any = True
+                yield inserted
+
+        except Exception as e:
+            raise Exception(f"Flashcard generation failed: {str(e)}")
+
+        finally:
+            # Keep card_count correct even if the client disconnects mid-stream
+            if inserted_any:
+                await self._update_deck_card_count(deck["id"])
+
+    def _insert_flashcards(
+        self,
+        deck_id: str,
+        cards: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Bulk insert generated flashcards into a deck.
+
+        Args:
+            deck_id: The deck's UUID
+            cards: Flashcards with front, back and optional difficulty
+
+        Returns:
+            List of inserted flashcard dictionaries
+
+        Raises:
+            Exception: If the insert returns no data
+        """
+        response = self.admin_client.table("flashcards") \
+            .insert([
+                {
+                    "deck_id": deck_id,
+                    "front": card["front"],
+                    "back": card["back"],
+                    "difficulty": card.get("difficulty", "medium"),
+                }
+                for card in cards
+            ]) \
+            .execute()
+
+        if not response.data:
+            raise Exception("Failed to save generated flashcards")
+
+        return response.data
+
     async def get_flashcards_by_deck(
         self,
         deck_id: str,
@@ -295,25 +625,22 @@ Output in JSON format only, no other text:
             Exception: If fetching fails
         """
         try:
-            # Verify deck ownership
-            deck = self.admin_client.table("decks") \
-                .select("id") \
-                .eq("id", deck_id) \
-                .eq("user_id", user_id) \
-                .single() \
-                .execute()
-
-            if not deck.data:
-                raise Exception("Deck not found or access denied")
-
-            # Fetch flashcards
+            # Fetch flashcards (ownership is a predicate on the card itself)
             response = self.admin_client.table("flashcards") \
                 .select("*") \
                 .eq("deck_id", deck_id) \
+                .eq("user_id", user_id) \
                 .order("created_at", desc=False) \
                 .execute()
 
-            return response.data if response.data else []
+            if response.data:
+                return response.data
+
+            # No cards: tell an empty deck apart from one the user doesn't own
+            if not await deck_service.get_deck_by_id(deck_id, user_id):
+                raise Exception("Deck not found or access denied")
+
+            return []
 
         except Exception as e:
             if "not found" in str(e).lower():
@@ -340,22 +667,13 @@ Output in JSON format only, no other text:
         """
         try:
             response = self.admin_client.table("flashcards") \
-                .select("*, decks!inner(user_id)") \
+                .select("*") \
                 .eq("id", flashcard_id) \
+                .eq("user_id", user_id) \
                 .single() \
                 .execute()
 
-            if not response.data:
-                return None
-
-            # Verify ownership through deck
-            if response.data["decks"]["user_id"] != user_id:
-                return None
-
-            # Remove nested deck info before returning
-            flashcard = response.data.copy()
-            flashcard.pop("decks", None)
-            return flashcard
+            return response.data if response.data else None
 
         except Exception as e:
             if "not found" in str(e).lower() or "0 rows" in str(e).lower():
@@ -387,21 +705,12 @@ Output in JSON format only, no other text:
             Exception: If creation fails
         """
         try:
-            # Verify deck ownership
-            deck = self.admin_client.table("decks") \
-                .select("id") \
-                .eq("id", deck_id) \
-                .eq("user_id", user_id) \
-                .single() \
-                .execute()
-
-            if not deck.data:
-                raise Exception("Deck not found or access denied")
-
-            # Create flashcard
+            # Create flashcard; the flashcards_set_user_id trigger rejects the
+            # insert unless user_id owns the deck
             response = self.admin_client.table("flashcards") \
                 .insert({
                     "deck_id": deck_id,
+                    "user_id": user_id,
                     "front": front,
                     "back": back,
                     "difficulty": difficulty,
@@ -462,15 +771,11 @@ Output in JSON format only, no other text:
             # Mark as edited
             update_data["is_edited"] = True
 
-            # Get flashcard with deck to verify ownership
-            flashcard = await self.get_flashcard_by_id(flashcard_id, user_id)
-            if not flashcard:
-                return None
-
-            # Update flashcard
+            # Update flashcard (no match if the user doesn't own it)
             response = self.admin_client.table("flashcards") \
                 .update(update_data) \
                 .eq("id", flashcard_id) \
+                .eq("user_id", user_id) \
                 .execute()
 
             if not response.data:
@@ -500,30 +805,115 @@ Output in JSON format only, no other text:
             Exception: If deletion fails
         """
         try:
-            # Get flashcard to verify ownership and get deck_id
-            flashcard = await self.get_flashcard_by_id(flashcard_id, user_id)
-            if not flashcard:
-                return False
-
-            deck_id = flashcard["deck_id"]
-
-            # Delete flashcard
+            # Delete flashcard (no match if the user doesn't own it)
             response = self.admin_client.table("flashcards") \
                 .delete() \
                 .eq("id", flashcard_id) \
+                .eq("user_id", user_id) \
                 .execute()
 
             deleted = len(response.data) > 0 if response.data else False
 
             if deleted:
                 # Update deck card_count
-                await self._update_deck_card_count(deck_id)
+                await self._update_deck_card_count(response.data[0]["deck_id"])
 
             return deleted
 
         except Exception as e:
             raise Exception(f"Failed to delete flashcard: {str(e)}")
 
+    @staticmethod
+    def _canonical_id(flashcard_id: str) -> str:
+        """Lowercase hyphenated form of a UUID, as the database returns it (unchanged if invalid)."""
+        try:
+            return str(UUID(flashcard_id))
+        except ValueError:
+            return flashcard_id
+
+    async def bulk_update_flashcards(
+        self,
+        user_id: str,
+        updates: List[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """
+        Update many flashcards in one transaction.
+
+        Edits for the same card are merged, later ones winning, and applied
+        in a single UPDATE filtered on the owner, so a card deleted meanwhile
+        is never recreated. Cards that don't exist or belong to another user
+        are skipped and reported in not_found_ids.
+
+        Args:
+            user_id: The user's UUID (for ownership verification)
+            updates: List of dicts with 'id' and optional front, back, difficulty
+
+        Returns:
+            Dict with:
+                - flashcards: List of updated flashcard dictionaries
+                - not_found_ids: IDs that were missing or not owned
+
+        Raises:
+            Exception: If update fails
+        """
+        try:
+            edits = {}
+            for update in updates:
+                fields = edits.setdefault(self._canonical_id(update["id"]), {})
+                for field in ("front", "back", "difficulty"):
+                    if update.get(field) is not None:
+                        fields[field] = update[field]
+
+            flashcards = await self.queries.update_flashcards(user_id, edits)
+
+            updated_ids = {flashcard["id"] for flashcard in flashcards}
+            return {
+                "flashcards": flashcards,
+                "not_found_ids": [flashcard_id for flashcard_id in edits if flashcard_id not in updated_ids],
+            }
+
+        except Exception as e:
+            raise Exception(f"Failed to bulk update flashcards: {str(e)}")
+
+    async def bulk_delete_flashcards(
+        self,
+        user_id: str,
+        flashcard_ids: List[str],
+    ) -> Dict[str, Any]:
+        """
+        Delete many flashcards in one transaction.
+
+        The DELETE is filtered on the owner and the affected decks' card
+        counts are recomputed in the same transaction, once per deck.
+
+        Args:
+            user_id: The user's UUID (for ownership verification)
+            flashcard_ids: Flashcard UUIDs to delete
+
+        Returns:
+            Dict with:
+                - deleted: Number of flashcards deleted
+                - not_found_ids: IDs that were missing or not owned
+
+        Raises:
+            Exception: If deletion fails
+        """
+        try:
+            requested_ids = list(dict.fromkeys(map(self._canonical_id, flashcard_ids)))
+            deleted = await self.queries.delete_flashcards(user_id, requested_ids)
+
+            deleted_ids = {flashcard["id"] for flashcard in deleted}
+            for deck_id in sorted({flashcard["deck_id"] for flashcard in deleted}):
+                deck_cache.invalidate(deck_id)
+
+            return {
+                "deleted": len(deleted),
+                "not_found_ids": [flashcard_id for flashcard_id in requested_ids if flashcard_id not in deleted_ids],
+            }
+
+        except Exception as e:
+            raise Exception(f"Failed to bulk delete flashcards: {str(e)}")
+
     async def _update_deck_card_count(self, deck_id: str) -> None:
         """
         Update the card_count field in the deck.
@@ -546,6 +936,8 @@ Output in JSON format only, no other text:
                 .eq("id", deck_id) \
                 .execute()
 
+            deck_cache.invalidate(deck_id)
+
         except Exception:
             # Don't fail the main operation if count update fails
             pass
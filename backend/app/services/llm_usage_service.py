@@ -0,0 +1,283 @@
+"""
+LLM Usage Service
+
+Instrumentation for every Claude call. Each call is wrapped in `track()`,
+which measures latency and time-to-first-token, collects token counts
+(including prompt cache reads/writes) and the outcome, then:
+- Updates in-process Prometheus-style counters and latency histograms
+- Stores one row in the llm_calls table (in the background, best effort)
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from supabase import Client
+
+from app.core.supabase import get_supabase_client
+
+TOKEN_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+)
+
+# Upper bounds (ms) of the latency histogram buckets
+LATENCY_BUCKETS_MS = (250, 500, 1000, 2500, 5000, 10000, 20000, 30000, 60000)
+
+
+class LLMCall:
+    """Measurements for a single (possibly retried) model call."""
+
+    def __init__(self, task: str, model: str, user_id: Optional[str] = None):
+        self.task = task
+        self.model = model
+        self.user_id = user_id
+        self.tokens = {field: 0 for field in TOKEN_FIELDS}
+        self.retries = 0
+        self.outcome = "success"
+        self.error: Optional[str] = None
+        self.latency_ms = 0
+        self.time_to_first_token_ms: Optional[int] = None
+        self._started = time.perf_counter()
+
+    def _elapsed_ms(self) -> int:
+        return int((time.perf_counter() - self._started) * 1000)
+
+    def add_usage(self, message: Any) -> None:
+        """
+        Add token counts from a Messages API response (or its usage object).
+
+        Counts are summed, so retried or fallback attempts are all accounted for.
+
+        Args:
+            message: Response from messages.create, a final streamed message, or a usage object
+        """
+        usage = getattr(message, "usage", message)
+        for field in TOKEN_FIELDS:
+            value = getattr(usage, field, 0)
+            if isinstance(value, int):
+                self.tokens[field] += value
+
+    def mark_first_token(self) -> None:
+        """Record time-to-first-token (only the first call counts)."""
+        if self.time_to_first_token_ms is None:
+            self.time_to_first_token_ms = self._elapsed_ms()
+
+    def finish(self) -> None:
+        """Freeze the total latency."""
+        self.latency_ms = self._elapsed_ms()
+
+    def to_row(self) -> Dict[str, Any]:
+        """Build the llm_calls row for this call."""
+        return {
+            "user_id": self.user_id,
+            "task": self.task,
+            "model": self.model,
+            "outcome": self.outcome,
+            "error": self.error,
+            **self.tokens,
+            "latency_ms": self.latency_ms,
+            "time_to_first_token_ms": self.time_to_first_token_ms,
+            "retries": self.retries,
+        }
+
+
+class LLMUsageService:
+    """
+    LLM Usage Service for BrainKit
+
+    Provides methods for:
+    - Tracking Claude calls (tokens, latency, TTFT, retries, outcome)
+    - Exporting Prometheus-style metrics
+    - Aggregating stored usage per task and model
+    """
+
+    def __init__(self):
+        """Initialize the usage service with empty metrics"""
+        self.admin_client: Client = get_supabase_client()
+        self.persist = True
+        self._counters: Dict[Tuple[str, str, str], Dict[str, int]] = {}
+        self._latency: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._pending: Set[asyncio.Task] = set()
+
+    @asynccontextmanager
+    async def track(
+        self,
+        task: str,
+        model: str,
+        user_id: Optional[str] = None,
+    ) -> AsyncIterator[LLMCall]:
+        """
+        Track one model call.
+
+        Usage:
+            async with llm_usage_service.track("mnemonic", model, user_id) as call:
+                message = client.messages.create(...)
+                call.add_usage(message)
+
+        Exceptions mark the call as failed and are re-raised.
+
+        Args:
+            task: Task name (e.g. "mnemonic", "flashcards", "concept_extraction")
+            model: Model used for the call
+            user_id: Optional user the call was made for
+
+        Yields:
+            The LLMCall being measured
+        """
+        call = LLMCall(task=task, model=model, user_id=user_id)
+        try:
+            yield call
+        except Exception as e:
+            call.outcome = "error"
+            call.error = str(e)[:500]
+            raise
+        except BaseException:
+            # Client disconnected or task cancelled mid-call
+            call.outcome = "cancelled"
+            raise
+        finally:
+            call.finish()
+            self.record(call)
+
+    def record(self, call: LLMCall) -> None:
+        """
+        Record a finished call in the metrics and the llm_calls table.
+
+        The database write runs in the background so it never adds latency
+        to the request, and failures never affect the caller.
+
+        Args:
+            call: The finished call
+        """
+        counters = self._counters.setdefault(
+            (call.task, call.model, call.outcome),
+            {"calls": 0, "retries": 0, **{field: 0 for field in TOKEN_FIELDS}},
+        )
+        counters["calls"] += 1
+        counters["retries"] += call.retries
+        for field in TOKEN_FIELDS:
+            counters[field] += call.tokens[field]
+
+        histogram = self._latency.setdefault(
+            (call.task, call.model),
+            {"buckets": [0] * len(LATENCY_BUCKETS_MS), "sum": 0, "count": 0},
+        )
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            if call.latency_ms <= bound:
+                histogram["buckets"][index] += 1
+        histogram["sum"] += call.latency_ms
+        histogram["count"] += 1
+
+        if not self.persist:
+            return
+
+        try:
+            task = asyncio.get_running_loop().create_task(asyncio.to_thread(self._insert_row, call.to_row()))
+        except RuntimeError:
+            # No running loop (sync caller): write inline
+            self._insert_row(call.to_row())
+            return
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def _insert_row(self, row: Dict[str, Any]) -> None:
+        """Insert one llm_calls row, ignoring failures."""
+        try:
+            self.admin_client.table("llm_calls").insert(row).execute()
+        except Exception:
+            # Usage tracking must never break generation
+            pass
+
+    def render_metrics(self) -> str:
+        """
+        Render the in-process metrics in Prometheus text format.
+
+        Returns:
+            Metrics text (counters per task/model/outcome, latency histograms per task/model)
+        """
+        lines = [
+            "# HELP brainkit_llm_calls_total Claude calls by task, model and outcome",
+            "# TYPE brainkit_llm_calls_total counter",
+        ]
+        for (task, model, outcome), counters in sorted(self._counters.items()):
+            lines.append(
+                f'brainkit_llm_calls_total{{task="{task}",model="{model}",outcome="{outcome}"}} {counters["calls"]}'
+            )
+
+        lines += [
+            "# HELP brainkit_llm_retries_total Retried or fallback attempts by task and model",
+            "# TYPE brainkit_llm_retries_total counter",
+        ]
+        for (task, model), retries in sorted(self._sum_by_task_model("retries").items()):
+            lines.append(f'brainkit_llm_retries_total{{task="{task}",model="{model}"}} {retries}')
+
+        lines += [
+            "# HELP brainkit_llm_tokens_total Tokens by task, model and kind",
+            "# TYPE brainkit_llm_tokens_total counter",
+        ]
+        for field in TOKEN_FIELDS:
+            kind = field.replace("_tokens", "")
+            for (task, model), tokens in sorted(self._sum_by_task_model(field).items()):
+                lines.append(
+                    f'brainkit_llm_tokens_total{{task="{task}",model="{model}",kind="{kind}"}} {tokens}'
+                )
+
+        lines += [
+            "# HELP brainkit_llm_latency_ms Claude call latency in milliseconds",
+            "# TYPE brainkit_llm_latency_ms histogram",
+        ]
+        for (task, model), histogram in sorted(self._latency.items()):
+            labels = f'task="{task}",model="{model}"'
+            for bound, count in zip(LATENCY_BUCKETS_MS, histogram["buckets"]):
+                lines.append(f'brainkit_llm_latency_ms_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'brainkit_llm_latency_ms_bucket{{{labels},le="+Inf"}} {histogram["count"]}')
+            lines.append(f"brainkit_llm_latency_ms_sum{{{labels}}} {histogram['sum']}")
+            lines.append(f"brainkit_llm_latency_ms_count{{{labels}}} {histogram['count']}")
+
+        return "\n".join(lines) + "\n"
+
+    def _sum_by_task_model(self, field: str) -> Dict[Tuple[str, str], int]:
+        """Sum a counter field across outcomes."""
+        totals: Dict[Tuple[str, str], int] = {}
+        for (task, model, _), counters in self._counters.items():
+            totals[(task, model)] = totals.get((task, model), 0) + counters[field]
+        return totals
+
+    async def get_usage_summary(self, hours: int = 24) -> Dict[str, Any]:
+        """
+        Aggregate stored usage per task and model.
+
+        Args:
+            hours: Size of the time window, counting back from now
+
+        Returns:
+            Dict containing:
+                - since: Start of the window (ISO timestamp)
+                - usage: List of per task/model aggregates
+                - totals: Calls, errors and token sums across all tasks
+
+        Raises:
+            Exception: If the aggregate query fails
+        """
+        since = (datetime.now(timezone.utc) - timedelta(hours=hours)).isoformat()
+
+        try:
+            response = self.admin_client.rpc("llm_usage_summary", {"since": since}).execute()
+            usage: List[Dict[str, Any]] = response.data or []
+
+            totals_fields = ("calls", "errors", "retries") + TOKEN_FIELDS
+            totals = {field: sum(row.get(field) or 0 for row in usage) for field in totals_fields}
+
+            return {"since": since, "usage": usage, "totals": totals}
+
+        except Exception as e:
+            raise Exception(f"Failed to get LLM usage: {str(e)}")
+
+
+# Singleton instance
+llm_usage_service = LLMUsageService()
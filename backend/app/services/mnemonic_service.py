@@ -9,8 +9,13 @@ from typing import Any, Dict, List, Optional
 
 from supabase import Client
 
+from app.core.config import settings
+from app.core.single_flight import SingleFlight, make_key, normalize_text
 from app.core.supabase import get_supabase_client
 from app.services.claude_service import claude_service
+from app.services.deck_cache import deck_cache
+from app.services.flashcard_pregeneration import flashcard_pregeneration
+from app.services.flashcard_service import flashcard_service
 
 
 class MnemonicService:
@@ -23,6 +28,7 @@ class MnemonicService:
     def __init__(self):
         """Initialize the mnemonic service with Supabase client"""
         self.admin_client: Client = get_supabase_client()
+        self.in_flight = SingleFlight()
 
     async def check_generation_limit(self, user_id: str) -> Dict[str, Any]:
         """
@@ -79,38 +85,73 @@ class MnemonicService:
         except Exception as e:
             raise Exception(f"Failed to check generation limit: {str(e)}")
 
-    async def increment_generation_count(self, user_id: str) -> None:
+    async def increment_generation_count(self, user_id: str) -> int:
         """
         Increment the user's monthly generation count.
 
+        Runs as a single UPDATE in the database (increment_generation_count
+        function), so concurrent generations can't lose increments.
+
         Args:
             user_id: The user's UUID
 
+        Returns:
+            The new monthly count
+
         Raises:
             Exception: If incrementing fails
         """
         try:
-            # Get current count
-            response = self.admin_client.table("profiles") \
-                .select("generation_count_monthly") \
-                .eq("id", user_id) \
-                .single() \
-                .execute()
+            response = self.admin_client.rpc(
+                "increment_generation_count",
+                {"p_user_id": user_id},
+            ).execute()
 
             if not response.data:
                 raise Exception("User profile not found")
 
-            current_count = response.data.get("generation_count_monthly", 0)
-
-            # Increment count
-            self.admin_client.table("profiles") \
-                .update({"generation_count_monthly": current_count + 1}) \
-                .eq("id", user_id) \
-                .execute()
+            row = response.data[0] if isinstance(response.data, list) else response.data
+            return row["generation_count_monthly"]
 
         except Exception as e:
             raise Exception(f"Failed to increment generation count: {str(e)}")
 
+    def _start_flashcard_pregeneration(
+        self,
+        generation_id: str,
+        user_id: str,
+        input_list_text: str,
+        mnemonics: Dict[str, Any],
+    ) -> None:
+        """
+        Start generating flashcards for all three options in the background.
+
+        Only runs when FLASHCARD_PREGENERATION is enabled.
+
+        Args:
+            generation_id: ID of the saved generation record
+            user_id: User the generation belongs to
+            input_list_text: The list as stored on the generation (one item per line)
+            mnemonics: Dict with acrostic, story and visual techniques
+        """
+        if not settings.FLASHCARD_PREGENERATION or not flashcard_service.claude_client:
+            return
+
+        flashcard_pregeneration.start(
+            generation_id=generation_id,
+            list_items=input_list_text,
+            mnemonics={
+                mnemonic_type: mnemonics[mnemonic_type]["content"]
+                for mnemonic_type in ("acrostic", "story", "visual")
+            },
+            generate=lambda list_items, mnemonic_type, content: flashcard_service._generate_flashcards_data(
+                list_items=list_items,
+                mnemonic_type=mnemonic_type,
+                mnemonic_content=content,
+                user_id=user_id,
+            ),
+        )
+
     async def generate_mnemonics(
         self,
         user_id: str,
@@ -145,56 +186,73 @@ class MnemonicService:
                     f"Upgrade to Premium for unlimited generations."
                 )
 
-            # Generate mnemonics using Claude
-            result = await claude_service.generate_mnemonics(
-                list_items=list_items,
-                user_id=user_id,
-                deck_id=deck_id,
+            # A double-click or client retry joins the generation already running,
+            # so only one generation row is saved and one pre-generation started
+            key = make_key("generation", user_id, deck_id, [normalize_text(item) for item in list_items])
+            return await self.in_flight.run(
+                key,
+                lambda: self._generate_and_save(user_id, list_items, deck_id, limit_check),
             )
 
-            # Save generation to database
-            input_list_text = "\n".join(list_items)
-
-            generation_data = {
-                "user_id": user_id,
-                "deck_id": deck_id,
-                "input_list": input_list_text,
-                "item_count": result["metadata"]["item_count"],
-                "acrostic_result": result["acrostic"],
-                "story_result": result["story"],
-                "visual_result": result["visual"],
-                "generation_time_ms": result["metadata"]["generation_time_ms"],
-                "claude_model": result["metadata"]["model"],
-            }
-
-            generation_response = self.admin_client.table("mnemonic_generations") \
-                .insert(generation_data) \
-                .execute()
-
-            if not generation_response.data:
-                raise Exception("Failed to save generation to database")
-
-            generation_id = generation_response.data[0]["id"]
-
-            # Increment generation count (only for free tier)
-            if not limit_check["is_premium"]:
-                await self.increment_generation_count(user_id)
-
-            # Add generation_id to metadata
-            result["metadata"]["generation_id"] = generation_id
-
-            # Update remaining count
-            if limit_check["is_premium"]:
-                result["metadata"]["remaining_generations"] = -1
-            else:
-                result["metadata"]["remaining_generations"] = limit_check["remaining"] - 1
-
-            return result
-
         except Exception as e:
             # Don't increment count on failure
             raise
 
+    async def _generate_and_save(
+        self,
+        user_id: str,
+        list_items: List[str],
+        deck_id: Optional[str],
+        limit_check: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Generate, save and count one generation (see generate_mnemonics)."""
+        # Generate mnemonics using Claude
+        result = await claude_service.generate_mnemonics(
+            list_items=list_items,
+            user_id=user_id,
+            deck_id=deck_id,
+        )
+
+        # Save generation to database
+        input_list_text = "\n".join(list_items)
+
+        generation_data = {
+            "user_id": user_id,
+            "deck_id": deck_id,
+            "input_list": input_list_text,
+            "item_count": result["metadata"]["item_count"],
+            "acrostic_result": result["acrostic"],
+            "story_result": result["story"],
+            "visual_result": result["visual"],
+            "generation_time_ms": result["metadata"]["generation_time_ms"],
+            "claude_model": result["metadata"]["model"],
+        }
+
+        generation_response = self.admin_client.table("mnemonic_generations") \
+            .insert(generation_data) \
+            .execute()
+
+        if not generation_response.data:
+            raise Exception("Failed to save generation to database")
+
+        generation_id = generation_response.data[0]["id"]
+        self._start_flashcard_pregeneration(generation_id, user_id, input_list_text, result)
+
+        # Increment generation count (only for free tier)
+        if not limit_check["is_premium"]:
+            await self.increment_generation_count(user_id)
+
+        # Add generation_id to metadata
+        result["metadata"]["generation_id"] = generation_id
+
+        # Update remaining count
+        if limit_check["is_premium"]:
+            result["metadata"]["remaining_generations"] = -1
+        else:
+            result["metadata"]["remaining_generations"] = limit_check["remaining"] - 1
+
+        return result
+
     async def save_generation_from_pdf(
         self,
         user_id: str,
@@ -255,6 +313,7 @@ class MnemonicService:
                 raise Exception("Failed to save generation to database")
 
             generation_id = generation_response.data[0]["id"]
+            self._start_flashcard_pregeneration(generation_id, user_id, input_list_text, mnemonics)
 
             # Increment generation count (only for free tier)
             if not limit_check["is_premium"]:
@@ -339,9 +398,14 @@ class MnemonicService:
                 .eq("user_id", user_id) \
                 .execute()
 
+            deck_cache.invalidate(deck_id)
+
             if not deck_response.data:
                 raise Exception("Failed to update deck")
 
+            # Let generate_flashcards pick up cards pre-generated for this option
+            flashcard_pregeneration.assign(deck_id, generation_id, selected_type)
+
             return deck_response.data[0]
 
         except Exception as e:
@@ -0,0 +1,139 @@
+"""
+Model Router
+
+Maps each Claude task to a model configured in Settings, so cheap tasks
+(concept extraction, short flashcard sets, validation) can run on a
+smaller, faster model. If the routed model returns a response that can't
+be parsed, the call is retried once on the larger fallback model.
+
+Every attempt is tracked by llm_usage_service and its latency is logged
+per task, so the mapping can be tuned from real numbers.
+"""
+
+import json
+import logging
+from typing import Any, Awaitable, Callable, Optional, Tuple, TypeVar
+
+from app.core.config import settings
+from app.core.llm_json import ResponseFormatError
+from app.services.llm_usage_service import LLMCall, llm_usage_service
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Errors that mean "the model answered, but not in a usable format"
+PARSE_ERRORS = (json.JSONDecodeError, ResponseFormatError)
+
+
+class ModelRouter:
+    """Routes tasks to models and falls back to a larger model on parse failure."""
+
+    TASKS = ("concept_extraction", "mnemonic", "flashcards", "flashcards_short")
+
+    def model_for(self, task: str) -> str:
+        """
+        Get the configured model for a task.
+
+        Args:
+            task: One of TASKS
+
+        Returns:
+            Model name
+
+        Raises:
+            ValueError: If the task is unknown
+        """
+        if task not in self.TASKS:
+            raise ValueError(f"Unknown model task: {task}")
+        return getattr(settings, f"CLAUDE_MODEL_{task.upper()}")
+
+    def flashcard_task(self, item_count: int) -> str:
+        """
+        Pick the flashcard task for a set of items.
+
+        Args:
+            item_count: Number of items the flashcards must cover
+
+        Returns:
+            "flashcards_short" for small sets, otherwise "flashcards"
+        """
+        if item_count <= settings.CLAUDE_FLASHCARDS_SHORT_MAX_ITEMS:
+            return "flashcards_short"
+        return "flashcards"
+
+    def fallback_for(self, task: str) -> Optional[str]:
+        """
+        Get the fallback model for a task (None if it already uses it).
+
+        Args:
+            task: One of TASKS
+
+        Returns:
+            Fallback model name, or None
+        """
+        fallback = settings.CLAUDE_FALLBACK_MODEL
+        return fallback if fallback and fallback != self.model_for(task) else None
+
+    async def run(
+        self,
+        task: str,
+        attempt: Callable[[str, LLMCall], Awaitable[T]],
+        user_id: Optional[str] = None,
+        retries: int = 0,
+    ) -> Tuple[T, str]:
+        """
+        Run a task on its routed model, falling back once on a parse failure.
+
+        Args:
+            task: One of TASKS
+            attempt: Coroutine function taking (model, call) that makes the
+                request, adds usage to `call` and returns the parsed result.
+                It should raise json.JSONDecodeError or ResponseFormatError
+                when the response can't be used.
+            user_id: Optional user the call is made for
+            retries: Attempts the caller already made for this request (its
+                own retry loop); recorded on the llm_calls rows
+
+        Returns:
+            Tuple of (result, model that produced it)
+
+        Raises:
+            Exception: Whatever the last attempt raised
+        """
+        model = self.model_for(task)
+        fallback = self.fallback_for(task)
+
+        try:
+            return await self._attempt(task, model, attempt, user_id, retries=retries), model
+        except PARSE_ERRORS as e:
+            if not fallback:
+                raise
+            logger.warning("llm task=%s model=%s parse failed (%s), retrying on %s", task, model, e, fallback)
+
+        return await self._attempt(task, fallback, attempt, user_id, retries=retries + 1), fallback
+
+    async def _attempt(
+        self,
+        task: str,
+        model: str,
+        attempt: Callable[[str, LLMCall], Awaitable[Any]],
+        user_id: Optional[str],
+        retries: int,
+    ) -> Any:
+        """Run one tracked attempt and log its latency."""
+        call = None
+        try:
+            async with llm_usage_service.track(task, model, user_id) as call:
+                call.retries = retries
+                return await attempt(model, call)
+        finally:
+            if call is not None:
+                logger.info(
+                    "llm task=%s model=%s outcome=%s latency_ms=%d",
+                    task, model, call.outcome, call.latency_ms,
+                )
+
+
+# Singleton instance
+model_router = ModelRouter()
@@ -4,11 +4,13 @@ PDF Processing Service
 Handles PDF text extraction and integration with Claude for concept extraction.
 """
 
+import hashlib
 import io
 from typing import Any, Dict, List
 
 import pdfplumber
 
+from app.core.single_flight import SingleFlight, make_key
 from app.services.claude_service import claude_service
 
 
@@ -27,7 +29,7 @@ class PDFService:
 
     def __init__(self):
         """Initialize the PDF service"""
-        pass
+        self.in_flight = SingleFlight()
 
     async def extract_text_from_pdf(self, file_content: bytes) -> str:
         """
@@ -84,6 +86,8 @@ class PDFService:
         """
         Process a PDF file and generate learning content.
 
+        Concurrent uploads of the same file by the same user share one run.
+
         Flow:
         1. Extract text from PDF
         2. Use Claude to identify key concepts
@@ -106,13 +110,28 @@ class PDFService:
             ValueError: If PDF processing fails
             Exception: If mnemonic generation fails
         """
+        file_hash = hashlib.sha256(file_content).hexdigest()
+        key = make_key("pdf", user_id, file_hash)
+        return await self.in_flight.run(
+            key,
+            lambda: self._process_pdf_for_learning(file_content, user_id, deck_id),
+        )
+
+    async def _process_pdf_for_learning(
+        self,
+        file_content: bytes,
+        user_id: str,
+        deck_id: str,
+    ) -> Dict[str, Any]:
+        """Extract concepts and generate mnemonics for a PDF (see process_pdf_for_learning)."""
         # Step 1: Extract text from PDF
         extracted_text = await self.extract_text_from_pdf(file_content)
 
         # Step 2: Extract key concepts using Claude
         concepts = await claude_service.extract_key_concepts(
             text=extracted_text,
-            max_concepts=self.MAX_CONCEPTS
+            max_concepts=self.MAX_CONCEPTS,
+            user_id=user_id,
         )
 
         # Validate we have enough concepts
@@ -0,0 +1,273 @@
+"""
+Rate Limit Service
+
+Per-user token-bucket limiter for the endpoints that call Claude, so one
+user can't use up the shared Anthropic rate limit. Every user gets a bucket
+sized by their subscription tier: `burst` requests can be made at once,
+after which tokens refill at `per_hour` / 3600 per second.
+
+Buckets live in process memory by default. With RATE_LIMIT_BACKEND set to
+"supabase" they are stored in the rate_limit_buckets table and updated
+atomically by the take_rate_limit_token function, so all workers share the
+same limits; if that call fails the in-process bucket is used instead. The
+function also deletes buckets idle for a day now and then, since a bucket
+that has refilled behaves exactly like a missing one.
+"""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Tuple
+
+from supabase import Client
+
+from app.core.config import settings
+from app.core.supabase import get_supabase_client
+
+
+class RateLimitResult(NamedTuple):
+    """Outcome of taking a token from a bucket."""
+    allowed: bool
+    remaining: int
+    retry_after_seconds: int
+
+
+class _Bucket(NamedTuple):
+    """State of one in-process token bucket."""
+    tokens: float
+    updated_at: float
+    capacity: int
+    refill_per_second: float
+
+    def is_full(self, now: float) -> bool:
+        """Whether the bucket has refilled completely (it behaves like a new one)."""
+        if self.refill_per_second <= 0:
+            return False
+        return now - self.updated_at >= (self.capacity - self.tokens) / self.refill_per_second
+
+
+class InMemoryRateLimitStore:
+    """
+    Token buckets kept in an OrderedDict, least recently used first.
+
+    take() never awaits between reading and writing a bucket, so it is
+    atomic within the event loop.
+    """
+
+    # Idle buckets that have refilled are dropped past this size
+    MAX_BUCKETS = 10000
+
+    def __init__(self):
+        """Initialize an empty store"""
+        self._buckets: OrderedDict[str, _Bucket] = OrderedDict()
+
+    def take(self, key: str, capacity: int, refill_per_second: float, cost: int = 1) -> RateLimitResult:
+        """
+        Take tokens from a bucket, refilling it for the time elapsed.
+
+        Args:
+            key: Bucket key (user and scope)
+            capacity: Maximum tokens in the bucket
+            refill_per_second: Tokens added per second
+            cost: Tokens this request needs
+
+        Returns:
+            RateLimitResult
+        """
+        now = time.monotonic()
+        bucket = self._buckets.pop(key, None)
+        tokens, updated_at = (bucket.tokens, bucket.updated_at) if bucket else (float(capacity), now)
+        tokens = min(float(capacity), tokens + (now - updated_at) * refill_per_second)
+
+        if tokens >= cost:
+            tokens -= cost
+            allowed = True
+            retry_after = 0
+        else:
+            allowed = False
+            retry_after = math.ceil((cost - tokens) / refill_per_second) if refill_per_second > 0 else 3600
+
+        self._buckets[key] = _Bucket(tokens, now, capacity, refill_per_second)
+        self._evict_full(now)
+
+        return RateLimitResult(allowed, int(tokens), retry_after)
+
+    def _evict_full(self, now: float) -> None:
+        """
+        Drop least recently used buckets past MAX_BUCKETS once they are full.
+
+        Each bucket is judged by its own capacity and refill rate. Eviction
+        stops at the first bucket still refilling, since dropping it would
+        hand its user fresh tokens; it is retried on the next take().
+        """
+        while len(self._buckets) > self.MAX_BUCKETS:
+            key, bucket = next(iter(self._buckets.items()))
+            if not bucket.is_full(now):
+                return
+            del self._buckets[key]
+
+
+class SupabaseRateLimitStore:
+    """Token buckets shared across workers through a database function."""
+
+    def __init__(self, client: Client):
+        """Initialize the store with a Supabase client"""
+        self.client = client
+
+    async def take(self, key: str, capacity: int, refill_per_second: float, cost: int = 1) -> RateLimitResult:
+        """
+        Take tokens from a shared bucket (see take_rate_limit_token).
+
+        Args:
+            key: Bucket key (user and scope)
+            capacity: Maximum tokens in the bucket
+            refill_per_second: Tokens added per second
+            cost: Tokens this request needs
+
+        Returns:
+            RateLimitResult
+
+        Raises:
+            Exception: If the database call fails
+        """
+        response = await asyncio.to_thread(
+            self.client.rpc(
+                "take_rate_limit_token",
+                {
+                    "p_key": key,
+                    "p_capacity": capacity,
+                    "p_refill_per_second": refill_per_second,
+                    "p_cost": cost,
+                },
+            ).execute
+        )
+        row = response.data[0] if isinstance(response.data, list) else response.data
+        if not row:
+            raise Exception("take_rate_limit_token returned no result")
+
+        return RateLimitResult(
+            allowed=bool(row["allowed"]),
+            remaining=int(row["remaining"]),
+            retry_after_seconds=int(row["retry_after_seconds"]),
+        )
+
+
+class RateLimitService:
+    """
+    Rate Limit Service for BrainKit
+
+    Provides methods for:
+    - Looking up a user's tier (cached briefly)
+    - Taking a token from the user's bucket for a scope
+    """
+
+    # Cached tiers past this size are dropped oldest first
+    MAX_CACHED_TIERS = 10000
+
+    def __init__(self):
+        """Initialize the rate limiter with the configured store"""
+        self.admin_client: Client = get_supabase_client()
+        self.memory_store = InMemoryRateLimitStore()
+        self.shared_store: Optional[SupabaseRateLimitStore] = None
+        if settings.RATE_LIMIT_BACKEND == "supabase":
+            self.shared_store = SupabaseRateLimitStore(self.admin_client)
+        self._tiers: OrderedDict[str, Tuple[str, float]] = OrderedDict()
+
+    def limits_for(self, tier: str) -> Tuple[int, float]:
+        """
+        Get the bucket size and refill rate for a tier.
+
+        Args:
+            tier: Subscription tier ('free' or 'premium')
+
+        Returns:
+            Tuple of (capacity, tokens refilled per second)
+        """
+        if tier == "premium":
+            return settings.RATE_LIMIT_PREMIUM_BURST, settings.RATE_LIMIT_PREMIUM_PER_HOUR / 3600
+        return settings.RATE_LIMIT_FREE_BURST, settings.RATE_LIMIT_FREE_PER_HOUR / 3600
+
+    async def get_tier(self, user_id: str) -> str:
+        """
+        Get a user's subscription tier, cached for RATE_LIMIT_TIER_CACHE_SECONDS.
+
+        Unknown users and lookup failures count as 'free'.
+
+        Args:
+            user_id: The user's UUID
+
+        Returns:
+            'free' or 'premium'
+        """
+        cached = self._tiers.get(user_id)
+        now = time.monotonic()
+        if cached and cached[1] > now:
+            return cached[0]
+
+        try:
+            response = await asyncio.to_thread(
+                self.admin_client.table("profiles")
+                .select("subscription_tier")
+                .eq("id", user_id)
+                .single()
+                .execute
+            )
+            tier = (response.data or {}).get("subscription_tier") or "free"
+        except Exception:
+            tier = "free"
+
+        self._cache_tier(user_id, tier, now)
+        return tier
+
+    def _cache_tier(self, user_id: str, tier: str, now: float) -> None:
+        """
+        Cache a user's tier, dropping expired entries and the oldest past MAX_CACHED_TIERS.
+
+        Entries are kept in insertion order, which is also expiry order.
+        """
+        self._tiers.pop(user_id, None)
+        self._tiers[user_id] = (tier, now + settings.RATE_LIMIT_TIER_CACHE_SECONDS)
+
+        while self._tiers:
+            oldest_user, (_, expires_at) = next(iter(self._tiers.items()))
+            if expires_at > now and len(self._tiers) <= self.MAX_CACHED_TIERS:
+                return
+            del self._tiers[oldest_user]
+
+    async def check(self, user_id: str, scope: str = "generation", cost: int = 1) -> RateLimitResult:
+        """
+        Take a token from the user's bucket for a scope.
+
+        Args:
+            user_id: The user's UUID
+            scope: What is being limited (one bucket per user and scope)
+            cost: Tokens this request needs
+
+        Returns:
+            RateLimitResult (always allowed when RATE_LIMIT_ENABLED is off)
+        """
+        if not settings.RATE_LIMIT_ENABLED:
+            return RateLimitResult(True, -1, 0)
+
+        tier = await self.get_tier(user_id)
+        capacity, refill_per_second = self.limits_for(tier)
+        key = f"{scope}:{tier}:{user_id}"
+
+        if self.shared_store is not None:
+            try:
+                return await self.shared_store.take(key, capacity, refill_per_second, cost)
+            except Exception:
+                # Never block generation because the shared store is down
+                pass
+
+        return self.memory_store.take(key, capacity, refill_per_second, cost)
+
+    def reset(self) -> None:
+        """Clear in-process buckets and cached tiers."""
+        self.memory_store = InMemoryRateLimitStore()
+        self._tiers.clear()
+
+
+# Singleton instance
+rate_limit_service = RateLimitService()
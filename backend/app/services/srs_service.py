@@ -11,7 +11,11 @@ from uuid import UUID
 
 from supabase import Client
 
+from app.core.config import settings
 from app.core.supabase import get_supabase_client
+from app.services.deck_cache import deck_cache
+from app.services.direct_queries import direct_queries
+from app.services.due_load_balancer import DueHistogramIndex, pick_balanced_interval
 
 
 class SRSService:
@@ -24,6 +28,7 @@ class SRSService:
     - Managing study sessions
     - Recording card reviews
     - Fetching due cards
+    - Load-balancing due dates (optional, see SRS_LOAD_BALANCE)
     """
 
     MIN_EASE_FACTOR = 1.3
@@ -31,6 +36,12 @@ class SRSService:
     def __init__(self):
         """Initialize the SRS service with Supabase client"""
         self.admin_client: Client = get_supabase_client()
+        self.queries = direct_queries
+        self.load_balance = settings.SRS_LOAD_BALANCE
+        self.due_index = DueHistogramIndex(
+            ttl_seconds=settings.SRS_DUE_INDEX_TTL_SECONDS,
+            max_entries=settings.SRS_DUE_INDEX_MAX_ENTRIES,
+        )
 
     def calculate_sm2(
         self,
@@ -77,6 +88,49 @@ class SRSService:
 
         return new_interval, new_ease, new_repetitions
 
+    async def _get_due_histogram(self, user_id: str, today: date) -> Dict[date, int]:
+        """
+        Get the user's per-day count of scheduled reviews from today onwards.
+
+        Served from the in-memory index; loaded with a single query on miss.
+
+        Args:
+            user_id: The user's UUID
+            today: First date to include
+
+        Returns:
+            Mapping of due date -> number of cards due that day
+        """
+        histogram = self.due_index.get(user_id)
+        if histogram is not None:
+            return histogram
+
+        histogram = await self.queries.get_due_histogram(user_id, today)
+        self.due_index.set(user_id, histogram)
+        return histogram
+
+    async def _balance_interval(self, user_id: str, interval: int, today: date) -> int:
+        """
+        Shift an interval within its fuzz window to the least loaded day.
+
+        Falls back to the unmodified interval if the histogram can't be loaded,
+        so load balancing never fails a review.
+
+        Args:
+            user_id: The user's UUID
+            interval: Target interval in days from SM-2
+            today: Reference date the interval is counted from
+
+        Returns:
+            The balanced interval in days
+        """
+        try:
+            histogram = await self._get_due_histogram(user_id, today)
+        except Exception:
+            return interval
+
+        return pick_balanced_interval(interval, histogram, today)
+
     async def get_due_cards(
         self,
         deck_id: str,
@@ -96,33 +150,73 @@ class SRSService:
             Exception: If fetching fails
         """
         try:
-            # Verify deck ownership
-            deck = self.admin_client.table("decks") \
-                .select("id") \
-                .eq("id", deck_id) \
-                .eq("user_id", user_id) \
-                .single() \
-                .execute()
+            due_cards = await self.queries.get_due_cards(deck_id, user_id, date.today())
 
-            if not deck.data:
+            if due_cards is None:
                 raise Exception("Deck not found or access denied")
 
-            # Fetch due cards (next_review_date <= today)
-            today = date.today()
-            response = self.admin_client.table("flashcards") \
-                .select("*") \
-                .eq("deck_id", deck_id) \
-                .lte("next_review_date", today.isoformat()) \
-                .order("next_review_date", desc=False) \
-                .execute()
-
-            return response.data if response.data else []
+            return due_cards
 
         except Exception as e:
             if "not found" in str(e).lower():
                 raise Exception("Deck not found")
             raise Exception(f"Failed to fetch due cards: {str(e)}")
 
+    async def get_due_cards_for_user(
+        self,
+        user_id: str,
+        deck_ids: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Get due flashcards across all of a user's decks in a single query.
+
+        Ownership is enforced by joining flashcards to decks on user_id,
+        so no separate per-deck ownership check is needed.
+
+        Args:
+            user_id: The user's UUID
+            deck_ids: Optional list of deck UUIDs to restrict the queue to
+
+        Returns:
+            List of due flashcard dictionaries, oldest due date first
+
+        Raises:
+            Exception: If fetching fails
+        """
+        try:
+            return await self.queries.get_due_cards_for_user(user_id, date.today(), deck_ids=deck_ids)
+
+        except Exception as e:
+            raise Exception(f"Failed to fetch due cards: {str(e)}")
+
+    def _create_session(self, user_id: str, deck_id: Optional[str]) -> Dict[str, Any]:
+        """
+        Insert a new study session row.
+
+        Args:
+            user_id: The user's UUID
+            deck_id: The deck's UUID, or None for a cross-deck session
+
+        Returns:
+            The created session dictionary
+
+        Raises:
+            Exception: If the insert returns no data
+        """
+        response = self.admin_client.table("study_sessions") \
+            .insert({
+                "user_id": user_id,
+                "deck_id": deck_id,
+                "cards_reviewed": 0,
+                "started_at": datetime.utcnow().isoformat(),
+            }) \
+            .execute()
+
+        if not response.data:
+            raise Exception("Failed to create study session")
+
+        return response.data[0]
+
     async def start_study_session(
         self,
         deck_id: str,
@@ -153,19 +247,51 @@ class SRSService:
                 }
 
             # Create session
-            response = self.admin_client.table("study_sessions") \
-                .insert({
-                    "user_id": user_id,
-                    "deck_id": deck_id,
-                    "cards_reviewed": 0,
-                    "started_at": datetime.utcnow().isoformat(),
-                }) \
-                .execute()
+            session = self._create_session(user_id=user_id, deck_id=deck_id)
 
-            if not response.data:
-                raise Exception("Failed to create study session")
+            return {
+                "session": session,
+                "due_cards": due_cards,
+                "cards_due_count": len(due_cards),
+            }
+
+        except Exception as e:
+            raise Exception(f"Failed to start study session: {str(e)}")
+
+    async def start_merged_study_session(
+        self,
+        user_id: str,
+        deck_ids: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Start a single study session over a merged due queue.
+
+        Covers every deck the user owns (or only `deck_ids` if given) with one
+        due-card query and one session row with a NULL deck_id.
+
+        Args:
+            user_id: The user's UUID
+            deck_ids: Optional list of deck UUIDs to restrict the queue to
+
+        Returns:
+            Dictionary with session data and due cards
+
+        Raises:
+            Exception: If session creation fails
+        """
+        try:
+            due_cards = await self.get_due_cards_for_user(user_id, deck_ids=deck_ids)
+
+            if not due_cards:
+                return {
+                    "session": None,
+                    "due_cards": [],
+                    "cards_due_count": 0,
+                }
 
-            session = response.data[0]
+            # A single-deck filter keeps the session attributable to that deck
+            session_deck_id = deck_ids[0] if deck_ids and len(deck_ids) == 1 else None
+            session = self._create_session(user_id=user_id, deck_id=session_deck_id)
 
             return {
                 "session": session,
@@ -205,20 +331,16 @@ class SRSService:
             if quality not in [1, 3, 5]:
                 raise ValueError("Quality must be 1 (Hard), 3 (Good), or 5 (Easy)")
 
-            # Get flashcard with deck to verify ownership
-            flashcard_response = self.admin_client.table("flashcards") \
-                .select("*, decks!inner(user_id)") \
-                .eq("id", flashcard_id) \
-                .single() \
-                .execute()
+            # Get flashcard with its deck owner to verify ownership
+            found = await self.queries.get_flashcard_with_owner(flashcard_id)
 
-            if not flashcard_response.data:
+            if not found:
                 raise Exception("Flashcard not found")
 
-            flashcard = flashcard_response.data
+            flashcard, owner_id = found
 
             # Verify ownership
-            if flashcard["decks"]["user_id"] != user_id:
+            if owner_id != user_id:
                 raise Exception("Access denied")
 
             # Get current SRS values
@@ -234,56 +356,45 @@ class SRSService:
                 interval=current_interval
             )
 
-            # Calculate next review date
-            next_review_date = date.today() + timedelta(days=new_interval)
+            # Spread reviews across nearby days if load balancing is enabled
+            today = date.today()
+            if self.load_balance:
+                new_interval = await self._balance_interval(user_id, new_interval, today)
 
-            # Update flashcard
-            update_response = self.admin_client.table("flashcards") \
-                .update({
+            # Calculate next review date
+            next_review_date = today + timedelta(days=new_interval)
+
+            # Update flashcard, record the review and count it in the session (one transaction)
+            updated_flashcard = await self.queries.record_review(
+                flashcard_id=flashcard_id,
+                user_id=user_id,
+                session_id=session_id,
+                srs_update={
                     "ease_factor": new_ease_factor,
                     "interval_days": new_interval,
                     "repetitions": new_repetitions,
-                    "next_review_date": next_review_date.isoformat(),
-                    "last_reviewed_at": datetime.utcnow().isoformat(),
-                }) \
-                .eq("id", flashcard_id) \
-                .execute()
-
-            if not update_response.data:
-                raise Exception("Failed to update flashcard")
-
-            updated_flashcard = update_response.data[0]
-
-            # Record the review
-            self.admin_client.table("card_reviews") \
-                .insert({
-                    "session_id": session_id,
-                    "flashcard_id": flashcard_id,
-                    "user_id": user_id,
+                    "next_review_date": next_review_date,
+                },
+                review={
                     "quality": quality,
                     "response_time_ms": response_time_ms,
                     "previous_interval": current_interval,
                     "new_interval": new_interval,
                     "previous_ease_factor": current_ease_factor,
                     "new_ease_factor": new_ease_factor,
-                }) \
-                .execute()
+                },
+            )
 
-            # Update session if provided
-            if session_id:
-                # Increment cards_reviewed count
-                session_response = self.admin_client.table("study_sessions") \
-                    .select("cards_reviewed") \
-                    .eq("id", session_id) \
-                    .single() \
-                    .execute()
+            if not updated_flashcard:
+                raise Exception("Failed to update flashcard")
 
-                if session_response.data:
-                    current_count = session_response.data.get("cards_reviewed", 0)
-                    self.admin_client.table("study_sessions") \
-                        .update({"cards_reviewed": current_count + 1}) \
-                        .eq("id", session_id) \
-                        .execute()
+            if self.load_balance:
+                previous_due = flashcard.get("next_review_date")
+                self.due_index.move(
+                    user_id,
+                    date.fromisoformat(previous_due) if previous_due else None,
+                    next_review_date,
+                )
 
             return updated_flashcard
 
@@ -338,15 +449,35 @@ class SRSService:
 
             completed_session = update_response.data[0]
 
-            # Update deck's last_studied_at
-            self.admin_client.table("decks") \
-                .update({"last_studied_at": datetime.utcnow().isoformat()}) \
-                .eq("id", completed_session["deck_id"]) \
-                .execute()
+            deck_id = completed_session.get("deck_id")
 
-            # Get next review info
-            deck_id = completed_session["deck_id"]
-            due_cards = await self.get_due_cards(deck_id, user_id)
+            if deck_id:
+                # Update deck's last_studied_at
+                self.admin_client.table("decks") \
+                    .update({"last_studied_at": datetime.utcnow().isoformat()}) \
+                    .eq("id", deck_id) \
+                    .execute()
+                deck_cache.invalidate(deck_id)
+
+                # Get next review info
+                due_cards = await self.get_due_cards(deck_id, user_id)
+            else:
+                # Cross-deck session: touch every deck that had a card reviewed
+                studied_deck_ids = await self._get_session_deck_ids(session_id)
+
+                if studied_deck_ids:
+                    self.admin_client.table("decks") \
+                        .update({"last_studied_at": datetime.utcnow().isoformat()}) \
+                        .in_("id", studied_deck_ids) \
+                        .eq("user_id", user_id) \
+                        .execute()
+                    for studied_deck_id in studied_deck_ids:
+                        deck_cache.invalidate(studied_deck_id)
+
+                due_cards = await self.get_due_cards_for_user(
+                    user_id,
+                    deck_ids=studied_deck_ids or None,
+                )
 
             return {
                 "session": completed_session,
@@ -356,6 +487,28 @@ class SRSService:
         except Exception as e:
             raise Exception(f"Failed to complete session: {str(e)}")
 
+    async def _get_session_deck_ids(self, session_id: str) -> List[str]:
+        """
+        Get the distinct deck IDs of all cards reviewed in a session.
+
+        Args:
+            session_id: The session's UUID
+
+        Returns:
+            List of deck UUIDs
+        """
+        response = self.admin_client.table("card_reviews") \
+            .select("flashcards(deck_id)") \
+            .eq("session_id", session_id) \
+            .execute()
+
+        deck_ids = {
+            row["flashcards"]["deck_id"]
+            for row in (response.data or [])
+            if row.get("flashcards")
+        }
+        return sorted(deck_ids)
+
 
 # Singleton instance
 srs_service = SRSService()
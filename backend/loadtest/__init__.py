@@ -0,0 +1,18 @@
+"""
+Load-test and benchmark suite for the API hot paths
+
+Runs the real API against a local Postgres, with PostgREST behind a fake
+Supabase gateway (fake_supabase) and a fake Anthropic API (fake_anthropic),
+so a whole study journey and PDF upload can be driven at volume without
+external services. From the repository root:
+
+    make loadtest-up        # Postgres + PostgREST, create, migrate and seed brainkit_loadtest
+    make loadtest-fakes     # terminal 1: fake Supabase (:54321) and Anthropic (:54322)
+    make loadtest-api       # terminal 2: the API on :8000, configured for the fakes
+    make loadtest           # terminal 3: run the journeys and compare with the baseline
+
+Record a baseline on a quiet machine with
+`python -m loadtest.run --save-baseline`; later runs exit non-zero when a
+step's p95 or throughput regresses beyond --tolerance. See run.py for the
+workload options and seed.py for the data set.
+"""
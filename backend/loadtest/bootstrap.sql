@@ -0,0 +1,57 @@
+-- Supabase stand-ins for the load-test database
+-- Description: The migrations assume a Supabase project: an auth schema with
+--              auth.users and auth.uid(), and the anon / authenticated /
+--              service_role roles PostgREST switches to. This creates just
+--              enough of that on a plain Postgres for the migrations to apply
+--              and for PostgREST to serve the service-role client. Applied by
+--              `python -m loadtest.stack setup` before the migrations; never
+--              run it against a real Supabase project.
+
+-- ============================================================
+-- AUTH SCHEMA
+-- ============================================================
+CREATE SCHEMA IF NOT EXISTS auth;
+
+CREATE TABLE IF NOT EXISTS auth.users (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  email TEXT UNIQUE,
+  encrypted_password TEXT,  -- sha256 hex, checked by the fake auth server
+  raw_user_meta_data JSONB NOT NULL DEFAULT '{}'::JSONB,
+  email_confirmed_at TIMESTAMPTZ DEFAULT NOW(),
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Same contract as Supabase: the sub claim of the request's JWT, set by PostgREST
+CREATE OR REPLACE FUNCTION auth.uid()
+RETURNS UUID
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT (NULLIF(current_setting('request.jwt.claims', true), '')::JSONB ->> 'sub')::UUID
+$$;
+
+-- ============================================================
+-- POSTGREST ROLES
+-- ============================================================
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN
+    CREATE ROLE anon NOLOGIN;
+  END IF;
+  IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'authenticated') THEN
+    CREATE ROLE authenticated NOLOGIN;
+  END IF;
+  IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'service_role') THEN
+    CREATE ROLE service_role NOLOGIN BYPASSRLS;
+  END IF;
+END;
+$$;
+
+GRANT USAGE ON SCHEMA public, auth TO anon, authenticated, service_role;
+GRANT EXECUTE ON FUNCTION auth.uid() TO anon, authenticated, service_role;
+
+-- Tables, sequences and functions created later by the migrations
+ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT ALL ON TABLES TO anon, authenticated, service_role;
+ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT ALL ON SEQUENCES TO anon, authenticated, service_role;
+ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT EXECUTE ON FUNCTIONS TO anon, authenticated, service_role;
@@ -0,0 +1,130 @@
+"""
+Fake Anthropic Messages API
+
+Answers POST /v1/messages after a configurable delay with canned JSON shaped
+like the response each of our prompts asks for, so the API's own overhead
+around a Claude call can be measured without spending tokens:
+
+- concept extraction ('"concepts"' in the prompt): a list of concepts
+- flashcard generation ('"flashcards"'): a list of front/back cards
+- anything else is a mnemonic request: one object that holds the three
+  techniques and also passes as a single technique
+
+Streaming requests get the same text as server-sent events.
+"""
+
+import asyncio
+import json
+import random
+import uuid
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+# Mean response latency and relative jitter, set by configure()
+LATENCY = {"mean_ms": 800, "jitter": 0.25}
+
+STREAM_CHUNK_CHARS = 40
+
+
+def configure(latency_ms: int, jitter: float = 0.25) -> None:
+    """Set the simulated model latency"""
+    LATENCY["mean_ms"] = latency_ms
+    LATENCY["jitter"] = jitter
+
+
+def _technique(name: str) -> dict:
+    return {
+        "title": f"Load test {name}",
+        "content": f"A {name} mnemonic covering every item in order. " * 4,
+        "how_to_use": "Recall the mnemonic, then walk through it item by item.",
+    }
+
+
+def _prompt_text(body: dict) -> str:
+    """Concatenated text of the user messages"""
+    parts = []
+    for message in body.get("messages", []):
+        content = message.get("content", "")
+        if isinstance(content, str):
+            parts.append(content)
+        else:
+            parts.extend(block.get("text", "") for block in content if isinstance(block, dict))
+    return "\n".join(parts)
+
+
+def response_text(prompt: str) -> str:
+    """Canned JSON answer for a prompt"""
+    if '"flashcards"' in prompt:
+        cards = [
+            {"front": f"Load test question {i}", "back": f"Load test answer {i}", "difficulty": "medium"}
+            for i in range(1, 11)
+        ]
+        return json.dumps({"flashcards": cards})
+
+    if '"concepts"' in prompt:
+        concepts = [f"Key concept {i}: a fact worth memorizing" for i in range(1, 16)]
+        return json.dumps({"concepts": concepts})
+
+    return json.dumps({
+        **_technique("technique"),
+        "acrostic": _technique("acrostic"),
+        "story": _technique("story"),
+        "visual": _technique("visual"),
+    })
+
+
+async def _simulate_latency() -> None:
+    mean = LATENCY["mean_ms"] / 1000
+    jitter = mean * LATENCY["jitter"]
+    await asyncio.sleep(max(0.0, random.uniform(mean - jitter, mean + jitter)))
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps({'type': event, **data})}\n\n"
+
+
+async def _stream(message: dict, text: str):
+    """Server-sent events in the order the Messages API sends them"""
+    chunks = [text[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(text), STREAM_CHUNK_CHARS)]
+    delay = LATENCY["mean_ms"] / 1000 / max(len(chunks), 1)
+
+    yield _sse("message_start", {"message": {**message, "content": [], "stop_reason": None}})
+    yield _sse("content_block_start", {"index": 0, "content_block": {"type": "text", "text": ""}})
+    for chunk in chunks:
+        await asyncio.sleep(delay)
+        yield _sse("content_block_delta", {"index": 0, "delta": {"type": "text_delta", "text": chunk}})
+    yield _sse("content_block_stop", {"index": 0})
+    yield _sse("message_delta", {
+        "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+        "usage": {"output_tokens": message["usage"]["output_tokens"]},
+    })
+    yield _sse("message_stop", {})
+
+
+async def create_message(request: Request):
+    body = await request.json()
+    prompt = _prompt_text(body)
+    text = response_text(prompt)
+
+    message = {
+        "id": f"msg_{uuid.uuid4().hex[:24]}",
+        "type": "message",
+        "role": "assistant",
+        "model": body.get("model", "fake"),
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": len(prompt) // 4, "output_tokens": len(text) // 4},
+    }
+
+    if body.get("stream"):
+        return StreamingResponse(_stream(message, text), media_type="text/event-stream")
+
+    await _simulate_latency()
+    return JSONResponse(message)
+
+
+app = Starlette(routes=[Route("/v1/messages", create_message, methods=["POST"])])
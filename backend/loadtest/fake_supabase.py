@@ -0,0 +1,208 @@
+"""
+Fake Supabase gateway
+
+Stands in for a Supabase project in front of the load-test database:
+
+- /auth/v1: the GoTrue endpoints the API uses (password and refresh token
+  grants, get user, logout, sign up). Users live in auth.users with a sha256
+  password hash, so a login costs a database lookup rather than a bcrypt
+  round; the numbers measure our overhead, not GoTrue's.
+- /rest/v1: proxied to PostgREST, which verifies the API keys' JWTs itself.
+
+Access tokens are HS256 JWTs signed with the same secret PostgREST uses.
+"""
+
+import hashlib
+import json
+import secrets
+import time
+import uuid
+from contextlib import asynccontextmanager
+
+import asyncpg
+import httpx
+from jose import JWTError, jwt
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from loadtest.stack import JWT_SECRET, POSTGREST_URL, database_url
+
+ACCESS_TOKEN_TTL_SECONDS = 3600
+
+# Request headers PostgREST needs; everything else stays at the gateway
+FORWARDED_REQUEST_HEADERS = (
+    "accept", "accept-profile", "authorization", "content-profile",
+    "content-type", "prefer", "range", "range-unit",
+)
+FORWARDED_RESPONSE_HEADERS = (
+    "content-type", "content-range", "location", "preference-applied",
+)
+
+USER_COLUMNS = "id, email, encrypted_password, raw_user_meta_data, email_confirmed_at, created_at, updated_at"
+
+state = {}
+
+# Refresh token -> user id, per process
+refresh_tokens = {}
+
+
+def hash_password(password: str) -> str:
+    """Password hash stored in auth.users.encrypted_password"""
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+def _auth_error(status_code: int, message: str) -> JSONResponse:
+    return JSONResponse({"code": status_code, "msg": message, "error_description": message}, status_code=status_code)
+
+
+def _user_json(row) -> dict:
+    metadata = row["raw_user_meta_data"]
+    return {
+        "id": str(row["id"]),
+        "aud": "authenticated",
+        "role": "authenticated",
+        "email": row["email"],
+        "email_confirmed_at": row["email_confirmed_at"].isoformat() if row["email_confirmed_at"] else None,
+        "app_metadata": {"provider": "email", "providers": ["email"]},
+        "user_metadata": json.loads(metadata) if isinstance(metadata, str) else metadata,
+        "created_at": row["created_at"].isoformat(),
+        "updated_at": row["updated_at"].isoformat(),
+    }
+
+
+def _session_json(row) -> dict:
+    now = int(time.time())
+    access_token = jwt.encode(
+        {
+            "sub": str(row["id"]),
+            "email": row["email"],
+            "role": "authenticated",
+            "aud": "authenticated",
+            "iat": now,
+            "exp": now + ACCESS_TOKEN_TTL_SECONDS,
+        },
+        JWT_SECRET,
+        algorithm="HS256",
+    )
+    refresh_token = secrets.token_urlsafe(24)
+    refresh_tokens[refresh_token] = row["id"]
+
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_TTL_SECONDS,
+        "expires_at": now + ACCESS_TOKEN_TTL_SECONDS,
+        "refresh_token": refresh_token,
+        "user": _user_json(row),
+    }
+
+
+async def _user_by_id(user_id):
+    return await state["pool"].fetchrow(f"SELECT {USER_COLUMNS} FROM auth.users WHERE id = $1", user_id)
+
+
+async def token(request: Request):
+    body = await request.json()
+    grant_type = request.query_params.get("grant_type")
+
+    if grant_type == "password":
+        row = await state["pool"].fetchrow(
+            f"SELECT {USER_COLUMNS} FROM auth.users WHERE email = $1", body.get("email", "")
+        )
+        if not row or row["encrypted_password"] != hash_password(body.get("password", "")):
+            return _auth_error(400, "Invalid login credentials")
+        return JSONResponse(_session_json(row))
+
+    if grant_type == "refresh_token":
+        user_id = refresh_tokens.pop(body.get("refresh_token", ""), None)
+        row = await _user_by_id(user_id) if user_id else None
+        if not row:
+            return _auth_error(400, "Invalid Refresh Token: Refresh Token Not Found")
+        return JSONResponse(_session_json(row))
+
+    return _auth_error(400, f"Unsupported grant type: {grant_type}")
+
+
+async def signup(request: Request):
+    body = await request.json()
+    metadata = (body.get("data") or {})
+    row = await state["pool"].fetchrow(
+        f"""
+        INSERT INTO auth.users (id, email, encrypted_password, raw_user_meta_data)
+        VALUES ($1, $2, $3, $4::jsonb)
+        ON CONFLICT (email) DO NOTHING
+        RETURNING {USER_COLUMNS}
+        """,
+        uuid.uuid4(), body.get("email"), hash_password(body.get("password", "")), json.dumps(metadata),
+    )
+    if not row:
+        return _auth_error(422, "User already registered")
+    return JSONResponse(_session_json(row))
+
+
+async def get_user(request: Request):
+    access_token = request.headers.get("authorization", "").removeprefix("Bearer ")
+    try:
+        claims = jwt.decode(access_token, JWT_SECRET, algorithms=["HS256"], audience="authenticated")
+    except JWTError:
+        return _auth_error(401, "invalid JWT: unable to parse or verify signature")
+
+    row = await _user_by_id(uuid.UUID(claims["sub"]))
+    if not row:
+        return _auth_error(404, "User not found")
+    return JSONResponse(_user_json(row))
+
+
+async def logout(request: Request):
+    return Response(status_code=204)
+
+
+async def rest(request: Request):
+    headers = {
+        name: value for name, value in request.headers.items()
+        if name in FORWARDED_REQUEST_HEADERS
+    }
+    upstream = await state["postgrest"].request(
+        request.method,
+        "/" + request.path_params["path"],
+        params=request.query_params.multi_items(),
+        headers=headers,
+        content=await request.body(),
+    )
+    return Response(
+        upstream.content,
+        status_code=upstream.status_code,
+        headers={
+            name: value for name, value in upstream.headers.items()
+            if name in FORWARDED_RESPONSE_HEADERS
+        },
+    )
+
+
+@asynccontextmanager
+async def lifespan(app):
+    state["pool"] = await asyncpg.create_pool(database_url(), min_size=2, max_size=10)
+    state["postgrest"] = httpx.AsyncClient(
+        base_url=POSTGREST_URL,
+        timeout=60,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=100),
+    )
+    try:
+        yield
+    finally:
+        await state["postgrest"].aclose()
+        await state["pool"].close()
+
+
+app = Starlette(
+    routes=[
+        Route("/auth/v1/token", token, methods=["POST"]),
+        Route("/auth/v1/signup", signup, methods=["POST"]),
+        Route("/auth/v1/user", get_user, methods=["GET"]),
+        Route("/auth/v1/logout", logout, methods=["POST"]),
+        Route("/rest/v1/{path:path}", rest, methods=["GET", "POST", "PATCH", "PUT", "DELETE", "HEAD"]),
+    ],
+    lifespan=lifespan,
+)
@@ -0,0 +1,326 @@
+"""
+Drive the API hot paths with concurrent virtual users
+
+Usage:
+    python -m loadtest.run [--base-url http://127.0.0.1:8000] [--concurrency 20]
+                           [--duration 60 | --iterations 10] [--reviews 20] [--pdf-every 10]
+                           [--output results.json] [--save-baseline] [--tolerance 0.2]
+
+Each virtual user repeatedly runs one study journey as a seeded user:
+
+    login -> list decks -> start session -> review x N -> complete -> stats overview
+
+and every --pdf-every-th journey also uploads a generated PDF (concept
+extraction and mnemonic generation against the fake Anthropic API).
+
+Prints count, errors, p50/p95/p99 latency and throughput per step. When a
+baseline exists (loadtest/baseline.json by default) the run is compared
+against it and the exit code is 1 if any step's p95 grew, or its
+throughput fell, by more than --tolerance. --save-baseline records this run
+as the new baseline instead. Compare runs made with the same arguments on
+the same machine.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+from loadtest.stack import SEED_PASSWORD, user_email
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+STEPS = (
+    "login", "list_decks", "start_session", "review",
+    "complete_session", "stats_overview", "pdf_upload",
+)
+
+# Arguments that change what a run measures; baselines are only comparable when they match
+WORKLOAD_ARGS = ("concurrency", "reviews", "pdf_every", "users")
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def make_pdf(lines: list) -> bytes:
+    """A minimal one-page PDF with the given lines of text"""
+    def escape(text: str) -> str:
+        return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    stream = "BT /F1 11 Tf 14 TL 50 780 Td " + " ".join(f"({escape(line)}) '" for line in lines) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+        "/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream",
+    ]
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def pdf_lines(tag: str) -> list:
+    """Study notes made unique per upload, so identical uploads aren't coalesced"""
+    return [f"Cardiology notes {tag}"] + [
+        f"{i}. Key fact number {i} about the cardiac cycle and its phases." for i in range(1, 31)
+    ]
+
+
+class Recorder:
+    """Latencies and errors per step"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.error_samples = {}
+
+    def record(self, step: str, elapsed_ms: float, response: httpx.Response = None, error: str = None) -> bool:
+        ok = error is None and response is not None and response.status_code < 400
+        self.latencies[step].append(elapsed_ms)
+        if not ok:
+            self.errors[step] += 1
+            if step not in self.error_samples:
+                self.error_samples[step] = error or f"HTTP {response.status_code}: {response.text[:200]}"
+        return ok
+
+    def summary(self, wall_seconds: float) -> dict:
+        steps = {}
+        for step in STEPS:
+            values = sorted(self.latencies.get(step, []))
+            if not values:
+                continue
+            steps[step] = {
+                "count": len(values),
+                "errors": self.errors.get(step, 0),
+                "p50_ms": round(percentile(values, 50), 1),
+                "p95_ms": round(percentile(values, 95), 1),
+                "p99_ms": round(percentile(values, 99), 1),
+                "rps": round(len(values) / wall_seconds, 2),
+            }
+
+        total = sum(step["count"] for step in steps.values())
+        return {
+            "steps": steps,
+            "total": {
+                "count": total,
+                "errors": sum(step["errors"] for step in steps.values()),
+                "rps": round(total / wall_seconds, 2),
+            },
+        }
+
+
+class VirtualUser:
+    """One simulated user running study journeys back to back"""
+
+    def __init__(self, index: int, client: httpx.AsyncClient, recorder: Recorder, args):
+        self.index = index
+        self.client = client
+        self.recorder = recorder
+        self.args = args
+        self.rng = random.Random(args.seed + index)
+        self.email = user_email(index % args.users)
+
+    async def call(self, step: str, method: str, path: str, **kwargs):
+        """Time one request; returns the JSON body, or None on failure"""
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, **kwargs)
+        except httpx.HTTPError as e:
+            self.recorder.record(step, (time.perf_counter() - start) * 1000, error=f"{type(e).__name__}: {e}")
+            return None
+
+        if not self.recorder.record(step, (time.perf_counter() - start) * 1000, response):
+            return None
+        return response.json() if response.content else {}
+
+    async def journey(self, number: int) -> None:
+        login = await self.call(
+            "login", "POST", "/auth/login",
+            json={"email": self.email, "password": SEED_PASSWORD},
+        )
+        if not login or not login.get("session"):
+            return
+        headers = {"Authorization": f"Bearer {login['session']['access_token']}"}
+
+        decks = await self.call("list_decks", "GET", "/decks", headers=headers)
+        if not decks or not decks.get("decks"):
+            return
+        deck_id = self.rng.choice(decks["decks"])["id"]
+
+        session = await self.call("start_session", "POST", f"/study/{deck_id}/start", headers=headers)
+        if session and session.get("session_id"):
+            for card in session["due_cards"][:self.args.reviews]:
+                await self.call(
+                    "review", "POST", "/study/review", headers=headers,
+                    json={
+                        "flashcard_id": card["id"],
+                        "quality": self.rng.choice((1, 3, 3, 5)),
+                        "session_id": session["session_id"],
+                        "response_time_ms": self.rng.randint(1500, 15000),
+                    },
+                )
+            await self.call(
+                "complete_session", "POST", "/study/complete", headers=headers,
+                json={"session_id": session["session_id"], "duration_seconds": 300},
+            )
+
+        await self.call("stats_overview", "GET", "/stats/overview", headers=headers)
+
+        if self.args.pdf_every and number % self.args.pdf_every == self.index % self.args.pdf_every:
+            pdf = make_pdf(pdf_lines(f"{self.index}-{number}"))
+            await self.call(
+                "pdf_upload", "POST", "/pdf/upload-and-generate", headers=headers,
+                data={"deck_id": deck_id},
+                files={"file": ("notes.pdf", pdf, "application/pdf")},
+            )
+
+    async def run(self, deadline: float) -> None:
+        number = 0
+        while True:
+            if self.args.iterations and number >= self.args.iterations:
+                return
+            if not self.args.iterations and time.perf_counter() >= deadline:
+                return
+            await self.journey(number)
+            number += 1
+
+
+async def run_load(args) -> dict:
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(
+        base_url=args.base_url.rstrip("/") + "/api/v1",
+        timeout=args.timeout,
+        limits=limits,
+    ) as client:
+        start = time.perf_counter()
+        deadline = start + args.duration
+        await asyncio.gather(*(
+            VirtualUser(i, client, recorder, args).run(deadline) for i in range(args.concurrency)
+        ))
+        wall_seconds = time.perf_counter() - start
+
+    result = recorder.summary(wall_seconds)
+    result["error_samples"] = recorder.error_samples
+    result["wall_seconds"] = round(wall_seconds, 1)
+    result["workload"] = {name: getattr(args, name) for name in WORKLOAD_ARGS}
+    result["recorded_at"] = datetime.now(timezone.utc).isoformat()
+    result["host"] = platform.node()
+    return result
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    """Rows of (step, metric, baseline, current, change, regressed) for steps in both runs"""
+    rows = []
+    for step, current in result["steps"].items():
+        previous = baseline.get("steps", {}).get(step)
+        if not previous:
+            continue
+        for metric, higher_is_worse in (("p95_ms", True), ("rps", False)):
+            before, after = previous[metric], current[metric]
+            if not before:
+                continue
+            change = (after - before) / before
+            regressed = change > tolerance if higher_is_worse else change < -tolerance
+            rows.append((step, metric, before, after, change, regressed))
+    return rows
+
+
+def print_report(result: dict) -> None:
+    print(f"\n{'step':<18}{'count':>8}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'rps':>9}")
+    for step, row in result["steps"].items():
+        print(
+            f"{step:<18}{row['count']:>8}{row['errors']:>8}{row['p50_ms']:>10}"
+            f"{row['p95_ms']:>10}{row['p99_ms']:>10}{row['rps']:>9}"
+        )
+    total = result["total"]
+    print(f"{'total':<18}{total['count']:>8}{total['errors']:>8}{'':>30}{total['rps']:>9}")
+
+    for step, sample in result["error_samples"].items():
+        print(f"⚠️  {step}: {sample}")
+
+
+def main() -> bool:
+    parser = argparse.ArgumentParser(description="Load test the API hot paths")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=20, help="Virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds to run (ignored with --iterations)")
+    parser.add_argument("--iterations", type=int, default=0, help="Journeys per virtual user")
+    parser.add_argument("--users", type=int, default=50, help="Seeded users to log in as")
+    parser.add_argument("--reviews", type=int, default=20, help="Reviews per study session")
+    parser.add_argument("--pdf-every", type=int, default=10, help="Upload a PDF every N journeys (0 to skip)")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="Write the results as JSON")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Record this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    mode = f"{args.iterations} journeys each" if args.iterations else f"{args.duration:g}s"
+    print(f"🚀 {args.concurrency} virtual users against {args.base_url} for {mode}")
+    result = asyncio.run(run_load(args))
+    print_report(result)
+
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2))
+        print(f"\n📝 Results written to {args.output}")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(result, indent=2))
+        print(f"\n📌 Baseline saved to {args.baseline}")
+        return result["total"]["errors"] == 0
+
+    if not args.baseline.exists():
+        print(f"\nℹ️  No baseline at {args.baseline}; record one with --save-baseline")
+        return result["total"]["errors"] == 0
+
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("workload") != result["workload"]:
+        print(f"\n⚠️  Baseline workload {baseline.get('workload')} differs from this run's {result['workload']}")
+
+    print(f"\nvs baseline from {baseline.get('recorded_at', '?')} (tolerance {args.tolerance:.0%}):")
+    regressions = 0
+    for step, metric, before, after, change, regressed in compare(result, baseline, args.tolerance):
+        regressions += regressed
+        marker = "❌" if regressed else "  "
+        print(f"{marker} {step:<18}{metric:<8}{before:>10} -> {after:<10}{change:+.1%}")
+
+    if regressions:
+        print(f"\n❌ {regressions} regression(s) beyond {args.tolerance:.0%}")
+        return False
+
+    print("\n✅ No regressions")
+    return result["total"]["errors"] == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
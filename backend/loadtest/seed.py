@@ -0,0 +1,186 @@
+"""
+Seed the load-test database
+
+Usage:
+    python -m loadtest.seed [--users 50] [--decks-per-user 5] [--min-cards 10] [--max-cards 10000]
+                            [--reviews-per-user 2000] [--history-days 365] [--seed 42]
+
+Creates users loadtest-0@example.com ... loadtest-{N-1}@example.com (password
+SEED_PASSWORD), each with decks whose sizes are spread log-uniformly between
+--min-cards and --max-cards, cards whose next review dates range from 30
+days overdue to 90 days ahead, and a review history grouped into completed
+study sessions. Rows are written with COPY, with triggers off for
+everything but auth.users (whose trigger creates the profiles), so the
+denormalized columns (decks.card_count, flashcards.user_id) are filled in
+here. The same --seed gives the same data.
+
+Run `python -m loadtest.stack setup` first; seeding appends, so rerun setup
+to start over.
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import asyncpg
+
+from loadtest.fake_supabase import hash_password
+from loadtest.stack import SEED_PASSWORD, database_url, user_email
+
+REVIEWS_PER_SESSION = 20
+QUALITIES = (1, 3, 3, 3, 5, 5)  # Mostly "Good", as in real review logs
+
+FLASHCARD_COLUMNS = (
+    "id", "deck_id", "user_id", "front", "back", "difficulty", "ease_factor",
+    "interval_days", "repetitions", "next_review_date", "last_reviewed_at",
+    "created_at", "updated_at",
+)
+SESSION_COLUMNS = (
+    "id", "user_id", "deck_id", "cards_reviewed", "duration_seconds", "started_at", "completed_at",
+)
+REVIEW_COLUMNS = (
+    "id", "session_id", "flashcard_id", "user_id", "quality", "response_time_ms",
+    "previous_interval", "new_interval", "previous_ease_factor", "new_ease_factor", "reviewed_at",
+)
+
+
+def make_uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def deck_size(rng: random.Random, min_cards: int, max_cards: int) -> int:
+    """Card count drawn log-uniformly, so small and huge decks are both common"""
+    return int(round(math.exp(rng.uniform(math.log(min_cards), math.log(max_cards)))))
+
+
+def build_user(rng: random.Random, user_id: uuid.UUID, args, now: datetime) -> dict:
+    """All rows for one user, keyed by table"""
+    today = now.date()
+    decks, flashcards, sessions, reviews = [], [], [], []
+
+    for d in range(args.decks_per_user):
+        deck_id = make_uuid(rng)
+        size = deck_size(rng, args.min_cards, args.max_cards)
+        created = now - timedelta(days=args.history_days + 1)
+        decks.append((deck_id, user_id, f"Load test deck {d + 1}", size, created))
+
+        for c in range(size):
+            interval = rng.choice((0, 1, 3, 7, 14, 30, 60))
+            flashcards.append((
+                make_uuid(rng), deck_id, user_id,
+                f"Deck {d + 1} question {c + 1}", f"Answer {c + 1}",
+                rng.choice(("easy", "medium", "hard")),
+                round(rng.uniform(1.3, 2.8), 2),
+                interval,
+                0 if interval == 0 else rng.randint(1, 8),
+                today + timedelta(days=rng.randint(-30, 90)),
+                None if interval == 0 else now - timedelta(days=interval),
+                created, created,
+            ))
+
+    # Reviews grouped into completed sessions spread over the history window
+    for _ in range(max(1, args.reviews_per_user // REVIEWS_PER_SESSION)):
+        if not flashcards or not args.reviews_per_user:
+            break
+        card = rng.choice(flashcards)
+        deck_id = card[1]
+        session_id = make_uuid(rng)
+        started = now - timedelta(days=rng.uniform(0, args.history_days))
+        cards = [card] + [rng.choice(flashcards) for _ in range(REVIEWS_PER_SESSION - 1)]
+
+        reviewed_at = started
+        for reviewed in cards:
+            response_time_ms = rng.randint(1500, 15000)
+            reviewed_at += timedelta(milliseconds=response_time_ms)
+            previous_interval = rng.choice((0, 1, 3, 7, 14, 30))
+            reviews.append((
+                make_uuid(rng), session_id, reviewed[0], user_id, rng.choice(QUALITIES), response_time_ms,
+                previous_interval, max(1, previous_interval * 2), 2.5, 2.5, reviewed_at,
+            ))
+
+        duration = int((reviewed_at - started).total_seconds())
+        sessions.append((session_id, user_id, deck_id, len(cards), duration, started, reviewed_at))
+
+    return {"decks": decks, "flashcards": flashcards, "study_sessions": sessions, "card_reviews": reviews}
+
+
+async def seed(args) -> bool:
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc)
+    conn = await asyncpg.connect(database_url())
+
+    try:
+        # Monthly card_reviews partitions must exist for the whole history
+        await conn.execute(
+            "SELECT create_card_review_partitions($1::DATE)",
+            date.today() - timedelta(days=args.history_days + 1),
+        )
+
+        print(f"👤 Creating {args.users} users...")
+        user_ids = [make_uuid(rng) for _ in range(args.users)]
+        password = hash_password(SEED_PASSWORD)
+        await conn.copy_records_to_table(
+            "users",
+            schema_name="auth",
+            columns=("id", "email", "encrypted_password"),
+            records=[(user_id, user_email(i), password) for i, user_id in enumerate(user_ids)],
+        )
+
+        await conn.execute("SET session_replication_role = replica")
+        totals = {"decks": 0, "flashcards": 0, "study_sessions": 0, "card_reviews": 0}
+        start = time.perf_counter()
+
+        for i, user_id in enumerate(user_ids):
+            rows = build_user(rng, user_id, args, now)
+            async with conn.transaction():
+                await conn.copy_records_to_table(
+                    "decks",
+                    columns=("id", "user_id", "name", "card_count", "created_at"),
+                    records=rows["decks"],
+                )
+                await conn.copy_records_to_table("flashcards", columns=FLASHCARD_COLUMNS, records=rows["flashcards"])
+                await conn.copy_records_to_table("study_sessions", columns=SESSION_COLUMNS, records=rows["study_sessions"])
+                await conn.copy_records_to_table("card_reviews", columns=REVIEW_COLUMNS, records=rows["card_reviews"])
+
+            for table, table_rows in rows.items():
+                totals[table] += len(table_rows)
+            print(f"   {i + 1}/{args.users} users, {totals['flashcards']} cards", end="\r")
+
+        await conn.execute("SET session_replication_role = DEFAULT")
+        await conn.execute("ANALYZE")
+    except asyncpg.PostgresError as e:
+        print(f"\n❌ Seeding failed: {str(e)}")
+        return False
+    finally:
+        await conn.close()
+
+    print(f"\n✅ Seeded in {time.perf_counter() - start:.1f}s: " + ", ".join(
+        f"{count} {table}" for table, count in totals.items()
+    ))
+    return True
+
+
+def main() -> bool:
+    parser = argparse.ArgumentParser(description="Seed the load-test database")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--decks-per-user", type=int, default=5)
+    parser.add_argument("--min-cards", type=int, default=10)
+    parser.add_argument("--max-cards", type=int, default=10000)
+    parser.add_argument("--reviews-per-user", type=int, default=2000)
+    parser.add_argument("--history-days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=42, help="Random seed, for reproducible data")
+    args = parser.parse_args()
+
+    if not 1 <= args.min_cards <= args.max_cards:
+        parser.error("--min-cards must be between 1 and --max-cards")
+    return asyncio.run(seed(args))
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,169 @@
+"""
+Load-test stack: database setup, fake services and API environment
+
+Usage:
+    python -m loadtest.stack setup          # (re)create the load-test database
+    python -m loadtest.stack fakes [--anthropic-latency-ms 800]
+    python -m loadtest.stack env            # KEY=VALUE lines for the API under test
+
+setup drops and recreates LOADTEST_DATABASE next to the database in
+DATABASE_URL (the docker-compose Postgres by default), applies
+bootstrap.sql, the alembic revisions and then the hand-applied SQL
+migrations in order, and asks PostgREST to reload its schema cache.
+
+fakes serves the Supabase gateway and the Anthropic API from one process.
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import asyncpg
+from jose import jwt
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+LOADTEST_DATABASE = "brainkit_loadtest"
+
+# Must match PGRST_JWT_SECRET of the postgrest service in docker-compose.yml
+JWT_SECRET = "loadtest-jwt-secret-not-for-production-use"
+
+SUPABASE_PORT = 54321
+ANTHROPIC_PORT = 54322
+POSTGREST_URL = os.environ.get("LOADTEST_POSTGREST_URL", "http://127.0.0.1:54320")
+
+# Every seeded user logs in with this password
+SEED_PASSWORD = "loadtest-password"
+
+MIGRATIONS_DIR = BACKEND_DIR / "alembic" / "versions"
+
+
+def user_email(index: int) -> str:
+    """Email of the index-th seeded user"""
+    return f"loadtest-{index}@example.com"
+
+
+def database_url(database: str = LOADTEST_DATABASE) -> str:
+    """DATABASE_URL with the database name swapped"""
+    url = make_url(settings.DATABASE_URL).set(database=database)
+    return url.render_as_string(hide_password=False)
+
+
+def api_key(role: str) -> str:
+    """A non-expiring Supabase-style API key for the given PostgREST role"""
+    return jwt.encode({"role": role, "iss": "loadtest"}, JWT_SECRET, algorithm="HS256")
+
+
+def api_env() -> dict:
+    """Environment for the API process under test"""
+    return {
+        "DEBUG": "false",
+        "DATABASE_URL": database_url(),
+        "DATABASE_CONNECTION_MODE": "direct",
+        "SUPABASE_URL": f"http://127.0.0.1:{SUPABASE_PORT}",
+        "SUPABASE_ANON_KEY": api_key("anon"),
+        "SUPABASE_SERVICE_ROLE_KEY": api_key("service_role"),
+        "CLAUDE_API_KEY": "loadtest",
+        "ANTHROPIC_API_URL": f"http://127.0.0.1:{ANTHROPIC_PORT}",
+        "RATE_LIMIT_ENABLED": "false",
+    }
+
+
+def sql_migrations() -> list:
+    """Hand-applied SQL migrations, skipping those that have an alembic revision"""
+    revisions = {path.name[:3] for path in MIGRATIONS_DIR.glob("*.py")}
+    return sorted(
+        path for path in MIGRATIONS_DIR.glob("*.sql")
+        if path.name[:3] not in revisions
+    )
+
+
+async def setup() -> bool:
+    """Recreate the load-test database and apply the full schema"""
+    print(f"🗄️  Recreating database {LOADTEST_DATABASE}...")
+    conn = await asyncpg.connect(settings.DATABASE_URL)
+    try:
+        await conn.execute(f'DROP DATABASE IF EXISTS "{LOADTEST_DATABASE}" WITH (FORCE)')
+        await conn.execute(f'CREATE DATABASE "{LOADTEST_DATABASE}"')
+    finally:
+        await conn.close()
+
+    conn = await asyncpg.connect(database_url())
+    try:
+        print("   bootstrap.sql")
+        await conn.execute((Path(__file__).parent / "bootstrap.sql").read_text())
+
+        print("   alembic upgrade head")
+        result = subprocess.run(
+            [sys.executable, "-m", "alembic", "upgrade", "head"],
+            cwd=BACKEND_DIR,
+            env={**os.environ, "DATABASE_URL": database_url()},
+        )
+        if result.returncode != 0:
+            print("❌ alembic upgrade failed")
+            return False
+
+        for path in sql_migrations():
+            print(f"   {path.name}")
+            await conn.execute(path.read_text())
+
+        await conn.execute("NOTIFY pgrst, 'reload schema'")
+    except asyncpg.PostgresError as e:
+        print(f"❌ Setup failed: {str(e)}")
+        return False
+    finally:
+        await conn.close()
+
+    print(f"✅ {LOADTEST_DATABASE} ready")
+    return True
+
+
+async def serve_fakes(anthropic_latency_ms: int) -> bool:
+    """Serve the fake Supabase gateway and Anthropic API until interrupted"""
+    import uvicorn
+
+    from loadtest import fake_anthropic, fake_supabase
+
+    fake_anthropic.configure(latency_ms=anthropic_latency_ms)
+    servers = [
+        uvicorn.Server(uvicorn.Config(fake_supabase.app, port=SUPABASE_PORT, log_level="warning")),
+        uvicorn.Server(uvicorn.Config(fake_anthropic.app, port=ANTHROPIC_PORT, log_level="warning")),
+    ]
+
+    print(f"🎭 Fake Supabase on :{SUPABASE_PORT} (PostgREST at {POSTGREST_URL})")
+    print(f"🎭 Fake Anthropic on :{ANTHROPIC_PORT} ({anthropic_latency_ms}ms latency)")
+    await asyncio.gather(*(server.serve() for server in servers))
+    return True
+
+
+def main() -> bool:
+    parser = argparse.ArgumentParser(description="Load-test stack")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("setup", help="(Re)create and migrate the load-test database")
+    fakes = commands.add_parser("fakes", help="Serve the fake Supabase and Anthropic APIs")
+    fakes.add_argument(
+        "--anthropic-latency-ms", type=int, default=800,
+        help="Mean latency of a fake Claude response",
+    )
+    commands.add_parser("env", help="Print the environment for the API under test")
+    args = parser.parse_args()
+
+    if args.command == "setup":
+        return asyncio.run(setup())
+    if args.command == "fakes":
+        return asyncio.run(serve_fakes(args.anthropic_latency_ms))
+
+    for key, value in api_env().items():
+        print(f"{key}={value}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
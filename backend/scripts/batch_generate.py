@@ -0,0 +1,81 @@
+"""
+Script to run bulk generation jobs through the Message Batches API
+
+Usage:
+    python scripts/batch_generate.py flashcards (--deck-id ID ... | --all-decks) [--replace]
+    python scripts/batch_generate.py mnemonics --user-id ID --file lists.json
+
+Regenerated flashcards are added to each deck, skipping questions it already
+has. --replace also deletes the cards the new set doesn't contain, along with
+their review history (cards the user edited are kept).
+
+The mnemonics input file is a JSON array of {"list_items": [...], "deck_id": "..."}.
+Set ANTHROPIC_API_URL to run against a local fake server.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.services.batch_generation_service import batch_generation_service  # noqa: E402
+
+
+async def run(args: argparse.Namespace) -> bool:
+    """Run the selected batch job and print a summary"""
+    if args.command == "flashcards":
+        print("🚀 Regenerating flashcards via Message Batches")
+        result = await batch_generation_service.regenerate_flashcards_batch(
+            deck_ids=args.deck_id,
+            replace_existing=args.replace,
+            all_decks=args.all_decks,
+        )
+        print(f"📦 Batch: {result['batch_id']}")
+        print(f"✅ {result['flashcard_count']} flashcards added to {len(result['deck_ids'])} decks")
+        if args.replace:
+            print(f"🗑️  {result['removed_count']} flashcards removed")
+    else:
+        with open(args.file, "r") as f:
+            lists = json.load(f)
+
+        print(f"🚀 Generating mnemonics for {len(lists)} lists via Message Batches")
+        result = await batch_generation_service.generate_mnemonics_batch([
+            {"user_id": args.user_id, "list_items": entry["list_items"], "deck_id": entry.get("deck_id")}
+            for entry in lists
+        ])
+        print(f"📦 Batch: {result['batch_id']}")
+        print(f"✅ {len(result['generations'])} generations saved")
+
+    for key, message in result["errors"].items():
+        print(f"❌ {key}: {message}")
+
+    return not result["errors"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    flashcards = subparsers.add_parser("flashcards", help="Regenerate flashcards for decks")
+    targets = flashcards.add_mutually_exclusive_group(required=True)
+    targets.add_argument("--deck-id", action="append", help="Deck to regenerate (repeatable)")
+    targets.add_argument("--all-decks", action="store_true", help="Regenerate every eligible deck")
+    flashcards.add_argument(
+        "--replace", action="store_true",
+        help="Delete cards missing from the new set, with their review history",
+    )
+
+    mnemonics = subparsers.add_parser("mnemonics", help="Pre-generate mnemonics for imported lists")
+    mnemonics.add_argument("--user-id", required=True, help="Owner of the generations")
+    mnemonics.add_argument("--file", required=True, help="JSON file with the lists")
+
+    success = asyncio.run(run(parser.parse_args()))
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Script to benchmark the per-request overhead of the CORS middleware
+
+Usage:
+    python scripts/benchmark_cors.py [--requests 20000]
+
+Calls a minimal FastAPI app in process (no server, no network) with no
+middleware, with the previous BaseHTTPMiddleware implementation and with the
+pure ASGI CORSCustomMiddleware. For each it prints the mean time per
+request and the overhead over the bare app, for a JSON response and a
+streamed response.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+
+# Add parent directory to path to import app modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.config import settings  # noqa: E402
+from app.core.cors import CORSCustomMiddleware  # noqa: E402
+
+ORIGIN = settings.CORS_ORIGINS[-1]
+
+
+class BaseHTTPCORSMiddleware(BaseHTTPMiddleware):
+    """The CORS middleware previously defined in app/main.py, for comparison"""
+
+    async def dispatch(self, request: Request, call_next):
+        origin = request.headers.get("origin", "")
+        is_allowed = origin in settings.CORS_ORIGINS or not origin
+
+        if request.method == "OPTIONS":
+            if is_allowed:
+                return Response(
+                    status_code=200,
+                    headers={
+                        "Access-Control-Allow-Origin": origin,
+                        "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, PATCH, OPTIONS",
+                        "Access-Control-Allow-Headers": "Authorization, Content-Type",
+                        "Access-Control-Allow-Credentials": "true",
+                        "Access-Control-Max-Age": "600",
+                    },
+                )
+            return Response(status_code=403)
+
+        response = await call_next(request)
+        if is_allowed:
+            response.headers["Access-Control-Allow-Origin"] = origin
+            response.headers["Access-Control-Allow-Credentials"] = "true"
+            response.headers["Access-Control-Expose-Headers"] = "*"
+        return response
+
+
+def make_app(middleware) -> FastAPI:
+    """Minimal app with one JSON and one streaming route"""
+    app = FastAPI()
+
+    @app.get("/json")
+    async def json_route():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream_route():
+        async def chunks():
+            for i in range(10):
+                yield f"data: {i}\n\n"
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    if middleware is BaseHTTPCORSMiddleware:
+        app.add_middleware(middleware)
+    elif middleware is not None:
+        app.add_middleware(middleware, allow_origins=settings.CORS_ORIGINS)
+    return app
+
+
+async def time_requests(app: FastAPI, path: str, requests: int) -> float:
+    """Mean microseconds per request through the ASGI app"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": [(b"host", b"bench"), (b"origin", ORIGIN.encode())],
+        "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+
+    never = asyncio.Event()
+
+    def make_receive():
+        # Like a server: the request body once, then nothing until disconnect
+        sent = False
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await never.wait()
+
+        return receive
+
+    async def send(message):
+        pass
+
+    for _ in range(200):
+        await app(dict(scope), make_receive(), send)
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), make_receive(), send)
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+async def main() -> bool:
+    """Run the benchmark and print a summary"""
+    parser = argparse.ArgumentParser(description="Benchmark CORS middleware overhead")
+    parser.add_argument("--requests", type=int, default=20000, help="Requests per measurement")
+    args = parser.parse_args()
+
+    print(f"🧪 {args.requests} in-process requests each, Origin: {ORIGIN}\n")
+    ok = True
+    for path in ("/json", "/stream"):
+        bare = await time_requests(make_app(None), path, args.requests)
+        legacy = await time_requests(make_app(BaseHTTPCORSMiddleware), path, args.requests)
+        asgi = await time_requests(make_app(CORSCustomMiddleware), path, args.requests)
+        ok = ok and asgi < legacy
+
+        print(f"GET {path}")
+        print(f"   no middleware       {bare:7.1f}µs")
+        print(f"   BaseHTTPMiddleware  {legacy:7.1f}µs  ({legacy - bare:+.1f}µs)")
+        print(f"   pure ASGI           {asgi:7.1f}µs  ({asgi - bare:+.1f}µs)")
+
+    return ok
+
+
+if __name__ == "__main__":
+    success = asyncio.run(main())
+    sys.exit(0 if success else 1)
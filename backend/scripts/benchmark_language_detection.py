@@ -0,0 +1,66 @@
+"""
+Script to benchmark the shared language detector
+
+Usage:
+    python scripts/benchmark_language_detection.py [--size-kb 100] [--runs 1000]
+
+Classifies a generated text of the given size in every supported language
+and prints the mean and p99 time per call. Target: < 1ms for 100KB.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.language import SUPPORTED_LANGUAGES, detect  # noqa: E402
+
+SAMPLES = {
+    "en": "The heart pumps blood through the arteries and the veins return it to the heart. ",
+    "es": "El corazón bombea la sangre por las arterias y las venas la devuelven al corazón. ",
+    "pt": "O coração bombeia o sangue pelas artérias e as veias devolvem o sangue ao coração. ",
+    "fr": "Le cœur pompe le sang dans les artères et les veines le ramènent vers le cœur. ",
+    "de": "Das Herz pumpt das Blut durch die Arterien und die Venen bringen es zum Herzen zurück. ",
+    "it": "Il cuore pompa il sangue nelle arterie e le vene lo riportano al cuore. ",
+}
+
+
+def main() -> bool:
+    """Run the benchmark and print a summary"""
+    parser = argparse.ArgumentParser(description="Benchmark language detection")
+    parser.add_argument("--size-kb", type=int, default=100, help="Size of the text to classify")
+    parser.add_argument("--runs", type=int, default=1000, help="Calls per language")
+    args = parser.parse_args()
+
+    ok = True
+    for language in SUPPORTED_LANGUAGES:
+        sentence = SAMPLES[language]
+        text = sentence * (args.size_kb * 1024 // len(sentence) + 1)
+
+        timings = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            guess = detect(text)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        timings.sort()
+        mean_ms = statistics.mean(timings)
+        p99_ms = timings[int(len(timings) * 0.99) - 1]
+        correct = guess.language == language
+        ok = ok and correct and mean_ms < 1.0
+
+        status = "✅" if correct else "❌"
+        print(
+            f"{status} {language}: detected={guess.language} confidence={guess.confidence:.2f} "
+            f"mean={mean_ms:.3f}ms p99={p99_ms:.3f}ms"
+        )
+
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,119 @@
+"""
+Script to benchmark response serialization and compression
+
+Usage:
+    python scripts/benchmark_responses.py [--cards 2000] [--runs 50]
+
+Builds a flashcard list response of the given size (the shape returned by
+GET /flashcards/deck/{id} and the due-card endpoints), then prints the mean
+time to render it with the standard JSON encoder and with orjson, and the
+size and time of every gzip level and brotli quality around the configured
+ones.
+"""
+
+import argparse
+import gzip
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import brotli
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+# Add parent directory to path to import app modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.config import settings  # noqa: E402
+
+TERMS = [
+    "Epinephrine", "Amiodarone", "Atropine", "Adenosine", "Lidocaine", "Vasopressin",
+    "Mitochondria", "Ribosome", "Golgi apparatus", "Lysosome", "Nucleus", "Cytoskeleton",
+    "Photosynthesis", "Glycolysis", "Krebs cycle", "Oxidative phosphorylation",
+]
+DEFINITIONS = [
+    "First-line drug for cardiac arrest; 1 mg IV every 3-5 minutes during resuscitation.",
+    "Antiarrhythmic used for shock-refractory ventricular fibrillation; 300 mg IV bolus first.",
+    "Organelle producing most of the cell's ATP through aerobic respiration.",
+    "Converts glucose into two molecules of pyruvate, yielding a net gain of two ATP.",
+    "Series of reactions in the mitochondrial matrix that oxidizes acetyl-CoA to CO2.",
+    "Packages and modifies proteins received from the endoplasmic reticulum for secretion.",
+]
+
+
+def build_payload(cards: int) -> dict:
+    """Build a flashcard list response with realistic field values"""
+    rng = random.Random(42)
+    deck_id, user_id = str(uuid.uuid4()), str(uuid.uuid4())
+    now = datetime(2026, 10, 19, tzinfo=timezone.utc)
+
+    flashcards = []
+    for i in range(cards):
+        created = now - timedelta(minutes=rng.randint(0, 500000))
+        flashcards.append({
+            "id": str(uuid.uuid4()),
+            "deck_id": deck_id,
+            "user_id": user_id,
+            "front": f"What is {rng.choice(TERMS)}? ({i})",
+            "back": " ".join(rng.sample(DEFINITIONS, 2)),
+            "difficulty": rng.choice(["easy", "medium", "hard"]),
+            "ease_factor": round(rng.uniform(1.3, 3.0), 2),
+            "interval_days": rng.randint(0, 180),
+            "repetitions": rng.randint(0, 12),
+            "next_review_date": (date(2026, 10, 19) + timedelta(days=rng.randint(-30, 90))).isoformat(),
+            "last_reviewed_at": created.isoformat(),
+            "created_at": created.isoformat(),
+            "updated_at": created.isoformat(),
+        })
+
+    return {"flashcards": flashcards, "total": cards}
+
+
+def mean_ms(fn, runs: int) -> float:
+    """Mean wall time of fn in milliseconds"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.mean(timings)
+
+
+def main() -> bool:
+    """Run the benchmark and print a summary"""
+    parser = argparse.ArgumentParser(description="Benchmark response serialization and compression")
+    parser.add_argument("--cards", type=int, default=2000, help="Flashcards in the payload")
+    parser.add_argument("--runs", type=int, default=50, help="Runs per measurement")
+    args = parser.parse_args()
+
+    payload = build_payload(args.cards)
+
+    print(f"🧪 {args.cards} flashcards, {args.runs} runs each\n")
+    print("Serialization")
+    json_ms = mean_ms(lambda: JSONResponse(payload).body, args.runs)
+    orjson_ms = mean_ms(lambda: ORJSONResponse(payload).body, args.runs)
+    body = ORJSONResponse(payload).body
+    print(f"   json     {json_ms:7.2f}ms")
+    print(f"   orjson   {orjson_ms:7.2f}ms  ({json_ms / orjson_ms:.1f}x faster)")
+
+    print(f"\nCompression of {len(body) / 1024:.0f} KB")
+    for level in sorted({1, settings.RESPONSE_GZIP_LEVEL, 9}):
+        size = len(gzip.compress(body, compresslevel=level, mtime=0))
+        ms = mean_ms(lambda: gzip.compress(body, compresslevel=level, mtime=0), args.runs)
+        marker = " *" if level == settings.RESPONSE_GZIP_LEVEL else ""
+        print(f"   gzip -{level:<2}  {size / 1024:6.0f} KB ({size / len(body):5.1%})  {ms:7.2f}ms{marker}")
+    for quality in sorted({1, settings.RESPONSE_BROTLI_QUALITY, 4, 11}):
+        size = len(brotli.compress(body, quality=quality))
+        ms = mean_ms(lambda: brotli.compress(body, quality=quality), max(1, args.runs // 10) if quality > 9 else args.runs)
+        marker = " *" if quality == settings.RESPONSE_BROTLI_QUALITY else ""
+        print(f"   br q{quality:<3}   {size / 1024:6.0f} KB ({size / len(body):5.1%})  {ms:7.2f}ms{marker}")
+
+    print("\n* configured")
+    return orjson_ms < json_ms
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,231 @@
+"""
+Script to EXPLAIN ANALYZE the hot queries against a seeded local Postgres
+
+Usage:
+    make db-up
+    python scripts/explain_hot_queries.py [--users 50] [--decks 10] [--cards 200] [--reviews 2000]
+    python scripts/explain_hot_queries.py --baseline   # without migrations 011+
+
+Builds a scratch schema (explain_hot_queries) on DATABASE_URL with the
+study tables and the indexes from earlier migrations, seeds it, applies
+the migrations in MIGRATIONS unless --baseline is given, and prints the plan,
+execution time and any sequential scans or sorts for every hot query. The
+schema is dropped afterwards unless --keep is given.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import asyncpg
+
+# Add parent directory to path to import app modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.config import settings  # noqa: E402
+
+SCHEMA = "explain_hot_queries"
+VERSIONS = Path(__file__).parent.parent / "alembic" / "versions"
+MIGRATIONS = [
+    VERSIONS / "011_hot_path_indexes.sql",
+    VERSIONS / "012_flashcards_user_id.sql",
+]
+
+# Tables and indexes as created by migrations 002, 003 and 007 (auth.users
+# foreign keys left out: the local database has no auth schema)
+BASELINE_DDL = """
+CREATE TABLE decks (
+  id UUID PRIMARY KEY,
+  user_id UUID NOT NULL,
+  title TEXT NOT NULL,
+  last_studied_at TIMESTAMPTZ,
+  created_at TIMESTAMPTZ DEFAULT NOW() NOT NULL
+);
+CREATE INDEX idx_decks_user_id ON decks(user_id);
+CREATE INDEX idx_decks_last_studied ON decks(user_id, last_studied_at DESC NULLS LAST);
+
+CREATE TABLE flashcards (
+  id UUID PRIMARY KEY,
+  deck_id UUID NOT NULL REFERENCES decks(id) ON DELETE CASCADE,
+  front TEXT NOT NULL,
+  back TEXT NOT NULL,
+  difficulty VARCHAR(10) DEFAULT 'medium',
+  ease_factor REAL DEFAULT 2.5 NOT NULL,
+  interval_days INTEGER DEFAULT 0 NOT NULL,
+  repetitions INTEGER DEFAULT 0 NOT NULL,
+  next_review_date DATE DEFAULT CURRENT_DATE NOT NULL,
+  last_reviewed_at TIMESTAMPTZ,
+  created_at TIMESTAMPTZ DEFAULT NOW() NOT NULL
+);
+CREATE INDEX idx_flashcards_deck_id ON flashcards(deck_id);
+CREATE INDEX idx_flashcards_next_review ON flashcards(deck_id, next_review_date);
+
+CREATE TABLE study_sessions (
+  id UUID PRIMARY KEY,
+  user_id UUID NOT NULL,
+  deck_id UUID REFERENCES decks(id) ON DELETE CASCADE,
+  cards_reviewed INTEGER NOT NULL DEFAULT 0,
+  duration_seconds INTEGER,
+  started_at TIMESTAMPTZ DEFAULT NOW(),
+  completed_at TIMESTAMPTZ
+);
+CREATE INDEX idx_study_sessions_user_id ON study_sessions(user_id);
+CREATE INDEX idx_study_sessions_deck_id ON study_sessions(deck_id);
+CREATE INDEX idx_study_sessions_completed_at ON study_sessions(completed_at DESC);
+
+CREATE TABLE card_reviews (
+  id UUID PRIMARY KEY,
+  session_id UUID REFERENCES study_sessions(id) ON DELETE CASCADE,
+  flashcard_id UUID NOT NULL REFERENCES flashcards(id) ON DELETE CASCADE,
+  user_id UUID NOT NULL,
+  quality INTEGER NOT NULL,
+  reviewed_at TIMESTAMPTZ DEFAULT NOW()
+);
+CREATE INDEX idx_card_reviews_flashcard_id ON card_reviews(flashcard_id);
+CREATE INDEX idx_card_reviews_session_id ON card_reviews(session_id);
+CREATE INDEX idx_card_reviews_reviewed_at ON card_reviews(reviewed_at DESC);
+"""
+
+# (name, SQL) in the shape the services send them; :user, :deck and :today are bound per query
+HOT_QUERIES = [
+    ("list decks (DirectQueries.get_decks_by_user)",
+     "SELECT * FROM decks WHERE user_id = :user "
+     "ORDER BY last_studied_at DESC NULLS LAST, created_at DESC"),
+    ("list deck cards (FlashcardService.get_flashcards_by_deck)",
+     "SELECT * FROM flashcards WHERE deck_id = :deck ORDER BY created_at"),
+    ("due cards in deck (DirectQueries.get_due_cards)",
+     "SELECT * FROM flashcards WHERE deck_id = :deck AND next_review_date <= :today ORDER BY next_review_date"),
+    ("merged due queue (DirectQueries.get_due_cards_for_user)",
+     "SELECT * FROM flashcards WHERE user_id = :user AND next_review_date <= :today ORDER BY next_review_date"),
+    ("due histogram (DirectQueries.get_due_histogram)",
+     "SELECT next_review_date, count(*) FROM flashcards "
+     "WHERE user_id = :user AND next_review_date >= :today GROUP BY next_review_date"),
+    ("review counts (DirectQueries.get_stats_overview)",
+     "SELECT count(*), count(*) FILTER (WHERE quality >= 3), "
+     "count(*) FILTER (WHERE reviewed_at >= date_trunc('month', :today::date)) "
+     "FROM card_reviews WHERE user_id = :user"),
+    ("study days (DirectQueries.get_stats_overview)",
+     "SELECT CAST(reviewed_at AS DATE) FROM card_reviews "
+     "WHERE user_id = :user AND reviewed_at >= :today::date - 366 GROUP BY CAST(reviewed_at AS DATE)"),
+    ("study time (DirectQueries.get_stats_overview)",
+     "SELECT coalesce(sum(duration_seconds), 0), "
+     "coalesce(sum(duration_seconds) FILTER (WHERE started_at >= date_trunc('month', :today::date)), 0) "
+     "FROM study_sessions WHERE user_id = :user"),
+]
+
+# Shapes used before flashcards.user_id existed (012), for --baseline
+BASELINE_QUERIES = {
+    "merged due queue (DirectQueries.get_due_cards_for_user)":
+        "SELECT flashcards.* FROM flashcards JOIN decks ON decks.id = flashcards.deck_id "
+        "WHERE decks.user_id = :user AND flashcards.next_review_date <= :today ORDER BY flashcards.next_review_date",
+    "due histogram (DirectQueries.get_due_histogram)":
+        "SELECT flashcards.next_review_date, count(*) FROM flashcards JOIN decks ON decks.id = flashcards.deck_id "
+        "WHERE decks.user_id = :user AND flashcards.next_review_date >= :today GROUP BY flashcards.next_review_date",
+}
+
+
+def bind(sql: str, values: dict) -> tuple:
+    """Replace :name placeholders with $n, numbering only the ones used"""
+    args = []
+    for name, value in values.items():
+        if f":{name}" in sql:
+            args.append(value)
+            sql = sql.replace(f":{name}", f"${len(args)}")
+    return sql, args
+
+
+async def seed(conn: asyncpg.Connection, users: int, decks: int, cards: int, reviews: int) -> tuple:
+    """Insert random users' decks, cards, sessions and reviews; return one (user, deck) to query"""
+    now = datetime.now(timezone.utc)
+    today = date.today()
+    deck_rows, card_rows, session_rows, review_rows = [], [], [], []
+
+    for _ in range(users):
+        user_id = uuid.uuid4()
+        user_cards = []
+        for d in range(decks):
+            deck_id = uuid.uuid4()
+            deck_rows.append((deck_id, user_id, f"Deck {d}", now - timedelta(days=random.randint(0, 60)),
+                              now - timedelta(days=random.randint(60, 365))))
+            for c in range(cards):
+                card_id = uuid.uuid4()
+                user_cards.append(card_id)
+                card_rows.append((card_id, deck_id, f"Front {c}", f"Back {c}", random.choice(["easy", "medium", "hard"]),
+                                  today + timedelta(days=random.randint(-30, 90)),
+                                  now - timedelta(minutes=random.randint(0, 500000))))
+
+        session_id = uuid.uuid4()
+        session_rows.append((session_id, user_id, random.randint(60, 3600), now - timedelta(days=random.randint(0, 365))))
+        for _ in range(reviews):
+            review_rows.append((uuid.uuid4(), session_id, random.choice(user_cards), user_id,
+                                random.choice([1, 3, 5]), now - timedelta(minutes=random.randint(0, 525600))))
+
+    await conn.copy_records_to_table("decks", records=deck_rows, schema_name=SCHEMA,
+                                     columns=["id", "user_id", "title", "last_studied_at", "created_at"])
+    await conn.copy_records_to_table("flashcards", records=card_rows, schema_name=SCHEMA,
+                                     columns=["id", "deck_id", "front", "back", "difficulty", "next_review_date", "created_at"])
+    await conn.copy_records_to_table("study_sessions", records=session_rows, schema_name=SCHEMA,
+                                     columns=["id", "user_id", "duration_seconds", "started_at"])
+    await conn.copy_records_to_table("card_reviews", records=review_rows, schema_name=SCHEMA,
+                                     columns=["id", "session_id", "flashcard_id", "user_id", "quality", "reviewed_at"])
+    await conn.execute("VACUUM ANALYZE decks, flashcards, study_sessions, card_reviews")
+
+    return deck_rows[0][1], deck_rows[0][0]
+
+
+async def main() -> bool:
+    """Seed the scratch schema and explain every hot query"""
+    parser = argparse.ArgumentParser(description="EXPLAIN ANALYZE the hot queries")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--decks", type=int, default=10, help="Decks per user")
+    parser.add_argument("--cards", type=int, default=200, help="Cards per deck")
+    parser.add_argument("--reviews", type=int, default=2000, help="Reviews per user")
+    parser.add_argument("--baseline", action="store_true", help="Skip migrations 011 and later")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch schema")
+    args = parser.parse_args()
+
+    conn = await asyncpg.connect(settings.DATABASE_URL)
+    try:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE; CREATE SCHEMA {SCHEMA}")
+        await conn.execute(f"SET search_path TO {SCHEMA}")
+        await conn.execute(BASELINE_DDL)
+
+        print(f"🌱 Seeding {args.users} users x {args.decks} decks x {args.cards} cards, {args.reviews} reviews each")
+        user_id, deck_id = await seed(conn, args.users, args.decks, args.cards, args.reviews)
+
+        if not args.baseline:
+            for migration in MIGRATIONS:
+                print(f"📄 Applying {migration.name}")
+                await conn.execute(migration.read_text())
+
+        flagged = 0
+        for name, sql in HOT_QUERIES:
+            if args.baseline:
+                sql = BASELINE_QUERIES.get(name, sql)
+            bound_sql, bound_args = bind(sql, {"user": user_id, "deck": deck_id, "today": date.today()})
+            rows = await conn.fetch(f"EXPLAIN (ANALYZE, BUFFERS) {bound_sql}", *bound_args)
+            plan = [row[0] for row in rows]
+            warnings = [line.strip() for line in plan if "Seq Scan" in line or line.strip().startswith("-> Sort") or line.strip().startswith("Sort")]
+            flagged += bool(warnings)
+
+            print("\n" + "=" * 70)
+            print(f"{'⚠️ ' if warnings else '✅'} {name}")
+            print("=" * 70)
+            print("\n".join(plan))
+
+        print(f"\n{len(HOT_QUERIES) - flagged}/{len(HOT_QUERIES)} queries without sequential scans or sorts")
+        return True
+
+    finally:
+        if not args.keep:
+            await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.close()
+
+
+if __name__ == "__main__":
+    success = asyncio.run(main())
+    sys.exit(0 if success else 1)
@@ -0,0 +1,53 @@
+"""
+Script to run card_reviews partition maintenance
+
+Usage:
+    python scripts/maintain_card_reviews.py
+
+Creates upcoming monthly partitions, compacts partitions older than
+CARD_REVIEWS_RAW_RETENTION_MONTHS into card_review_summaries and deletes
+summaries past CARD_REVIEWS_SUMMARY_RETENTION_MONTHS. Run it daily from cron
+when pg_cron isn't available (migration 013 schedules it otherwise).
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.config import settings  # noqa: E402
+from app.core.supabase import get_supabase_client  # noqa: E402
+
+
+def maintain() -> bool:
+    """Call maintain_card_reviews with the configured policy and print a summary"""
+    print("🧹 Maintaining card_reviews partitions")
+    print(f"   {settings.CARD_REVIEWS_PARTITION_MONTHS_AHEAD} months ahead, "
+          f"raw reviews kept {settings.CARD_REVIEWS_RAW_RETENTION_MONTHS} months, "
+          f"summaries kept {settings.CARD_REVIEWS_SUMMARY_RETENTION_MONTHS or 'forever'}"
+          f"{' months' if settings.CARD_REVIEWS_SUMMARY_RETENTION_MONTHS else ''}")
+
+    try:
+        response = get_supabase_client().rpc(
+            "maintain_card_reviews",
+            {
+                "p_months_ahead": settings.CARD_REVIEWS_PARTITION_MONTHS_AHEAD,
+                "p_keep_months": settings.CARD_REVIEWS_RAW_RETENTION_MONTHS,
+                "p_summary_keep_months": settings.CARD_REVIEWS_SUMMARY_RETENTION_MONTHS,
+            },
+        ).execute()
+    except Exception as e:
+        print(f"❌ Maintenance failed: {str(e)}")
+        return False
+
+    row = response.data[0] if isinstance(response.data, list) else response.data
+    print(f"✅ {row['created_partitions']} partitions created, "
+          f"{row['compacted_partitions']} compacted, "
+          f"{row['summary_rows_deleted']} summary rows deleted")
+    return True
+
+
+if __name__ == "__main__":
+    success = maintain()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,109 @@
+"""
+Tests for response compression
+
+Tests cover:
+- Accept-Encoding negotiation
+- Large bodies compressed with brotli or gzip
+- Small, streamed and already-encoded bodies left alone
+- Vary merged with headers set by inner middleware
+"""
+
+import gzip
+
+import brotli
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, choose_encoding
+
+LARGE = {"flashcards": [{"front": f"Question {i}", "back": "Answer " * 10} for i in range(200)]}
+
+
+def make_client() -> TestClient:
+    app = FastAPI(default_response_class=ORJSONResponse)
+
+    @app.get("/large")
+    async def large():
+        return LARGE
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        async def events():
+            for i in range(3):
+                yield f"data: {'x' * 2000}{i}\n\n"
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/vary")
+    async def vary():
+        return PlainTextResponse("x" * 5000, headers={"Vary": "Origin"})
+
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    return TestClient(app)
+
+
+class TestChooseEncoding:
+    """Test Accept-Encoding negotiation"""
+
+    def test_prefers_brotli(self):
+        assert choose_encoding("gzip, deflate, br") == "br"
+
+    def test_falls_back_to_gzip(self):
+        assert choose_encoding("gzip, deflate") == "gzip"
+
+    def test_respects_q_values(self):
+        assert choose_encoding("br;q=0.5, gzip") == "gzip"
+        assert choose_encoding("br;q=0, gzip;q=0") is None
+
+    def test_wildcard_and_identity(self):
+        assert choose_encoding("*") == "br"
+        assert choose_encoding("identity") is None
+        assert choose_encoding("") is None
+
+
+class TestCompressionMiddleware:
+    """Test which responses get compressed"""
+
+    def test_large_json_is_brotli_compressed(self):
+        response = make_client().get("/large", headers={"Accept-Encoding": "br"})
+
+        assert response.headers["content-encoding"] == "br"
+        assert "accept-encoding" in response.headers["vary"].lower()
+        assert int(response.headers["content-length"]) < len(response.content)
+        assert response.json() == LARGE
+
+    def test_large_json_is_gzip_compressed(self):
+        response = make_client().get("/large", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.json() == LARGE
+
+    def test_compressed_bytes_decode(self):
+        """The body on the wire should be valid brotli and gzip"""
+        client = make_client()
+        with client.stream("GET", "/large", headers={"Accept-Encoding": "br"}) as response:
+            assert brotli.decompress(b"".join(response.iter_raw())).startswith(b'{"flashcards"')
+        with client.stream("GET", "/large", headers={"Accept-Encoding": "gzip"}) as response:
+            assert gzip.decompress(b"".join(response.iter_raw())).startswith(b'{"flashcards"')
+
+    def test_small_body_is_not_compressed(self):
+        response = make_client().get("/small", headers={"Accept-Encoding": "br, gzip"})
+
+        assert "content-encoding" not in response.headers
+
+    def test_stream_passes_through(self):
+        """Server-sent events must not be buffered or encoded"""
+        response = make_client().get("/stream", headers={"Accept-Encoding": "br, gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.text.count("data: ") == 3
+
+    def test_existing_vary_is_kept(self):
+        response = make_client().get("/vary", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Origin, Accept-Encoding"
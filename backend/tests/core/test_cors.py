@@ -0,0 +1,101 @@
+"""
+Tests for the CORS middleware
+
+Tests cover:
+- Preflight answers for allowed and unknown origins
+- Headers added to responses for allowed origins only
+- Streamed bodies forwarded chunk by chunk
+"""
+
+import pytest
+
+from app.core.cors import CORSCustomMiddleware
+
+ALLOWED = "http://localhost:3000"
+
+
+def make_scope(method: str = "GET", origin: str = None) -> dict:
+    headers = [(b"host", b"testserver")]
+    if origin is not None:
+        headers.append((b"origin", origin.encode()))
+    return {"type": "http", "method": method, "path": "/", "headers": headers}
+
+
+async def streaming_app(scope, receive, send):
+    """App sending its body in three chunks"""
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/event-stream")]})
+    for chunk in (b"data: 1\n\n", b"data: 2\n\n"):
+        await send({"type": "http.response.body", "body": chunk, "more_body": True})
+    await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+async def call(scope: dict) -> list:
+    """Run a request through the middleware and collect the sent messages"""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await CORSCustomMiddleware(streaming_app, allow_origins=[ALLOWED])(scope, receive, send)
+    return messages
+
+
+def headers_of(messages: list) -> dict:
+    return dict(messages[0]["headers"])
+
+
+class TestPreflight:
+    """Test OPTIONS handling"""
+
+    @pytest.mark.asyncio
+    async def test_allowed_origin(self):
+        messages = await call(make_scope("OPTIONS", ALLOWED))
+
+        assert messages[0]["status"] == 200
+        headers = headers_of(messages)
+        assert headers[b"access-control-allow-origin"] == ALLOWED.encode()
+        assert headers[b"access-control-allow-credentials"] == b"true"
+        assert b"PATCH" in headers[b"access-control-allow-methods"]
+        assert headers[b"access-control-max-age"] == b"600"
+
+    @pytest.mark.asyncio
+    async def test_unknown_origin_is_forbidden(self):
+        messages = await call(make_scope("OPTIONS", "https://evil.example"))
+
+        assert messages[0]["status"] == 403
+        assert b"access-control-allow-origin" not in headers_of(messages)
+
+    @pytest.mark.asyncio
+    async def test_origin_must_match_exactly(self):
+        messages = await call(make_scope("OPTIONS", ALLOWED + "/"))
+
+        assert messages[0]["status"] == 403
+
+
+class TestResponses:
+    """Test headers on non-preflight responses"""
+
+    @pytest.mark.asyncio
+    async def test_allowed_origin_gets_headers(self):
+        headers = headers_of(await call(make_scope("GET", ALLOWED)))
+
+        assert headers[b"access-control-allow-origin"] == ALLOWED.encode()
+        assert headers[b"access-control-expose-headers"] == b"*"
+        assert headers[b"content-type"] == b"text/event-stream"
+
+    @pytest.mark.asyncio
+    async def test_unknown_origin_gets_no_headers(self):
+        headers = headers_of(await call(make_scope("GET", "https://evil.example")))
+
+        assert b"access-control-allow-origin" not in headers
+
+    @pytest.mark.asyncio
+    async def test_stream_is_forwarded_chunk_by_chunk(self):
+        """Server-sent events must not be buffered"""
+        messages = await call(make_scope("GET", ALLOWED))
+
+        bodies = [(m["body"], m["more_body"]) for m in messages[1:]]
+        assert bodies == [(b"data: 1\n\n", True), (b"data: 2\n\n", True), (b"", False)]
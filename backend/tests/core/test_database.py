@@ -0,0 +1,39 @@
+"""
+Tests for database engine configuration
+
+Tests cover:
+- Prepared statement settings per connection mode
+"""
+
+import pytest
+
+from app.core.database import build_connect_args
+
+
+class TestConnectArgs:
+    """Test asyncpg connect arguments per connection mode"""
+
+    @pytest.mark.parametrize("mode", ["session_pooler", "direct"])
+    def test_dedicated_backends_use_statement_cache(self, mode):
+        """Session pooler and direct connections should cache prepared statements"""
+        args = build_connect_args(mode, 500)
+
+        assert args == {"statement_cache_size": 500, "prepared_statement_cache_size": 500}
+
+    def test_transaction_pooler_disables_prepared_statements(self):
+        """By default the transaction pooler gets no prepared statements"""
+        args = build_connect_args("transaction_pooler", 500)
+
+        assert args == {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+
+    def test_transaction_pooler_with_support_uses_unique_names(self):
+        """A pooler that tracks prepared statements gets uniquely named ones"""
+        args = build_connect_args("transaction_pooler", 500, pooler_prepared_statements=True)
+
+        name_func = args["prepared_statement_name_func"]
+        assert args["statement_cache_size"] == 500
+        assert name_func() != name_func()
+
+    def test_unknown_mode_is_rejected(self):
+        with pytest.raises(ValueError, match="DATABASE_CONNECTION_MODE"):
+            build_connect_args("pgbouncer", 500)
@@ -0,0 +1,64 @@
+"""
+Tests for collection ETags
+
+Tests cover:
+- ETags change with count and newest updated_at
+- If-None-Match parsing and weak comparison
+- 304 responses
+"""
+
+from datetime import datetime, timezone
+
+from app.core.etag import collection_etag, etag_matches, not_modified
+
+UPDATED = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+class TestCollectionEtag:
+    """Test ETag building"""
+
+    def test_etag_is_weak_and_stable(self):
+        assert collection_etag("decks", 3, UPDATED) == collection_etag("decks", 3, UPDATED)
+        assert collection_etag("decks", 3, UPDATED).startswith('W/"')
+
+    def test_count_and_updated_at_change_the_etag(self):
+        """A delete changes the count; an insert or update moves updated_at"""
+        base = collection_etag("decks", 3, UPDATED)
+        assert base != collection_etag("decks", 2, UPDATED)
+        assert base != collection_etag("decks", 3, UPDATED.replace(microsecond=1))
+
+    def test_scope_separates_collections(self):
+        assert collection_etag("decks", 3, UPDATED) != collection_etag("deck-1-flashcards", 3, UPDATED)
+
+    def test_empty_collection(self):
+        assert collection_etag("decks", 0, None) == 'W/"decks-0-0"'
+
+
+class TestEtagMatches:
+    """Test If-None-Match handling"""
+
+    def test_missing_header_never_matches(self):
+        assert not etag_matches(None, 'W/"decks-1-1"')
+
+    def test_weak_comparison_ignores_prefix(self):
+        assert etag_matches('"decks-1-1"', 'W/"decks-1-1"')
+        assert etag_matches('W/"decks-1-1"', 'W/"decks-1-1"')
+
+    def test_any_listed_tag_matches(self):
+        assert etag_matches('W/"decks-0-0", W/"decks-1-1"', 'W/"decks-1-1"')
+        assert not etag_matches('W/"decks-0-0", W/"decks-2-1"', 'W/"decks-1-1"')
+
+    def test_wildcard_matches(self):
+        assert etag_matches("*", 'W/"decks-1-1"')
+
+
+class TestNotModified:
+    """Test 304 responses"""
+
+    def test_not_modified_has_no_body_and_keeps_etag(self):
+        response = not_modified('W/"decks-1-1"')
+
+        assert response.status_code == 304
+        assert response.body == b""
+        assert response.headers["etag"] == 'W/"decks-1-1"'
+        assert response.headers["cache-control"] == "private, no-cache"
@@ -0,0 +1,73 @@
+"""
+Tests for language detection
+
+Tests cover:
+- Detecting each supported language from short lists and prose
+- Confidence scores and the default for text without signal
+- Prompt instruction lines for languages without a template
+- Classifying large texts quickly
+"""
+
+import time
+
+import pytest
+
+from app.core.language import detect, detect_language, language_instruction
+
+
+class TestDetect:
+    """Test language detection"""
+
+    @pytest.mark.parametrize("text,expected", [
+        ("The heart pumps blood through the arteries and it returns via the veins", "en"),
+        ("El corazón bombea la sangre por las arterias y vuelve por las venas", "es"),
+        ("O coração bombeia o sangue pelas artérias e não pelas veias", "pt"),
+        ("Le cœur pompe le sang dans les artères et il revient par les veines", "fr"),
+        ("Das Herz pumpt das Blut durch die Arterien und über die Venen zurück", "de"),
+        ("Il cuore pompa il sangue nelle arterie e torna attraverso le vene", "it"),
+    ])
+    def test_detects_supported_languages(self, text, expected):
+        """Prose in each supported language should be recognized"""
+        assert detect_language(text) == expected
+
+    def test_spanish_list_with_accents(self):
+        """A list of Spanish terms with accents should be Spanish"""
+        assert detect_language("Aurícula derecha Válvula tricúspide Ventrículo derecho Válvula pulmonar") == "es"
+
+    def test_no_signal_returns_default(self):
+        """Text without any stopwords or accents falls back to the default"""
+        guess = detect("Mitochondria Ribosome Lysosome", default="es")
+        assert guess.language == "es"
+        assert guess.confidence == 0.0
+
+    def test_confidence_is_higher_for_unambiguous_text(self):
+        """Clear English text should be more confident than a mixed sentence"""
+        clear = detect("the cat and the dog were in the house with their owner")
+        mixed = detect("the gato y the perro")
+        assert 0.0 < mixed.confidence < clear.confidence <= 1.0
+
+    def test_large_text_is_fast(self):
+        """100KB of text should classify in well under a few milliseconds"""
+        text = "El corazón bombea la sangre por las arterias. " * 2200
+        detect(text)
+
+        start = time.perf_counter()
+        for _ in range(50):
+            guess = detect(text)
+        elapsed_ms = (time.perf_counter() - start) * 1000 / 50
+
+        assert guess.language == "es"
+        assert elapsed_ms < 5
+
+
+class TestLanguageInstruction:
+    """Test the output-language instruction for prompts"""
+
+    def test_no_instruction_for_template_languages(self):
+        """Spanish and English have their own templates"""
+        assert language_instruction("es") == ""
+        assert language_instruction("en") == ""
+
+    def test_instruction_for_other_languages(self):
+        """Other languages ask for output in that language"""
+        assert "German" in language_instruction("de")
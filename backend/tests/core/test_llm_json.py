@@ -0,0 +1,122 @@
+"""
+Tests for LLM JSON parsing
+
+Tests cover:
+- Extracting JSON from fenced or prose-wrapped responses
+- Tolerating trailing commas and raw newlines in strings
+- Recovering completed items from truncated responses
+- Incremental array extraction from streamed text
+"""
+
+import json
+
+import pytest
+
+from app.core.llm_json import JSONArrayStream, extract_json
+
+
+class TestExtractJson:
+    """Test tolerant JSON extraction"""
+
+    def test_plain_json(self):
+        """Valid JSON should parse like json.loads"""
+        text = '{"concepts": ["A", "B"], "count": 2, "score": 0.5, "ok": true, "x": null}'
+        assert extract_json(text) == json.loads(text)
+
+    def test_code_fence_and_prose(self):
+        """JSON inside a markdown fence with surrounding prose should be found"""
+        text = 'Here are your cards:\n```json\n{"flashcards": []}\n```\nGood luck!'
+        assert extract_json(text) == {"flashcards": []}
+
+    def test_unlabelled_fence(self):
+        """A fence without a language tag should also be handled"""
+        assert extract_json('```\n{"a": 1}\n```') == {"a": 1}
+
+    def test_backticks_inside_string_values(self):
+        """``` in a string value (e.g. a card about code) shouldn't be taken for a fence"""
+        text = '{"flashcards": [{"front": "How do you fence code in markdown?", "back": "Wrap it in ```"}]}'
+        assert extract_json(text) == json.loads(text)
+
+    def test_fenced_response_with_backticks_inside(self):
+        """A fenced response whose values contain ``` should still parse"""
+        card = '{"front": "Fence?", "back": "Use ```python"}'
+        assert extract_json(f'```json\n{{"flashcards": [{card}]}}\n```') == {"flashcards": [json.loads(card)]}
+
+    def test_leading_prose_with_braces(self):
+        """Non-JSON braces before the payload should be skipped"""
+        assert extract_json('Use {curly} braces: {"a": 1}') == {"a": 1}
+
+    def test_trailing_commas(self):
+        """Trailing commas in objects and arrays should be accepted"""
+        assert extract_json('{"a": [1, 2,], "b": "c",}') == {"a": [1, 2], "b": "c"}
+
+    def test_raw_newline_in_string(self):
+        """Unescaped newlines inside strings should be accepted"""
+        assert extract_json('{"a": "line 1\nline 2"}') == {"a": "line 1\nline 2"}
+
+    def test_truncated_array_drops_incomplete_item(self):
+        """A response cut off mid-item should keep the completed items"""
+        text = '{"flashcards": [{"front": "Q1", "back": "A1"}, {"front": "Q2", "ba'
+        assert extract_json(text) == {"flashcards": [{"front": "Q1", "back": "A1"}]}
+
+    def test_truncated_string_list(self):
+        """A list of strings cut off mid-string should keep completed strings"""
+        assert extract_json('{"concepts": ["A", "B", "C') == {"concepts": ["A", "B"]}
+
+    def test_truncated_exponent_is_dropped(self):
+        """A number cut off at its exponent should be dropped like other cut-off values"""
+        assert extract_json('{"b": 2, "a": 1.5e') == {"b": 2}
+        assert extract_json('{"scores": [1, 2.5, -') == {"scores": [1, 2.5]}
+
+    def test_truncated_without_partial_raises(self):
+        """Truncated input should fail when partial results are not allowed"""
+        with pytest.raises(json.JSONDecodeError):
+            extract_json('{"a": [1, 2', allow_partial=False)
+
+    def test_expected_type_list(self):
+        """expected_type=list should skip objects and return the first array"""
+        assert extract_json('[{"a": 1}]', expected_type=list) == [{"a": 1}]
+
+    def test_no_json_raises(self):
+        """Text without any JSON should raise JSONDecodeError"""
+        with pytest.raises(json.JSONDecodeError):
+            extract_json("This is not valid JSON")
+
+    def test_malformed_json_raises(self):
+        """Structurally broken JSON should raise JSONDecodeError"""
+        with pytest.raises(json.JSONDecodeError):
+            extract_json('{"a": 1 "b": 2}')
+
+
+class TestJSONArrayStream:
+    """Test incremental array extraction"""
+
+    def test_emits_items_across_chunk_boundaries(self):
+        """Items split across chunks should be emitted once complete"""
+        text = '```json\n{"flashcards": [{"front": "Q1", "back": "A1"}, {"front": "Q2", "back": "A2"}]}\n```'
+        stream = JSONArrayStream("flashcards")
+
+        items = []
+        for i in range(0, len(text), 3):
+            items.extend(stream.feed(text[i:i + 3]))
+
+        assert items == [
+            {"front": "Q1", "back": "A1"},
+            {"front": "Q2", "back": "A2"},
+        ]
+
+    def test_primitive_and_nested_items(self):
+        """Strings, numbers and nested arrays should be emitted as items"""
+        stream = JSONArrayStream("items")
+        assert stream.feed('{"items": ["a,b", 2, [3, 4], true]}') == ["a,b", 2, [3, 4], True]
+
+    def test_ignores_text_after_array(self):
+        """Nothing should be emitted after the array closes"""
+        stream = JSONArrayStream("items")
+        assert stream.feed('{"items": [1]') == [1]
+        assert stream.feed(', "other": [2]}') == []
+
+    def test_skips_malformed_item(self):
+        """A malformed item should be skipped without stopping the stream"""
+        stream = JSONArrayStream("items")
+        assert stream.feed('{"items": [{"a": 1 "b": 2}, {"c": 3}]}') == [{"c": 3}]
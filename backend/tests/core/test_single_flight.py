@@ -0,0 +1,123 @@
+"""
+Tests for single-flight request coalescing
+
+Tests cover:
+- Concurrent calls with the same key share one execution
+- Different keys and sequential calls run separately
+- Errors reach every waiter and release the key
+- A cancelled caller doesn't cancel the shared call
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.single_flight import SingleFlight, make_key, normalize_text
+
+
+class TestMakeKey:
+    """Test key building"""
+
+    def test_same_parts_same_key(self):
+        """Equal inputs should produce equal keys"""
+        assert make_key("mnemonic", "user", ["a", "b"]) == make_key("mnemonic", "user", ["a", "b"])
+
+    def test_different_parts_different_key(self):
+        """Task, user and input all distinguish keys"""
+        base = make_key("mnemonic", "user", ["a"])
+        assert base != make_key("flashcards", "user", ["a"])
+        assert base != make_key("mnemonic", "other", ["a"])
+        assert base != make_key("mnemonic", "user", ["b"])
+
+    def test_normalize_text(self):
+        """Case and whitespace differences are ignored"""
+        assert normalize_text("  Aurícula   DERECHA\n") == normalize_text("aurícula derecha")
+
+
+class TestSingleFlight:
+    """Test call coalescing"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        """Callers with the same key should await a single call"""
+        flight = SingleFlight()
+        executions = 0
+
+        async def call():
+            nonlocal executions
+            executions += 1
+            await asyncio.sleep(0.05)
+            return {"value": 1}
+
+        results = await asyncio.gather(*(flight.run("key", call) for _ in range(3)))
+
+        assert executions == 1
+        assert results == [{"value": 1}] * 3
+        assert flight.coalesced == 2
+        assert flight.in_flight() == 0
+
+    @pytest.mark.asyncio
+    async def test_each_caller_gets_its_own_copy(self):
+        """Mutating one caller's result must not affect another's"""
+        flight = SingleFlight()
+
+        async def call():
+            await asyncio.sleep(0.01)
+            return {"metadata": {}}
+
+        first, second = await asyncio.gather(flight.run("key", call), flight.run("key", call))
+        first["metadata"]["generation_id"] = "a"
+
+        assert second["metadata"] == {}
+
+    @pytest.mark.asyncio
+    async def test_sequential_and_different_keys_run_separately(self):
+        """Only in-flight calls with the same key are shared"""
+        flight = SingleFlight()
+        executions = 0
+
+        async def call():
+            nonlocal executions
+            executions += 1
+            return executions
+
+        await flight.run("key", call)
+        await flight.run("key", call)
+        await asyncio.gather(flight.run("a", call), flight.run("b", call))
+
+        assert executions == 4
+
+    @pytest.mark.asyncio
+    async def test_error_reaches_all_callers_and_releases_key(self):
+        """A failure is raised to every waiter; the next call starts fresh"""
+        flight = SingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            flight.run("key", failing), flight.run("key", failing), return_exceptions=True
+        )
+        assert all(isinstance(result, ValueError) for result in results)
+
+        async def ok():
+            return "ok"
+
+        assert await flight.run("key", ok) == "ok"
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_shared_call(self):
+        """Another waiter should still get the result if the first caller goes away"""
+        flight = SingleFlight()
+
+        async def call():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        first = asyncio.ensure_future(flight.run("key", call))
+        second = asyncio.ensure_future(flight.run("key", call))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        assert await second == "done"
@@ -0,0 +1,231 @@
+"""
+Tests for Batch Generation Service
+
+Runs the Message Batches pipeline against a local fake Anthropic server.
+Tests cover:
+- Submitting prompts, polling and downloading results
+- Bulk-writing mnemonic generations
+- Bulk-writing regenerated flashcards, with per-request errors
+"""
+
+import json
+from unittest.mock import AsyncMock, Mock, patch
+
+import httpx
+import pytest
+
+from app.services.batch_generation_service import BatchGenerationService
+
+
+class FakeBatchesServer:
+    """
+    In-process fake of the Message Batches API.
+
+    Each batch reports "in_progress" for `polls_until_ended` status checks,
+    then "ended". Responses are produced by `respond(custom_id, params)`.
+    """
+
+    def __init__(self, respond, polls_until_ended: int = 1):
+        self.respond = respond
+        self.polls_until_ended = polls_until_ended
+        self.batches = {}
+        self.status_checks = 0
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+
+        if request.method == "POST" and path == "/v1/messages/batches":
+            batch_id = f"msgbatch_{len(self.batches) + 1}"
+            self.batches[batch_id] = json.loads(request.content)["requests"]
+            return httpx.Response(200, json={"id": batch_id, "processing_status": "in_progress"})
+
+        batch_id = path.split("/")[4]
+        if path.endswith("/results"):
+            lines = [
+                json.dumps({"custom_id": item["custom_id"], "result": self.respond(item["custom_id"], item["params"])})
+                for item in self.batches[batch_id]
+            ]
+            return httpx.Response(200, text="\n".join(lines))
+
+        self.status_checks += 1
+        ended = self.status_checks > self.polls_until_ended
+        return httpx.Response(200, json={
+            "id": batch_id,
+            "processing_status": "ended" if ended else "in_progress",
+            "results_url": f"/v1/messages/batches/{batch_id}/results" if ended else None,
+        })
+
+
+def succeeded(payload):
+    """Build a succeeded batch result wrapping a JSON payload"""
+    return {
+        "type": "succeeded",
+        "message": {"content": [{"type": "text", "text": "```json\n" + json.dumps(payload) + "\n```"}]},
+    }
+
+
+@pytest.fixture
+def mock_supabase_client():
+    """Mock Supabase client with a chainable query builder"""
+    client = Mock()
+    for method in ["table", "select", "eq", "in_", "insert", "update", "delete", "order", "range"]:
+        setattr(client, method, Mock(return_value=client))
+    client.execute = Mock(return_value=Mock(data=[]))
+    return client
+
+
+def make_service(server, supabase_client):
+    """Create a service bound to the fake server"""
+    http_client = httpx.AsyncClient(
+        base_url="http://fake-anthropic",
+        transport=httpx.MockTransport(server.handler),
+    )
+    service = BatchGenerationService(http_client=http_client)
+    service.admin_client = supabase_client
+    service.poll_interval = 0
+    return service
+
+
+MNEMONICS = {
+    technique: {"title": "T", "content": "C", "how_to_use": "H"}
+    for technique in ["acrostic", "story", "visual"]
+}
+
+
+class TestBatchPipeline:
+    """Test batch submission and result collection"""
+
+    @pytest.mark.asyncio
+    async def test_run_batch_polls_until_ended(self, mock_supabase_client):
+        """Results should be collected once the batch has ended"""
+        server = FakeBatchesServer(lambda custom_id, params: succeeded({"id": custom_id}), polls_until_ended=2)
+        service = make_service(server, mock_supabase_client)
+
+        result = await service.run_batch([
+            {"custom_id": "a", "params": {}},
+            {"custom_id": "b", "params": {}},
+        ])
+
+        assert server.status_checks == 3
+        assert result["parsed"] == {"a": {"id": "a"}, "b": {"id": "b"}}
+        assert result["errors"] == {}
+
+    @pytest.mark.asyncio
+    async def test_run_batch_reports_errored_requests(self, mock_supabase_client):
+        """Errored requests should be reported without failing the batch"""
+        def respond(custom_id, params):
+            if custom_id == "bad":
+                return {"type": "errored", "error": {"type": "invalid_request_error", "message": "boom"}}
+            return succeeded({"ok": True})
+
+        service = make_service(FakeBatchesServer(respond), mock_supabase_client)
+
+        result = await service.run_batch([
+            {"custom_id": "good", "params": {}},
+            {"custom_id": "bad", "params": {}},
+        ])
+
+        assert result["parsed"] == {"good": {"ok": True}}
+        assert result["errors"] == {"bad": "boom"}
+
+
+class TestBulkWrites:
+    """Test writing batch results to the database"""
+
+    @pytest.mark.asyncio
+    async def test_mnemonics_batch_uses_prompt_builder_and_bulk_inserts(self, mock_supabase_client):
+        """All generations should be saved with one insert"""
+        prompts = []
+
+        def respond(custom_id, params):
+            prompts.append(params["messages"][0]["content"])
+            return succeeded(MNEMONICS)
+
+        service = make_service(FakeBatchesServer(respond), mock_supabase_client)
+        mock_supabase_client.execute.return_value = Mock(data=[{"id": "gen-1"}, {"id": "gen-2"}])
+
+        result = await service.generate_mnemonics_batch([
+            {"user_id": "user-1", "list_items": ["A", "B", "C"]},
+            {"user_id": "user-1", "list_items": ["D", "E", "F"], "deck_id": "deck-1"},
+        ])
+
+        assert len(prompts) == 2
+        assert "1. A" in prompts[0]
+        mock_supabase_client.table.assert_called_once_with("mnemonic_generations")
+        rows = mock_supabase_client.insert.call_args[0][0]
+        assert [row["input_list"] for row in rows] == ["A\nB\nC", "D\nE\nF"]
+        assert rows[1]["deck_id"] == "deck-1"
+        assert len(result["generations"]) == 2
+        assert result["errors"] == {}
+
+    @pytest.mark.asyncio
+    async def test_mnemonics_batch_skips_incomplete_results(self, mock_supabase_client):
+        """Results missing a technique should be reported, not saved"""
+        incomplete = {"acrostic": MNEMONICS["acrostic"]}
+        service = make_service(
+            FakeBatchesServer(lambda custom_id, params: succeeded(incomplete)),
+            mock_supabase_client,
+        )
+
+        result = await service.generate_mnemonics_batch([
+            {"user_id": "user-1", "list_items": ["A", "B", "C"]},
+        ])
+
+        mock_supabase_client.insert.assert_not_called()
+        assert "Missing 'story'" in result["errors"][0]
+
+    @pytest.mark.asyncio
+    async def test_flashcards_batch_merges_cards_in_one_transaction(self, mock_supabase_client):
+        """Cards for all decks should be saved in one direct transaction, add-only by default"""
+        decks = [
+            {"id": "deck-1", "user_id": "u1", "original_list": "A\nB", "selected_mnemonic_type": "story", "selected_mnemonic_content": "S"},
+            {"id": "deck-2", "user_id": "u1", "original_list": "C\nD", "selected_mnemonic_type": "story", "selected_mnemonic_content": "S"},
+            {"id": "deck-3", "user_id": "u2", "original_list": "", "selected_mnemonic_content": None},
+        ]
+        mock_supabase_client.execute.return_value = Mock(data=decks)
+
+        def respond(custom_id, params):
+            if custom_id == "flashcards-deck-2":
+                return {"type": "expired"}
+            return succeeded({"flashcards": [
+                {"front": "Q1", "back": "A1", "difficulty": "easy"},
+                {"front": "q1 ", "back": "dup"},
+                {"front": "Q2", "back": "A2"},
+            ]})
+
+        service = make_service(FakeBatchesServer(respond), mock_supabase_client)
+        save = AsyncMock(return_value={"deck-1": {"added": 2, "removed": 0}})
+
+        with patch("app.services.batch_generation_service.direct_queries.save_generated_flashcards", new=save):
+            result = await service.regenerate_flashcards_batch(deck_ids=["deck-1", "deck-2", "deck-3"])
+
+        assert result["deck_ids"] == ["deck-1"]
+        assert result["flashcard_count"] == 2
+        assert result["errors"] == {"deck-2": "expired"}
+        mock_supabase_client.delete.assert_not_called()
+        mock_supabase_client.insert.assert_not_called()
+        (generated,), kwargs = save.await_args
+        assert [card["front"] for card in generated[0]["cards"]] == ["Q1", "Q2"]
+        assert generated[0]["user_id"] == "u1"
+        assert kwargs["replace_existing"] is False
+
+    @pytest.mark.asyncio
+    async def test_flashcards_batch_requires_explicit_decks(self, mock_supabase_client):
+        """Without deck IDs or all_decks it should refuse to touch anything"""
+        service = make_service(FakeBatchesServer(lambda custom_id, params: None), mock_supabase_client)
+
+        with pytest.raises(ValueError, match="all_decks"):
+            await service.regenerate_flashcards_batch()
+
+        mock_supabase_client.table.assert_not_called()
+
+    def test_all_decks_are_paged(self, mock_supabase_client):
+        """The deck listing should page past PostgREST's row cap"""
+        service = make_service(FakeBatchesServer(lambda custom_id, params: None), mock_supabase_client)
+        full_page = [{"id": f"d{i}"} for i in range(1000)]
+        mock_supabase_client.execute.side_effect = [Mock(data=full_page), Mock(data=[{"id": "last"}])]
+
+        decks = service._fetch_decks(None)
+
+        assert len(decks) == 1001
+        assert mock_supabase_client.range.call_args_list[1][0] == (1000, 1999)
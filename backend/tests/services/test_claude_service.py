@@ -6,15 +6,20 @@ Tests cover:
 - Scenario 2: Mnemonic quality requirements
 - Scenario 3: Handle Claude API timeout
 - Scenario 4: Handle Claude API error
+- Parallel per-technique generation with per-technique retry
 """
 
+import asyncio
 import json
+import threading
+import time
 from unittest.mock import AsyncMock, Mock, patch
 
 import anthropic
 import pytest
 
 from app.services.claude_service import ClaudeService
+from app.services.model_router import model_router
 
 
 @pytest.fixture
@@ -44,6 +49,7 @@ def claude_service():
     """Create ClaudeService instance with mocked API key"""
     with patch("app.services.claude_service.settings") as mock_settings:
         mock_settings.CLAUDE_API_KEY = "test-api-key"
+        mock_settings.ANTHROPIC_API_URL = "https://api.anthropic.com"
         service = ClaudeService()
         return service
 
@@ -60,7 +66,6 @@ class TestClaudeServiceInit:
 
     def test_init_with_api_key_succeeds(self, claude_service):
         """Should initialize successfully with valid API key"""
-        assert claude_service.model == "claude-sonnet-4-20250514"
         assert claude_service.max_tokens == 4096
         assert claude_service.timeout == 30
 
@@ -72,16 +77,26 @@ class TestBuildMnemonicPrompt:
         """Should build prompt with correct format"""
         list_items = ["Epinephrine", "Amiodarone", "Lidocaine", "Atropine"]
         prompt = claude_service._build_mnemonic_prompt(list_items)
+        system_prompt = claude_service._build_mnemonic_system_prompt()
 
         assert "1. Epinephrine" in prompt
         assert "2. Amiodarone" in prompt
         assert "3. Lidocaine" in prompt
         assert "4. Atropine" in prompt
         assert "4" in prompt  # item_count
-        assert "ACROSTIC TECHNIQUE" in prompt
-        assert "NARRATIVE STORY TECHNIQUE" in prompt
-        assert "VISUAL/SPATIAL PATTERN TECHNIQUE" in prompt
-        assert "JSON format" in prompt
+        assert "ACROSTIC TECHNIQUE" in system_prompt
+        assert "NARRATIVE STORY TECHNIQUE" in system_prompt
+        assert "VISUAL/SPATIAL PATTERN TECHNIQUE" in system_prompt
+        assert "JSON format" in system_prompt
+
+    def test_system_prompt_is_static(self, claude_service):
+        """The system prompt should not depend on the list, so it can be cached"""
+        first = claude_service._build_mnemonic_system_prompt("es")
+        second = claude_service._build_mnemonic_system_prompt("es")
+
+        assert first == second
+        assert "ESPAÑOL" in first
+        assert first != claude_service._build_mnemonic_system_prompt("en")
 
 
 class TestGenerateMnemonics:
@@ -123,6 +138,35 @@ class TestGenerateMnemonics:
             assert result["metadata"]["model"] == "claude-sonnet-4-20250514"
             assert "generation_time_ms" in result["metadata"]
 
+    @pytest.mark.asyncio
+    async def test_generate_keeps_instructions_in_system_prompt(self, claude_service, mock_claude_response):
+        """Static instructions should go in the system prompt and cache usage be recorded"""
+        list_items = ["Item1", "Item2", "Item3"]
+
+        mock_message = Mock()
+        mock_message.content = [Mock(text=json.dumps(mock_claude_response))]
+        mock_message.usage = Mock(
+            input_tokens=40,
+            cache_creation_input_tokens=0,
+            cache_read_input_tokens=900,
+        )
+
+        with patch.object(claude_service.client.messages, "create", return_value=mock_message) as mock_create:
+            result = await claude_service.generate_mnemonics(
+                list_items=list_items, user_id="test-user", deck_id="test-deck"
+            )
+
+        kwargs = mock_create.call_args.kwargs
+        # Below the 1024-token cache minimum, so no cache_control marker
+        assert isinstance(kwargs["system"], str)
+        assert "ACROSTIC TECHNIQUE" in kwargs["system"]
+        assert "Item1" not in kwargs["system"]
+        assert "1. Item1" in kwargs["messages"][0]["content"]
+
+        assert result["metadata"]["input_tokens"] == 40
+        assert result["metadata"]["cache_creation_input_tokens"] == 0
+        assert result["metadata"]["cache_read_input_tokens"] == 900
+
     @pytest.mark.asyncio
     async def test_generate_with_markdown_wrapped_json(self, claude_service, mock_claude_response):
         """Should handle Claude response wrapped in markdown code blocks"""
@@ -255,6 +299,188 @@ class TestGenerateMnemonics:
                 )
 
 
+@pytest.fixture
+def parallel_settings():
+    """Enable parallel technique generation"""
+    with patch("app.services.claude_service.settings") as mock_settings:
+        mock_settings.MNEMONIC_PARALLEL_GENERATION = True
+        mock_settings.MNEMONIC_TECHNIQUE_MAX_ATTEMPTS = 2
+        yield mock_settings
+
+
+def technique_of(kwargs):
+    """Return which technique a focused request asks for"""
+    system_text = kwargs["system"]
+    for technique, marker in (("acrostic", "ACROSTIC"), ("story", "NARRATIVE STORY"), ("visual", "VISUAL/SPATIAL")):
+        if marker in system_text:
+            return technique
+    raise AssertionError("No technique in system prompt")
+
+
+def technique_message(technique_content):
+    """Build a mock Claude message for one technique"""
+    message = Mock()
+    message.content = [Mock(text=json.dumps(technique_content))]
+    message.usage = Mock(input_tokens=10, cache_creation_input_tokens=0, cache_read_input_tokens=300)
+    return message
+
+
+class TestParallelGeneration:
+    """Test concurrent per-technique mnemonic generation"""
+
+    @pytest.mark.asyncio
+    async def test_assembles_three_focused_calls(self, claude_service, mock_claude_response, parallel_settings):
+        """Each technique should come from its own single-technique request"""
+        list_items = ["Epinephrine", "Amiodarone", "Lidocaine", "Atropine"]
+
+        def create(**kwargs):
+            assert kwargs["system"].count("TECHNIQUE") == 1
+            return technique_message(mock_claude_response[technique_of(kwargs)])
+
+        with patch.object(claude_service.client.messages, "create", side_effect=create) as mock_create:
+            result = await claude_service.generate_mnemonics(list_items=list_items, user_id="test-user")
+
+        assert mock_create.call_count == 3
+        for technique in ["acrostic", "story", "visual"]:
+            assert result[technique] == mock_claude_response[technique]
+        assert result["metadata"]["model"] == "claude-sonnet-4-20250514"
+        assert result["metadata"]["input_tokens"] == 30
+        assert result["metadata"]["cache_read_input_tokens"] == 900
+
+    @pytest.mark.asyncio
+    async def test_techniques_run_concurrently(self, claude_service, mock_claude_response, parallel_settings):
+        """Wall-clock time should be close to one call, not three"""
+        list_items = ["Item1", "Item2", "Item3"]
+
+        def create(**kwargs):
+            time.sleep(0.2)
+            return technique_message(mock_claude_response[technique_of(kwargs)])
+
+        with patch.object(claude_service.client.messages, "create", side_effect=create):
+            start = time.perf_counter()
+            await claude_service.generate_mnemonics(list_items=list_items, user_id="test-user")
+            elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.5
+
+    @pytest.mark.asyncio
+    async def test_failed_technique_is_retried_alone(self, claude_service, mock_claude_response, parallel_settings):
+        """A timeout on one technique should only repeat that technique's call"""
+        list_items = ["Item1", "Item2", "Item3"]
+        claude_service.technique_retry_delay = 0
+        calls = []
+        lock = threading.Lock()
+
+        def create(**kwargs):
+            technique = technique_of(kwargs)
+            with lock:
+                calls.append(technique)
+                first_story = technique == "story" and calls.count("story") == 1
+            if first_story:
+                raise anthropic.APITimeoutError(request=Mock())
+            return technique_message(mock_claude_response[technique])
+
+        with patch.object(claude_service.client.messages, "create", side_effect=create), \
+                patch.object(model_router, "run", wraps=model_router.run) as mock_run:
+            result = await claude_service.generate_mnemonics(list_items=list_items, user_id="test-user")
+
+        assert sorted(calls) == ["acrostic", "story", "story", "visual"]
+        assert result["story"] == mock_claude_response["story"]
+        # The repeated call is recorded as a retry in llm_calls
+        assert sorted(call.kwargs["retries"] for call in mock_run.call_args_list) == [0, 0, 0, 1]
+
+    @pytest.mark.asyncio
+    async def test_technique_failing_every_attempt_raises(self, claude_service, mock_claude_response, parallel_settings):
+        """Generation should fail once a technique exhausts its attempts"""
+        list_items = ["Item1", "Item2", "Item3"]
+        claude_service.technique_retry_delay = 0
+
+        def create(**kwargs):
+            if technique_of(kwargs) == "visual":
+                raise anthropic.APITimeoutError(request=Mock())
+            return technique_message(mock_claude_response[technique_of(kwargs)])
+
+        with patch.object(claude_service.client.messages, "create", side_effect=create):
+            with pytest.raises(Exception, match="longer than expected"):
+                await claude_service.generate_mnemonics(list_items=list_items, user_id="test-user")
+
+
+class TestRequestCoalescing:
+    """Test deduplication of identical in-flight calls"""
+
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_generations_share_one_call(self, claude_service, mock_claude_response):
+        """A double-click should not start a second Claude call"""
+        list_items = ["Epinephrine", "Amiodarone", "Lidocaine"]
+
+        mock_message = Mock()
+        mock_message.content = [Mock(text=json.dumps(mock_claude_response))]
+
+        with patch.object(claude_service.client.messages, "create", return_value=mock_message) as mock_create:
+            results = await asyncio.gather(
+                claude_service.generate_mnemonics(list_items=list_items, user_id="user"),
+                claude_service.generate_mnemonics(list_items=[" epinephrine", "AMIODARONE", "lidocaine "], user_id="user"),
+            )
+
+        assert mock_create.call_count == 1
+        assert results[0]["acrostic"] == results[1]["acrostic"]
+
+    @pytest.mark.asyncio
+    async def test_caller_arriving_mid_call_joins_it(self, claude_service, mock_claude_response):
+        """A retry sent while the first Claude call is running should join it"""
+        list_items = ["Epinephrine", "Amiodarone", "Lidocaine"]
+        mock_message = Mock()
+        mock_message.content = [Mock(text=json.dumps(mock_claude_response))]
+
+        def slow_create(**kwargs):
+            time.sleep(0.3)  # The sync client blocks its thread for the whole call
+            return mock_message
+
+        with patch.object(claude_service.client.messages, "create", side_effect=slow_create) as mock_create:
+            first = asyncio.create_task(claude_service.generate_mnemonics(list_items=list_items, user_id="user"))
+            await asyncio.sleep(0.05)
+            assert not first.done()
+            second = await claude_service.generate_mnemonics(list_items=list_items, user_id="user")
+            await first
+
+        assert mock_create.call_count == 1
+        assert second["acrostic"] == mock_claude_response["acrostic"]
+
+    @pytest.mark.asyncio
+    async def test_concept_extraction_caller_arriving_mid_call_joins_it(self, claude_service):
+        """A re-uploaded PDF while extraction is running should share the call"""
+        mock_message = Mock()
+        mock_message.content = [Mock(text=json.dumps({"concepts": ["Heart pumps blood"]}))]
+
+        def slow_create(**kwargs):
+            time.sleep(0.3)
+            return mock_message
+
+        with patch.object(claude_service.client.messages, "create", side_effect=slow_create) as mock_create:
+            first = asyncio.create_task(claude_service.extract_key_concepts("The heart pumps blood.", user_id="user"))
+            await asyncio.sleep(0.05)
+            assert not first.done()
+            await claude_service.extract_key_concepts("The heart pumps blood.", user_id="user")
+            await first
+
+        assert mock_create.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_different_users_are_not_coalesced(self, claude_service, mock_claude_response):
+        """Requests from different users run separately"""
+        list_items = ["Epinephrine", "Amiodarone", "Lidocaine"]
+        mock_message = Mock()
+        mock_message.content = [Mock(text=json.dumps(mock_claude_response))]
+
+        with patch.object(claude_service.client.messages, "create", return_value=mock_message) as mock_create:
+            await asyncio.gather(
+                claude_service.generate_mnemonics(list_items=list_items, user_id="user-a"),
+                claude_service.generate_mnemonics(list_items=list_items, user_id="user-b"),
+            )
+
+        assert mock_create.call_count == 2
+
+
 class TestExtractKeyConcepts:
     """Test key concept extraction from text"""
 
@@ -275,6 +501,18 @@ class TestExtractKeyConcepts:
             assert "Heart pumps blood" in concepts
             assert "Lungs exchange oxygen" in concepts
 
+    @pytest.mark.asyncio
+    async def test_extract_attributes_call_to_user(self, claude_service):
+        """The llm_calls row should carry the user who uploaded the text"""
+        mock_message = Mock()
+        mock_message.content = [Mock(text=json.dumps({"concepts": ["Heart pumps blood"]}))]
+
+        with patch.object(claude_service.client.messages, "create", return_value=mock_message), \
+                patch.object(model_router, "run", wraps=model_router.run) as mock_run:
+            await claude_service.extract_key_concepts("The heart pumps blood.", user_id="user-123")
+
+        assert mock_run.call_args.kwargs["user_id"] == "user-123"
+
     @pytest.mark.asyncio
     async def test_extract_truncates_long_text(self, claude_service):
         """Should truncate text longer than 15000 characters"""
@@ -0,0 +1,211 @@
+"""
+Tests for Deck Cache
+
+Tests cover:
+- LRU bound and TTL expiry
+- Read-through loading and hit rate
+- Invalidation on deck writes
+- Invalidation from Postgres notifications
+"""
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from app.services.deck_cache import DeckCache, PostgresDeckInvalidation
+from app.services.deck_service import DeckService
+
+
+@pytest.fixture
+def mock_supabase_client():
+    """Mock Supabase client with a chainable query builder"""
+    client = Mock()
+    for method in ["table", "select", "eq", "single", "update", "delete"]:
+        setattr(client, method, Mock(return_value=client))
+    client.execute = Mock()
+    return client
+
+
+@pytest.fixture
+def deck_service(mock_supabase_client):
+    """DeckService with a mock client and its own cache"""
+    service = DeckService()
+    service.admin_client = mock_supabase_client
+    service.cache = DeckCache()
+    return service
+
+
+class TestDeckCache:
+    """Test the LRU/TTL store"""
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = DeckCache(max_entries=2)
+        cache.set("d1", {"id": "d1"})
+        cache.set("d2", {"id": "d2"})
+        cache.get("d1")
+        cache.set("d3", {"id": "d3"})
+
+        assert cache.get("d2") is None
+        assert cache.get("d1") == {"id": "d1"}
+        assert cache.evictions == 1
+
+    def test_expired_entry_is_a_miss(self):
+        cache = DeckCache(ttl_seconds=60)
+        with patch("app.services.deck_cache.time.monotonic", return_value=1000):
+            cache.set("d1", {"id": "d1"})
+        with patch("app.services.deck_cache.time.monotonic", return_value=1061):
+            assert cache.get("d1") is None
+
+    def test_callers_get_a_copy(self):
+        """Mutating a returned deck shouldn't change the cached row"""
+        cache = DeckCache()
+        cache.set("d1", {"id": "d1", "title": "A"})
+        cache.get("d1")["title"] = "B"
+
+        assert cache.get("d1")["title"] == "A"
+
+    @pytest.mark.asyncio
+    async def test_read_through_loads_once(self):
+        cache = DeckCache()
+        load = AsyncMock(return_value={"id": "d1"})
+
+        await cache.get_or_load("d1", load)
+        await cache.get_or_load("d1", load)
+
+        load.assert_awaited_once()
+        assert cache.hit_rate() == 0.5
+
+    @pytest.mark.asyncio
+    async def test_missing_deck_is_not_cached(self):
+        """A deck created after a miss should be visible immediately"""
+        cache = DeckCache()
+        load = AsyncMock(return_value=None)
+
+        await cache.get_or_load("d1", load)
+        await cache.get_or_load("d1", load)
+
+        assert load.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_load_invalidated_midway_is_not_cached(self):
+        """A row read before an invalidation shouldn't be written back"""
+        cache = DeckCache()
+
+        async def stale_load():
+            cache.invalidate("d1")  # A write lands while the old row is in flight
+            return {"id": "d1", "title": "Old"}
+
+        assert (await cache.get_or_load("d1", stale_load))["title"] == "Old"
+        assert cache.get("d1") is None
+        assert cache._loading == {} and cache._generations == {}
+
+        await cache.get_or_load("d1", AsyncMock(return_value={"id": "d1", "title": "New"}))
+        assert cache.get("d1")["title"] == "New"
+
+    @pytest.mark.asyncio
+    async def test_load_across_clear_is_not_cached(self):
+        """clear() (e.g. lost notifications) also discards loads in flight"""
+        cache = DeckCache()
+
+        async def stale_load():
+            cache.clear()
+            return {"id": "d1"}
+
+        await cache.get_or_load("d1", stale_load)
+        assert cache.get("d1") is None
+
+    def test_metrics_report_counters(self):
+        cache = DeckCache()
+        cache.set("d1", {"id": "d1"})
+        cache.get("d1")
+        cache.get("d2")
+        cache.invalidate("d1")
+
+        metrics = cache.render_metrics()
+
+        assert 'brainkit_deck_cache_lookups_total{result="hit"} 1' in metrics
+        assert 'brainkit_deck_cache_lookups_total{result="miss"} 1' in metrics
+        assert "brainkit_deck_cache_invalidations_total 1" in metrics
+        assert "brainkit_deck_cache_entries 0" in metrics
+
+
+class TestDeckServiceCaching:
+    """Test DeckService reads and writes through the cache"""
+
+    @pytest.mark.asyncio
+    async def test_ownership_checked_against_cached_row(self, deck_service, mock_supabase_client):
+        mock_supabase_client.execute.return_value = Mock(data={"id": "d1", "user_id": "u1"})
+
+        assert await deck_service.get_deck_by_id("d1", "u1") == {"id": "d1", "user_id": "u1"}
+        assert await deck_service.get_deck_by_id("d1", "u2") is None
+        assert mock_supabase_client.execute.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_update_invalidates(self, deck_service, mock_supabase_client):
+        deck_service.cache.set("d1", {"id": "d1", "user_id": "u1", "name": "Old"})
+        mock_supabase_client.execute.return_value = Mock(data=[{"id": "d1", "user_id": "u1", "name": "New"}])
+
+        await deck_service.update_deck("d1", "u1", name="New")
+
+        assert deck_service.cache.get("d1") is None
+
+    @pytest.mark.asyncio
+    async def test_delete_invalidates(self, deck_service, mock_supabase_client):
+        deck_service.cache.set("d1", {"id": "d1", "user_id": "u1"})
+        mock_supabase_client.execute.return_value = Mock(data=[{"id": "d1"}])
+
+        assert await deck_service.delete_deck("d1", "u1") is True
+        assert deck_service.cache.get("d1") is None
+
+
+class TestPostgresDeckInvalidation:
+    """Test invalidation from other workers' writes"""
+
+    def test_notification_drops_deck(self):
+        cache = DeckCache()
+        cache.set("d1", {"id": "d1"})
+        cache.set("d2", {"id": "d2"})
+
+        PostgresDeckInvalidation(cache, "postgresql://")._on_notify(None, 1, "deck_cache_invalidate", "d1")
+
+        assert cache.get("d1") is None
+        assert cache.get("d2") == {"id": "d2"}
+
+    @pytest.mark.asyncio
+    async def test_lost_connection_bypasses_cache_until_reconnected(self):
+        """Entries can't be trusted without notifications, so lookups go to the database"""
+        cache = DeckCache()
+        cache.set("d1", {"id": "d1"})
+        listener = PostgresDeckInvalidation(cache, "postgresql://")
+        listener.RECONNECT_DELAYS = (0,)
+        connection = Mock(add_listener=AsyncMock())
+
+        with patch("app.services.deck_cache.asyncpg.connect", AsyncMock(
+            side_effect=[OSError("database restarting"), connection],
+        )) as mock_connect:
+            listener._on_terminate(None)
+
+            assert cache.get("d1") is None
+            load = AsyncMock(return_value={"id": "d1"})
+            await cache.get_or_load("d1", load)
+            assert cache.get("d1") is None  # Not cached while bypassed
+
+            await listener._reconnect_task
+
+        assert mock_connect.await_count == 2
+        assert cache.bypass is False
+        await cache.get_or_load("d1", load)
+        assert cache.get("d1") == {"id": "d1"}
+
+    @pytest.mark.asyncio
+    async def test_stop_does_not_reconnect(self):
+        """Closing the connection on shutdown shouldn't start a reconnect"""
+        listener = PostgresDeckInvalidation(DeckCache(), "postgresql://")
+        connection = Mock(is_closed=Mock(return_value=False))
+        connection.close = AsyncMock(side_effect=lambda: listener._on_terminate(connection))
+        listener._connection = connection
+
+        await listener.stop()
+
+        assert listener._reconnect_task is None
+        assert listener.cache.bypass is False
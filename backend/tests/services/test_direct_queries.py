@@ -0,0 +1,331 @@
+"""
+Tests for Direct Queries (pooled Postgres hot paths)
+
+Tests cover:
+- Ownership checks and malformed IDs
+- Statements sent for due cards, reviews and bulk edits
+- List versions used for ETags
+- Streak calculation
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import Mock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.direct_queries import DirectQueries
+
+
+class FakeResult:
+    """Result returning canned rows for every accessor used by DirectQueries"""
+
+    def __init__(self, rows=None, scalar=None):
+        self.rows = rows or []
+        self.scalar = scalar
+
+    def scalar_one_or_none(self):
+        return self.scalar
+
+    def scalars(self):
+        return Mock(all=Mock(return_value=self.rows), first=Mock(return_value=self.rows[0] if self.rows else None))
+
+    def all(self):
+        return self.rows
+
+    def first(self):
+        return self.rows[0] if self.rows else None
+
+    def one(self):
+        return self.rows[0]
+
+
+class FakeSession:
+    """Async session that records compiled SQL and replays queued results"""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.statements = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def begin(self):
+        return self
+
+    async def execute(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return self.results.pop(0)
+
+
+def make_queries(*results):
+    session = FakeSession(results)
+    return DirectQueries(session_maker=lambda: session), session
+
+
+class TestDueCards:
+    """Test due-card fetching"""
+
+    @pytest.mark.asyncio
+    async def test_due_cards_filter_on_card_owner(self):
+        """Due cards should come from one single-table query when any are due"""
+        card = Mock(to_dict=Mock(return_value={"id": "card-1"}))
+        queries, session = make_queries(FakeResult(rows=[card]))
+
+        result = await queries.get_due_cards(str(uuid4()), str(uuid4()), date(2026, 1, 1))
+
+        assert result == [{"id": "card-1"}]
+        assert len(session.statements) == 1
+        assert "flashcards.user_id =" in session.statements[0]
+        assert "JOIN" not in session.statements[0]
+
+    @pytest.mark.asyncio
+    async def test_deck_not_owned_returns_none(self):
+        """With nothing due, an unowned deck should be told apart from an empty one"""
+        queries, session = make_queries(FakeResult(rows=[]), FakeResult(scalar=None))
+
+        result = await queries.get_due_cards(str(uuid4()), str(uuid4()), date(2026, 1, 1))
+
+        assert result is None
+        assert len(session.statements) == 2
+
+    @pytest.mark.asyncio
+    async def test_malformed_ids_skip_the_database(self):
+        """IDs that aren't UUIDs can't match a row"""
+        queries, session = make_queries()
+
+        assert await queries.get_due_cards("not-a-uuid", str(uuid4()), date(2026, 1, 1)) is None
+        assert await queries.get_due_cards_for_user("not-a-uuid", date(2026, 1, 1)) == []
+        assert session.statements == []
+
+    @pytest.mark.asyncio
+    async def test_merged_queue_is_one_single_table_query(self):
+        """Due cards across decks should come from one query on flashcards.user_id"""
+        card = Mock(to_dict=Mock(return_value={"id": "card-1"}))
+        queries, session = make_queries(FakeResult(rows=[card]))
+
+        cards = await queries.get_due_cards_for_user(str(uuid4()), date(2026, 1, 1), deck_ids=[str(uuid4())])
+
+        assert cards == [{"id": "card-1"}]
+        assert len(session.statements) == 1
+        assert "JOIN" not in session.statements[0]
+        assert "flashcards.user_id =" in session.statements[0]
+        assert "flashcards.deck_id IN" in session.statements[0]
+
+
+class TestRecordReview:
+    """Test the review transaction"""
+
+    @pytest.mark.asyncio
+    async def test_review_updates_card_inserts_review_and_counts_session(self):
+        """All three writes should run, with the session counter incremented in SQL"""
+        card = Mock(to_dict=Mock(return_value={"id": "card-1"}))
+        queries, session = make_queries(FakeResult(rows=[card]), FakeResult(), FakeResult())
+
+        result = await queries.record_review(
+            flashcard_id=str(uuid4()),
+            user_id=str(uuid4()),
+            session_id=str(uuid4()),
+            srs_update={"ease_factor": 2.5, "interval_days": 1, "repetitions": 1, "next_review_date": date(2026, 1, 2)},
+            review={"quality": 3, "response_time_ms": None, "previous_interval": 0, "new_interval": 1,
+                    "previous_ease_factor": 2.5, "new_ease_factor": 2.5},
+        )
+
+        assert result == {"id": "card-1"}
+        update_card, insert_review, update_session = session.statements
+        assert update_card.startswith("UPDATE flashcards") and "RETURNING" in update_card
+        assert insert_review.startswith("INSERT INTO card_reviews")
+        assert "cards_reviewed=(study_sessions.cards_reviewed +" in update_session
+
+    @pytest.mark.asyncio
+    async def test_missing_card_writes_nothing_else(self):
+        """If the card is gone, no review row should be inserted"""
+        queries, session = make_queries(FakeResult(rows=[]))
+
+        result = await queries.record_review(str(uuid4()), str(uuid4()), None, {"interval_days": 1}, {"quality": 3})
+
+        assert result is None
+        assert len(session.statements) == 1
+
+
+class TestUpdateFlashcards:
+    """Test the bulk edit transaction"""
+
+    @pytest.mark.asyncio
+    async def test_all_edits_go_out_in_one_update(self):
+        """Edits should be one UPDATE joined to a VALUES list and filtered on the owner"""
+        card_id = uuid4()
+        card = Mock(to_dict=Mock(return_value={"id": str(card_id)}))
+        queries, session = make_queries(FakeResult(rows=[card]))
+
+        updated = await queries.update_flashcards(
+            str(uuid4()), {str(card_id): {"front": "Q"}, str(uuid4()): {"back": "A", "difficulty": "hard"}},
+        )
+
+        assert updated == [{"id": str(card_id)}]
+        (statement,) = session.statements
+        assert statement.startswith("UPDATE flashcards")
+        assert "FROM (VALUES" in statement and "flashcards.user_id =" in statement
+        assert "coalesce(edits.front, flashcards.front)" in statement
+        assert "ON CONFLICT" not in statement
+
+    @pytest.mark.asyncio
+    async def test_nothing_to_write_skips_the_database(self):
+        """Empty or malformed edits shouldn't open a transaction"""
+        queries, session = make_queries()
+
+        assert await queries.update_flashcards(str(uuid4()), {"not-a-uuid": {"front": "Q"}, str(uuid4()): {}}) == []
+        assert session.statements == []
+
+
+class TestDeleteFlashcards:
+    """Test the bulk delete transaction"""
+
+    @pytest.mark.asyncio
+    async def test_delete_and_recount_in_one_transaction(self):
+        """One DELETE over an ID array, then one recount for the affected decks"""
+        card_id, deck_id = uuid4(), uuid4()
+        queries, session = make_queries(FakeResult(rows=[(card_id, deck_id)]), FakeResult())
+
+        deleted = await queries.delete_flashcards(str(uuid4()), [str(card_id), str(uuid4())])
+
+        assert deleted == [{"id": str(card_id), "deck_id": str(deck_id)}]
+        delete_cards, recount = session.statements
+        assert delete_cards.startswith("DELETE FROM flashcards")
+        assert "= ANY (" in delete_cards and "flashcards.user_id =" in delete_cards
+        assert recount.startswith("UPDATE decks SET card_count=")
+
+    @pytest.mark.asyncio
+    async def test_nothing_deleted_skips_recount(self):
+        """No matching cards means no deck update"""
+        queries, session = make_queries(FakeResult(rows=[]))
+
+        assert await queries.delete_flashcards(str(uuid4()), [str(uuid4())]) == []
+        assert len(session.statements) == 1
+
+
+class TestSaveGeneratedFlashcards:
+    """Test merging regenerated cards into decks"""
+
+    @pytest.mark.asyncio
+    async def test_add_only_skips_existing_questions(self):
+        """Known questions shouldn't be reinserted and nothing should be deleted"""
+        deck_id = uuid4()
+        existing = [(uuid4(), deck_id, "What is A?", False)]
+        queries, session = make_queries(FakeResult(rows=existing), FakeResult(), FakeResult())
+
+        summary = await queries.save_generated_flashcards(
+            [{"deck_id": str(deck_id), "user_id": str(uuid4()), "cards": [
+                {"front": "what is a", "back": "A"},
+                {"front": "What is B?", "back": "B"},
+            ]}],
+            key=lambda front: front.lower().strip("?"),
+        )
+
+        assert summary == {str(deck_id): {"added": 1, "removed": 0}}
+        lock, insert_cards, recount = session.statements
+        assert lock.endswith("FOR UPDATE")
+        assert insert_cards.startswith("INSERT INTO flashcards")
+        assert recount.startswith("UPDATE decks SET card_count=")
+
+    @pytest.mark.asyncio
+    async def test_replace_keeps_matching_and_edited_cards(self):
+        """Replace should only delete unedited cards missing from the new set"""
+        deck_id = uuid4()
+        stale, edited, kept = uuid4(), uuid4(), uuid4()
+        existing = [
+            (stale, deck_id, "Old question", False),
+            (edited, deck_id, "My own question", True),
+            (kept, deck_id, "What is A?", False),
+        ]
+        queries, session = make_queries(FakeResult(rows=existing), FakeResult(), FakeResult())
+
+        summary = await queries.save_generated_flashcards(
+            [{"deck_id": str(deck_id), "user_id": str(uuid4()), "cards": [{"front": "What is A?", "back": "A"}]}],
+            key=str.lower,
+            replace_existing=True,
+        )
+
+        assert summary == {str(deck_id): {"added": 0, "removed": 1}}
+        lock, delete_cards, recount = session.statements
+        assert delete_cards.startswith("DELETE FROM flashcards")
+        assert recount.startswith("UPDATE decks")
+
+
+class TestListVersions:
+    """Test the aggregates behind list ETags"""
+
+    @pytest.mark.asyncio
+    async def test_decks_version_is_one_aggregate(self):
+        updated = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        queries, session = make_queries(FakeResult(rows=[(3, updated)]))
+
+        assert await queries.get_decks_version(str(uuid4())) == (3, updated)
+        assert len(session.statements) == 1
+        assert "max(decks.updated_at)" in session.statements[0]
+
+    @pytest.mark.asyncio
+    async def test_flashcards_version_filters_on_card_owner(self):
+        queries, session = make_queries(FakeResult(rows=[(0, None)]))
+
+        assert await queries.get_deck_flashcards_version(str(uuid4()), str(uuid4())) == (0, None)
+        assert "max(flashcards.updated_at)" in session.statements[0]
+        assert "flashcards.user_id =" in session.statements[0]
+
+    @pytest.mark.asyncio
+    async def test_malformed_ids_skip_the_database(self):
+        queries, session = make_queries()
+
+        assert await queries.get_decks_version("not-a-uuid") == (0, None)
+        assert await queries.get_deck_flashcards_version("not-a-uuid", str(uuid4())) == (0, None)
+        assert session.statements == []
+
+
+class TestStatsOverview:
+    """Test study statistics"""
+
+    @pytest.mark.asyncio
+    async def test_totals_include_compacted_summaries(self):
+        """Reviews in compacted months should still count towards totals and retention"""
+        today = date(2026, 1, 10)
+        queries, session = make_queries(
+            FakeResult(rows=[(10, 8, 4)]),       # raw reviews: total, retained, this month
+            FakeResult(rows=[(90, 72)]),         # summaries: total, retained
+            FakeResult(rows=[(3600, 600)]),      # study time: total, this month
+            FakeResult(rows=[today]),            # study days
+        )
+
+        stats = await queries.get_stats_overview(str(uuid4()), today)
+
+        assert stats["total_cards_studied"] == 100
+        assert stats["retention_rate"] == 80
+        assert stats["this_month_cards"] == 4
+        assert stats["streak"] == 1
+        assert "card_review_summaries" in session.statements[1]
+        assert "card_reviews.reviewed_at >=" in session.statements[3]
+
+
+class TestStreak:
+    """Test streak calculation"""
+
+    def test_streak_counts_back_from_today(self):
+        today = date(2026, 1, 10)
+        days = {today - timedelta(days=i) for i in range(4)}
+
+        assert DirectQueries._streak(days, today) == 4
+
+    def test_streak_survives_until_today_is_studied(self):
+        """Not having studied yet today shouldn't reset the streak"""
+        today = date(2026, 1, 10)
+        days = {today - timedelta(days=i) for i in range(1, 3)}
+
+        assert DirectQueries._streak(days, today) == 2
+
+    def test_gap_breaks_streak(self):
+        today = date(2026, 1, 10)
+
+        assert DirectQueries._streak({today - timedelta(days=2)}, today) == 0
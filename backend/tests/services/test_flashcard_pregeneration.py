@@ -0,0 +1,149 @@
+"""
+Tests for speculative flashcard pre-generation
+
+Tests cover:
+- Background generation for every mnemonic option
+- Claiming the selected option's flashcards
+- Mismatch and TTL eviction
+- generate_flashcards using a pre-generated result
+"""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.services.flashcard_pregeneration import FlashcardPregenerationCache
+from app.services.flashcard_service import FlashcardService
+
+MNEMONICS = {"acrostic": "A phrase", "story": "A story", "visual": "A journey"}
+
+
+def make_generate(calls):
+    """Fake generator recording its calls"""
+    async def generate(list_items, mnemonic_type, content):
+        calls.append(mnemonic_type)
+        return [{"front": f"{mnemonic_type} Q", "back": "A"}]
+    return generate
+
+
+class TestPregenerationCache:
+    """Test the pre-generation cache"""
+
+    @pytest.mark.asyncio
+    async def test_generates_all_options_and_returns_selected(self):
+        """All three options should be generated; the selected one is claimed"""
+        cache = FlashcardPregenerationCache()
+        calls = []
+
+        cache.start("gen-1", "A\nB\nC", MNEMONICS, make_generate(calls))
+        cache.assign("deck-1", "gen-1", "story")
+        task = cache.take("deck-1", "A\nB\nC", "story", "A story")
+
+        assert await task == [{"front": "story Q", "back": "A"}]
+        assert sorted(calls) == ["acrostic", "story", "visual"]
+        assert cache.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_claimed_once(self):
+        """A claimed result should not be returned again"""
+        cache = FlashcardPregenerationCache()
+        cache.start("gen-1", "A\nB\nC", MNEMONICS, make_generate([]))
+        cache.assign("deck-1", "gen-1", "story")
+
+        assert cache.take("deck-1", "A\nB\nC", "story", "A story") is not None
+        assert cache.take("deck-1", "A\nB\nC", "story", "A story") is None
+
+    @pytest.mark.asyncio
+    async def test_miss_when_deck_changed(self):
+        """A deck whose list or mnemonic changed should not get stale cards"""
+        cache = FlashcardPregenerationCache()
+        cache.start("gen-1", "A\nB\nC", MNEMONICS, make_generate([]))
+
+        cache.assign("deck-1", "gen-1", "story")
+        assert cache.take("deck-1", "A\nB\nC\nD", "story", "A story") is None
+
+        cache.assign("deck-1", "gen-1", "story")
+        assert cache.take("deck-1", "A\nB\nC", "story", "Edited story") is None
+        assert cache.misses == 2
+
+    @pytest.mark.asyncio
+    async def test_unassigned_deck_misses(self):
+        """Without select_mnemonic there is nothing to claim"""
+        cache = FlashcardPregenerationCache()
+        assert cache.take("deck-1", "A", "story", "A story") is None
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_are_evicted_and_cancelled(self):
+        """Entries older than the TTL should be dropped and their tasks cancelled"""
+        cache = FlashcardPregenerationCache(ttl_seconds=60)
+
+        async def slow_generate(list_items, mnemonic_type, content):
+            await asyncio.sleep(10)
+
+        cache.start("gen-1", "A\nB\nC", MNEMONICS, slow_generate)
+        cache.assign("deck-1", "gen-1", "story")
+        tasks = list(cache._entries["gen-1"]["tasks"].values())
+        cache._entries["gen-1"]["created_at"] = time.monotonic() - 61
+
+        assert cache.evict_expired() == 1
+        await asyncio.sleep(0)
+        assert all(task.cancelled() for task in tasks)
+        assert cache.take("deck-1", "A\nB\nC", "story", "A story") is None
+
+
+class TestGenerateFlashcardsWithPregeneration:
+    """Test generate_flashcards picking up pre-generated cards"""
+
+    @pytest.mark.asyncio
+    async def test_uses_pregenerated_cards(self):
+        """A cache hit should skip the Claude call"""
+        service = FlashcardService()
+        deck = {
+            "id": "deck-1",
+            "original_list": "A\nB\nC",
+            "selected_mnemonic_type": "story",
+            "selected_mnemonic_content": "A story",
+        }
+        cache = FlashcardPregenerationCache()
+        cache.start("gen-1", "A\nB\nC", MNEMONICS, make_generate([]))
+        cache.assign("deck-1", "gen-1", "story")
+
+        with patch("app.services.flashcard_service.flashcard_pregeneration", cache), \
+                patch.object(service, "get_deck_for_generation", new=AsyncMock(return_value=deck)), \
+                patch.object(service, "_generate_flashcards_data", new=AsyncMock()) as mock_generate, \
+                patch.object(service, "_insert_flashcards", side_effect=lambda deck_id, cards: cards), \
+                patch.object(service, "_update_deck_card_count", new=AsyncMock()):
+            flashcards = await service.generate_flashcards("deck-1", "user-1")
+
+        mock_generate.assert_not_awaited()
+        assert flashcards == [{"front": "story Q", "back": "A"}]
+
+    @pytest.mark.asyncio
+    async def test_failed_pregeneration_falls_back(self):
+        """A failed background generation should fall back to a fresh call"""
+        service = FlashcardService()
+        deck = {
+            "id": "deck-1",
+            "original_list": "A\nB\nC",
+            "selected_mnemonic_type": "story",
+            "selected_mnemonic_content": "A story",
+        }
+
+        async def failing_generate(list_items, mnemonic_type, content):
+            raise Exception("Claude API call failed")
+
+        cache = FlashcardPregenerationCache()
+        cache.start("gen-1", "A\nB\nC", MNEMONICS, failing_generate)
+        cache.assign("deck-1", "gen-1", "story")
+        fresh = [{"front": "Fresh Q", "back": "A"}]
+
+        with patch("app.services.flashcard_service.flashcard_pregeneration", cache), \
+                patch.object(service, "get_deck_for_generation", new=AsyncMock(return_value=deck)), \
+                patch.object(service, "_generate_flashcards_data", new=AsyncMock(return_value=fresh)), \
+                patch.object(service, "_insert_flashcards", side_effect=lambda deck_id, cards: cards), \
+                patch.object(service, "_update_deck_card_count", new=AsyncMock()):
+            flashcards = await service.generate_flashcards("deck-1", "user-1")
+
+        assert flashcards == fresh
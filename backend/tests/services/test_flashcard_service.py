@@ -8,12 +8,18 @@ Tests cover:
 - Scenario 3: Parse markdown-wrapped JSON responses
 """
 
+import asyncio
 import json
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
+from pydantic import ValidationError
 
+from app.core.config import settings
+from app.core.llm_json import JSONArrayStream
+from app.schemas.flashcard import BulkFlashcardUpdate
 from app.services.flashcard_service import FlashcardService
+from app.services.model_router import model_router
 
 
 @pytest.fixture
@@ -74,6 +80,46 @@ class TestFlashcardGenerationAPI:
                     assert all("back" in card for card in result)
                     assert all("difficulty" in card for card in result)
 
+    @pytest.mark.asyncio
+    async def test_call_claude_api_attributes_call_to_user(self, mock_flashcards_response):
+        """The llm_calls row should carry the user the cards are generated for"""
+        service = FlashcardService()
+
+        mock_message = Mock()
+        mock_message.content = [Mock(text=json.dumps(mock_flashcards_response))]
+
+        with patch.object(service.claude_client.messages, "create", return_value=mock_message), \
+                patch.object(model_router, "run", wraps=model_router.run) as mock_run:
+            await service._call_claude_api(
+                list_items="Item1\nItem2\nItem3",
+                mnemonic_type="acrostic",
+                mnemonic_content="I Take Three",
+                user_id="user-123",
+            )
+
+        assert mock_run.call_args.kwargs["user_id"] == "user-123"
+
+    @pytest.mark.asyncio
+    async def test_call_claude_api_separates_static_instructions(self, mock_flashcards_response):
+        """Instructions should go in the system prompt, the deck data in the user message"""
+        service = FlashcardService()
+
+        mock_message = Mock()
+        mock_message.content = [Mock(text=json.dumps(mock_flashcards_response))]
+
+        with patch.object(service.claude_client.messages, "create", return_value=mock_message) as mock_create:
+            await service._call_claude_api(
+                list_items="Item1\nItem2\nItem3",
+                mnemonic_type="acrostic",
+                mnemonic_content="I Take Three"
+            )
+
+        kwargs = mock_create.call_args.kwargs
+        assert isinstance(kwargs["system"], str)
+        assert "Item1" not in kwargs["system"]
+        assert "Item1" in kwargs["messages"][0]["content"]
+        assert "15-20" in kwargs["messages"][0]["content"]
+
     @pytest.mark.asyncio
     async def test_call_claude_api_with_markdown_wrapper(self, mock_flashcards_response):
         """
@@ -187,7 +233,7 @@ class TestPromptBuilding:
 
     @pytest.mark.asyncio
     async def test_claude_api_receives_correct_model(self):
-        """Should use claude-sonnet-4-20250514 model"""
+        """Should use the model routed for short flashcard sets"""
         with patch("app.core.supabase.get_supabase_client"):
             with patch("app.core.config.settings") as mock_settings:
                 mock_settings.CLAUDE_API_KEY = "test-api-key"
@@ -207,9 +253,50 @@ class TestPromptBuilding:
                     # Verify model parameter
                     assert mock_create.called
                     call_kwargs = mock_create.call_args[1]
-                    assert call_kwargs["model"] == "claude-sonnet-4-20250514"
+                    assert call_kwargs["model"] == settings.CLAUDE_MODEL_FLASHCARDS_SHORT
                     assert call_kwargs["max_tokens"] == 4000
 
+    @pytest.mark.asyncio
+    async def test_long_list_uses_flashcards_model(self):
+        """Lists above the short-set limit should use the main flashcards model"""
+        service = FlashcardService()
+        list_items = "\n".join(f"Item{i}" for i in range(settings.CLAUDE_FLASHCARDS_SHORT_MAX_ITEMS + 1))
+
+        mock_message = Mock()
+        mock_message.content = [Mock(text=json.dumps({"flashcards": []}))]
+
+        with patch.object(service.claude_client.messages, "create", return_value=mock_message) as mock_create:
+            await service._call_claude_api(
+                list_items=list_items,
+                mnemonic_type="acrostic",
+                mnemonic_content="I Take"
+            )
+
+        assert mock_create.call_args[1]["model"] == settings.CLAUDE_MODEL_FLASHCARDS
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_larger_model_on_parse_failure(self):
+        """An unusable response from the small model should be retried on the fallback model"""
+        service = FlashcardService()
+
+        bad_message = Mock()
+        bad_message.content = [Mock(text="Sorry, I can't help with that")]
+        good_message = Mock()
+        good_message.content = [Mock(text=json.dumps({"flashcards": [{"front": "Q", "back": "A"}]}))]
+
+        with patch.object(
+            service.claude_client.messages, "create", side_effect=[bad_message, good_message]
+        ) as mock_create:
+            result = await service._call_claude_api(
+                list_items="Item1\nItem2",
+                mnemonic_type="acrostic",
+                mnemonic_content="I Take"
+            )
+
+        assert result == [{"front": "Q", "back": "A"}]
+        models = [call[1]["model"] for call in mock_create.call_args_list]
+        assert models == [settings.CLAUDE_MODEL_FLASHCARDS_SHORT, settings.CLAUDE_FALLBACK_MODEL]
+
     @pytest.mark.asyncio
     async def test_prompt_includes_list_and_mnemonic(self):
         """Should include both list items and mnemonic in prompt"""
@@ -239,3 +326,357 @@ class TestPromptBuilding:
                     assert "Every Advanced" in prompt
                     assert "acrostic" in prompt
                     assert "15-20" in prompt  # Should mention count target
+
+
+@pytest.fixture
+def mock_supabase_client():
+    """Mock Supabase client with a chainable query builder"""
+    client = Mock()
+    for method in ["table", "select", "eq", "in_", "insert", "update", "upsert", "delete"]:
+        setattr(client, method, Mock(return_value=client))
+    client.execute = Mock()
+    return client
+
+
+class TestBulkOperations:
+    """Test bulk flashcard update and delete"""
+
+    @pytest.mark.asyncio
+    async def test_bulk_update_merges_edits_into_one_transaction(self):
+        """Should send each card's merged edits to one direct update"""
+        service = FlashcardService()
+        service.queries = Mock(update_flashcards=AsyncMock(return_value=[
+            {"id": "c1", "difficulty": "hard"}, {"id": "c2", "back": "New answer"},
+        ]))
+
+        result = await service.bulk_update_flashcards(
+            user_id="u1",
+            updates=[
+                {"id": "c1", "difficulty": "hard"},
+                {"id": "c2", "back": "New answer"},
+                {"id": "c1", "front": "Edited"},
+                {"id": "c3", "front": "Not mine"},
+            ],
+        )
+
+        service.queries.update_flashcards.assert_awaited_once_with("u1", {
+            "c1": {"difficulty": "hard", "front": "Edited"},
+            "c2": {"back": "New answer"},
+            "c3": {"front": "Not mine"},
+        })
+        assert [card["id"] for card in result["flashcards"]] == ["c1", "c2"]
+        assert result["not_found_ids"] == ["c3"]
+
+    @pytest.mark.asyncio
+    async def test_bulk_update_normalizes_ids(self):
+        """An uppercase ID should match the lowercase one the database returns"""
+        card_id = "123e4567-e89b-12d3-a456-426614174000"
+        service = FlashcardService()
+        service.queries = Mock(update_flashcards=AsyncMock(return_value=[{"id": card_id, "front": "Q"}]))
+
+        result = await service.bulk_update_flashcards(user_id="u1", updates=[{"id": card_id.upper(), "front": "Q"}])
+
+        service.queries.update_flashcards.assert_awaited_once_with("u1", {card_id: {"front": "Q"}})
+        assert result["not_found_ids"] == []
+
+    def test_bulk_update_item_needs_a_change(self):
+        """An edit with no fields should be rejected, not silently skipped"""
+        with pytest.raises(ValidationError, match="at least one of front, back, difficulty"):
+            BulkFlashcardUpdate(id="123e4567-e89b-12d3-a456-426614174000")
+
+        assert BulkFlashcardUpdate(id="123e4567-e89b-12d3-a456-426614174000", difficulty="hard")
+
+    @pytest.mark.asyncio
+    async def test_bulk_delete_goes_through_one_transaction(self):
+        """Should delete directly and invalidate each affected deck once"""
+        card_id = "123e4567-e89b-12d3-a456-426614174000"
+        service = FlashcardService()
+        service.queries = Mock(delete_flashcards=AsyncMock(return_value=[
+            {"id": card_id, "deck_id": "d1"},
+            {"id": "c2", "deck_id": "d1"},
+        ]))
+
+        with patch("app.services.flashcard_service.deck_cache") as mock_cache:
+            result = await service.bulk_delete_flashcards(
+                user_id="u1", flashcard_ids=[card_id.upper(), "c2", "c9", "c2"],
+            )
+
+        service.queries.delete_flashcards.assert_awaited_once_with("u1", [card_id, "c2", "c9"])
+        assert result == {"deleted": 2, "not_found_ids": ["c9"]}
+        mock_cache.invalidate.assert_called_once_with("d1")
+
+    @pytest.mark.asyncio
+    async def test_bulk_delete_nothing_owned(self):
+        """Every ID should be reported when nothing was deleted"""
+        service = FlashcardService()
+        service.queries = Mock(delete_flashcards=AsyncMock(return_value=[]))
+
+        result = await service.bulk_delete_flashcards(user_id="u1", flashcard_ids=["c1"])
+
+        assert result == {"deleted": 0, "not_found_ids": ["c1"]}
+
+
+class TestOwnership:
+    """Test ownership checks on the denormalized flashcards.user_id"""
+
+    @pytest.mark.asyncio
+    async def test_get_flashcard_is_one_single_table_query(self, mock_supabase_client):
+        """Ownership should be a predicate on the card, not a join to decks"""
+        service = FlashcardService()
+        service.admin_client = mock_supabase_client
+        mock_supabase_client.single = Mock(return_value=mock_supabase_client)
+        mock_supabase_client.execute.return_value = Mock(data={"id": "c1", "user_id": "u1"})
+
+        result = await service.get_flashcard_by_id("c1", "u1")
+
+        assert result == {"id": "c1", "user_id": "u1"}
+        mock_supabase_client.table.assert_called_once_with("flashcards")
+        mock_supabase_client.select.assert_called_once_with("*")
+        mock_supabase_client.eq.assert_any_call("user_id", "u1")
+
+    @pytest.mark.asyncio
+    async def test_create_flashcard_skips_deck_query(self, mock_supabase_client):
+        """The insert carries user_id and the trigger checks it against the deck"""
+        service = FlashcardService()
+        service.admin_client = mock_supabase_client
+        mock_supabase_client.execute.return_value = Mock(data=[{"id": "c1"}])
+
+        with patch.object(service, "_update_deck_card_count", new=AsyncMock()):
+            await service.create_flashcard("d1", "u1", "Q", "A")
+
+        mock_supabase_client.table.assert_called_once_with("flashcards")
+        assert mock_supabase_client.insert.call_args[0][0]["user_id"] == "u1"
+
+    @pytest.mark.asyncio
+    async def test_create_flashcard_in_foreign_deck(self, mock_supabase_client):
+        """A trigger rejection should surface as Deck not found"""
+        service = FlashcardService()
+        service.admin_client = mock_supabase_client
+        mock_supabase_client.execute.side_effect = Exception("Deck not found or access denied")
+
+        with pytest.raises(Exception, match="^Deck not found$"):
+            await service.create_flashcard("d1", "u2", "Q", "A")
+
+
+class TestParallelGeneration:
+    """Test list partitioning and parallel generation for large lists"""
+
+    def test_short_list_is_single_group(self):
+        """Lists up to SINGLE_CALL_MAX_ITEMS should use one call"""
+        service = FlashcardService()
+        items = "\n".join(f"Item{i}" for i in range(service.SINGLE_CALL_MAX_ITEMS))
+
+        assert len(service._partition_list(items)) == 1
+
+    def test_long_list_is_partitioned_evenly(self):
+        """A 50-item list should be split into evenly sized groups"""
+        service = FlashcardService()
+        items = "\n".join(f"Item{i}" for i in range(50))
+
+        groups = service._partition_list(items)
+
+        assert len(groups) == 5
+        assert all(len(group) == 10 for group in groups)
+        assert [item for group in groups for item in group] == [f"Item{i}" for i in range(50)]
+
+    def test_dedupe_by_normalized_front(self):
+        """Questions differing only in case/punctuation should be merged"""
+        service = FlashcardService()
+        cards = [
+            {"front": "What is Item1?", "back": "A"},
+            {"front": "what is  item1", "back": "B"},
+            {"front": "What is Item2?", "back": "C"},
+        ]
+
+        result = service._dedupe_flashcards(cards)
+
+        assert [card["back"] for card in result] == ["A", "C"]
+
+    @pytest.mark.asyncio
+    async def test_groups_generated_concurrently_and_merged(self):
+        """Each group should get its own call and results merged in order"""
+        service = FlashcardService()
+        items = "\n".join(f"Item{i}" for i in range(30))
+
+        async def fake_call(list_items, mnemonic_type, mnemonic_content, focus_items=None, user_id=None, retries=0):
+            return [{"front": f"What is {item}?", "back": item} for item in focus_items] + [
+                {"front": "What is the mnemonic?", "back": "shared"}
+            ]
+
+        with patch.object(service, "_call_claude_api", side_effect=fake_call) as mock_call:
+            result = await service._generate_flashcards_data(items, "acrostic", "Mnemonic")
+
+        assert mock_call.call_count == 3
+        assert len(result) == 31  # 30 item cards + 1 deduplicated shared card
+        assert result[0]["back"] == "Item0"
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        """No more than MAX_CONCURRENT_CALLS groups should run at once"""
+        service = FlashcardService()
+        service.MAX_CONCURRENT_CALLS = 2
+        items = "\n".join(f"Item{i}" for i in range(60))
+        running = 0
+        peak = 0
+
+        async def fake_call(list_items, mnemonic_type, mnemonic_content, focus_items=None, user_id=None, retries=0):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return [{"front": focus_items[0], "back": "A"}]
+
+        with patch.object(service, "_call_claude_api", side_effect=fake_call):
+            await service._generate_flashcards_data(items, "acrostic", "Mnemonic")
+
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_group_is_retried_once(self):
+        """A group that fails once should be retried and its cards kept"""
+        service = FlashcardService()
+        items = "\n".join(f"Item{i}" for i in range(20))
+        mock_call = AsyncMock(side_effect=[
+            [{"front": "Q1", "back": "A1"}],
+            Exception("Claude API call failed: timeout"),
+            [{"front": "Q2", "back": "A2"}],
+        ])
+
+        with patch.object(service, "_call_claude_api", mock_call):
+            result = await service._generate_flashcards_data(items, "acrostic", "Mnemonic")
+
+        assert mock_call.call_count == 3
+        assert [call.kwargs.get("retries", 0) for call in mock_call.call_args_list] == [0, 0, 1]
+        assert result == [{"front": "Q1", "back": "A1"}, {"front": "Q2", "back": "A2"}]
+
+    @pytest.mark.asyncio
+    async def test_partial_group_failure_keeps_other_groups(self, caplog):
+        """A group failing twice should not discard other groups, and its items are logged"""
+        service = FlashcardService()
+        items = "\n".join(f"Item{i}" for i in range(20))
+        mock_call = AsyncMock(side_effect=[
+            [{"front": "Q1", "back": "A1"}],
+            Exception("Claude API call failed: timeout"),
+            Exception("Claude API call failed: timeout"),
+        ])
+
+        with patch.object(service, "_call_claude_api", mock_call):
+            result = await service._generate_flashcards_data(items, "acrostic", "Mnemonic")
+
+        assert result == [{"front": "Q1", "back": "A1"}]
+        assert "10 of 20 items without cards" in caplog.text
+        assert "Item19" in caplog.text and "Item0'" not in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_all_groups_failing_raises(self):
+        """Should raise if no group produced flashcards"""
+        service = FlashcardService()
+        items = "\n".join(f"Item{i}" for i in range(20))
+        mock_call = AsyncMock(side_effect=Exception("Claude API call failed: timeout"))
+
+        with patch.object(service, "_call_claude_api", mock_call):
+            with pytest.raises(Exception, match="Claude API call failed"):
+                await service._generate_flashcards_data(items, "acrostic", "Mnemonic")
+
+
+class FakeStream:
+    """Minimal stand-in for the Anthropic async message stream"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    @property
+    def text_stream(self):
+        async def iterate():
+            for chunk in self.chunks:
+                yield chunk
+        return iterate()
+
+    @property
+    def current_message_snapshot(self):
+        return Mock(usage=Mock(input_tokens=10, output_tokens=20,
+                               cache_creation_input_tokens=0, cache_read_input_tokens=0))
+
+
+class TestStreamingGeneration:
+    """Test streamed flashcard generation"""
+
+    def test_parser_emits_cards_as_they_complete(self, mock_flashcards_response):
+        """Cards should be returned as soon as their object closes, across chunk boundaries"""
+        text = "```json\n" + json.dumps(mock_flashcards_response) + "\n```"
+        parser = JSONArrayStream("flashcards")
+
+        emitted = []
+        for i in range(0, len(text), 7):
+            emitted.append(parser.feed(text[i:i + 7]))
+
+        cards = [card for batch in emitted for card in batch]
+        assert cards == mock_flashcards_response["flashcards"]
+        # First card is available before the stream ends
+        first_batch_index = next(i for i, batch in enumerate(emitted) if batch)
+        assert first_batch_index < len(emitted) - 1
+
+    def test_parser_handles_braces_and_quotes_in_strings(self):
+        """Braces and escaped quotes inside strings should not split objects"""
+        parser = JSONArrayStream("flashcards")
+        text = '{"flashcards": [{"front": "What is {x}?", "back": "A \\"quoted\\" }"}]}'
+
+        cards = parser.feed(text)
+
+        assert cards == [{"front": "What is {x}?", "back": 'A "quoted" }'}]
+
+    @pytest.mark.asyncio
+    async def test_stream_inserts_in_micro_batches(self, mock_supabase_client):
+        """Cards should be saved and yielded in batches of STREAM_BATCH_SIZE"""
+        service = FlashcardService()
+        service.admin_client = mock_supabase_client
+        service.STREAM_BATCH_SIZE = 2
+        mock_supabase_client.execute.side_effect = lambda: Mock(
+            data=[{"id": str(i)} for i in range(len(mock_supabase_client.insert.call_args[0][0]))]
+        )
+
+        cards = [{"front": f"Q{i}", "back": f"A{i}", "difficulty": "easy"} for i in range(5)]
+        payload = json.dumps({"flashcards": cards})
+        service.async_claude_client = Mock()
+        service.async_claude_client.messages.stream = Mock(
+            return_value=FakeStream([payload[i:i + 10] for i in range(0, len(payload), 10)])
+        )
+        deck = {"id": "d1", "original_list": "Q0\nQ1", "selected_mnemonic_type": "acrostic", "selected_mnemonic_content": "M"}
+
+        with patch.object(service, "_update_deck_card_count") as mock_recount:
+            batches = [batch async for batch in service.stream_generate_flashcards(deck)]
+
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert mock_supabase_client.insert.call_count == 3
+        mock_recount.assert_called_once_with("d1")
+
+    @pytest.mark.asyncio
+    async def test_disconnect_after_first_batch_still_recounts(self, mock_supabase_client):
+        """Closing the stream at the first yield should still update card_count"""
+        service = FlashcardService()
+        service.admin_client = mock_supabase_client
+        service.STREAM_BATCH_SIZE = 2
+        mock_supabase_client.execute.side_effect = lambda: Mock(
+            data=[{"id": str(i)} for i in range(len(mock_supabase_client.insert.call_args[0][0]))]
+        )
+
+        payload = json.dumps({"flashcards": [{"front": f"Q{i}", "back": f"A{i}"} for i in range(5)]})
+        service.async_claude_client = Mock()
+        service.async_claude_client.messages.stream = Mock(return_value=FakeStream([payload]))
+        deck = {"id": "d1", "original_list": "Q0\nQ1", "selected_mnemonic_type": "acrostic", "selected_mnemonic_content": "M"}
+
+        with patch.object(service, "_update_deck_card_count") as mock_recount:
+            generator = service.stream_generate_flashcards(deck)
+            first = await generator.__anext__()
+            await generator.aclose()
+
+        assert len(first) == 2
+        assert mock_supabase_client.insert.call_count == 1
+        mock_recount.assert_called_once_with("d1")
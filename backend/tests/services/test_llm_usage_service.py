@@ -0,0 +1,155 @@
+"""
+Tests for LLM Usage Service
+
+Tests cover:
+- Tracking successful, failed and streamed calls
+- Prometheus-style metrics rendering
+- Usage aggregation
+"""
+
+from unittest.mock import Mock
+
+import pytest
+
+from app.services.llm_usage_service import LLMUsageService
+
+
+@pytest.fixture
+def usage_service():
+    """Usage service that records metrics without writing to the database"""
+    service = LLMUsageService()
+    service.admin_client = Mock()
+    service.persist = False
+    return service
+
+
+def make_message(input_tokens=100, output_tokens=50, cache_read=0, cache_creation=0):
+    """Build a fake Messages API response with usage"""
+    return Mock(usage=Mock(
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        cache_read_input_tokens=cache_read,
+        cache_creation_input_tokens=cache_creation,
+    ))
+
+
+class TestTrack:
+    """Test call tracking"""
+
+    @pytest.mark.asyncio
+    async def test_records_tokens_and_outcome(self, usage_service):
+        """A successful call should record its tokens and a success outcome"""
+        recorded = []
+        usage_service.record = recorded.append
+
+        async with usage_service.track("mnemonic", "model-a", user_id="user-1") as call:
+            call.add_usage(make_message(cache_read=900))
+
+        row = recorded[0].to_row()
+        assert row["task"] == "mnemonic"
+        assert row["user_id"] == "user-1"
+        assert row["outcome"] == "success"
+        assert row["input_tokens"] == 100
+        assert row["output_tokens"] == 50
+        assert row["cache_read_input_tokens"] == 900
+        assert row["latency_ms"] >= 0
+        assert row["time_to_first_token_ms"] is None
+
+    @pytest.mark.asyncio
+    async def test_records_error_and_reraises(self, usage_service):
+        """A failing call should be recorded as an error and the exception re-raised"""
+        recorded = []
+        usage_service.record = recorded.append
+
+        with pytest.raises(ValueError):
+            async with usage_service.track("flashcards", "model-a") as call:
+                call.retries = 1
+                raise ValueError("bad json")
+
+        row = recorded[0].to_row()
+        assert row["outcome"] == "error"
+        assert row["error"] == "bad json"
+        assert row["retries"] == 1
+
+    @pytest.mark.asyncio
+    async def test_usage_is_summed_across_attempts(self, usage_service):
+        """Tokens from several attempts should add up; TTFT keeps the first mark"""
+        recorded = []
+        usage_service.record = recorded.append
+
+        async with usage_service.track("flashcards_stream", "model-a") as call:
+            call.mark_first_token()
+            first = call.time_to_first_token_ms
+            call.mark_first_token()
+            call.add_usage(make_message(input_tokens=10, output_tokens=5))
+            call.add_usage(make_message(input_tokens=20, output_tokens=7))
+
+        assert recorded[0].time_to_first_token_ms == first
+        assert recorded[0].tokens["input_tokens"] == 30
+        assert recorded[0].tokens["output_tokens"] == 12
+
+    @pytest.mark.asyncio
+    async def test_persists_row_in_background(self, usage_service):
+        """With persistence on, one llm_calls row should be inserted"""
+        usage_service.persist = True
+        client = usage_service.admin_client
+        client.table.return_value = client
+        client.insert.return_value = client
+
+        async with usage_service.track("mnemonic", "model-a") as call:
+            call.add_usage(make_message())
+
+        for task in list(usage_service._pending):
+            await task
+
+        client.table.assert_called_once_with("llm_calls")
+        assert client.insert.call_args[0][0]["task"] == "mnemonic"
+
+
+class TestMetrics:
+    """Test Prometheus-style metrics"""
+
+    @pytest.mark.asyncio
+    async def test_render_metrics(self, usage_service):
+        """Counters, token totals and latency histograms should be rendered"""
+        async with usage_service.track("mnemonic", "model-a") as call:
+            call.add_usage(make_message(input_tokens=100, cache_read=900))
+        with pytest.raises(RuntimeError):
+            async with usage_service.track("mnemonic", "model-a"):
+                raise RuntimeError("boom")
+
+        text = usage_service.render_metrics()
+
+        assert 'brainkit_llm_calls_total{task="mnemonic",model="model-a",outcome="success"} 1' in text
+        assert 'brainkit_llm_calls_total{task="mnemonic",model="model-a",outcome="error"} 1' in text
+        assert 'brainkit_llm_tokens_total{task="mnemonic",model="model-a",kind="cache_read_input"} 900' in text
+        assert 'brainkit_llm_latency_ms_count{task="mnemonic",model="model-a"} 2' in text
+        assert 'le="+Inf"} 2' in text
+
+
+class TestUsageSummary:
+    """Test usage aggregation"""
+
+    @pytest.mark.asyncio
+    async def test_summary_adds_totals(self, usage_service):
+        """Totals should be summed across the per-task rows from the database"""
+        rows = [
+            {"task": "mnemonic", "model": "m", "calls": 3, "errors": 1, "retries": 0,
+             "input_tokens": 300, "output_tokens": 90, "cache_creation_input_tokens": 900,
+             "cache_read_input_tokens": 1800, "avg_latency_ms": 2000.0, "p95_latency_ms": 3000.0,
+             "avg_time_to_first_token_ms": None},
+            {"task": "flashcards", "model": "m", "calls": 2, "errors": 0, "retries": 1,
+             "input_tokens": 200, "output_tokens": 80, "cache_creation_input_tokens": 0,
+             "cache_read_input_tokens": 0, "avg_latency_ms": 1000.0, "p95_latency_ms": 1500.0,
+             "avg_time_to_first_token_ms": 400.0},
+        ]
+        usage_service.admin_client.rpc.return_value.execute.return_value = Mock(data=rows)
+
+        summary = await usage_service.get_usage_summary(hours=6)
+
+        assert usage_service.admin_client.rpc.call_args[0][0] == "llm_usage_summary"
+        assert summary["usage"] == rows
+        assert summary["totals"]["calls"] == 5
+        assert summary["totals"]["errors"] == 1
+        assert summary["totals"]["retries"] == 1
+        assert summary["totals"]["cache_read_input_tokens"] == 1800
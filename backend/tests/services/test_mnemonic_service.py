@@ -8,6 +8,7 @@ Tests cover:
 - Mnemonic selection and deck updates
 """
 
+import asyncio
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
@@ -25,6 +26,7 @@ def mock_supabase_client():
     client.single = Mock(return_value=client)
     client.insert = Mock(return_value=client)
     client.update = Mock(return_value=client)
+    client.rpc = Mock(return_value=client)
     client.execute = Mock()
     return client
 
@@ -122,22 +124,19 @@ class TestIncrementGenerationCount:
 
     @pytest.mark.asyncio
     async def test_increment_count_success(self, mnemonic_service, mock_supabase_client):
-        """Should increment user's generation count"""
-        # Mock current count retrieval
-        mock_select_response = Mock()
-        mock_select_response.data = {"generation_count_monthly": 5}
-
-        # Mock update
-        mock_update_response = Mock()
-        mock_update_response.data = [{"generation_count_monthly": 6}]
-
-        mock_supabase_client.execute.side_effect = [mock_select_response, mock_update_response]
+        """Should increment user's generation count atomically in the database"""
+        mock_response = Mock()
+        mock_response.data = [{"generation_count_monthly": 6}]
+        mock_supabase_client.execute.return_value = mock_response
 
-        await mnemonic_service.increment_generation_count("test-user")
+        new_count = await mnemonic_service.increment_generation_count("test-user")
 
-        # Verify update was called with incremented count
-        update_call = [call for call in mock_supabase_client.update.call_args_list if call]
-        assert len(update_call) > 0
+        assert new_count == 6
+        mock_supabase_client.rpc.assert_called_once_with(
+            "increment_generation_count", {"p_user_id": "test-user"}
+        )
+        # No read-modify-write
+        mock_supabase_client.update.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_increment_count_user_not_found(self, mnemonic_service, mock_supabase_client):
@@ -173,17 +172,13 @@ class TestGenerateMnemonics:
         mock_save_response.data = [{"id": "generation-123"}]
 
         # Mock increment
-        mock_increment_select = Mock()
-        mock_increment_select.data = {"generation_count_monthly": 0}
-
-        mock_increment_update = Mock()
-        mock_increment_update.data = [{"generation_count_monthly": 1}]
+        mock_increment = Mock()
+        mock_increment.data = [{"generation_count_monthly": 1}]
 
         mock_supabase_client.execute.side_effect = [
             mock_limit_response,  # check limit
             mock_save_response,  # save generation
-            mock_increment_select,  # get current count
-            mock_increment_update,  # increment count
+            mock_increment,  # increment count
         ]
 
         # Mock Claude service
@@ -241,6 +236,81 @@ class TestGenerateMnemonics:
             assert result["metadata"]["remaining_generations"] == -1
 
 
+    @pytest.mark.asyncio
+    async def test_generate_starts_flashcard_pregeneration_when_enabled(
+        self, mnemonic_service, mock_supabase_client, mock_generation_result
+    ):
+        """With pre-generation on, flashcards for all three options should be started"""
+        mock_limit_response = Mock()
+        mock_limit_response.data = {
+            "subscription_tier": "premium",
+            "generation_count_monthly": 0,
+            "generation_reset_date": None,
+        }
+        mock_save_response = Mock()
+        mock_save_response.data = [{"id": "generation-123"}]
+        mock_supabase_client.execute.side_effect = [mock_limit_response, mock_save_response]
+
+        with patch("app.services.mnemonic_service.claude_service") as mock_claude, \
+                patch("app.services.mnemonic_service.settings") as mock_settings, \
+                patch("app.services.mnemonic_service.flashcard_pregeneration") as mock_cache:
+            mock_claude.generate_mnemonics = AsyncMock(return_value=mock_generation_result)
+            mock_settings.FLASHCARD_PREGENERATION = True
+
+            await mnemonic_service.generate_mnemonics(
+                user_id="premium-user", list_items=["Item1", "Item2", "Item3"], deck_id="test-deck"
+            )
+
+        kwargs = mock_cache.start.call_args.kwargs
+        assert kwargs["generation_id"] == "generation-123"
+        assert kwargs["list_items"] == "Item1\nItem2\nItem3"
+        assert set(kwargs["mnemonics"]) == {"acrostic", "story", "visual"}
+
+    @pytest.mark.asyncio
+    async def test_double_submit_saves_and_pregenerates_once(
+        self, mnemonic_service, mock_supabase_client, mock_generation_result
+    ):
+        """A coalesced double-submit should save one generation and start one pre-generation"""
+        mock_limit_response = Mock()
+        mock_limit_response.data = {
+            "subscription_tier": "premium",
+            "generation_count_monthly": 0,
+            "generation_reset_date": None,
+        }
+        mock_save_response = Mock()
+        mock_save_response.data = [{"id": "generation-123"}]
+        mock_supabase_client.execute.side_effect = [
+            mock_limit_response,  # first caller's limit check
+            mock_limit_response,  # second caller's limit check
+            mock_save_response,  # the one shared save
+        ]
+        release = asyncio.Event()
+
+        async def generate(**kwargs):
+            await release.wait()
+            return mock_generation_result
+
+        with patch("app.services.mnemonic_service.claude_service") as mock_claude, \
+                patch("app.services.mnemonic_service.settings") as mock_settings, \
+                patch("app.services.mnemonic_service.flashcard_pregeneration") as mock_cache:
+            mock_claude.generate_mnemonics = AsyncMock(side_effect=generate)
+            mock_settings.FLASHCARD_PREGENERATION = True
+
+            submits = [
+                asyncio.create_task(mnemonic_service.generate_mnemonics(
+                    user_id="premium-user", list_items=["Item1", "Item2", "Item3"], deck_id="test-deck"
+                ))
+                for _ in range(2)
+            ]
+            await asyncio.sleep(0)
+            release.set()
+            results = await asyncio.gather(*submits)
+
+        assert [r["metadata"]["generation_id"] for r in results] == ["generation-123", "generation-123"]
+        assert mock_claude.generate_mnemonics.await_count == 1
+        assert mock_supabase_client.insert.call_count == 1
+        assert mock_cache.start.call_count == 1
+
 class TestSelectMnemonic:
     """Test mnemonic selection"""
 
@@ -284,12 +354,14 @@ class TestSelectMnemonic:
             mock_deck_response,  # update deck
         ]
 
-        result = await mnemonic_service.select_mnemonic(
-            user_id="test-user", generation_id="gen-123", selected_type="acrostic", deck_id="deck-123"
-        )
+        with patch("app.services.mnemonic_service.flashcard_pregeneration") as mock_cache:
+            result = await mnemonic_service.select_mnemonic(
+                user_id="test-user", generation_id="gen-123", selected_type="acrostic", deck_id="deck-123"
+            )
 
         assert result["id"] == "deck-123"
         assert result["selected_mnemonic_type"] == "acrostic"
+        mock_cache.assign.assert_called_once_with("deck-123", "gen-123", "acrostic")
 
     @pytest.mark.asyncio
     async def test_select_mnemonic_generation_not_found(self, mnemonic_service, mock_supabase_client):
@@ -0,0 +1,115 @@
+"""
+Tests for Model Router
+
+Tests cover:
+- Task to model mapping from Settings
+- Fallback to the larger model on parse failures only
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from app.core.llm_json import ResponseFormatError
+from app.services.model_router import ModelRouter
+
+
+@pytest.fixture
+def router():
+    """Router with a small model for concept extraction and a larger fallback"""
+    with patch("app.services.model_router.settings") as mock_settings:
+        mock_settings.CLAUDE_MODEL_CONCEPT_EXTRACTION = "small"
+        mock_settings.CLAUDE_MODEL_MNEMONIC = "large"
+        mock_settings.CLAUDE_MODEL_FLASHCARDS = "large"
+        mock_settings.CLAUDE_MODEL_FLASHCARDS_SHORT = "small"
+        mock_settings.CLAUDE_FLASHCARDS_SHORT_MAX_ITEMS = 5
+        mock_settings.CLAUDE_FALLBACK_MODEL = "large"
+        with patch("app.services.model_router.llm_usage_service.persist", False):
+            yield ModelRouter()
+
+
+class TestRouting:
+    """Test task to model mapping"""
+
+    def test_model_for_task(self, router):
+        """Each task should use its configured model"""
+        assert router.model_for("concept_extraction") == "small"
+        assert router.model_for("mnemonic") == "large"
+
+    def test_unknown_task_raises(self, router):
+        """Unknown tasks should be rejected"""
+        with pytest.raises(ValueError):
+            router.model_for("poetry")
+
+    def test_flashcard_task_by_size(self, router):
+        """Small sets should use the short-set task"""
+        assert router.flashcard_task(5) == "flashcards_short"
+        assert router.flashcard_task(6) == "flashcards"
+
+    def test_no_fallback_when_already_on_fallback_model(self, router):
+        """Tasks already on the fallback model have nothing to fall back to"""
+        assert router.fallback_for("mnemonic") is None
+        assert router.fallback_for("concept_extraction") == "large"
+
+
+class TestFallback:
+    """Test fallback on parse failures"""
+
+    @pytest.mark.asyncio
+    async def test_success_on_routed_model(self, router):
+        """A usable response should be returned with the routed model"""
+        async def attempt(model, call):
+            return f"ok from {model}"
+
+        assert await router.run("concept_extraction", attempt) == ("ok from small", "small")
+
+    @pytest.mark.asyncio
+    async def test_parse_failure_falls_back(self, router):
+        """A parse failure should retry once on the fallback model"""
+        models = []
+
+        async def attempt(model, call):
+            models.append((model, call.retries))
+            if model == "small":
+                raise json.JSONDecodeError("Expecting value", "", 0)
+            return "ok"
+
+        assert await router.run("concept_extraction", attempt) == ("ok", "large")
+        assert models == [("small", 0), ("large", 1)]
+
+    @pytest.mark.asyncio
+    async def test_caller_retries_are_recorded(self, router):
+        """Attempts from the caller's own retry loop should count in call.retries"""
+        models = []
+
+        async def attempt(model, call):
+            models.append((model, call.retries))
+            if model == "small":
+                raise json.JSONDecodeError("Expecting value", "", 0)
+            return "ok"
+
+        await router.run("concept_extraction", attempt, retries=2)
+        assert models == [("small", 2), ("large", 3)]
+
+    @pytest.mark.asyncio
+    async def test_fallback_failure_is_raised(self, router):
+        """If the fallback also fails, its error should be raised"""
+        async def attempt(model, call):
+            raise ResponseFormatError(f"bad {model}")
+
+        with pytest.raises(ResponseFormatError, match="bad large"):
+            await router.run("concept_extraction", attempt)
+
+    @pytest.mark.asyncio
+    async def test_other_errors_do_not_fall_back(self, router):
+        """API errors should not trigger the fallback"""
+        models = []
+
+        async def attempt(model, call):
+            models.append(model)
+            raise RuntimeError("API down")
+
+        with pytest.raises(RuntimeError):
+            await router.run("concept_extraction", attempt)
+        assert models == ["small"]
@@ -11,6 +11,7 @@ Tests cover:
 - Scenario 7: Multi-language PDF processing (Spanish/English)
 """
 
+import asyncio
 import io
 from unittest.mock import AsyncMock, Mock, patch
 
@@ -548,3 +549,31 @@ class TestProcessPDFForLearning:
                         user_id=user_id,
                         deck_id=deck_id,
                     )
+
+
+class TestProcessPDFCoalescing:
+    """Test deduplication of concurrent uploads of the same file"""
+
+    @pytest.mark.asyncio
+    async def test_same_file_processed_once(self, pdf_service, mock_extracted_text, mock_claude_concepts):
+        """Concurrent uploads of identical bytes by one user should share one run"""
+        mnemonics = {
+            "acrostic": {"title": "A", "content": "A", "how_to_use": "A"},
+            "story": {"title": "S", "content": "S", "how_to_use": "S"},
+            "visual": {"title": "V", "content": "V", "how_to_use": "V"},
+            "metadata": {"generation_time_ms": 1, "item_count": 10, "model": "m"},
+        }
+
+        with patch.object(pdf_service, "extract_text_from_pdf", AsyncMock(return_value=mock_extracted_text)):
+            with patch("app.services.pdf_service.claude_service") as mock_claude:
+                mock_claude.extract_key_concepts = AsyncMock(return_value=mock_claude_concepts)
+                mock_claude.generate_mnemonics = AsyncMock(return_value=mnemonics)
+
+                results = await asyncio.gather(
+                    pdf_service.process_pdf_for_learning(b"same pdf", "user", "deck"),
+                    pdf_service.process_pdf_for_learning(b"same pdf", "user", "deck"),
+                    pdf_service.process_pdf_for_learning(b"other pdf", "user", "deck"),
+                )
+
+        assert mock_claude.extract_key_concepts.await_count == 2
+        assert results[0] == results[1]
@@ -0,0 +1,187 @@
+"""
+Tests for Rate Limit Service
+
+Tests cover:
+- Token bucket burst, refill and Retry-After
+- Per-tier bucket sizes and tier caching
+- Shared-store backend and fallback to in-process buckets
+"""
+
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.services.rate_limit_service import (
+    InMemoryRateLimitStore,
+    RateLimitService,
+    SupabaseRateLimitStore,
+)
+
+
+@pytest.fixture
+def mock_supabase_client():
+    """Mock Supabase client"""
+    client = Mock()
+    client.table = Mock(return_value=client)
+    client.select = Mock(return_value=client)
+    client.eq = Mock(return_value=client)
+    client.single = Mock(return_value=client)
+    client.rpc = Mock(return_value=client)
+    client.execute = Mock()
+    return client
+
+
+@pytest.fixture
+def rate_limit_service(mock_supabase_client):
+    """Create RateLimitService with mocked dependencies"""
+    with patch("app.services.rate_limit_service.get_supabase_client", return_value=mock_supabase_client):
+        service = RateLimitService()
+        return service
+
+
+def profile_response(tier):
+    """Build a profiles query response"""
+    response = Mock()
+    response.data = {"subscription_tier": tier}
+    return response
+
+
+class TestInMemoryStore:
+    """Test the in-process token bucket"""
+
+    def test_burst_then_reject_with_retry_after(self):
+        """A full bucket allows `capacity` requests, then reports when to retry"""
+        store = InMemoryRateLimitStore()
+
+        with patch("app.services.rate_limit_service.time.monotonic", return_value=1000.0):
+            results = [store.take("user", capacity=3, refill_per_second=0.1) for _ in range(4)]
+
+        assert [result.allowed for result in results] == [True, True, True, False]
+        assert results[2].remaining == 0
+        assert results[3].retry_after_seconds == 10
+
+    def test_refills_over_time(self):
+        """Tokens come back at the refill rate, capped at capacity"""
+        store = InMemoryRateLimitStore()
+
+        with patch("app.services.rate_limit_service.time.monotonic", return_value=1000.0):
+            store.take("user", capacity=1, refill_per_second=0.5)
+            assert not store.take("user", capacity=1, refill_per_second=0.5).allowed
+
+        with patch("app.services.rate_limit_service.time.monotonic", return_value=1002.0):
+            assert store.take("user", capacity=1, refill_per_second=0.5).allowed
+
+    def test_buckets_are_per_key(self):
+        """One user's bucket doesn't affect another's"""
+        store = InMemoryRateLimitStore()
+
+        assert store.take("a", capacity=1, refill_per_second=0.01).allowed
+        assert not store.take("a", capacity=1, refill_per_second=0.01).allowed
+        assert store.take("b", capacity=1, refill_per_second=0.01).allowed
+
+    def test_evicts_least_recently_used_full_buckets(self):
+        """Past MAX_BUCKETS, idle buckets that have refilled are dropped oldest first"""
+        store = InMemoryRateLimitStore()
+        store.MAX_BUCKETS = 2
+
+        with patch("app.services.rate_limit_service.time.monotonic", return_value=1000.0):
+            store.take("a", capacity=1, refill_per_second=1.0)
+            store.take("b", capacity=1, refill_per_second=1.0)
+
+        with patch("app.services.rate_limit_service.time.monotonic", return_value=1010.0):
+            store.take("c", capacity=1, refill_per_second=1.0)
+
+        assert list(store._buckets) == ["b", "c"]
+
+    def test_eviction_uses_each_buckets_own_refill_rate(self):
+        """A slow bucket that is still refilling survives a fast caller's eviction"""
+        store = InMemoryRateLimitStore()
+        store.MAX_BUCKETS = 1
+
+        with patch("app.services.rate_limit_service.time.monotonic", return_value=1000.0):
+            store.take("slow", capacity=1, refill_per_second=0.001)
+
+        with patch("app.services.rate_limit_service.time.monotonic", return_value=1010.0):
+            store.take("fast", capacity=1, refill_per_second=1.0)
+
+        assert "slow" in store._buckets
+        with patch("app.services.rate_limit_service.time.monotonic", return_value=1010.0):
+            assert not store.take("slow", capacity=1, refill_per_second=0.001).allowed
+
+
+class TestRateLimitService:
+    """Test per-user, per-tier limiting"""
+
+    @pytest.mark.asyncio
+    async def test_premium_gets_larger_bucket(self, rate_limit_service, mock_supabase_client):
+        """Premium users should be able to burst more than free users"""
+        mock_supabase_client.execute.side_effect = [profile_response("free"), profile_response("premium")]
+
+        with patch("app.services.rate_limit_service.settings") as mock_settings:
+            mock_settings.RATE_LIMIT_ENABLED = True
+            mock_settings.RATE_LIMIT_FREE_BURST = 2
+            mock_settings.RATE_LIMIT_FREE_PER_HOUR = 1
+            mock_settings.RATE_LIMIT_PREMIUM_BURST = 4
+            mock_settings.RATE_LIMIT_PREMIUM_PER_HOUR = 1
+            mock_settings.RATE_LIMIT_TIER_CACHE_SECONDS = 300
+
+            free = [(await rate_limit_service.check("free-user")).allowed for _ in range(5)]
+            premium = [(await rate_limit_service.check("premium-user")).allowed for _ in range(5)]
+
+        assert free.count(True) == 2
+        assert premium.count(True) == 4
+        # Tiers are looked up once per user
+        assert mock_supabase_client.execute.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_tier_cache_is_bounded(self, rate_limit_service, mock_supabase_client):
+        """Expired tiers are dropped on write and the oldest go past MAX_CACHED_TIERS"""
+        mock_supabase_client.execute.return_value = profile_response("free")
+        rate_limit_service.MAX_CACHED_TIERS = 2
+
+        with patch("app.services.rate_limit_service.settings") as mock_settings:
+            mock_settings.RATE_LIMIT_TIER_CACHE_SECONDS = 300
+            with patch("app.services.rate_limit_service.time.monotonic", return_value=1000.0):
+                await rate_limit_service.get_tier("user-1")
+            with patch("app.services.rate_limit_service.time.monotonic", return_value=1400.0):
+                await rate_limit_service.get_tier("user-2")
+                await rate_limit_service.get_tier("user-3")
+                assert list(rate_limit_service._tiers) == ["user-2", "user-3"]
+                await rate_limit_service.get_tier("user-4")
+
+        assert list(rate_limit_service._tiers) == ["user-3", "user-4"]
+
+    @pytest.mark.asyncio
+    async def test_disabled_always_allows(self, rate_limit_service, mock_supabase_client):
+        """RATE_LIMIT_ENABLED=False should skip the limiter entirely"""
+        with patch("app.services.rate_limit_service.settings") as mock_settings:
+            mock_settings.RATE_LIMIT_ENABLED = False
+            result = await rate_limit_service.check("user")
+
+        assert result.allowed
+        mock_supabase_client.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_shared_store_is_used(self, rate_limit_service, mock_supabase_client):
+        """With a shared store, the database function decides"""
+        shared_response = Mock()
+        shared_response.data = [{"allowed": False, "remaining": 0, "retry_after_seconds": 42}]
+        mock_supabase_client.execute.side_effect = [profile_response("free"), shared_response]
+        rate_limit_service.shared_store = SupabaseRateLimitStore(mock_supabase_client)
+
+        result = await rate_limit_service.check("user")
+
+        assert not result.allowed
+        assert result.retry_after_seconds == 42
+        assert mock_supabase_client.rpc.call_args.args[0] == "take_rate_limit_token"
+        assert mock_supabase_client.rpc.call_args.args[1]["p_key"] == "generation:free:user"
+
+    @pytest.mark.asyncio
+    async def test_shared_store_failure_falls_back(self, rate_limit_service, mock_supabase_client):
+        """If the shared store fails, the in-process bucket is used"""
+        mock_supabase_client.execute.side_effect = [profile_response("free"), Exception("connection refused")]
+        rate_limit_service.shared_store = SupabaseRateLimitStore(mock_supabase_client)
+
+        result = await rate_limit_service.check("user")
+
+        assert result.allowed
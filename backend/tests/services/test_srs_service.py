@@ -10,7 +10,9 @@ Tests cover:
 
 import pytest
 from datetime import date, datetime, timedelta
+from unittest.mock import AsyncMock, Mock, patch
 
+from app.services.due_load_balancer import DueHistogramIndex, get_fuzz_range, pick_balanced_interval
 from app.services.srs_service import SRSService
 
 
@@ -319,3 +321,191 @@ class TestEdgeCases:
         assert ease > 2.5, "Ease should increase with Easy ratings"
         # There should be some upper practical limit
         assert ease < 5.0, "Ease shouldn't grow unbounded in practice"
+
+
+class TestLoadBalancing:
+    """Test load-balanced due date fuzzing"""
+
+    def test_short_intervals_are_not_fuzzed(self):
+        """Intervals under 3 days should stay exact"""
+
+        assert get_fuzz_range(1) == (1, 1)
+        assert get_fuzz_range(2) == (2, 2)
+
+    def test_fuzz_window_grows_with_interval(self):
+        """Longer intervals should get a wider window around the target"""
+
+        assert get_fuzz_range(6) == (5, 7)
+        assert get_fuzz_range(15) == (13, 17)
+        assert get_fuzz_range(100) == (95, 105)
+
+    def test_picks_least_loaded_day(self):
+        """Should move the card to the emptiest day in the window"""
+
+        today = date(2026, 1, 1)
+        histogram = {
+            today + timedelta(days=13): 40,
+            today + timedelta(days=14): 35,
+            today + timedelta(days=15): 50,
+            today + timedelta(days=16): 2,
+            today + timedelta(days=17): 30,
+        }
+
+        assert pick_balanced_interval(15, histogram, today) == 16
+
+    def test_ties_prefer_target_interval(self):
+        """With an empty histogram the SM-2 interval should be kept"""
+
+        assert pick_balanced_interval(15, {}, date(2026, 1, 1)) == 15
+
+    def test_histogram_index_tracks_moves(self):
+        """Moving a card should update both old and new day counts"""
+
+        index = DueHistogramIndex()
+        old_day, new_day = date(2026, 1, 2), date(2026, 1, 9)
+        index.set("user-1", {old_day: 1})
+
+        index.move("user-1", old_day, new_day)
+
+        assert index.get("user-1") == {new_day: 1}
+
+    def test_histogram_index_expires(self):
+        """Expired histograms should be reported as missing"""
+
+        index = DueHistogramIndex(ttl_seconds=-1)
+        index.set("user-1", {date(2026, 1, 2): 3})
+
+        assert index.get("user-1") is None
+
+    def test_histogram_index_is_bounded(self):
+        """Expired entries are swept on write and the oldest go past max_entries"""
+
+        index = DueHistogramIndex(ttl_seconds=60, max_entries=2)
+        with patch("app.services.due_load_balancer.time.monotonic", return_value=1000.0):
+            index.set("user-1", {})
+        with patch("app.services.due_load_balancer.time.monotonic", return_value=1100.0):
+            index.set("user-2", {})
+            index.set("user-3", {})
+            assert list(index._entries) == ["user-2", "user-3"]
+            index.set("user-4", {})
+
+        assert list(index._entries) == ["user-3", "user-4"]
+
+    @pytest.mark.asyncio
+    async def test_balance_interval_falls_back_on_error(self, srs_service):
+        """A failing histogram load should not change the interval"""
+        srs_service.queries = Mock()
+        srs_service.queries.get_due_histogram = AsyncMock(side_effect=Exception("connection refused"))
+
+        result = await srs_service._balance_interval("user-1", 15, date(2026, 1, 1))
+
+        assert result == 15
+
+
+@pytest.fixture
+def mock_supabase_client():
+    """Mock Supabase client with a chainable query builder"""
+    client = Mock()
+    for method in ["table", "select", "eq", "lte", "gte", "in_", "order", "single", "insert", "update"]:
+        setattr(client, method, Mock(return_value=client))
+    client.execute = Mock()
+    return client
+
+
+class TestMergedStudySession:
+    """Test cross-deck study sessions with a merged due queue"""
+
+    @pytest.mark.asyncio
+    async def test_merged_queue_uses_single_joined_query(self, srs_service):
+        """Due cards across decks should come from one query joined on user_id"""
+        srs_service.queries = Mock()
+        srs_service.queries.get_due_cards_for_user = AsyncMock(return_value=[
+            {"id": "card-1", "deck_id": "deck-1"},
+            {"id": "card-2", "deck_id": "deck-2"},
+        ])
+
+        cards = await srs_service.get_due_cards_for_user("user-1")
+
+        srs_service.queries.get_due_cards_for_user.assert_awaited_once_with(
+            "user-1", date.today(), deck_ids=None
+        )
+        assert [card["id"] for card in cards] == ["card-1", "card-2"]
+
+    @pytest.mark.asyncio
+    async def test_merged_queue_applies_deck_filter(self, srs_service):
+        """An explicit deck filter should be pushed into the query"""
+        srs_service.queries = Mock()
+        srs_service.queries.get_due_cards_for_user = AsyncMock(return_value=[])
+
+        await srs_service.get_due_cards_for_user("user-1", deck_ids=["deck-1", "deck-2"])
+
+        assert srs_service.queries.get_due_cards_for_user.call_args.kwargs["deck_ids"] == ["deck-1", "deck-2"]
+
+    @pytest.mark.asyncio
+    async def test_merged_session_creates_one_session_without_deck(self, srs_service, mock_supabase_client):
+        """A multi-deck session should be stored as one row with a NULL deck_id"""
+        srs_service.admin_client = mock_supabase_client
+        srs_service.queries = Mock()
+        srs_service.queries.get_due_cards_for_user = AsyncMock(return_value=[
+            {"id": "card-1", "deck_id": "deck-1"},
+            {"id": "card-2", "deck_id": "deck-2"},
+        ])
+        mock_supabase_client.execute.return_value = Mock(data=[{"id": "session-1", "deck_id": None}])
+
+        result = await srs_service.start_merged_study_session("user-1")
+
+        assert result["session"]["id"] == "session-1"
+        assert result["cards_due_count"] == 2
+        inserted = mock_supabase_client.insert.call_args[0][0]
+        assert inserted["deck_id"] is None
+        assert inserted["user_id"] == "user-1"
+
+    @pytest.mark.asyncio
+    async def test_merged_session_without_due_cards(self, srs_service, mock_supabase_client):
+        """No session should be created when nothing is due"""
+        srs_service.admin_client = mock_supabase_client
+        srs_service.queries = Mock()
+        srs_service.queries.get_due_cards_for_user = AsyncMock(return_value=[])
+
+        result = await srs_service.start_merged_study_session("user-1")
+
+        assert result["session"] is None
+        assert result["cards_due_count"] == 0
+        mock_supabase_client.insert.assert_not_called()
+
+
+class TestReviewCard:
+    """Test recording a review through the direct query path"""
+
+    @pytest.mark.asyncio
+    async def test_review_writes_card_review_and_session_in_one_call(self, srs_service):
+        """The card update, review row and session counter should go out together"""
+        srs_service.load_balance = False
+        srs_service.queries = Mock()
+        srs_service.queries.get_flashcard_with_owner = AsyncMock(return_value=(
+            {"id": "card-1", "ease_factor": 2.5, "interval_days": 0, "repetitions": 0, "next_review_date": None},
+            "user-1",
+        ))
+        srs_service.queries.record_review = AsyncMock(return_value={"id": "card-1", "interval_days": 1})
+
+        result = await srs_service.review_card(flashcard_id="card-1", quality=3, session_id="session-1", user_id="user-1")
+
+        assert result == {"id": "card-1", "interval_days": 1}
+        kwargs = srs_service.queries.record_review.call_args.kwargs
+        assert kwargs["session_id"] == "session-1"
+        assert kwargs["srs_update"]["interval_days"] == 1
+        assert kwargs["srs_update"]["next_review_date"] == date.today() + timedelta(days=1)
+        assert kwargs["review"]["quality"] == 3
+        assert kwargs["review"]["previous_interval"] == 0
+
+    @pytest.mark.asyncio
+    async def test_review_rejects_other_users_card(self, srs_service):
+        """A card in someone else's deck should not be reviewed"""
+        srs_service.queries = Mock()
+        srs_service.queries.get_flashcard_with_owner = AsyncMock(return_value=({"id": "card-1"}, "user-2"))
+        srs_service.queries.record_review = AsyncMock()
+
+        with pytest.raises(Exception, match="Access denied"):
+            await srs_service.review_card(flashcard_id="card-1", quality=3, session_id=None, user_id="user-1")
+
+        srs_service.queries.record_review.assert_not_awaited()